@@ -0,0 +1,36 @@
+import os, sys
+root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(root); sys.path.insert(0, root)
+
+from backtesting.shared.load import load_df
+from backtesting.bayeslinreg.src.ta import add_signals
+from backtesting.mllinreg.src.ta import add_indicators   # bayeslinreg regresses on mllinreg's features
+from backtesting.shared.trade import simulate_trades, evaluate_trades
+from backtesting.shared.result import plot, summarize
+import pandas as pd
+
+SYMBOL     = "BTCUSDT"
+ASSET_TYPE = "crypto"
+INTERVAL   = "15m"
+RUN_START  = "2025-09-21"
+RUN_END    = "2026-03-21"
+
+INDICATORS = dict()   # fixed — no tunable indicator params
+SIGNALS    = dict(forgetting=0.995, prob_buy=0.6, prob_sell=0.4, use_trend_filter=True)
+TRADES     = dict(tp_pct=0.05, sl_pct=0.03, max_candles=192)
+EVAL       = dict(init_portfolio=1000, trade_size_pct=0.1, fee_pct=0.001, leverage=1)
+SAVE_PLOT  = None   # e.g. "results/bayeslinreg/single_run.png" to keep the figure
+
+df = load_df(ticker=SYMBOL, timeframe=INTERVAL, asset_type=ASSET_TYPE)
+df = add_indicators(df, **INDICATORS)
+df = add_signals(df, **SIGNALS)
+df = df[(df["close_time"] > pd.to_datetime(RUN_START)) & (df["close_time"] <= pd.to_datetime(RUN_END))]
+
+trades = simulate_trades(df, **TRADES)
+resdf  = evaluate_trades(trades, **EVAL)
+
+PROB_PANEL = {"col": "prob_up", "label": "P(next return > 0)",
+              "buy": SIGNALS["prob_buy"], "sell": SIGNALS["prob_sell"]}
+
+summarize(resdf)
+plot(df, trades=resdf, price_overlays=[("ma_trend", "MA-trend", "orange")], indicator_panel=PROB_PANEL, save_path=SAVE_PLOT)
@@ -0,0 +1,18 @@
+from backtesting.shared.diagnose import run_diagnose as _run
+from backtesting.bayeslinreg.src.optimize import _build_df
+
+def _make_plot_kwargs(p):
+    return {
+        "price_overlays": [("ma_trend", "MA-trend", "orange")],
+        "indicator_panel": {"col": "prob_up", "label": "P(next return > 0)", "buy": p["prob_buy"], "sell": p["prob_sell"]},
+    }
+
+def run_diagnose(symbol, interval, test_start, test_end, eval_params, asset_type, run_dir=None, rank=0, intrabar=False, show=True, sizing=None):
+    return _run(
+        strategy_name="Bayesian Online Linear Regression", runs_base="results/bayeslinreg",
+        symbol=symbol, interval=interval,
+        test_start=test_start, test_end=test_end,
+        eval_params=eval_params, asset_type=asset_type,
+        build_df=_build_df, make_plot_kwargs=_make_plot_kwargs,
+        run_dir=run_dir, rank=rank, intrabar=intrabar, show=show, sizing=sizing,
+    )
@@ -0,0 +1,24 @@
+from backtesting.shared.optimize import run_grid_search as _run
+from backtesting.bayeslinreg.src.ta import GRAPH
+
+_COLS = ["forgetting", "prob_buy", "prob_sell", "use_trend_filter",
+         "tp_pct", "sl_pct", "trades", "win_rate", "total_pnl", "sharpe", "max_drawdown"]
+
+def _build_df(rawdf, p):
+    return GRAPH(rawdf, p)
+
+_build_df.pure = True   # reads rawdf without mutating it — build_cached skips the copy
+
+def run_grid_search(symbol, interval, train_start, train_end, grid, eval_params, asset_type, intrabar=False, sizing=None, prune=None,
+                    workers=None):
+    return _run(
+        strategy_name="Bayesian Online Linear Regression", runs_base="results/bayeslinreg",
+        symbol=symbol, interval=interval,
+        train_start=train_start, train_end=train_end,
+        grid=grid, eval_params=eval_params, asset_type=asset_type,
+        build_df=_build_df,
+        is_valid=lambda p: 0 < p["prob_sell"] < 0.5 < p["prob_buy"] < 1 and 0 < p["forgetting"] <= 1,
+        readme_cols=_COLS,
+        format_combo=lambda p: f"lam={p['forgetting']} buy={p['prob_buy']} sell={p['prob_sell']} tp={p['tp_pct']} sl={p['sl_pct']}",
+        intrabar=intrabar, sizing=sizing, prune=prune, workers=workers,
+    )
@@ -0,0 +1,130 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from backtesting.mllinreg.src.ta import _FEATURES
+
+# --- online Bayesian linear regression of the next candle return on the mllinreg features ---
+# Normal-inverse-gamma posterior over (weights, noise variance), updated once per candle with
+# exponential forgetting: before each update the precision and the noise evidence are discounted
+# by `forgetting`, so old candles fade out instead of falling off a fixed training window.
+# Each step is a rank-1 (Sherman–Morrison) update of the covariance — O(d²) per candle, no refits.
+# The predictive for the next return is Student-t: mean x·m, scale² (β/α)(1 + xᵀPx), 2α dof.
+class BayesLinReg:
+    def __init__(self, d: int, forgetting=0.995, prior_var=1.0, noise_var=1e-5):
+        self.lam   = forgetting
+        self.m     = np.zeros(d)
+        self.P     = np.eye(d) * prior_var   # posterior covariance / noise variance
+        self.alpha = 1.0
+        self.beta  = noise_var               # prior noise variance guess × alpha
+        self.n     = 0
+
+    # --- Student-t predictive (mean, scale², dof) for features x ---
+    def predictive(self, x: np.ndarray):
+        return float(x @ self.m), self.beta / self.alpha * (1.0 + float(x @ self.P @ x)), 2.0 * self.alpha
+
+    # --- (mean, variance, P(next return > 0)) for features x ---
+    def predict(self, x: np.ndarray):
+        mean, scale, dof = self.predictive(x)
+        var = scale * dof / (dof - 2.0) if dof > 2.0 else math.inf
+        return mean, var, _prob_positive(mean, scale, dof)
+
+    # --- absorb one observed (x, y) pair ---
+    def update(self, x: np.ndarray, y: float) -> None:
+        P     = self.P / self.lam
+        alpha = self.lam * self.alpha
+        beta  = self.lam * self.beta
+        Px    = P @ x
+        q     = 1.0 + float(x @ Px)
+        err   = y - float(x @ self.m)
+        self.m     = self.m + Px * (err / q)
+        self.P     = P - np.outer(Px, Px) / q
+        self.alpha = alpha + 0.5
+        self.beta  = beta + 0.5 * err * err / q
+        self.n    += 1
+
+
+def _prob_positive(mean: float, scale: float, dof: float) -> float:
+    from scipy.special import stdtr   # lazy, like sklearn in mllinreg
+    return float(stdtr(dof, mean / math.sqrt(scale))) if scale > 0 else 0.5
+
+
+# --- regressors: intercept + features, RSI centred and rescaled to the others' order of magnitude ---
+def _design(features: dict) -> np.ndarray:
+    cols = [np.ones(len(features["rsi"]))]
+    for f in _FEATURES:
+        v = np.asarray(features[f], dtype=np.float64)
+        cols.append((v - 50.0) / 100.0 if f == "rsi" else v)
+    return np.column_stack(cols)
+
+
+# --- one pass over the candles: at bar t learn (x[t-1], return t-1→t), then predict return t→t+1 ---
+# Returns (pred_mean, pred_std, prob_up) aligned with close; the first `warmup` bars are neutral.
+def posterior_predictive(close, *features, forgetting=0.995, prior_var=1.0, warmup=200):
+    from scipy.special import stdtr
+
+    close = np.asarray(close, dtype=np.float64)
+    X     = _design(dict(zip(_FEATURES, features)))
+    n, d  = X.shape
+    ret   = np.r_[np.nan, close[1:] / close[:-1] - 1]
+    model = BayesLinReg(d, forgetting=forgetting, prior_var=prior_var, noise_var=float(np.nanvar(ret[1:warmup + 1]) or 1e-6))
+
+    mean, scale, dof = np.zeros(n), np.full(n, np.nan), np.full(n, np.nan)
+    for t in range(1, n):
+        model.update(X[t - 1], ret[t])
+        mean[t], scale[t], dof[t] = model.predictive(X[t])
+
+    var  = np.where(dof > 2.0, scale * dof / (dof - 2.0), np.nan)   # bar 0 has no posterior yet
+    prob = stdtr(dof, mean / np.sqrt(scale))
+    cold = np.arange(n) < warmup
+    mean[cold], prob[cold] = 0.0, 0.5
+    return mean, np.sqrt(var), np.nan_to_num(prob, nan=0.5)
+
+
+# --- add buy/sell/hold signals on the probability of a positive next return ---
+def add_signals(df: pd.DataFrame, forgetting=0.995, prob_buy=0.6, prob_sell=0.4, use_trend_filter=True,
+                use_vol_filter=False, warmup=200) -> pd.DataFrame:
+    df["_pred_mean"], df["_pred_std"], df["prob_up"] = posterior_predictive(
+        df["close_price"], *(df[f] for f in _FEATURES), forgetting=forgetting, warmup=warmup)
+    df["signal"] = _signal(_prob_mask(df["prob_up"], df["close_price"], df["ma_trend"], df["quote_asset_volume"], df["vol_ma"],
+                                      side=1, level=prob_buy, use_trend_filter=use_trend_filter, use_vol_filter=use_vol_filter),
+                           _prob_mask(df["prob_up"], df["close_price"], df["ma_trend"], df["quote_asset_volume"], df["vol_ma"],
+                                      side=-1, level=prob_sell, use_trend_filter=use_trend_filter, use_vol_filter=use_vol_filter))
+    return df
+
+
+def _prob_mask(prob: pd.Series, close, ma_trend, volume, vol_ma, side=1, level=0.6,
+               use_trend_filter=True, use_vol_filter=False) -> pd.Series:
+    vol_ok = (volume > vol_ma) if use_vol_filter else True
+    if side == 1:
+        trend_ok = (close > ma_trend) if use_trend_filter else True
+        return (prob > level) & (prob.shift(1) <= level) & trend_ok & vol_ok
+    trend_ok = (close < ma_trend) if use_trend_filter else True
+    return (prob < level) & (prob.shift(1) >= level) & trend_ok & vol_ok
+
+def _signal(buy_mask: pd.Series, sell_mask: pd.Series) -> np.ndarray:
+    return np.select([sell_mask.to_numpy(), buy_mask.to_numpy()], [-1, 1], 0)
+
+
+# --- node graph (shared.dag): features are shared with mllinreg, the posterior pass is cached per forgetting ---
+def _graph():
+    from backtesting.mllinreg.src.ta import GRAPH as ML_GRAPH
+    from backtesting.shared.dag import SIGNAL, Graph, Node
+    from backtesting.shared.registry import get
+
+    _filters = ("close_price", "ma_trend", "quote_asset_volume", "vol_ma")
+    _mask    = {"use_trend_filter": "use_trend_filter"}
+    features = [n for n in ML_GRAPH.nodes.values() if n.stage != SIGNAL]
+    return Graph("bayeslinreg", [
+        *features,
+        Node("posterior", posterior_predictive, ["close_price", *_FEATURES], stage=SIGNAL,
+             params={"forgetting": "forgetting"}, const={"warmup": 200}, outputs=("_pred_mean", "_pred_std", "prob_up")),
+        Node("buy_mask",  _prob_mask, ["prob_up", *_filters], params={"level": "prob_buy", **_mask},
+             const={"side": 1}, stage=SIGNAL, column=False),
+        Node("sell_mask", _prob_mask, ["prob_up", *_filters], params={"level": "prob_sell", **_mask},
+             const={"side": -1}, stage=SIGNAL, column=False),
+        Node("signal", _signal, ["buy_mask", "sell_mask"], stage=SIGNAL),
+    ], types=get("bayeslinreg")["params"])
+
+GRAPH = _graph()
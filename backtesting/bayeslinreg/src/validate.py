@@ -0,0 +1,23 @@
+from backtesting.shared.validate import run_validation as _run
+from backtesting.bayeslinreg.src.optimize import _build_df
+
+def _make_param_row(p):
+    return {"lam": p["forgetting"], "p_buy": p["prob_buy"], "p_sell": p["prob_sell"],
+            "trend_f": bool(p["use_trend_filter"]), "tp": p["tp_pct"], "sl": p["sl_pct"]}
+
+def _format_best(b):
+    return (f"forgetting={b['lam']}\n"
+            f"prob_buy={b['p_buy']}, prob_sell={b['p_sell']}, use_trend_filter={b['trend_f']}\n"
+            f"tp_pct={b['tp']}, sl_pct={b['sl']}")
+
+def run_validation(symbol, interval, test_start, test_end, eval_params, asset_type, run_dir=None, top_n=10, intrabar=False,
+                   test_windows=None, symbols=None, n_jobs=1, sizing=None, rank_by="robust"):
+    return _run(
+        strategy_name="Bayesian Online Linear Regression", runs_base="results/bayeslinreg",
+        symbol=symbol, interval=interval,
+        test_start=test_start, test_end=test_end,
+        eval_params=eval_params, asset_type=asset_type,
+        build_df=_build_df, make_param_row=_make_param_row, format_best=_format_best,
+        run_dir=run_dir, top_n=top_n, intrabar=intrabar,
+        test_windows=test_windows, symbols=symbols, n_jobs=n_jobs, sizing=sizing, rank_by=rank_by,
+    )
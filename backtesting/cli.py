@@ -0,0 +1,342 @@
+import argparse
+import json
+import os
+import sys
+
+# repo root: data/ and results/ paths are relative to it
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Only argparse/os/json at import time — pandas, rich and the strategy modules load inside each
+# command, matplotlib only when a plot is drawn, sklearn only when mllinreg builds signals.
+
+
+def _eval_params(a) -> dict:
+    out = dict(init_portfolio=a.init_portfolio, trade_size_pct=a.trade_size_pct, fee_pct=a.fee_pct, leverage=a.leverage)
+    if getattr(a, "costs", None) is not None:
+        out["cost_model"] = _costs(a)
+    return out
+
+
+# --- --costs [impact=0.5,spread=cs,funding_rate=0.0001,...] -> shared.costs model; bare --costs keeps the defaults ---
+def _costs(a) -> dict:
+    out = {}
+    for item in filter(None, a.costs.split(",")):
+        key, _, raw = item.partition("=")
+        key, raw = key.strip(), raw.strip()
+        if raw.lower() in ("none", "cs", "true", "false"):
+            out[key] = {"none": None, "cs": "cs", "true": True, "false": False}[raw.lower()]
+        else:
+            out[key] = int(raw) if key in ("window", "funding_hours") else float(raw)
+    return out
+
+
+# --- --sizing method=kelly,fraction=0.5,max_size=2 -> shared.sizing config ---
+def _sizing(a) -> dict:
+    if not a.sizing:
+        return None
+    out = {}
+    for item in a.sizing.split(","):
+        key, _, raw = item.partition("=")
+        key, raw = key.strip(), raw.strip()
+        try:
+            out[key] = int(raw) if key in ("window", "min_trades") else float(raw)
+        except ValueError:
+            out[key] = raw
+    if out.get("method") not in ("kelly", "vol", "hit_rate"):
+        raise ValueError(f"--sizing: method must be kelly, vol or hit_rate, got {out.get('method')!r}")
+    return out
+
+
+# --- --prune [max_dd=15,min_trades=10,chunk=8] -> shared.prune config; bare --prune keeps the defaults ---
+def _prune(a):
+    if getattr(a, "prune", None) is None:
+        return None
+    out = {}
+    for item in filter(None, a.prune.split(",")):
+        key, _, raw = item.partition("=")
+        out[key.strip()] = float(raw) if key.strip() == "max_dd" else int(raw)
+    return out
+
+
+# --- --workers [HOST:PORT] / --local-workers N -> shared.distributed config; neither → this process ---
+def _workers(a):
+    if getattr(a, "workers", None) is None and not getattr(a, "local_workers", 0):
+        return None
+    return {"address": a.workers or "127.0.0.1:0", "local": a.local_workers or 0}
+
+
+def _params(name: str, items: list) -> dict:
+    from backtesting.shared import registry
+
+    p = dict(registry.get(name)["defaults"])
+    for item in items or []:
+        key, _, raw = item.partition("=")
+        p[key.strip()] = registry.parse_value(name, key.strip(), raw.strip())
+    return p
+
+
+# --- commands ---
+
+def cmd_single(a):
+    import pandas as pd
+    from backtesting.shared import registry
+    from backtesting.shared.cache import raw_frame
+    from backtesting.shared.result import plot, summarize
+    from backtesting.shared.sizing import size_bars, size_trades
+    from backtesting.shared.trade import evaluate_trades, simulate_trades
+
+    p = _params(a.strategy, a.param)
+    rawdf, sub, _ = raw_frame(a.symbol, a.interval, a.asset_type, a.intrabar)
+    df = registry.build_df(a.strategy)(rawdf.copy(), p)
+    df = size_bars(df[(df["close_time"] > pd.to_datetime(a.start)) & (df["close_time"] <= pd.to_datetime(a.end))], _sizing(a))
+    trades = simulate_trades(df, tp_pct=p["tp_pct"], sl_pct=p["sl_pct"], max_candles=p["max_candles"],
+                             intrabar=a.intrabar, sub_bars=sub)
+    trades = size_trades(trades, _sizing(a), df)
+    if trades.empty:
+        print("No trades fired.")
+        return
+    resdf = evaluate_trades(trades, **_eval_params(a), bars=df)
+    summarize(resdf)
+    if not a.no_plot or a.save_plot:
+        plot(df, trades=resdf, save_path=a.save_plot, show=not a.no_plot, **registry.plot_kwargs(a.strategy, p))
+
+
+def cmd_grid(a):
+    from backtesting.shared import registry
+
+    grid = registry.parse_grid(a.strategy, a.grid)
+    return registry.module(a.strategy, "optimize").run_grid_search(
+        a.symbol, a.interval, a.train[0], a.train[1], grid, _eval_params(a), a.asset_type, intrabar=a.intrabar,
+        sizing=_sizing(a), prune=_prune(a), workers=_workers(a))
+
+
+def cmd_validate(a, run_dir=None):
+    from backtesting.shared import registry
+
+    windows = [tuple(w) for w in a.test]
+    return registry.module(a.strategy, "validate").run_validation(
+        a.symbol, a.interval, windows[0][0], windows[0][1], _eval_params(a), a.asset_type,
+        run_dir=run_dir or a.run_dir, top_n=a.top_n, intrabar=a.intrabar,
+        test_windows=windows if len(windows) > 1 else None, symbols=a.symbols, n_jobs=a.jobs, sizing=_sizing(a),
+        rank_by=a.rank_by)
+
+
+def cmd_diagnose(a):
+    from backtesting.shared import registry
+
+    return registry.module(a.strategy, "diagnose").run_diagnose(
+        a.symbol, a.interval, a.test[0], a.test[1], _eval_params(a), a.asset_type,
+        run_dir=a.run_dir, rank=a.rank, intrabar=a.intrabar, show=not a.no_plot, sizing=_sizing(a))
+
+
+def cmd_tune(a):
+    run_dir = cmd_grid(a)
+    a.test, a.run_dir = [a.test], None
+    return cmd_validate(a, run_dir=run_dir)
+
+
+def cmd_sweep(a):
+    from backtesting.shared import registry
+    from backtesting.shared.sweep import run_sweep
+
+    grids = {s: registry.get(s)["grid"] for s in a.strategies}
+    if a.grid_file:
+        with open(a.grid_file) as f:
+            grids |= {s: registry.parse_grid(s, [], base=g) for s, g in json.load(f).items()}
+    return run_sweep(
+        strategies=a.strategies, symbols={a.asset_type: a.symbols}, intervals=a.intervals, grids=grids,
+        train=tuple(a.train), test=tuple(a.test), eval_params=_eval_params(a),
+        top_n=a.top_n, intrabar=a.intrabar, n_jobs=a.jobs, prune=_prune(a),
+    )
+
+
+def cmd_worker(a):
+    from backtesting.shared.distributed import work
+
+    work(a.connect, cache_dir=a.cache, retry=a.retry)
+
+
+def cmd_ensemble(a):
+    from backtesting.shared.ensemble import run_ensemble
+
+    members = {m: _params(m, [i.split(".", 1)[1] for i in a.param if i.split(".", 1)[0] == m]) for m in a.members}
+    weights = {}
+    for item in a.weights:
+        key, _, raw = item.partition("=")
+        weights[key.strip()] = float(raw)
+    return run_ensemble(
+        a.symbol, a.interval, a.start, a.end, _eval_params(a), a.asset_type, members=members, rules=a.rules,
+        weights=weights, quorum=a.quorum, threshold=a.threshold, window=a.window,
+        tp_pct=a.tp, sl_pct=a.sl, max_candles=a.max_candles, intrabar=a.intrabar, sizing=_sizing(a),
+    )
+
+
+def cmd_report(a):
+    from backtesting.shared import registry, report
+
+    runs = list(a.run_dirs)
+    for s in a.strategies or ([] if runs else list(registry.STRATEGIES)):
+        runs += report.find_runs(registry.runs_base(s))
+    done = report.render_runs(runs, n_jobs=a.jobs)
+    failed = {d: r for d, r in done.items() if isinstance(r, str)}
+    print(f"Rendered {len(done) - len(failed)}/{len(done)} runs")
+    for d, err in failed.items():
+        print(f"  {d}: {err}")
+
+
+# --- argument parsing ---
+
+def _parser() -> argparse.ArgumentParser:
+    from backtesting.shared.registry import STRATEGIES
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--asset-type", default="crypto")
+    common.add_argument("--init-portfolio", type=float, default=1000)
+    common.add_argument("--trade-size-pct", type=float, default=0.1)
+    common.add_argument("--fee-pct", type=float, default=0.001)
+    common.add_argument("--leverage", type=float, default=1)
+    common.add_argument("--intrabar", action="store_true", help="tp/sl against high/low, ties resolved on 1m candles")
+    common.add_argument("--costs", nargs="?", const="", default=None, metavar="KEY=V,...",
+                        help="maker/taker fees, high/low spread, sqrt slippage and funding (shared.costs) instead of the flat fee")
+
+    one = argparse.ArgumentParser(add_help=False, parents=[common])
+    one.add_argument("strategy", choices=list(STRATEGIES))
+    one.add_argument("--symbol", default="BTCUSDT")
+    one.add_argument("--interval", default="15m")
+    one.add_argument("--sizing", default=None, metavar="method=M,KEY=V,...",
+                     help="per-trade sizing (shared.sizing): kelly | vol | hit_rate, e.g. method=vol,target_vol=0.4,max_size=1")
+
+    grid_arg = dict(action="append", default=[], metavar="PARAM=V1,V2,...",
+                    help="override one grid axis (repeatable); other axes keep the strategy's default grid")
+    prune_arg = dict(nargs="?", const="", default=None, metavar="max_dd=20,min_trades=5,chunk=16",
+                     help="abandon combos that can no longer pass validation (shared.prune); pruned.csv records why")
+    workers_arg = dict(nargs="?", const="127.0.0.1:7077", default=None, metavar="HOST:PORT",
+                       help="serve the combos to `worker` processes (shared.distributed) listening on HOST:PORT "
+                            "(default 127.0.0.1:7077; give a host such as 0.0.0.0 to accept remote workers). "
+                            "Workers trust the coordinator: they unpickle its candle data and import the code it names")
+    local_arg   = dict(type=int, default=0, metavar="N", help="start N workers on this machine")
+
+    ap  = argparse.ArgumentParser(prog="python -m backtesting.cli", description="Backtest strategies from one entry point.")
+    ap.add_argument("--root", default=ROOT, help="repo root holding data/ and results/")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("single", parents=[one], help="one backtest with fixed params")
+    p.add_argument("--start", required=True)
+    p.add_argument("--end", required=True)
+    p.add_argument("--param", action="append", default=[], metavar="PARAM=VALUE",
+                   help="override one single-run default (repeatable)")
+    p.add_argument("--no-plot", action="store_true", help="no plot window (with --save-plot: render off-screen)")
+    p.add_argument("--save-plot", default=None, metavar="PATH", help="write the plot to PATH (png/svg/pdf)")
+    p.set_defaults(func=cmd_single)
+
+    p = sub.add_parser("grid", parents=[one], help="grid search over a train window")
+    p.add_argument("--train", nargs=2, required=True, metavar=("START", "END"))
+    p.add_argument("--grid", **grid_arg)
+    p.add_argument("--prune", **prune_arg)
+    p.add_argument("--workers", **workers_arg)
+    p.add_argument("--local-workers", **local_arg)
+    p.set_defaults(func=cmd_grid)
+
+    p = sub.add_parser("validate", parents=[one], help="re-test the top grid configs on held-out windows")
+    p.add_argument("--test", nargs=2, action="append", required=True, metavar=("START", "END"),
+                   help="test window (repeatable for walk-forward windows)")
+    p.add_argument("--run-dir", default=None, help="defaults to the latest grid search run")
+    p.add_argument("--top-n", type=int, default=10)
+    p.add_argument("--symbols", nargs="+", default=None, help="validate on these symbols instead of --symbol")
+    p.add_argument("--jobs", type=int, default=1)
+    p.add_argument("--rank-by", choices=("robust", "sharpe"), default="robust",
+                   help="order of the grid configs re-tested: neighbourhood robustness or train Sharpe")
+    p.set_defaults(func=cmd_validate)
+
+    p = sub.add_parser("diagnose", parents=[one], help="replay one grid config on the test window")
+    p.add_argument("--test", nargs=2, required=True, metavar=("START", "END"))
+    p.add_argument("--run-dir", default=None)
+    p.add_argument("--rank", type=int, default=0, help="0 = best train config")
+    p.add_argument("--no-plot", action="store_true", help="no plot window; the plot is still saved into the run dir")
+    p.set_defaults(func=cmd_diagnose)
+
+    p = sub.add_parser("tune", parents=[one], help="grid search then validation")
+    p.add_argument("--train", nargs=2, required=True, metavar=("START", "END"))
+    p.add_argument("--test", nargs=2, required=True, metavar=("START", "END"))
+    p.add_argument("--grid", **grid_arg)
+    p.add_argument("--prune", **prune_arg)
+    p.add_argument("--workers", **workers_arg)
+    p.add_argument("--local-workers", **local_arg)
+    p.add_argument("--top-n", type=int, default=10)
+    p.add_argument("--jobs", type=int, default=1)
+    p.add_argument("--rank-by", choices=("robust", "sharpe"), default="robust")
+    p.set_defaults(func=cmd_tune, symbols=None)
+
+    p = sub.add_parser("sweep", parents=[common], help="strategies × symbols × intervals on a process pool")
+    p.add_argument("--strategies", nargs="+", choices=list(STRATEGIES), default=list(STRATEGIES))
+    p.add_argument("--symbols", nargs="+", default=["BTCUSDT"])
+    p.add_argument("--intervals", nargs="+", default=["15m"])
+    p.add_argument("--train", nargs=2, required=True, metavar=("START", "END"))
+    p.add_argument("--test", nargs=2, required=True, metavar=("START", "END"))
+    p.add_argument("--grid-file", default=None, help='JSON {"<strategy>": {param: [values]}} replacing default grids')
+    p.add_argument("--prune", **prune_arg)
+    p.add_argument("--top-n", type=int, default=10)
+    p.add_argument("--jobs", type=int, default=os.cpu_count())
+    p.set_defaults(func=cmd_sweep)
+
+    p = sub.add_parser("ensemble", parents=[common], help="several strategies on one load of the data, combined")
+    p.add_argument("--members", nargs="+", choices=list(STRATEGIES), default=["macrossover", "momentum", "linreg", "mllinreg"])
+    p.add_argument("--symbol", default="BTCUSDT")
+    p.add_argument("--interval", default="15m")
+    p.add_argument("--start", required=True)
+    p.add_argument("--end", required=True)
+    p.add_argument("--rules", nargs="+", choices=("vote", "weighted", "agree"), default=["vote", "weighted", "agree"])
+    p.add_argument("--weights", nargs="*", default=[], metavar="MEMBER=W", help="weights for the weighted rule (default 1)")
+    p.add_argument("--quorum", type=float, default=None, help="vote: net votes needed (default majority); agree: members agreeing (default 1)")
+    p.add_argument("--threshold", type=float, default=0.5, help="weighted: share of the total weight needed")
+    p.add_argument("--window", type=int, default=None,
+                   help="bars a member's signal keeps voting (default: the smallest member max_candles)")
+    p.add_argument("--tp", type=float, default=0.05)
+    p.add_argument("--sl", type=float, default=0.03)
+    p.add_argument("--max-candles", type=int, default=192)
+    p.add_argument("--param", action="append", default=[], metavar="MEMBER.PARAM=VALUE",
+                   help="override one member default (repeatable)")
+    p.add_argument("--sizing", default=None, metavar="method=M,KEY=V,...")
+    p.set_defaults(func=cmd_ensemble)
+
+    p = sub.add_parser("worker", help="run grid-search combos for a coordinator (grid/tune --workers)")
+    p.add_argument("--connect", required=True, metavar="HOST:PORT",
+                   help="coordinator to pull work from; only connect to coordinators you trust")
+    p.add_argument("--cache", default="data/cache", help="local candle cache, by content hash")
+    p.add_argument("--retry", type=float, default=30.0, help="seconds to keep reconnecting before exiting")
+    p.set_defaults(func=cmd_worker)
+
+    p = sub.add_parser("report", help="re-render README/validate.md/report.html/plots from stored run data")
+    p.add_argument("run_dirs", nargs="*", help="run directories (default: every run of --strategies)")
+    p.add_argument("--strategies", nargs="+", choices=list(STRATEGIES), default=None)
+    p.add_argument("--jobs", type=int, default=os.cpu_count())
+    p.set_defaults(func=cmd_report)
+    return ap
+
+
+def main(argv=None):
+    ap   = _parser()
+    args = ap.parse_args(argv)
+    try:   # bad PARAM=VALUE items are usage errors, not tracebacks
+        from backtesting.shared import registry
+        for s in [args.strategy] if hasattr(args, "strategy") else []:
+            registry.parse_grid(s, getattr(args, "grid", []))
+            _params(s, getattr(args, "param", []))
+        for m in getattr(args, "members", []):
+            _params(m, [i.split(".", 1)[1] for i in args.param if i.split(".", 1)[0] == m])
+        if getattr(args, "sizing", None):   # and kelly only for strategies that forecast
+            from backtesting.shared.sizing import check_columns
+
+            sizing = _sizing(args)
+            for s in ([args.strategy] if hasattr(args, "strategy") else []) + (getattr(args, "strategies", None) or []):
+                check_columns(sizing, registry.get(s).get("forecast", ()), strategy=s)
+    except (KeyError, ValueError) as e:
+        ap.error(str(e).strip('"'))
+    os.chdir(args.root)
+    if args.root not in sys.path:
+        sys.path.insert(0, args.root)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 import os, sys
-root = "/home/mykyta/Code/personal/stochastic-risk-assessment"
+root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 os.chdir(root); sys.path.insert(0, root)
 
 from backtesting.linreg.src.diagnose import run_diagnose
@@ -1,5 +1,5 @@
 import os, sys
-root = "/home/mykyta/Code/personal/stochastic-risk-assessment"
+root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 os.chdir(root); sys.path.insert(0, root)
 
 from backtesting.shared.load import load_df
@@ -18,6 +18,7 @@ INDICATORS = dict(lr_window=30, trend_window=200, vol_window=20)
 SIGNALS    = dict(slope_buy=0.001, slope_sell=-0.001, use_trend_filter=True)
 TRADES     = dict(tp_pct=0.05, sl_pct=0.03, max_candles=192)
 EVAL       = dict(init_portfolio=1000, trade_size_pct=0.1, fee_pct=0.001, leverage=1)
+SAVE_PLOT  = None   # e.g. "results/linreg/single_run.png" to keep the figure
 
 df = load_df(ticker=SYMBOL, timeframe=INTERVAL, asset_type=ASSET_TYPE)
 df = add_indicators(df, **INDICATORS)
@@ -30,4 +31,4 @@ resdf  = evaluate_trades(trades, **EVAL)
 SLOPE_PANEL = {"col": "lr_slope_norm", "label": "LR Slope (norm)", "buy": SIGNALS["slope_buy"], "sell": SIGNALS["slope_sell"]}
 
 summarize(resdf)
-plot(df, trades=resdf, price_overlays=[("ma_trend", "MA-trend", "orange")], indicator_panel=SLOPE_PANEL)
+plot(df, trades=resdf, price_overlays=[("ma_trend", "MA-trend", "orange")], indicator_panel=SLOPE_PANEL, save_path=SAVE_PLOT)
@@ -4,11 +4,7 @@ import pandas as pd
 # --- compute technical indicators ---
 def add_indicators(df: pd.DataFrame, lr_window=30, trend_window=200, vol_window=20) -> pd.DataFrame:
     # Rolling linear regression slope over lr_window candles
-    def _slope(prices):
-        x = np.arange(len(prices))
-        return np.polyfit(x, prices, 1)[0]
-
-    df["lr_slope"] = df["close_price"].rolling(lr_window).apply(_slope, raw=True)
+    df["lr_slope"] = _rolling_slope(df["close_price"], lr_window)
     # Normalize slope by current price to make it scale-invariant (% per candle)
     df["lr_slope_norm"] = df["lr_slope"] / df["close_price"]
     # Long-term trend filter
@@ -40,3 +36,44 @@ def add_signals(df: pd.DataFrame, slope_buy=0.001, slope_sell=-0.001, use_trend_
     df.loc[buy_mask, "signal"] = 1
     df.loc[sell_mask, "signal"] = -1
     return df
+
+
+# --- the same strategy as a node graph (shared.dag): per-node caching across combos ---
+def _slope(prices):
+    x = np.arange(len(prices))
+    return np.polyfit(x, prices, 1)[0]
+
+def _rolling_slope(close: pd.Series, window=30) -> pd.Series:
+    return close.rolling(window).apply(_slope, raw=True)
+
+def _slope_mask(slope: pd.Series, close, ma_trend, volume, vol_ma, side=1, level=0.001,
+                use_trend_filter=True, use_vol_filter=False) -> pd.Series:
+    vol_ok = (volume > vol_ma) if use_vol_filter else True
+    if side == 1:
+        trend_ok = (close > ma_trend) if use_trend_filter else True
+        return (slope > level) & (slope.shift(1) <= level) & trend_ok & vol_ok
+    trend_ok = (close < ma_trend) if use_trend_filter else True
+    return (slope < level) & (slope.shift(1) >= level) & trend_ok & vol_ok
+
+def _signal(buy_mask: pd.Series, sell_mask: pd.Series) -> np.ndarray:
+    return np.select([sell_mask.to_numpy(), buy_mask.to_numpy()], [-1, 1], 0)   # sell wins, as in add_signals
+
+def _graph():
+    from backtesting.shared.dag import SIGNAL, Graph, Node, ratio, rolling_mean
+    from backtesting.shared.registry import get
+
+    _filters = ("close_price", "ma_trend", "quote_asset_volume", "vol_ma")
+    _mask    = {"use_trend_filter": "use_trend_filter"}
+    return Graph("linreg", [
+        Node("lr_slope",      _rolling_slope, ["close_price"], params={"window": "lr_window"}),
+        Node("lr_slope_norm", ratio,          ["lr_slope", "close_price"]),
+        Node("ma_trend",      rolling_mean,   ["close_price"], params={"window": "trend_window"}),
+        Node("vol_ma",        rolling_mean,   ["quote_asset_volume"], const={"window": 20}),
+        Node("buy_mask",  _slope_mask, ["lr_slope_norm", *_filters], params={"level": "slope_buy", **_mask},
+             const={"side": 1}, stage=SIGNAL, column=False),
+        Node("sell_mask", _slope_mask, ["lr_slope_norm", *_filters], params={"level": "slope_sell", **_mask},
+             const={"side": -1}, stage=SIGNAL, column=False),
+        Node("signal", _signal, ["buy_mask", "sell_mask"], stage=SIGNAL),
+    ], types=get("linreg")["params"])
+
+GRAPH = _graph()
@@ -1,10 +1,5 @@
 from backtesting.shared.validate import run_validation as _run
-from backtesting.linreg.src.ta import add_indicators, add_signals
-
-def _build_df(rawdf, p):
-    df = add_indicators(rawdf, lr_window=int(p["lr_window"]), trend_window=int(p["trend_window"]))
-    return add_signals(df, slope_buy=p["slope_buy"], slope_sell=p["slope_sell"],
-                       use_trend_filter=bool(p["use_trend_filter"]))
+from backtesting.linreg.src.optimize import _build_df
 
 def _make_param_row(p):
     return {"lr_w": int(p["lr_window"]), "trend": int(p["trend_window"]),
@@ -16,12 +11,14 @@ def _format_best(b):
             f"slope_buy={b['buy']}, slope_sell={b['sell']}, use_trend_filter={b['trend_f']}\n"
             f"tp_pct={b['tp']}, sl_pct={b['sl']}")
 
-def run_validation(symbol, interval, test_start, test_end, eval_params, asset_type, run_dir=None, top_n=10):
+def run_validation(symbol, interval, test_start, test_end, eval_params, asset_type, run_dir=None, top_n=10, intrabar=False,
+                   test_windows=None, symbols=None, n_jobs=1, sizing=None, rank_by="robust"):
     return _run(
         strategy_name="Linear Regression Slope", runs_base="results/linreg",
         symbol=symbol, interval=interval,
         test_start=test_start, test_end=test_end,
         eval_params=eval_params, asset_type=asset_type,
         build_df=_build_df, make_param_row=_make_param_row, format_best=_format_best,
-        run_dir=run_dir, top_n=top_n,
+        run_dir=run_dir, top_n=top_n, intrabar=intrabar,
+        test_windows=test_windows, symbols=symbols, n_jobs=n_jobs, sizing=sizing, rank_by=rank_by,
     )
@@ -1,5 +1,5 @@
 import os, sys
-root = "/home/mykyta/Code/personal/stochastic-risk-assessment"
+root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 os.chdir(root); sys.path.insert(0, root)
 
 from backtesting.shared.load import load_df
@@ -18,6 +18,7 @@ INDICATORS = dict(short_window=10, long_window=50, trend_window=200, rsi_window=
 SIGNALS    = dict(cross_persist=2, rsi_buy=55, rsi_sell=45, use_vol_filter=False)
 TRADES     = dict(tp_pct=0.05, sl_pct=0.07, max_candles=None)
 EVAL       = dict(init_portfolio=1000, trade_size_pct=0.1, fee_pct=0.001, leverage=1)
+SAVE_PLOT  = None   # e.g. "results/macrossover/single_run.png" to keep the figure
 
 df = load_df(ticker=SYMBOL, timeframe=INTERVAL, asset_type=ASSET_TYPE)
 df = add_indicators(df, **INDICATORS)
@@ -30,4 +31,4 @@ resdf  = evaluate_trades(trades, **EVAL)
 MA_OVERLAYS = [("ma_short", "MA-short", None), ("ma_long", "MA-long", None), ("ma_trend", "MA-trend", "orange")]
 
 summarize(resdf)
-plot(df, trades=resdf, price_overlays=MA_OVERLAYS)
+plot(df, trades=resdf, price_overlays=MA_OVERLAYS, save_path=SAVE_PLOT)
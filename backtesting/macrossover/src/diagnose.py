@@ -1,19 +1,17 @@
 from backtesting.shared.diagnose import run_diagnose as _run
-from backtesting.macrossover.src.ta import add_indicators, add_signals
+from backtesting.macrossover.src.optimize import _build_df
 
 _OVERLAYS = [("ma_short", "MA-short", None), ("ma_long", "MA-long", None), ("ma_trend", "MA-trend", "orange")]
 
-def _build_df(rawdf, p):
-    df = add_indicators(rawdf, short_window=int(p["short_window"]), long_window=int(p["long_window"]), trend_window=int(p["trend_window"]))
-    return add_signals(df, cross_persist=int(p["cross_persist"]), rsi_buy=p["rsi_buy"], rsi_sell=p["rsi_sell"], use_vol_filter=bool(p["use_vol_filter"]))
+def _make_plot_kwargs(p):
+    return {"price_overlays": _OVERLAYS}
 
-def run_diagnose(symbol, interval, test_start, test_end, eval_params, asset_type, run_dir=None, rank=0):
+def run_diagnose(symbol, interval, test_start, test_end, eval_params, asset_type, run_dir=None, rank=0, intrabar=False, show=True, sizing=None):
     return _run(
         strategy_name="MA Crossover", runs_base="results/macrossover",
         symbol=symbol, interval=interval,
         test_start=test_start, test_end=test_end,
         eval_params=eval_params, asset_type=asset_type,
-        build_df=_build_df,
-        make_plot_kwargs=lambda p: {"price_overlays": _OVERLAYS},
-        run_dir=run_dir, rank=rank,
+        build_df=_build_df, make_plot_kwargs=_make_plot_kwargs,
+        run_dir=run_dir, rank=rank, intrabar=intrabar, show=show, sizing=sizing,
     )
@@ -1,14 +1,16 @@
 from backtesting.shared.optimize import run_grid_search as _run
-from backtesting.macrossover.src.ta import add_indicators, add_signals
+from backtesting.macrossover.src.ta import GRAPH
 
 _COLS = ["short_window", "long_window", "trend_window", "tp_pct", "sl_pct",
          "trades", "win_rate", "total_pnl", "sharpe", "max_drawdown"]
 
 def _build_df(rawdf, p):
-    df = add_indicators(rawdf, short_window=int(p["short_window"]), long_window=int(p["long_window"]), trend_window=int(p["trend_window"]))
-    return add_signals(df, cross_persist=int(p["cross_persist"]), rsi_buy=p["rsi_buy"], rsi_sell=p["rsi_sell"], use_vol_filter=bool(p["use_vol_filter"]))
+    return GRAPH(rawdf, p)
 
-def run_grid_search(symbol, interval, train_start, train_end, grid, eval_params, asset_type):
+_build_df.pure = True   # reads rawdf without mutating it — build_cached skips the copy
+
+def run_grid_search(symbol, interval, train_start, train_end, grid, eval_params, asset_type, intrabar=False, sizing=None, prune=None,
+                    workers=None):
     return _run(
         strategy_name="MA Crossover", runs_base="results/macrossover",
         symbol=symbol, interval=interval,
@@ -18,4 +20,5 @@ def run_grid_search(symbol, interval, train_start, train_end, grid, eval_params,
         is_valid=lambda p: p["short_window"] < p["long_window"] < p["trend_window"],
         readme_cols=_COLS,
         format_combo=lambda p: f"s={int(p['short_window'])} l={int(p['long_window'])} t={int(p['trend_window'])} tp={p['tp_pct']} sl={p['sl_pct']}",
+        intrabar=intrabar, sizing=sizing, prune=prune, workers=workers,
     )
@@ -1,7 +1,16 @@
+import numpy as np
 import pandas as pd
 
+from backtesting.shared import mtf
+from backtesting.shared.regime import regime_prob
+
 # --- compute technical indicator ---
-def add_indicators(df: pd.DataFrame, short_window=20, long_window=50, trend_window=200, rsi_window=14, vol_window=20) -> pd.DataFrame:
+# htf_interval (e.g. "4h") adds htf_bias: ±1 as the last closed higher-timeframe candle sits
+# above/below its MA(htf_trend_window); entries must then agree with it.
+# regime_states (e.g. 3) adds regime_p: the HMM-filtered probability of regime_state (shared.regime,
+# 0 = calmest); entries then need regime_p ≥ regime_min_p.
+def add_indicators(df: pd.DataFrame, short_window=20, long_window=50, trend_window=200, rsi_window=14, vol_window=20,
+                   htf_interval=None, htf_trend_window=50, regime_states=0, regime_state=0) -> pd.DataFrame:
     df["ma_short"] = df["close_price"].rolling(short_window).mean()
     df["ma_long"] = df["close_price"].rolling(long_window).mean()
     df["ma_trend"] = df["close_price"].rolling(trend_window).mean()
@@ -9,20 +18,22 @@ def add_indicators(df: pd.DataFrame, short_window=20, long_window=50, trend_wind
     df["price_change"] = df["close_price"].pct_change()
     df["vol_ma"] = df["quote_asset_volume"].rolling(vol_window).mean()
 
-    delta = df["close_price"].diff()
-    gain = delta.clip(lower=0)
-    loss = -delta.clip(upper=0)
-    rs = gain.ewm(com=rsi_window - 1, min_periods=rsi_window).mean() / loss.ewm(com=rsi_window - 1, min_periods=rsi_window).mean()
-    df["rsi"] = 100 - (100 / (1 + rs))
+    df["rsi"] = _ewm_rsi(df["close_price"], rsi_window)
+    if mtf.enabled(htf_interval):
+        df["htf_bias"] = _htf_bias(df["close_time"], htf_interval, htf_trend_window)
+    if regime_states:
+        df["regime_p"] = regime_prob(df["close_price"], regime_states, regime_state)
 
     return df.dropna()
 
 # --- add buy/sell/hold signals based on indicators ---
-def add_signals(df: pd.DataFrame, cross_persist=2, rsi_buy=55, rsi_sell=45, use_vol_filter=True) -> pd.DataFrame:
+def add_signals(df: pd.DataFrame, cross_persist=2, rsi_buy=55, rsi_sell=45, use_vol_filter=True, regime_min_p=0.5) -> pd.DataFrame:
     df["cross_up"] = (df["ma_short"] > df["ma_long"]).astype(int)
     df["cross_down"] = (df["ma_short"] < df["ma_long"]).astype(int)
 
     vol_ok = (df["quote_asset_volume"] > df["vol_ma"]) if use_vol_filter else True
+    htf    = df["htf_bias"] if "htf_bias" in df.columns else 0
+    regime = (df["regime_p"] >= regime_min_p) if "regime_p" in df.columns else True
 
     df["signal"] = 0
     buy_mask = (
@@ -31,6 +42,8 @@ def add_signals(df: pd.DataFrame, cross_persist=2, rsi_buy=55, rsi_sell=45, use_
         & (df["close_price"] > df["ma_trend"])
         & (df["rsi"].shift(1) <= rsi_buy)
         & vol_ok
+        & (htf >= 0)
+        & regime
     )
     sell_mask = (
         (df["cross_down"].rolling(cross_persist).min() == 1)
@@ -38,7 +51,67 @@ def add_signals(df: pd.DataFrame, cross_persist=2, rsi_buy=55, rsi_sell=45, use_
         & (df["close_price"] < df["ma_trend"])
         & (df["rsi"].shift(1) >= rsi_sell)
         & vol_ok
+        & (htf <= 0)
+        & regime
     )
     df.loc[buy_mask, "signal"] = 1
     df.loc[sell_mask, "signal"] = -1
-    return df
\ No newline at end of file
+    return df
+
+# --- the same strategy as a node graph (shared.dag): per-node caching across combos ---
+def _ewm_rsi(close: pd.Series, window=14) -> pd.Series:
+    delta = close.diff()
+    gain = delta.clip(lower=0)
+    loss = -delta.clip(upper=0)
+    rs = gain.ewm(com=window - 1, min_periods=window).mean() / loss.ewm(com=window - 1, min_periods=window).mean()
+    return 100 - (100 / (1 + rs))
+
+# all zeros (no constraint) when htf_interval is unset, so the column never trims rows
+def _htf_bias(close_time: pd.Series, interval=None, window=50) -> np.ndarray:
+    if not mtf.enabled(interval):
+        return np.zeros(len(close_time))
+    return mtf.htf_feature(close_time, str(interval), mtf.trend_bias, window=int(window))
+
+def _above(a: pd.Series, b: pd.Series) -> pd.Series:
+    return (a > b).astype(int)
+
+def _cross_mask(cross: pd.Series, close, ma_trend, rsi, volume, vol_ma, htf_bias=0, regime_p=1.0, side=1, cross_persist=2,
+                rsi_level=55, use_vol_filter=True, regime_min_p=0.5) -> pd.Series:
+    vol_ok = (volume > vol_ma) if use_vol_filter else True
+    trend  = ((close > ma_trend) & (htf_bias >= 0)) if side == 1 else ((close < ma_trend) & (htf_bias <= 0))
+    trend  = trend & (regime_p >= regime_min_p)
+    rsi_ok = (rsi.shift(1) <= rsi_level) if side == 1 else (rsi.shift(1) >= rsi_level)
+    return (cross.rolling(cross_persist).min() == 1) & (cross.shift(cross_persist) == 0) & trend & rsi_ok & vol_ok
+
+def _signal(buy_mask: pd.Series, sell_mask: pd.Series) -> np.ndarray:
+    return np.select([sell_mask.to_numpy(), buy_mask.to_numpy()], [-1, 1], 0)   # sell wins, as in add_signals
+
+def _graph():
+    from backtesting.shared.dag import SIGNAL, Graph, Node, pct_change, rolling_mean
+    from backtesting.shared.registry import get
+
+    _filters = ("close_price", "ma_trend", "rsi", "quote_asset_volume", "vol_ma", "htf_bias", "regime_p")
+    return Graph("macrossover", [
+        Node("ma_short",      rolling_mean, ["close_price"], params={"window": "short_window"}),
+        Node("ma_long",       rolling_mean, ["close_price"], params={"window": "long_window"}),
+        Node("ma_trend",      rolling_mean, ["close_price"], params={"window": "trend_window"}),
+        Node("volume_change", pct_change,   ["quote_asset_volume"]),
+        Node("price_change",  pct_change,   ["close_price"]),
+        Node("vol_ma",        rolling_mean, ["quote_asset_volume"], const={"window": 20}),
+        Node("rsi",           _ewm_rsi,     ["close_price"], const={"window": 14}),
+        Node("htf_bias",      _htf_bias,    ["close_time"], const={"interval": None, "window": 50},
+             params={"interval": "htf_interval", "window": "htf_trend_window"}),
+        Node("regime_p",      regime_prob,  ["close_price"], const={"states": 0, "state": 0},
+             params={"states": "regime_states", "state": "regime_state"}),
+        Node("cross_up",   _above, ["ma_short", "ma_long"], stage=SIGNAL),
+        Node("cross_down", _above, ["ma_long", "ma_short"], stage=SIGNAL),
+        Node("buy_mask",  _cross_mask, ["cross_up", *_filters], const={"side": 1, "regime_min_p": 0.5}, stage=SIGNAL, column=False,
+             params={"cross_persist": "cross_persist", "rsi_level": "rsi_buy", "use_vol_filter": "use_vol_filter",
+                     "regime_min_p": "regime_min_p"}),
+        Node("sell_mask", _cross_mask, ["cross_down", *_filters], const={"side": -1, "regime_min_p": 0.5}, stage=SIGNAL, column=False,
+             params={"cross_persist": "cross_persist", "rsi_level": "rsi_sell", "use_vol_filter": "use_vol_filter",
+                     "regime_min_p": "regime_min_p"}),
+        Node("signal", _signal, ["buy_mask", "sell_mask"], stage=SIGNAL),
+    ], types=get("macrossover")["params"])
+
+GRAPH = _graph()
@@ -1,5 +1,5 @@
 import os, sys
-root = "/home/mykyta/Code/personal/stochastic-risk-assessment"
+root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 os.chdir(root); sys.path.insert(0, root)
 
 from backtesting.shared.load import load_df
@@ -18,6 +18,7 @@ INDICATORS = dict()   # fixed — no tunable indicator params
 SIGNALS    = dict(train_size=500, retrain_every=100, signal_threshold=0.001, use_trend_filter=True)
 TRADES     = dict(tp_pct=0.05, sl_pct=0.03, max_candles=192)
 EVAL       = dict(init_portfolio=1000, trade_size_pct=0.1, fee_pct=0.001, leverage=1)
+SAVE_PLOT  = None   # e.g. "results/mllinreg/single_run.png" to keep the figure
 
 df = load_df(ticker=SYMBOL, timeframe=INTERVAL, asset_type=ASSET_TYPE)
 df = add_indicators(df, **INDICATORS)
@@ -31,4 +32,4 @@ PRED_PANEL = {"col": "_prediction", "label": "LR Prediction",
               "buy": SIGNALS["signal_threshold"], "sell": -SIGNALS["signal_threshold"]}
 
 summarize(resdf)
-plot(df, trades=resdf, price_overlays=[("ma_trend", "MA-trend", "orange")], indicator_panel=PRED_PANEL)
+plot(df, trades=resdf, price_overlays=[("ma_trend", "MA-trend", "orange")], indicator_panel=PRED_PANEL, save_path=SAVE_PLOT)
@@ -1,15 +1,16 @@
 from backtesting.shared.optimize import run_grid_search as _run
-from backtesting.mllinreg.src.ta import add_indicators, add_signals
+from backtesting.mllinreg.src.ta import GRAPH
 
 _COLS = ["train_size", "retrain_every", "signal_threshold", "use_trend_filter",
          "tp_pct", "sl_pct", "trades", "win_rate", "total_pnl", "sharpe", "max_drawdown"]
 
 def _build_df(rawdf, p):
-    df = add_indicators(rawdf)
-    return add_signals(df, train_size=int(p["train_size"]), retrain_every=int(p["retrain_every"]),
-                       signal_threshold=p["signal_threshold"], use_trend_filter=bool(p["use_trend_filter"]))
+    return GRAPH(rawdf, p)
 
-def run_grid_search(symbol, interval, train_start, train_end, grid, eval_params, asset_type):
+_build_df.pure = True   # reads rawdf without mutating it — build_cached skips the copy
+
+def run_grid_search(symbol, interval, train_start, train_end, grid, eval_params, asset_type, intrabar=False, sizing=None, prune=None,
+                    workers=None):
     return _run(
         strategy_name="ML Linear Regression", runs_base="results/mllinreg",
         symbol=symbol, interval=interval,
@@ -19,4 +20,5 @@ def run_grid_search(symbol, interval, train_start, train_end, grid, eval_params,
         is_valid=lambda p: p["signal_threshold"] >= 0,
         readme_cols=_COLS,
         format_combo=lambda p: f"train={int(p['train_size'])} retrain={int(p['retrain_every'])} thr={p['signal_threshold']} tp={p['tp_pct']} sl={p['sl_pct']}",
+        intrabar=intrabar, sizing=sizing, prune=prune, workers=workers,
     )
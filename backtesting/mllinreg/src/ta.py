@@ -1,6 +1,5 @@
 import numpy as np
 import pandas as pd
-from sklearn.linear_model import LinearRegression
 
 # --- compute features for the ML model ---
 def add_indicators(df: pd.DataFrame, roc_short=5, roc_long=20, rsi_window=14,
@@ -10,10 +9,7 @@ def add_indicators(df: pd.DataFrame, roc_short=5, roc_long=20, rsi_window=14,
     df["roc_20"] = df["close_price"].pct_change(roc_long)
 
     # RSI
-    delta = df["close_price"].diff()
-    gain = delta.clip(lower=0).rolling(rsi_window).mean()
-    loss = (-delta.clip(upper=0)).rolling(rsi_window).mean()
-    df["rsi"] = 100 - (100 / (1 + gain / loss))
+    df["rsi"] = _rolling_rsi(df["close_price"], rsi_window)
 
     # Price relative to MA — captures mean reversion / trend strength
     df["ma_ratio"] = df["close_price"] / df["close_price"].rolling(ma_window).mean() - 1
@@ -29,29 +25,35 @@ def add_indicators(df: pd.DataFrame, roc_short=5, roc_long=20, rsi_window=14,
 
 _FEATURES = ["roc_5", "roc_20", "rsi", "ma_ratio", "vol_ratio"]
 
-# --- walk-forward ML signal generation ---
-def add_signals(df: pd.DataFrame, train_size=500, retrain_every=100,
-                signal_threshold=0.001, use_trend_filter=True, use_vol_filter=False) -> pd.DataFrame:
+# --- walk-forward predictions of the next candle return, refit every retrain_every rows ---
+def _walk_forward(df: pd.DataFrame, train_size=500, retrain_every=100) -> pd.Series:
+    from sklearn.linear_model import LinearRegression   # lazy: ~1s import, only this strategy needs it
+
     # Target: next candle return — known for all past rows, NaN for last row
-    df["_next_return"] = df["close_price"].shift(-1) / df["close_price"] - 1
-    df["_prediction"]  = 0.0
-    df["signal"]       = 0
+    data = df[_FEATURES].assign(_next_return=df["close_price"].shift(-1) / df["close_price"] - 1)
+    prediction = pd.Series(0.0, index=df.index)
 
     model = LinearRegression()
 
-    for i in range(train_size, len(df) - 1, retrain_every):
-        train_slice = df.iloc[i - train_size:i].dropna(subset=_FEATURES + ["_next_return"])
+    for i in range(train_size, len(data) - 1, retrain_every):
+        train_slice = data.iloc[i - train_size:i].dropna(subset=_FEATURES + ["_next_return"])
         if len(train_slice) < 50:
             continue
 
         model.fit(train_slice[_FEATURES].values, train_slice["_next_return"].values)
 
-        predict_end = min(i + retrain_every, len(df) - 1)
-        pred_slice  = df.iloc[i:predict_end]
+        predict_end = min(i + retrain_every, len(data) - 1)
+        pred_slice  = data.iloc[i:predict_end]
         valid       = pred_slice[_FEATURES].notna().all(axis=1)
         if valid.any():
-            preds = model.predict(pred_slice.loc[valid, _FEATURES].values)
-            df.loc[pred_slice.index[valid], "_prediction"] = preds
+            prediction.loc[pred_slice.index[valid]] = model.predict(pred_slice.loc[valid, _FEATURES].values)
+    return prediction
+
+# --- walk-forward ML signal generation ---
+def add_signals(df: pd.DataFrame, train_size=500, retrain_every=100,
+                signal_threshold=0.001, use_trend_filter=True, use_vol_filter=False) -> pd.DataFrame:
+    df["_prediction"] = _walk_forward(df, train_size, retrain_every)
+    df["signal"]      = 0
 
     pred = df["_prediction"]
     trend_ok_long  = (df["close_price"] > df["ma_trend"]) if use_trend_filter else True
@@ -72,6 +74,59 @@ def add_signals(df: pd.DataFrame, train_size=500, retrain_every=100,
     )
     df.loc[buy_mask,  "signal"] = 1
     df.loc[sell_mask, "signal"] = -1
-
-    df.drop(columns=["_next_return"], inplace=True)
     return df
+
+
+# --- the same strategy as a node graph (shared.dag): refits are cached per (train_size, retrain_every), ---
+# --- so threshold / filter combos reuse them ---
+def _rolling_rsi(close: pd.Series, window=14) -> pd.Series:
+    delta = close.diff()
+    gain = delta.clip(lower=0).rolling(window).mean()
+    loss = (-delta.clip(upper=0)).rolling(window).mean()
+    return 100 - (100 / (1 + gain / loss))
+
+def _relative(a: pd.Series, b: pd.Series) -> pd.Series:
+    return a / b - 1
+
+def _prediction(close, *features, train_size=500, retrain_every=100) -> pd.Series:
+    df = pd.DataFrame(dict(zip(_FEATURES, features)) | {"close_price": close})
+    return _walk_forward(df, train_size, retrain_every)
+
+def _prediction_mask(pred: pd.Series, close, ma_trend, volume, vol_ma, side=1, signal_threshold=0.001,
+                     use_trend_filter=True, use_vol_filter=False) -> pd.Series:
+    level  = signal_threshold if side == 1 else -signal_threshold
+    vol_ok = (volume > vol_ma) if use_vol_filter else True
+    if side == 1:
+        trend_ok = (close > ma_trend) if use_trend_filter else True
+        return (pred > level) & (pred.shift(1) <= level) & trend_ok & vol_ok
+    trend_ok = (close < ma_trend) if use_trend_filter else True
+    return (pred < level) & (pred.shift(1) >= level) & trend_ok & vol_ok
+
+def _signal(buy_mask: pd.Series, sell_mask: pd.Series) -> np.ndarray:
+    return np.select([sell_mask.to_numpy(), buy_mask.to_numpy()], [-1, 1], 0)   # sell wins, as in add_signals
+
+def _graph():
+    from backtesting.shared.dag import SIGNAL, Graph, Node, pct_change, rolling_mean
+    from backtesting.shared.registry import get
+
+    _filters = ("close_price", "ma_trend", "quote_asset_volume", "vol_ma")
+    _mask    = {"signal_threshold": "signal_threshold", "use_trend_filter": "use_trend_filter"}
+    return Graph("mllinreg", [
+        Node("roc_5",     pct_change,   ["close_price"], const={"periods": 5}),
+        Node("roc_20",    pct_change,   ["close_price"], const={"periods": 20}),
+        Node("rsi",       _rolling_rsi, ["close_price"], const={"window": 14}),
+        Node("ma_50",     rolling_mean, ["close_price"], const={"window": 50}, column=False),
+        Node("ma_ratio",  _relative,    ["close_price", "ma_50"]),
+        Node("vol_ma",    rolling_mean, ["quote_asset_volume"], const={"window": 20}),
+        Node("vol_ratio", _relative,    ["quote_asset_volume", "vol_ma"]),
+        Node("ma_trend",  rolling_mean, ["close_price"], const={"window": 200}),
+        Node("_prediction", _prediction, ["close_price", *_FEATURES], stage=SIGNAL,
+             params={"train_size": "train_size", "retrain_every": "retrain_every"}),
+        Node("buy_mask",  _prediction_mask, ["_prediction", *_filters], params=_mask,
+             const={"side": 1}, stage=SIGNAL, column=False),
+        Node("sell_mask", _prediction_mask, ["_prediction", *_filters], params=_mask,
+             const={"side": -1}, stage=SIGNAL, column=False),
+        Node("signal", _signal, ["buy_mask", "sell_mask"], stage=SIGNAL),
+    ], types=get("mllinreg")["params"])
+
+GRAPH = _graph()
@@ -1,10 +1,5 @@
 from backtesting.shared.validate import run_validation as _run
-from backtesting.mllinreg.src.ta import add_indicators, add_signals
-
-def _build_df(rawdf, p):
-    df = add_indicators(rawdf)
-    return add_signals(df, train_size=int(p["train_size"]), retrain_every=int(p["retrain_every"]),
-                       signal_threshold=p["signal_threshold"], use_trend_filter=bool(p["use_trend_filter"]))
+from backtesting.mllinreg.src.optimize import _build_df
 
 def _make_param_row(p):
     return {"train": int(p["train_size"]), "retrain": int(p["retrain_every"]),
@@ -16,12 +11,14 @@ def _format_best(b):
             f"signal_threshold={b['thr']}, use_trend_filter={b['trend_f']}\n"
             f"tp_pct={b['tp']}, sl_pct={b['sl']}")
 
-def run_validation(symbol, interval, test_start, test_end, eval_params, asset_type, run_dir=None, top_n=10):
+def run_validation(symbol, interval, test_start, test_end, eval_params, asset_type, run_dir=None, top_n=10, intrabar=False,
+                   test_windows=None, symbols=None, n_jobs=1, sizing=None, rank_by="robust"):
     return _run(
         strategy_name="ML Linear Regression", runs_base="results/mllinreg",
         symbol=symbol, interval=interval,
         test_start=test_start, test_end=test_end,
         eval_params=eval_params, asset_type=asset_type,
         build_df=_build_df, make_param_row=_make_param_row, format_best=_format_best,
-        run_dir=run_dir, top_n=top_n,
+        run_dir=run_dir, top_n=top_n, intrabar=intrabar,
+        test_windows=test_windows, symbols=symbols, n_jobs=n_jobs, sizing=sizing, rank_by=rank_by,
     )
@@ -1,5 +1,5 @@
 import os, sys
-root = "/home/mykyta/Code/personal/stochastic-risk-assessment"
+root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 os.chdir(root); sys.path.insert(0, root)
 
 from backtesting.shared.load import load_df
@@ -18,6 +18,7 @@ INDICATORS = dict(roc_window=10, smooth_window=3, trend_window=200)
 SIGNALS    = dict(roc_buy=2.0, roc_sell=-2.0)
 TRADES     = dict(tp_pct=0.03, sl_pct=0.03, max_candles=192)
 EVAL       = dict(init_portfolio=1000, trade_size_pct=0.1, fee_pct=0.001, leverage=5)
+SAVE_PLOT  = None   # e.g. "results/momentum/single_run.png" to keep the figure
 
 df = load_df(ticker=SYMBOL, timeframe=INTERVAL, asset_type=ASSET_TYPE)
 df = add_indicators(df, **INDICATORS)
@@ -30,4 +31,4 @@ resdf  = evaluate_trades(trades, **EVAL)
 ROC_PANEL = {"col": "roc_smooth", "label": "ROC (smoothed)", "buy": SIGNALS["roc_buy"], "sell": SIGNALS["roc_sell"]}
 
 summarize(resdf)
-plot(df, trades=resdf, price_overlays=[("ma_trend", "MA-trend", "orange")], indicator_panel=ROC_PANEL)
+plot(df, trades=resdf, price_overlays=[("ma_trend", "MA-trend", "orange")], indicator_panel=ROC_PANEL, save_path=SAVE_PLOT)
@@ -1,9 +1,5 @@
 from backtesting.shared.diagnose import run_diagnose as _run
-from backtesting.momentum.src.ta import add_indicators, add_signals
-
-def _build_df(rawdf, p):
-    df = add_indicators(rawdf, roc_window=int(p["roc_window"]), smooth_window=int(p["smooth_window"]), trend_window=int(p["trend_window"]))
-    return add_signals(df, roc_buy=p["roc_buy"], roc_sell=p["roc_sell"])
+from backtesting.momentum.src.optimize import _build_df
 
 def _make_plot_kwargs(p):
     return {
@@ -11,12 +7,12 @@ def _make_plot_kwargs(p):
         "indicator_panel": {"col": "roc_smooth", "label": "ROC (smoothed)", "buy": p["roc_buy"], "sell": p["roc_sell"]},
     }
 
-def run_diagnose(symbol, interval, test_start, test_end, eval_params, asset_type, run_dir=None, rank=0):
+def run_diagnose(symbol, interval, test_start, test_end, eval_params, asset_type, run_dir=None, rank=0, intrabar=False, show=True, sizing=None):
     return _run(
         strategy_name="Momentum (Price ROC)", runs_base="results/momentum",
         symbol=symbol, interval=interval,
         test_start=test_start, test_end=test_end,
         eval_params=eval_params, asset_type=asset_type,
         build_df=_build_df, make_plot_kwargs=_make_plot_kwargs,
-        run_dir=run_dir, rank=rank,
+        run_dir=run_dir, rank=rank, intrabar=intrabar, show=show, sizing=sizing,
     )
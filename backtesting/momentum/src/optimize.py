@@ -1,14 +1,16 @@
 from backtesting.shared.optimize import run_grid_search as _run
-from backtesting.momentum.src.ta import add_indicators, add_signals
+from backtesting.momentum.src.ta import GRAPH
 
 _COLS = ["roc_window", "smooth_window", "trend_window", "roc_buy", "roc_sell",
          "tp_pct", "sl_pct", "trades", "win_rate", "total_pnl", "sharpe", "max_drawdown"]
 
 def _build_df(rawdf, p):
-    df = add_indicators(rawdf, roc_window=int(p["roc_window"]), smooth_window=int(p["smooth_window"]), trend_window=int(p["trend_window"]))
-    return add_signals(df, roc_buy=p["roc_buy"], roc_sell=p["roc_sell"])
+    return GRAPH(rawdf, p)
 
-def run_grid_search(symbol, interval, train_start, train_end, grid, eval_params, asset_type):
+_build_df.pure = True   # reads rawdf without mutating it — build_cached skips the copy
+
+def run_grid_search(symbol, interval, train_start, train_end, grid, eval_params, asset_type, intrabar=False, sizing=None, prune=None,
+                    workers=None):
     return _run(
         strategy_name="Momentum (Price ROC)", runs_base="results/momentum",
         symbol=symbol, interval=interval,
@@ -18,4 +20,5 @@ def run_grid_search(symbol, interval, train_start, train_end, grid, eval_params,
         is_valid=lambda p: p["roc_buy"] > 0 and p["roc_sell"] < 0,
         readme_cols=_COLS,
         format_combo=lambda p: f"roc={int(p['roc_window'])} buy={p['roc_buy']} sell={p['roc_sell']} tp={p['tp_pct']} sl={p['sl_pct']}",
+        intrabar=intrabar, sizing=sizing, prune=prune, workers=workers,
     )
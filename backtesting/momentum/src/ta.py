@@ -1,7 +1,13 @@
+import numpy as np
 import pandas as pd
 
+from backtesting.shared.regime import regime_prob
+
 # --- compute technical indicators ---
-def add_indicators(df: pd.DataFrame, roc_window=10, smooth_window=3, trend_window=200, vol_window=20) -> pd.DataFrame:
+# regime_states (e.g. 3) adds regime_p, the HMM-filtered probability of regime_state (shared.regime);
+# entries then need regime_p ≥ regime_min_p.
+def add_indicators(df: pd.DataFrame, roc_window=10, smooth_window=3, trend_window=200, vol_window=20,
+                   regime_states=0, regime_state=0) -> pd.DataFrame:
     # Price Rate of Change (%)
     df["roc"] = df["close_price"].pct_change(roc_window) * 100
     # Smoothed ROC to reduce noise
@@ -10,12 +16,16 @@ def add_indicators(df: pd.DataFrame, roc_window=10, smooth_window=3, trend_windo
     df["ma_trend"] = df["close_price"].rolling(trend_window).mean()
     # Volume moving average
     df["vol_ma"] = df["quote_asset_volume"].rolling(vol_window).mean()
+    if regime_states:
+        df["regime_p"] = regime_prob(df["close_price"], regime_states, regime_state)
 
     return df.dropna()
 
 # --- add buy/sell/hold signals based on ROC ---
-def add_signals(df: pd.DataFrame, roc_buy=2.0, roc_sell=-2.0, use_vol_filter=False) -> pd.DataFrame:
+def add_signals(df: pd.DataFrame, roc_buy=2.0, roc_sell=-2.0, use_vol_filter=False, regime_min_p=0.5) -> pd.DataFrame:
     vol_ok = (df["quote_asset_volume"] > df["vol_ma"]) if use_vol_filter else True
+    if "regime_p" in df.columns:
+        vol_ok = vol_ok & (df["regime_p"] >= regime_min_p)
 
     df["signal"] = 0
     buy_mask = (
@@ -33,3 +43,37 @@ def add_signals(df: pd.DataFrame, roc_buy=2.0, roc_sell=-2.0, use_vol_filter=Fal
     df.loc[buy_mask, "signal"] = 1
     df.loc[sell_mask, "signal"] = -1
     return df
+
+
+# --- the same strategy as a node graph (shared.dag): per-node caching across combos ---
+def _threshold_mask(x: pd.Series, close, ma_trend, volume, vol_ma, regime_p=1.0, side=1, level=2.0, use_vol_filter=False,
+                    regime_min_p=0.5) -> pd.Series:
+    vol_ok = (volume > vol_ma) if use_vol_filter else True
+    vol_ok = vol_ok & (regime_p >= regime_min_p)
+    if side == 1:
+        return (x > level) & (x.shift(1) <= level) & (close > ma_trend) & vol_ok
+    return (x < level) & (x.shift(1) >= level) & (close < ma_trend) & vol_ok
+
+def _signal(buy_mask: pd.Series, sell_mask: pd.Series) -> np.ndarray:
+    return np.select([sell_mask.to_numpy(), buy_mask.to_numpy()], [-1, 1], 0)   # sell wins, as in add_signals
+
+def _graph():
+    from backtesting.shared.dag import SIGNAL, Graph, Node, pct_change, rolling_mean
+    from backtesting.shared.registry import get
+
+    _filters = ("close_price", "ma_trend", "quote_asset_volume", "vol_ma", "regime_p")
+    return Graph("momentum", [
+        Node("roc",        pct_change,   ["close_price"], params={"periods": "roc_window"}, const={"scale": 100}),
+        Node("roc_smooth", rolling_mean, ["roc"], params={"window": "smooth_window"}),
+        Node("ma_trend",   rolling_mean, ["close_price"], params={"window": "trend_window"}),
+        Node("vol_ma",     rolling_mean, ["quote_asset_volume"], const={"window": 20}),
+        Node("regime_p",   regime_prob,  ["close_price"], const={"states": 0, "state": 0},
+             params={"states": "regime_states", "state": "regime_state"}),
+        Node("buy_mask",  _threshold_mask, ["roc_smooth", *_filters], params={"level": "roc_buy", "regime_min_p": "regime_min_p"},
+             const={"side": 1, "use_vol_filter": False, "regime_min_p": 0.5}, stage=SIGNAL, column=False),
+        Node("sell_mask", _threshold_mask, ["roc_smooth", *_filters], params={"level": "roc_sell", "regime_min_p": "regime_min_p"},
+             const={"side": -1, "use_vol_filter": False, "regime_min_p": 0.5}, stage=SIGNAL, column=False),
+        Node("signal", _signal, ["buy_mask", "sell_mask"], stage=SIGNAL),
+    ], types=get("momentum")["params"])
+
+GRAPH = _graph()
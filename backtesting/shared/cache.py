@@ -0,0 +1,81 @@
+import os
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# params that only affect trade simulation — combos differing only in these share one build_df
+TRADE_KEYS = ("tp_pct", "sl_pct", "max_candles")
+
+# columns run_grid_search appends to each combo in grid_search.csv
+METRIC_COLS = ("trades", "win_rate", "total_pnl", "final_portf", "sharpe", "max_drawdown", "avg_candles", "psr", "dsr")
+
+# columns shared.robust adds next to them (robust.csv) — scores, never params
+ROBUST_COLS = ("nbr_n", "sharpe_nbr_min", "sharpe_nbr_mean", "sharpe_nbr_std", "dd_nbr_min", "robust")
+
+_MAX_ENTRIES = 8
+_built = OrderedDict()
+
+
+def _plain(v):
+    if isinstance(v, (bool, np.bool_)):
+        return bool(v)
+    if isinstance(v, (int, float, np.integer, np.floating)):
+        return float(v)
+    return v
+
+
+# --- hashable key of the indicator/signal params of a combo (grid dict or grid_search.csv row) ---
+def signal_key(p) -> tuple:
+    items = p.items() if isinstance(p, dict) else p.to_dict().items()
+    return tuple(sorted((k, _plain(v)) for k, v in items if k not in TRADE_KEYS and k not in METRIC_COLS + ROBUST_COLS))
+
+
+def data_key(symbol: str, interval: str, asset_type: str, rawdf: pd.DataFrame) -> tuple:
+    return (symbol, interval, asset_type, len(rawdf), str(rawdf["close_time"].iloc[-1]) if len(rawdf) else None)
+
+
+# --- build_df once per (strategy, data, signal params); the returned frame is shared — don't mutate it ---
+def build_cached(build_df, rawdf: pd.DataFrame, p, dkey: tuple) -> pd.DataFrame:
+    key = (build_df.__module__, build_df.__qualname__, dkey, signal_key(p))
+    if key in _built:
+        _built.move_to_end(key)
+        return _built[key]
+    df = build_df(rawdf if getattr(build_df, "pure", False) else rawdf.copy(), p)   # pure: dag graphs never mutate
+    _built[key] = df
+    if len(_built) > _MAX_ENTRIES:
+        _built.popitem(last=False)
+    return df
+
+
+# --- raw candles (+ 1m child index when intrabar) per process: (rawdf, sub, dkey); read-only ---
+_MAX_RAW = 4
+_raw     = OrderedDict()
+
+def data_path(symbol: str, interval: str, asset_type: str) -> str:
+    path = f"data/org/{asset_type}/{symbol}/{interval}.csv"
+    return path if os.path.isfile(path) else f"data/org/{asset_type}/{symbol}/1m.csv"   # load_df derives from 1m
+
+
+def raw_frame(symbol: str, interval: str, asset_type: str, intrabar: bool = False):
+    from backtesting.shared.load import load_df
+    from backtesting.shared.resample import prepare_intrabar
+
+    path = data_path(symbol, interval, asset_type)
+    key  = (symbol, interval, asset_type, intrabar, os.path.getmtime(path) if os.path.isfile(path) else None)
+    if key in _raw:
+        _raw.move_to_end(key)
+        return _raw[key]
+    rawdf = load_df(ticker=symbol, timeframe=interval, asset_type=asset_type)
+    sub   = None
+    if intrabar:
+        rawdf, sub = prepare_intrabar(rawdf, symbol, interval, asset_type)
+    _raw[key] = (rawdf, sub, data_key(symbol, interval, asset_type, rawdf))
+    if len(_raw) > _MAX_RAW:
+        _raw.popitem(last=False)
+    return _raw[key]
+
+
+def clear() -> None:
+    _built.clear()
+    _raw.clear()
@@ -0,0 +1,112 @@
+import math
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from backtesting.shared.load import to_ms
+
+# --- trading costs beyond the flat fee_pct, applied per trade as array operations ---
+# Every cost is a fraction of the trade's notional, charged on entry and on exit:
+#
+#   fees      taker on entry; on exit maker for tp (a resting limit order) when tp_maker, else taker
+#   spread    half the bar's bid/ask spread per side, from the Corwin–Schultz high/low estimator on
+#             the bar and the one before it (no look-ahead), averaged over `window` bars
+#   slippage  square-root impact: impact · σ_bar · √(notional / quote volume per bar), with σ_bar the
+#             rolling std of log returns and the volume a rolling mean of quote_asset_volume
+#   funding   rate per funding period (every funding_hours from 00:00 UTC) the position is held
+#             through; longs pay, shorts receive. Only when leverage > 1 (perpetuals; spot pays none)
+#
+# cost model dicts, as passed in eval_params["cost_model"] (every key optional):
+#   {"taker_fee": 0.0005, "maker_fee": 0.0002, "tp_maker": True, "spread": "cs" | 0.0004 | None,
+#    "impact": 1.0, "funding_rate": 0.0001, "funding_hours": 8, "window": 20}
+# taker_fee defaults to eval_params' fee_pct and maker_fee to taker_fee, so {} only adds spread,
+# slippage and funding to the flat run. The per-bar spread / σ / volume are cached per bar frame.
+
+DEFAULTS = {"taker_fee": None, "maker_fee": None, "tp_maker": True, "spread": "cs", "impact": 1.0,
+            "funding_rate": 0.0001, "funding_hours": 8, "window": 20}
+
+_MAX_ENTRIES = 8
+_bars = OrderedDict()   # bar-frame fingerprint -> (open_ms, spread, sigma, volume)
+
+_K = 3 - 2 * math.sqrt(2)
+
+
+# --- Corwin & Schultz (2012) spread from two consecutive bars' high/low; bar t uses (t-1, t) ---
+def corwin_schultz(high, low) -> np.ndarray:
+    h, l = np.asarray(high, dtype=np.float64), np.asarray(low, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        hl   = np.log(h / l) ** 2
+        beta = hl + np.concatenate([[np.nan], hl[:-1]])
+        h2   = np.maximum(h, np.concatenate([[np.nan], h[:-1]]))
+        l2   = np.minimum(l, np.concatenate([[np.nan], l[:-1]]))
+        gamma = np.log(h2 / l2) ** 2
+        alpha = (np.sqrt(2 * beta) - np.sqrt(beta)) / _K - np.sqrt(gamma / _K)
+        s = 2 * (np.exp(alpha) - 1) / (1 + np.exp(alpha))
+    return np.where(np.isnan(s), np.nan, np.maximum(s, 0.0))   # negative estimates are noise → 0
+
+
+def _bar_features(bars: pd.DataFrame, window: int):
+    key = (len(bars), str(bars["open_time"].iloc[0]), str(bars["open_time"].iloc[-1]),
+           float(np.nansum(bars["close_price"].to_numpy(np.float64))), window)
+    if key in _bars:
+        _bars.move_to_end(key)
+        return _bars[key]
+    close  = bars["close_price"].astype(np.float64)
+    spread = pd.Series(corwin_schultz(bars["high_price"], bars["low_price"])).rolling(window, min_periods=1).mean()
+    sigma  = np.log(close).diff().rolling(window, min_periods=2).std()
+    volume = bars["quote_asset_volume"].astype(np.float64).rolling(window, min_periods=1).mean()
+    out = (to_ms(bars["open_time"]).to_numpy(np.int64), spread.bfill().fillna(0).to_numpy(),
+           sigma.bfill().fillna(0).to_numpy(), volume.to_numpy())
+    _bars[key] = out
+    if len(_bars) > _MAX_ENTRIES:
+        _bars.popitem(last=False)
+    return out
+
+
+# --- {fee, spread, slippage, funding} in currency per trade (arrays aligned with `trades`) ---
+def trade_costs(trades: pd.DataFrame, notional, cost_model: dict, bars: pd.DataFrame = None,
+                fee_pct: float = 0.0005, leverage: float = 1) -> dict:
+    cm = DEFAULTS | (cost_model or {})
+    n  = len(trades)
+    notional = np.broadcast_to(np.asarray(notional, dtype=np.float64), (n,))
+    taker = fee_pct if cm["taker_fee"] is None else cm["taker_fee"]
+    maker = taker if cm["maker_fee"] is None else cm["maker_fee"]
+
+    exit_fee = np.full(n, taker)
+    if cm["tp_maker"]:
+        exit_fee = np.where(trades["exit_reason"].to_numpy() == "tp", maker, exit_fee)
+    out = {"fee": notional * (taker + exit_fee)}
+
+    entry_ms = to_ms(trades["entry_time"]).to_numpy(np.int64)
+    exit_ms  = to_ms(trades["exit_time"]).to_numpy(np.int64)
+    if cm["spread"] is not None or cm["impact"]:
+        if bars is None:
+            raise ValueError("cost model: spread / slippage need the simulated bars (evaluate_trades(..., bars=df))")
+        open_ms, spread, sigma, volume = _bar_features(bars, int(cm["window"]))
+        i = np.clip(np.searchsorted(open_ms, entry_ms), 0, len(open_ms) - 1)
+        j = np.clip(np.searchsorted(open_ms, exit_ms), 0, len(open_ms) - 1)
+        if cm["spread"] == "cs":
+            half = (spread[i] + spread[j]) / 2
+        else:
+            half = np.full(n, float(cm["spread"] or 0.0))
+        out["spread"] = notional * half
+        with np.errstate(divide="ignore", invalid="ignore"):
+            slip = cm["impact"] * (sigma[i] * np.sqrt(notional / volume[i]) + sigma[j] * np.sqrt(notional / volume[j]))
+        out["slippage"] = notional * np.nan_to_num(slip, posinf=0.0)
+    else:
+        out["spread"] = out["slippage"] = np.zeros(n)
+
+    if leverage > 1 and cm["funding_rate"]:
+        period = int(cm["funding_hours"] * 3_600_000)
+        periods = exit_ms // period - entry_ms // period   # funding timestamps in (entry, exit]
+        out["funding"] = notional * cm["funding_rate"] * periods * trades["signal"].to_numpy(np.float64)
+    else:
+        out["funding"] = np.zeros(n)
+    return out
+
+
+def describe(cost_model: dict = None) -> str:
+    if cost_model is None:
+        return "flat fee_pct"
+    return ", ".join(f"{k}={v}" for k, v in (DEFAULTS | cost_model).items())
@@ -0,0 +1,170 @@
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# --- strategies as graphs of named nodes instead of a fixed add_indicators -> add_signals chain ---
+# Indicator nodes run on the full candle series (like add_indicators); the frame is then trimmed
+# to rows where the raw and indicator columns are all non-NaN (add_indicators' dropna) and
+# signal nodes run on the trimmed frame (like add_signals), so the output equals the old _build_df.
+#
+# Every node output is cached under (op, input keys, resolved params, data fingerprint), not under
+# the node's name: a change to rsi_buy recomputes only the nodes downstream of rsi_buy, and equal
+# computations (ma_trend(200) in two strategies, every grid combo, validation) share one entry.
+
+INDICATOR = "indicator"
+SIGNAL    = "signal"
+
+_MAX_BYTES = 512 * 2**20
+_cache     = OrderedDict()   # key -> pd.Series (pd.DataFrame for multi-output nodes)
+_bytes     = 0
+_stats     = {"hits": 0, "misses": 0}
+
+
+class Node:
+    def __init__(self, name, fn, inputs=(), params=None, const=None, stage=INDICATOR, column=True, outputs=None):
+        self.name    = name
+        self.fn      = fn               # fn(*input_series, **kwargs) -> Series / array aligned with the inputs
+        self.inputs  = tuple(inputs)    # earlier node names or raw candle columns
+        self.params  = dict(params or {})   # fn kwarg -> strategy param name
+        self.const   = dict(const or {})    # fn kwarg -> fixed value
+        self.stage   = stage
+        self.column  = column           # False → intermediate, not part of the output frame
+        self.outputs = tuple(outputs) if outputs else (name,)   # several: fn returns a frame with these columns
+
+
+class Graph:
+    def __init__(self, name: str, nodes: list, types: dict = None):
+        self.name  = name
+        self.nodes = OrderedDict()
+        self.types = types or {}       # param -> cast (int / float / bool), applied before keying
+        self._produced = {}            # output name -> node
+        for n in nodes:
+            for i in n.inputs:
+                if i in self._produced and n.stage == INDICATOR and self._produced[i].stage == SIGNAL:
+                    raise ValueError(f"{name}: indicator node {n.name!r} cannot read signal node {i!r}")
+            if n.name in self.nodes or set(n.outputs) & set(self._produced):
+                raise ValueError(f"{name}: duplicate node {n.name!r}")
+            self.nodes[n.name] = n
+            self._produced.update({o: n for o in n.outputs})
+        self.raw_inputs = sorted({i for n in nodes for i in n.inputs if i not in self._produced})
+
+    def params(self) -> set:
+        return {v for n in self.nodes.values() for v in n.params.values()}
+
+    # --- nodes whose output changes when `param` does ---
+    def downstream(self, param: str) -> list:
+        hit = set()
+        for n in self.nodes.values():
+            if param in n.params.values() or any(self._produced[i].name in hit for i in n.inputs if i in self._produced):
+                hit.add(n.name)
+        if any(self.nodes[h].stage == INDICATOR and self.nodes[h].column for h in hit):
+            hit |= {n for n, node in self.nodes.items() if node.stage == SIGNAL}   # the dropna trim moves
+        return [n for n in self.nodes if n in hit]
+
+    def _kwargs(self, n: Node, p) -> dict:
+        kw = dict(n.const)
+        for arg, name in n.params.items():
+            if arg in kw and name not in p:   # optional param (const holds its default), e.g. older grid_search.csv
+                continue
+            v = p[name]
+            kw[arg] = self.types[name](v) if name in self.types and v is not None else v
+        return kw
+
+    # --- evaluate (or fetch) one node; multi-output nodes register each output column ---
+    def _eval(self, n: Node, p, keys: dict, values: dict, index) -> None:
+        kw  = self._kwargs(n, p)
+        key = (n.fn.__module__, n.fn.__qualname__, tuple(keys[i] for i in n.inputs), tuple(sorted(kw.items())))
+        out = _cached(key, lambda: n.fn(*(values[i] for i in n.inputs), **kw), index, n.outputs)
+        for o in n.outputs:
+            keys[o]   = key if len(n.outputs) == 1 else key + (o,)
+            values[o] = out if len(n.outputs) == 1 else out[o]
+
+    def __call__(self, rawdf: pd.DataFrame, p) -> pd.DataFrame:
+        fp     = _fingerprint(rawdf, self.raw_inputs)
+        keys   = {c: ("raw", c, fp) for c in self.raw_inputs}
+        values = {c: rawdf[c] for c in self.raw_inputs}
+
+        # indicators on the full series
+        indicators = [n for n in self.nodes.values() if n.stage == INDICATOR]
+        for n in indicators:
+            self._eval(n, p, keys, values, rawdf.index)
+
+        # add_indicators' dropna: rows where the raw frame and every indicator column are present
+        ind_cols = [o for n in indicators if n.column for o in n.outputs]
+        trim_key = ("trim", fp, tuple(rawdf.columns), tuple(keys[c] for c in ind_cols))
+        keep     = _cached(trim_key, lambda: pd.Series(
+            rawdf.notna().all(axis=1).to_numpy() & np.logical_and.reduce([values[c].notna().to_numpy() for c in ind_cols] or [True]),
+            index=rawdf.index), rawdf.index)
+        pos      = np.flatnonzero(keep.to_numpy())
+        index    = rawdf.index[pos]
+
+        # signals on the trimmed frame
+        tkeys, tvalues = {}, {}
+        for name in list(self.raw_inputs) + [o for n in indicators for o in n.outputs]:
+            tkeys[name]   = ("trimmed", trim_key, keys[name])
+            tvalues[name] = _cached(tkeys[name], lambda: values[name].iloc[pos], index)
+        signals = [n for n in self.nodes.values() if n.stage == SIGNAL]
+        for n in signals:
+            self._eval(n, p, tkeys, tvalues, index)
+
+        cols = {c: values[c].to_numpy()[pos] for c in ind_cols}
+        cols |= {o: tvalues[o].to_numpy() for n in signals if n.column for o in n.outputs}
+        out = pd.concat([rawdf.iloc[pos], pd.DataFrame(cols, index=index)], axis=1)
+        out.attrs = dict(rawdf.attrs)   # concat drops them; shared.mtf and later stages read symbol / interval
+        return out
+
+
+# --- cheap content fingerprint of the candle columns a graph reads ---
+def _fingerprint(rawdf: pd.DataFrame, cols: list) -> tuple:
+    if rawdf.empty:
+        return (0,)
+    sums = tuple(float(np.nansum(rawdf[c].to_numpy(np.float64))) for c in cols)
+    return (len(rawdf), rawdf.index[0], rawdf.index[-1], str(rawdf["close_time"].iloc[0]), str(rawdf["close_time"].iloc[-1]), sums)
+
+
+def _cached(key, compute, index, outputs=None):
+    global _bytes
+    if key in _cache:
+        _stats["hits"] += 1
+        _cache.move_to_end(key)
+        return _cache[key]
+    _stats["misses"] += 1
+    out = compute()
+    if outputs and len(outputs) > 1:
+        if not isinstance(out, pd.DataFrame):
+            out = pd.DataFrame(dict(zip(outputs, out)), index=index)
+    elif not isinstance(out, pd.Series):
+        out = pd.Series(out, index=index)
+    _cache[key] = out
+    _bytes += out.to_numpy().nbytes
+    while _bytes > _MAX_BYTES and len(_cache) > 1:
+        _, old = _cache.popitem(last=False)
+        _bytes -= old.to_numpy().nbytes
+    return out
+
+
+def stats() -> dict:
+    return dict(_stats, entries=len(_cache), mb=round(_bytes / 2**20, 1))
+
+
+def clear() -> None:
+    global _bytes
+    _cache.clear()
+    _bytes = 0
+    _stats.update(hits=0, misses=0)
+
+
+# --- ops shared by several strategies (same op + inputs + params → one cache entry) ---
+
+def rolling_mean(s: pd.Series, window: int) -> pd.Series:
+    return s.rolling(window).mean()
+
+
+def pct_change(s: pd.Series, periods: int = 1, scale: float = 1.0) -> pd.Series:
+    out = s.pct_change(periods)
+    return out * scale if scale != 1.0 else out
+
+
+def ratio(a: pd.Series, b: pd.Series) -> pd.Series:
+    return a / b
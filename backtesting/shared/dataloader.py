@@ -0,0 +1,175 @@
+import os
+import shutil
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import requests
+
+from backtesting.shared.load import INTERVAL_MS, KLINE_COLUMNS, klines_weight, to_ms
+
+_PAGE_LIMIT = 1000
+_MAX_RETRIES = 5
+
+
+# --- request-weight budget shared by all fetch threads (sliding 1-minute window) ---
+class RateLimiter:
+    def __init__(self, weight_per_minute: int = 6000, safety: float = 0.8):
+        self.budget = int(weight_per_minute * safety)
+        self._spent = deque()   # (monotonic time, weight)
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, weight: int) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._spent and now - self._spent[0][0] >= 60:
+                    self._spent.popleft()
+                used = sum(w for _, w in self._spent)
+                if now >= self._paused_until and used + weight <= self.budget:
+                    self._spent.append((now, weight))
+                    return
+                wait = max(self._paused_until - now, 60 - (now - self._spent[0][0]) if self._spent else 0.05)
+            time.sleep(min(max(wait, 0.05), 5.0))
+
+    # server-reported usage (X-MBX-USED-WEIGHT-1M) or a 429 Retry-After wins over local accounting
+    def observe(self, used_weight: int = None, retry_after: float = None) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if retry_after is not None:
+                self._paused_until = max(self._paused_until, now + retry_after)
+            elif used_weight is not None and used_weight >= self.budget:
+                self._paused_until = max(self._paused_until, now + 60 - time.time() % 60)
+
+
+_local = threading.local()
+
+def _session() -> requests.Session:
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session()
+    return _local.session
+
+
+# --- one GET /api/v3/klines page, retried on 429/418/5xx ---
+def fetch_page(base_url: str, symbol: str, interval: str, start_ms: int, end_ms: int,
+               limiter: RateLimiter, limit: int = _PAGE_LIMIT) -> list:
+    params = {"symbol": symbol, "interval": interval, "startTime": start_ms, "endTime": end_ms, "limit": limit}
+    for attempt in range(_MAX_RETRIES):
+        limiter.acquire(klines_weight(limit))
+        resp = _session().get(f"{base_url}/api/v3/klines", params=params, timeout=30)
+        used = resp.headers.get("X-MBX-USED-WEIGHT-1M")
+        if resp.status_code in (418, 429):
+            limiter.observe(retry_after=float(resp.headers.get("Retry-After", 2 ** attempt)))
+            continue
+        if resp.status_code >= 500:
+            time.sleep(2 ** attempt)
+            continue
+        resp.raise_for_status()
+        limiter.observe(used_weight=int(used) if used else None)
+        return resp.json()
+    raise RuntimeError(f"{symbol} {interval}: gave up after {_MAX_RETRIES} attempts ({start_ms} → {end_ms})")
+
+
+# --- raw kline rows -> DataFrame in the data/org CSV schema ---
+def klines_to_df(rows: list) -> pd.DataFrame:
+    df = pd.DataFrame([r[:len(KLINE_COLUMNS)] for r in rows], columns=KLINE_COLUMNS)
+    for c in KLINE_COLUMNS:
+        if c in ("open_time", "close_time"):
+            df[c] = pd.to_datetime(df[c].astype("int64"), unit="ms")
+        elif c == "number_of_trades":
+            df[c] = df[c].astype("int64")
+        else:
+            df[c] = df[c].astype(float)
+    return df
+
+
+# --- last stored close_time, read from the tail of the CSV without parsing the whole file ---
+def last_close_time(path: str):
+    if not os.path.isfile(path):
+        return None
+    with open(path, "rb") as f:
+        header = f.readline().decode().rstrip("\r\n").split(",")
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        f.seek(max(0, size - 4096))
+        lines = [l for l in f.read().decode().splitlines() if l.strip()]
+    if len(lines) < 1 or lines[-1].split(",") == header:
+        return None
+    last = lines[-1].split(",")
+    return to_ms(pd.Series([last[header.index("close_time")]])).iloc[0], int(last[0])
+
+
+# --- append rows through a temp file + atomic rename so readers never see a partial CSV ---
+def append_atomic(path: str, df: pd.DataFrame, next_index: int = 0) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp.{os.getpid()}.{threading.get_ident()}"
+    out = df.copy()
+    out.index = range(next_index, next_index + len(out))
+    if os.path.isfile(path):
+        shutil.copyfile(path, tmp)
+        with open(tmp, "rb+") as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+        out.to_csv(tmp, mode="a", header=False)
+    else:
+        out.to_csv(tmp)
+    os.replace(tmp, path)
+
+
+def _page_ranges(start_ms: int, end_ms: int, interval: str, limit: int = _PAGE_LIMIT) -> list:
+    step = INTERVAL_MS[interval] * limit
+    return [(s, min(s + step - 1, end_ms)) for s in range(start_ms, end_ms + 1, step)]
+
+
+# --- fetch every (symbol, interval) pair concurrently, pages in parallel, appending only new candles ---
+def sync_klines(
+    base_url: str,
+    symbols: dict,              # {asset_type: [symbol, ...]}
+    intervals: list,
+    start: str,                 # used when a CSV does not exist yet
+    end: str = None,            # defaults to now; only candles closed by `end` are stored
+    data_root: str = "data/org",
+    max_workers: int = 8,
+    weight_per_minute: int = 6000,
+    log=print,
+) -> dict:
+    end_ms   = int(pd.Timestamp(end).value // 1_000_000) if end else int(time.time() * 1000)
+    start_ms = int(pd.Timestamp(start).value // 1_000_000)
+    limiter  = RateLimiter(weight_per_minute)
+
+    plan = {}
+    for asset_type, syms in symbols.items():
+        for symbol in syms:
+            for interval in intervals:
+                path = f"{data_root}/{asset_type}/{symbol}/{interval}.csv"
+                last = last_close_time(path)
+                first = last[0] + 1 if last else start_ms
+                plan[(symbol, interval)] = (path, last, _page_ranges(first, end_ms, interval) if first <= end_ms else [])
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            key: [pool.submit(fetch_page, base_url, key[0], key[1], s, e, limiter) for s, e in pages]
+            for key, (_, _, pages) in plan.items()
+        }
+        added = {}
+        for (symbol, interval), page_futures in futures.items():
+            path, last, _ = plan[(symbol, interval)]
+            rows = [r for f in page_futures for r in f.result()]
+            if not rows:
+                added[(symbol, interval)] = 0
+                continue
+            df = klines_to_df(rows).drop_duplicates("open_time").sort_values("open_time")
+            close_ms = to_ms(df["close_time"])
+            keep = close_ms <= end_ms
+            if last:
+                keep &= close_ms > last[0]
+            df = df[keep]
+            if not df.empty:
+                append_atomic(path, df, next_index=last[1] + 1 if last else 0)
+            added[(symbol, interval)] = len(df)
+            log(f"  {symbol} {interval}: +{len(df)} rows")
+    return added
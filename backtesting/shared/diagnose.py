@@ -2,6 +2,11 @@ import pandas as pd
 from rich.console import Console
 
 from backtesting.shared.load import load_df
+from backtesting.shared.resample import prepare_intrabar
+from backtesting.shared import tracking
+from backtesting.shared.cache import METRIC_COLS
+from backtesting.shared.sizing import size_bars, size_trades
+from backtesting.shared.store import record_results
 from backtesting.shared.trade import simulate_trades, evaluate_trades
 from backtesting.shared.result import plot, summarize
 from backtesting.shared.validate import latest_run_dir
@@ -22,6 +27,9 @@ def run_diagnose(
     make_plot_kwargs,   # (params) -> dict passed to plot()
     run_dir: str = None,
     rank: int = 0,
+    intrabar: bool = False,
+    show: bool = True,  # False → headless: the plot is only saved into run_dir
+    sizing: dict = None,  # shared.sizing config; None → fixed trade_size_pct
 ) -> None:
     if run_dir is None:
         run_dir = latest_run_dir(runs_base)
@@ -32,16 +40,32 @@ def run_diagnose(
     TEST_START = pd.to_datetime(test_start)
     TEST_END   = pd.to_datetime(test_end)
 
-    df     = build_df(load_df(ticker=symbol, timeframe=interval, asset_type=asset_type), p)
-    df     = df[(df["close_time"] > TEST_START) & (df["close_time"] <= TEST_END)]
-    trades = simulate_trades(df, tp_pct=p["tp_pct"], sl_pct=p["sl_pct"], max_candles=int(p["max_candles"]))
+    rawdf  = load_df(ticker=symbol, timeframe=interval, asset_type=asset_type)
+    sub    = None
+    if intrabar:
+        rawdf, sub = prepare_intrabar(rawdf, symbol, interval, asset_type)
+    df     = build_df(rawdf, p)
+    df     = size_bars(df[(df["close_time"] > TEST_START) & (df["close_time"] <= TEST_END)], sizing)
+    trades = simulate_trades(df, tp_pct=p["tp_pct"], sl_pct=p["sl_pct"], max_candles=int(p["max_candles"]),
+                             intrabar=intrabar, sub_bars=sub)
+    trades = size_trades(trades, sizing, df)
 
-    kwargs = make_plot_kwargs(p)
+    kwargs = make_plot_kwargs(p) | {"save_path": f"{run_dir}/diagnose_rank{rank + 1}_{symbol}_{interval}.png", "show": show}
     if trades.empty:
         _console.print("[dim]No trades fired.[/dim]")
         plot(df, **kwargs)
         return
 
-    resdf = evaluate_trades(trades, **eval_params)
+    resdf = evaluate_trades(trades, **eval_params, bars=df)
+    params  = {k: v for k, v in p.items() if k not in METRIC_COLS}
+    metrics = {
+        "trades": len(resdf), "win_rate": round((resdf["pnl"] > 0).mean() * 100, 1), "total_pnl": round(resdf["pnl"].sum(), 2),
+        "sharpe": resdf.attrs.get("sharpe"), "max_drawdown": resdf.attrs.get("max_drawdown"),
+        "final_portf": resdf.attrs.get("final_portfolio"), "avg_candles": round(resdf["candles"].mean(), 1),
+    }
+    record_results(run_dir, "diagnose", [{"params": params, "symbol": symbol, "window_start": test_start, "window_end": test_end,
+                                          **metrics}], strategy_name=strategy_name)
     summarize(resdf)
     plot(df, trades=resdf, **kwargs)
+    tracking.log_diagnose(run_dir, params | {"symbol": symbol, "rank": rank}, metrics, (test_start, test_end), [kwargs["save_path"]])
+    _console.print(f"[dim]Plot → {kwargs['save_path']}[/dim]")
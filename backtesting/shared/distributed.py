@@ -0,0 +1,513 @@
+import atexit
+import hashlib
+import importlib
+import json
+import os
+import pickle
+import socket
+import socketserver
+import struct
+import subprocess
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import nullcontext
+
+import numpy as np
+import pandas as pd
+from rich.console import Console
+
+from backtesting.shared.cache import signal_key
+
+_console = Console()
+
+# --- run_grid_search combos on worker processes over TCP, possibly on other machines ---
+# The coordinator lives in the grid-search process and serves work units: up to unit_size combos
+# sorted by signal_key, so the combos of one unit mostly share one build_df on the worker. Workers
+# pull units, run optimize.run_combo on each combo and send back the result row minus the params
+# plus the trade returns (entry / exit time, pnl). run_grid_search merges them in combo order, so
+# grid_search.csv, returns.npz, pruned.csv and every later step are those of a local run.
+#
+# Wire format: 4-byte big-endian length + JSON header, then `blob` raw bytes if the header says so.
+#   worker → {"op": "hello", "worker": name}                  ← {"op": "hello", "heartbeat": s}
+#            {"op": "get"}                                    ← {"op": "unit", ...} | {"op": "wait", "delay": s}
+#            {"op": "blob", "hash": h}                        ← {"op": "blob", "blob": n} + candle data
+#            {"op": "beat", "unit": id}                       (no reply)
+#            {"op": "result", "unit": id, "outcomes": [...]}  ← {"op": "ok"}
+#            {"op": "error", "unit": id, "error": text}       ← {"op": "ok"}
+# A unit's lease lasts `lease` seconds and each heartbeat renews it. Units whose every lease ran out
+# or whose worker disconnected go back to the queue. With the queue empty, idle workers also get a
+# second copy of a unit that has run `straggler` × the median unit time; the first result wins.
+#
+# Candle data (the raw frame and the 1m child bars, pickled) is identified by its SHA-256. Workers
+# keep it under cache_dir/<hash>.pkl and fetch it only when missing, so a dataset crosses the
+# network once per machine. Workers unpickle what the coordinator sends and import the build_df it
+# names, so connect them only to coordinators you trust.
+
+DEFAULTS = {"address": "127.0.0.1:0", "local": 0, "unit_size": 32, "heartbeat": 2.0, "lease": 10.0,
+            "straggler": 3.0, "max_failures": 3}
+CACHE_DIR = "data/cache"
+
+_HEAD = struct.Struct(">I")
+
+
+# --- framing ---
+
+def _json(v):
+    if isinstance(v, np.generic):
+        return v.item()
+    if isinstance(v, (pd.Timestamp, np.datetime64)):
+        return str(v)
+    raise TypeError(f"{type(v).__name__} is not JSON serializable")
+
+
+def send(sock: socket.socket, msg: dict, blob: bytes = b"", lock: threading.Lock = None) -> None:
+    head = json.dumps(msg | ({"blob": len(blob)} if blob else {}), default=_json).encode()
+    with lock or nullcontext():   # heartbeats share the worker's socket with the main thread
+        sock.sendall(_HEAD.pack(len(head)) + head)
+        if blob:
+            sock.sendall(blob)
+
+
+def _exact(sock: socket.socket, n: int) -> bytes:
+    buf = bytearray(n)
+    view, got = memoryview(buf), 0
+    while got < n:
+        k = sock.recv_into(view[got:], n - got)
+        if not k:
+            raise ConnectionError("peer closed the connection")
+        got += k
+    return bytes(buf)
+
+
+def recv(sock: socket.socket) -> tuple:
+    (n,) = _HEAD.unpack(_exact(sock, _HEAD.size))
+    msg  = json.loads(_exact(sock, n))
+    return msg, _exact(sock, msg["blob"]) if msg.get("blob") else b""
+
+
+def _split(address: str) -> tuple:
+    host, _, port = str(address).rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+# --- coordinator ---
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        self.server.coordinator._serve(self.request)
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads      = True
+    allow_reuse_address = True
+
+
+class Coordinator:
+    def __init__(self, address: str = "127.0.0.1:0", heartbeat: float = 2.0, lease: float = 10.0, straggler: float = 3.0,
+                 max_failures: int = 3):
+        self.heartbeat, self.lease, self.straggler, self.max_failures = heartbeat, lease, straggler, max_failures
+        self._cond    = threading.Condition()
+        self._pending = deque()     # unit ids waiting for a worker
+        self._units   = {}          # unit id -> {job, idx, leases {worker: [since, deadline]}, done, failures}
+        self._jobs    = {}          # job id -> {spec, out, left, on_done, stats, error}
+        self._blobs   = {}          # hash -> bytes (candle data of the active jobs)
+        self._conns   = set()
+        self._next_id = 0
+        self.workers  = {}          # worker name -> last message time
+        self.procs    = []          # local workers started by spawn()
+
+        host, port   = _split(address)
+        self._server = _Server((host, port), _Handler)
+        self._server.coordinator = self
+        self.address = f"{host}:{self._server.server_address[1]}"
+        threading.Thread(target=self._server.serve_forever, daemon=True, name="coordinator").start()
+
+    # --- one worker connection ---
+    def _serve(self, sock: socket.socket) -> None:
+        name = None
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with self._cond:
+            self._conns.add(sock)
+        try:
+            while True:
+                msg, _ = recv(sock)
+                op   = msg["op"]
+                name = msg["worker"] if op == "hello" else name
+                with self._cond:
+                    self.workers[name] = time.monotonic()
+                if op == "hello":
+                    send(sock, {"op": "hello", "heartbeat": self.heartbeat})
+                elif op == "get":
+                    send(sock, self._assign(name) or {"op": "wait", "delay": min(self.heartbeat, 0.5)})
+                elif op == "blob":
+                    send(sock, {"op": "blob", "hash": msg["hash"]}, self._blobs[msg["hash"]])
+                elif op == "beat":
+                    self._renew(name, msg["unit"])
+                elif op == "result":
+                    self._complete(name, msg["unit"], msg["outcomes"])
+                    send(sock, {"op": "ok"})
+                elif op == "error":
+                    self._fail(name, msg["unit"], msg["error"])
+                    send(sock, {"op": "ok"})
+        except (ConnectionError, OSError, ValueError, KeyError):   # KeyError: data of a job that has ended
+            pass
+        finally:
+            with self._cond:
+                self._conns.discard(sock)
+                for uid, u in self._units.items():
+                    if not u["done"] and u["leases"].pop(name, None) and not u["leases"]:
+                        self._requeue(uid)
+                self._cond.notify_all()
+
+    # --- next unit for `name`: the queue first, then a copy of a straggling unit ---
+    def _assign(self, name: str):
+        with self._cond:
+            self._expire()
+            uid = self._pending.popleft() if self._pending else self._straggler(name)
+            if uid is None:
+                return None
+            u   = self._units[uid]
+            job = self._jobs[u["job"]]
+            now = time.monotonic()
+            u["leases"][name] = [now, now + self.lease]
+            return {"op": "unit", "unit": uid, "spec": job["spec"], "combos": [[i, job["combos"][i]] for i in u["idx"]]}
+
+    def _straggler(self, name: str):
+        done = [d for j in self._jobs.values() for d in j["stats"]["durations"]]
+        if not done:
+            return None
+        limit, now, slow = self.straggler * float(np.median(done)), time.monotonic(), []
+        for uid, u in self._units.items():
+            if u["done"] or len(u["leases"]) != 1 or name in u["leases"]:
+                continue
+            since = next(iter(u["leases"].values()))[0]
+            if now - since > limit:
+                slow.append((since, uid))
+        if not slow:
+            return None
+        uid = min(slow)[1]
+        self._jobs[self._units[uid]["job"]]["stats"]["speculative"] += 1
+        return uid
+
+    def _renew(self, name: str, uid: int) -> None:
+        with self._cond:
+            lease = self._units.get(uid, {}).get("leases", {}).get(name)
+            if lease:
+                lease[1] = time.monotonic() + self.lease
+
+    # --- units whose leases all ran out go back to the front of the queue (caller holds the lock) ---
+    def _expire(self) -> None:
+        now = time.monotonic()
+        for uid, u in self._units.items():
+            if u["done"] or not u["leases"]:
+                continue
+            for w in [w for w, l in u["leases"].items() if l[1] < now]:
+                del u["leases"][w]
+            if not u["leases"]:
+                self._requeue(uid)
+
+    def _requeue(self, uid: int) -> None:
+        if uid not in self._pending:
+            self._pending.appendleft(uid)
+            self._jobs[self._units[uid]["job"]]["stats"]["reassigned"] += 1
+
+    def _complete(self, name: str, uid: int, outcomes: list) -> None:
+        with self._cond:
+            u = self._units.get(uid)
+            if u is None or u["done"]:   # the other copy of a reassigned / speculative unit won
+                if u is not None:
+                    self._jobs[u["job"]]["stats"]["duplicates"] += 1
+                return
+            job   = self._jobs[u["job"]]
+            since = u["leases"].get(name, [time.monotonic()])[0]
+            u["done"], u["leases"] = True, {}
+            if uid in self._pending:
+                self._pending.remove(uid)
+            for o in outcomes:
+                job["out"][o["i"]] = o
+            job["left"] -= len(u["idx"])
+            job["stats"]["durations"].append(time.monotonic() - since)
+            job["stats"]["per_worker"][name] = job["stats"]["per_worker"].get(name, 0) + len(u["idx"])
+            on_done = job["on_done"]
+            self._cond.notify_all()
+        if on_done:
+            on_done(len(outcomes), f"[dim]{name}: unit {uid} ({len(outcomes)} combos)[/dim]")
+
+    def _fail(self, name: str, uid: int, error: str) -> None:
+        with self._cond:
+            u = self._units.get(uid)
+            if u is None or u["done"]:
+                return
+            u["leases"].pop(name, None)
+            u["failures"] += 1
+            job = self._jobs[u["job"]]
+            if u["failures"] >= self.max_failures:
+                job["error"] = f"unit {uid} failed {u['failures']}× — last on {name}: {error}"
+            elif not u["leases"]:
+                self._requeue(uid)
+            self._cond.notify_all()
+
+    # --- run one job to completion: packed outcome dicts in combo order ---
+    def run(self, spec: dict, combos: list, blob: bytes, unit_size: int = 32, on_done=None) -> tuple:
+        order = sorted(range(len(combos)), key=lambda i: repr(signal_key(combos[i])))
+        with self._cond:
+            jid = self._next_id
+            self._next_id += 1
+            self._blobs[spec["data"]["hash"]] = blob
+            job = self._jobs[jid] = {
+                "id": jid, "spec": spec, "combos": combos, "out": [None] * len(combos), "left": len(combos),
+                "on_done": on_done, "error": None,
+                "stats": {"durations": [], "per_worker": {}, "reassigned": 0, "speculative": 0, "duplicates": 0},
+            }
+            units = [order[k:k + unit_size] for k in range(0, len(order), max(int(unit_size), 1))]
+            for idx in units:
+                uid = self._next_id
+                self._next_id += 1
+                self._units[uid] = {"job": jid, "idx": idx, "leases": {}, "done": False, "failures": 0}
+                self._pending.append(uid)
+
+        t0, hinted = time.monotonic(), False
+        try:
+            with self._cond:
+                while job["left"] > 0 and job["error"] is None:
+                    self._cond.wait(self.heartbeat)
+                    self._expire()
+                    if not hinted and not self.workers and time.monotonic() - t0 > 5:
+                        hinted = True
+                        _console.print(f"[yellow]waiting for workers: python -m backtesting.cli worker --connect {self.address}[/yellow]")
+        finally:
+            with self._cond:
+                for uid in [u for u, v in self._units.items() if v["job"] == jid]:
+                    del self._units[uid]
+                    if uid in self._pending:
+                        self._pending.remove(uid)
+                del self._jobs[jid]
+                if not any(j["spec"]["data"]["hash"] == spec["data"]["hash"] for j in self._jobs.values()):
+                    self._blobs.pop(spec["data"]["hash"], None)
+        if job["error"]:
+            raise RuntimeError(f"distributed grid search: {job['error']}")
+
+        s = job["stats"]
+        return job["out"], {
+            "address": self.address, "units": len(units), "unit_size": unit_size, "workers": len(s["per_worker"]),
+            "per_worker": s["per_worker"], "reassigned": s["reassigned"], "speculative": s["speculative"],
+            "duplicates": s["duplicates"], "seconds": round(time.monotonic() - t0, 2),
+        }
+
+    # --- n worker processes on this machine (localhost testing, or a coordinator's own cores) ---
+    def spawn(self, n: int, cache_dir: str = CACHE_DIR) -> None:
+        pkg  = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))   # holds backtesting/
+        env  = os.environ | {"PYTHONPATH": os.pathsep.join(filter(None, [pkg, os.environ.get("PYTHONPATH")]))}
+        host, port = _split(self.address)
+        addr = f"{'127.0.0.1' if host in ('0.0.0.0', '') else host}:{port}"
+        for _ in range(n):
+            self.procs.append(subprocess.Popen(
+                [sys.executable, "-m", "backtesting.cli", "--root", os.getcwd(), "worker", "--connect", addr,
+                 "--cache", cache_dir, "--retry", "5"],
+                env=env, stdout=subprocess.DEVNULL))
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        with self._cond:
+            for s in list(self._conns):
+                try:
+                    s.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+        for p in self.procs:
+            p.terminate()
+        for p in self.procs:
+            try:
+                p.wait(5)
+            except subprocess.TimeoutExpired:
+                p.kill()
+
+
+_coordinators = {}   # configured address -> Coordinator, kept for the process (tune = grid search per call)
+_payloads     = OrderedDict()   # data key -> (hash, pickled candles)
+
+
+def coordinator(cfg: dict) -> Coordinator:
+    key = str(cfg["address"])
+    c   = _coordinators.get(key)
+    if c is None:
+        c = _coordinators[key] = Coordinator(cfg["address"], cfg["heartbeat"], cfg["lease"], cfg["straggler"],
+                                             cfg["max_failures"])
+        _console.print(f"[dim]Coordinator listening on {c.address}[/dim]")
+    if int(cfg["local"]) > len(c.procs):
+        c.spawn(int(cfg["local"]) - len(c.procs), cfg.get("cache_dir", CACHE_DIR))
+    return c
+
+
+@atexit.register
+def shutdown() -> None:
+    while _coordinators:
+        _coordinators.popitem()[1].close()
+
+
+def _payload(frames: tuple) -> tuple:
+    rawdf, sub, dkey = frames
+    key = (dkey, sub is not None)
+    if key not in _payloads:
+        blob = pickle.dumps((rawdf, sub), protocol=pickle.HIGHEST_PROTOCOL)
+        _payloads[key] = (hashlib.sha256(blob).hexdigest(), blob)
+        if len(_payloads) > 2:
+            _payloads.popitem(last=False)
+    return _payloads[key]
+
+
+def _unpack(o: dict, p: dict) -> tuple:
+    kind = (o or {}).get("kind")
+    if kind == "ok":
+        ev = pd.DataFrame({
+            "entry_time": pd.to_datetime(np.asarray(o["ev"]["entry_ms"], dtype=np.int64), unit="ms"),
+            "exit_time":  pd.to_datetime(np.asarray(o["ev"]["exit_ms"], dtype=np.int64), unit="ms"),
+            "pnl":        np.asarray(o["ev"]["pnl"], dtype=np.float64),
+        })
+        return "ok", {**p, **o["row"]}, ev
+    if kind == "pruned":
+        return "pruned", {**p, **o["row"]}, None
+    return None, None, None
+
+
+# --- run_grid_search's combos on the workers -> ([(kind, row, trade returns)] in combo order, run.json summary) ---
+def run_combos(workers, build_df, combos: list, source: tuple, frames: tuple, job: dict, on_done=None) -> tuple:
+    cfg  = DEFAULTS | (workers if isinstance(workers, dict) else {"address": workers or DEFAULTS["address"]})
+    c    = coordinator(cfg)
+    h, blob = _payload(frames)
+    spec = {"build": [build_df.__module__, build_df.__qualname__],
+            "data": {"hash": h, "source": list(source), "dkey": list(frames[2])}, **job}
+    out, info = c.run(spec, combos, blob, int(cfg["unit_size"]), on_done)
+    return [_unpack(o, p) for o, p in zip(out, combos)], info
+
+
+def describe(info: dict) -> str:
+    per = ", ".join(f"{w}: {n}" for w, n in sorted(info["per_worker"].items()))
+    return (f"{info['units']} units over {info['workers']} workers ({per}) in {info['seconds']}s · "
+            f"{info['reassigned']} reassigned · {info['speculative']} speculative copies")
+
+
+# --- worker ---
+
+_frames = OrderedDict()   # hash -> (rawdf, sub), per worker process
+
+
+def _candles(sock, lock, data: dict, cache_dir: str) -> tuple:
+    h = data["hash"]
+    if h in _frames:
+        _frames.move_to_end(h)
+        return _frames[h]
+    path = os.path.join(cache_dir, f"{h}.pkl")
+    if os.path.isfile(path):
+        with open(path, "rb") as f:
+            blob = f.read()
+    else:
+        send(sock, {"op": "blob", "hash": h}, lock=lock)
+        _, blob = recv(sock)
+        if hashlib.sha256(blob).hexdigest() != h:
+            raise ValueError(f"candle data {h[:12]}… arrived corrupted")
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = f"{path}.tmp.{os.getpid()}"
+        with open(tmp, "wb") as f:
+            f.write(blob)
+        os.replace(tmp, path)
+    _frames[h] = pickle.loads(blob)
+    if len(_frames) > 2:
+        _frames.popitem(last=False)
+    return _frames[h]
+
+
+def _pack(i: int, kind, row, ev, params: dict) -> dict:
+    if kind == "ok":
+        from backtesting.shared.load import to_ms
+
+        return {"i": i, "kind": kind, "row": {k: v for k, v in row.items() if k not in params},
+                "ev": {"entry_ms": to_ms(ev["entry_time"]).tolist(), "exit_ms": to_ms(ev["exit_time"]).tolist(),
+                       "pnl": ev["pnl"].astype(np.float64).tolist()}}
+    if kind == "pruned":
+        return {"i": i, "kind": kind, "row": {k: v for k, v in row.items() if k not in params}}
+    return {"i": i}
+
+
+def _run_unit(msg: dict, frames: tuple) -> list:
+    from backtesting.shared.optimize import run_combo
+    from backtesting.shared.prune import make_pruner
+
+    spec  = msg["spec"]
+    mod, qual = spec["build"]
+    build = getattr(importlib.import_module(mod), qual)
+    rawdf, sub = frames
+    dkey  = tuple(spec["data"]["dkey"])
+    start, end = pd.to_datetime(spec["start"]), pd.to_datetime(spec["end"])
+    pruner = make_pruner(spec["prune"], spec["eval_params"], spec["sizing"])
+    out = []
+    for i, p in msg["combos"]:
+        kind, row, ev = run_combo(build, rawdf, sub, dkey, p, start, end, spec["eval_params"], spec["intrabar"],
+                                  spec["sizing"], pruner)
+        out.append(_pack(i, kind, row, ev, p))
+    return out
+
+
+def _session(sock: socket.socket, name: str, cache_dir: str) -> None:
+    lock = threading.Lock()
+    send(sock, {"op": "hello", "worker": name}, lock=lock)
+    hb = recv(sock)[0]["heartbeat"]
+    _console.print(f"[dim]worker {name} connected[/dim]")
+    while True:
+        send(sock, {"op": "get"}, lock=lock)
+        msg, _ = recv(sock)
+        if msg["op"] == "wait":
+            time.sleep(msg["delay"])
+            continue
+        uid  = msg["unit"]
+        stop = threading.Event()
+
+        def beat():
+            while not stop.wait(hb):
+                try:
+                    send(sock, {"op": "beat", "unit": uid}, lock=lock)
+                except OSError:
+                    return
+
+        threading.Thread(target=beat, daemon=True).start()
+        t0 = time.perf_counter()
+        try:
+            reply = {"op": "result", "unit": uid,
+                     "outcomes": _run_unit(msg, _candles(sock, lock, msg["spec"]["data"], cache_dir))}
+        except (ConnectionError, OSError):
+            raise
+        except Exception as e:
+            reply = {"op": "error", "unit": uid, "error": f"{type(e).__name__}: {e}"}
+        finally:
+            stop.set()
+        send(sock, reply, lock=lock)
+        recv(sock)
+        _console.print(f"[dim]unit {uid}: {len(msg['combos'])} combos in {time.perf_counter() - t0:.2f}s[/dim]")
+
+
+# --- worker loop: serve units until the coordinator has been unreachable for `retry` seconds ---
+def work(address: str, cache_dir: str = CACHE_DIR, retry: float = 30.0, name: str = None) -> None:
+    name = name or f"{socket.gethostname()}:{os.getpid()}"
+    host, port = _split(address)
+    lost = None
+    while True:
+        try:
+            sock = socket.create_connection((host, port))
+        except OSError:
+            lost = lost or time.monotonic()
+            if time.monotonic() - lost > retry:
+                return
+            time.sleep(0.5)
+            continue
+        lost = None
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            _session(sock, name, cache_dir)
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            sock.close()
+        lost = time.monotonic()
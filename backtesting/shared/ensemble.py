@@ -0,0 +1,166 @@
+import time
+
+import numpy as np
+import pandas as pd
+from rich import box
+from rich.console import Console
+from rich.table import Table
+
+from backtesting.shared import dag, registry
+from backtesting.shared.cache import raw_frame
+from backtesting.shared.sizing import size_bars, size_trades
+from backtesting.shared.trade import evaluate_trades, simulate_trades
+
+_console = Console()
+
+# --- several strategies on one load of the candles, combined into ensemble signals ---
+# The candles are loaded once (cache.raw_frame) and every member's graph runs on that same frame.
+# Graph nodes are cached by op + inputs + params, so indicators the members share (ma_trend(200),
+# vol_ma(20), pct_change, …) are computed once for all of them. Member signals are lined up on the
+# rows where every member is warmed up; there each member's signal equals its standalone one.
+#
+# A member's signal counts for `window` bars after it fires (window=1: that bar only), so event
+# signals (crosses) and state signals (thresholds) can be combined. Crosses fire on one bar, so with
+# window=1 members almost never line up; by default a vote lasts as long as the shortest member
+# trade can stay open (the smallest member max_candles, else the ensemble's own). Rules:
+#   vote      long / short when net votes (longs − shorts) ≥ quorum (default: a majority of members)
+#   weighted  long / short when Σ weight · vote ≥ threshold · Σ weight (default threshold 0.5)
+#   agree     the first member's signals, kept only when no other member votes against them and at
+#             least `quorum` (default 1) vote with them
+# vote / weighted fire when their combined state turns long or short, as a member's entry signal does.
+
+DEFAULT_MEMBERS = ("macrossover", "momentum", "linreg", "mllinreg")
+RULES = ("vote", "weighted", "agree")
+
+
+# --- {member: params} -> one frame: the shared candles on the common rows + signal_<member> columns ---
+def build_members(rawdf: pd.DataFrame, members: dict) -> pd.DataFrame:
+    frames = {}
+    for m, p in members.items():
+        fn = registry.build_df(m)
+        frames[m] = fn(rawdf if getattr(fn, "pure", False) else rawdf.copy(), p)
+    common = rawdf.index
+    for f in frames.values():
+        common = common.intersection(f.index)
+    out = rawdf.loc[common].copy()
+    for m, f in frames.items():
+        out[f"signal_{m}"] = f.loc[common, "signal"].to_numpy()
+    out.attrs = dict(rawdf.attrs)
+    return out
+
+
+# --- T × M member signals -> T × M votes: each signal held for `window` bars ---
+def hold(signals: np.ndarray, window: int = 1) -> np.ndarray:
+    t    = np.arange(len(signals))[:, None]
+    last = np.maximum.accumulate(np.where(signals != 0, t, -1), axis=0)
+    held = np.take_along_axis(signals, np.maximum(last, 0), axis=0)
+    return np.where((last >= 0) & (t - last < max(int(window), 1)), held, 0).astype(np.int64)
+
+
+# --- default hold window: the shortest member holding period ---
+def default_window(members: dict, max_candles: int) -> int:
+    held = [int(p["max_candles"]) for p in members.values() if p.get("max_candles")]
+    return min(held) if held else max(int(max_candles or 1), 1)
+
+
+def _entries(state: np.ndarray) -> np.ndarray:
+    prev = np.concatenate([[0], state[:-1]])
+    return np.where((state != 0) & (state != prev), state, 0)
+
+
+# --- one combined signal column from the member signals ---
+def combine(signals: np.ndarray, rule: str = "vote", weights=None, quorum: float = None, threshold: float = 0.5,
+            window: int = 1) -> np.ndarray:
+    signals = np.asarray(signals, dtype=np.int64)
+    m       = signals.shape[1]
+    votes   = hold(signals, window)
+    if rule == "vote":
+        net = votes.sum(axis=1)
+        q   = m // 2 + 1 if quorum is None else quorum
+        return _entries(np.where(np.abs(net) >= q, np.sign(net), 0))
+    if rule == "weighted":
+        w   = np.ones(m) if weights is None else np.asarray(weights, dtype=np.float64)
+        net = votes @ w
+        return _entries(np.where(np.abs(net) >= threshold * w.sum(), np.sign(net), 0).astype(np.int64))
+    if rule == "agree":
+        lead, others = signals[:, 0], votes[:, 1:]
+        with_  = (others == lead[:, None]).sum(axis=1)
+        against = (others == -lead[:, None]).any(axis=1)
+        return np.where((lead != 0) & ~against & (with_ >= (1 if quorum is None else quorum)), lead, 0)
+    raise ValueError(f"unknown ensemble rule {rule!r}; known: {', '.join(RULES)}")
+
+
+def _metrics(name, trades, eval_params, bars) -> dict:
+    if trades.empty:
+        return {"signal": name, "trades": 0, "win_rate": 0, "total_pnl": 0, "sharpe": 0, "max_drawdown": 0}, None
+    ev = evaluate_trades(trades, **eval_params, bars=bars)
+    return {
+        "signal":       name,
+        "trades":       len(ev),
+        "win_rate":     round(len(ev[ev["pnl"] > 0]) / len(ev) * 100, 1),
+        "total_pnl":    round(ev["pnl"].sum(), 2),
+        "sharpe":       ev.attrs.get("sharpe", 0),
+        "max_drawdown": ev.attrs.get("max_drawdown", 0),
+    }, ev
+
+
+def run_ensemble(
+    symbol: str,
+    interval: str,
+    start: str,
+    end: str,
+    eval_params: dict,
+    asset_type: str,
+    members=DEFAULT_MEMBERS,   # [name, ...] (registry defaults) or {name: params}
+    rules=RULES,               # combination rules to run side by side
+    weights: dict = None,      # {member: weight} for "weighted"; missing members weigh 1
+    quorum: float = None,
+    threshold: float = 0.5,
+    window: int = None,        # bars a member's signal keeps voting (default: default_window)
+    tp_pct: float = 0.05,      # exits of the combined signals; members keep their own
+    sl_pct: float = 0.03,
+    max_candles: int = 192,
+    intrabar: bool = False,
+    sizing: dict = None,
+) -> tuple:
+    members = dict(members) if isinstance(members, dict) else {m: dict(registry.get(m)["defaults"]) for m in members}
+    names   = list(members)
+    window  = default_window(members, max_candles) if window is None else window
+    _console.print(f"[bold]Ensemble[/bold]  ·  {', '.join(names)}  ·  {symbol} {interval}  [{start} → {end}  |  rules: {', '.join(rules)}  |  window: {window}]")
+
+    t0 = time.perf_counter()
+    rawdf, sub, _ = raw_frame(symbol, interval, asset_type, intrabar)
+    t1 = time.perf_counter()
+    before = dag.stats()
+    df = build_members(rawdf, members)
+    after = dag.stats()
+    df = size_bars(df[(df["close_time"] > pd.to_datetime(start)) & (df["close_time"] <= pd.to_datetime(end))], sizing)
+    t2 = time.perf_counter()
+
+    sigs = df[[f"signal_{m}" for m in names]].to_numpy()
+    w    = [float((weights or {}).get(m, 1.0)) for m in names]
+    runs = [(m, df[f"signal_{m}"].to_numpy(), members[m]) for m in names]
+    runs += [(f"ensemble:{r}", combine(sigs, r, weights=w, quorum=quorum, threshold=threshold, window=window),
+              {"tp_pct": tp_pct, "sl_pct": sl_pct, "max_candles": max_candles}) for r in rules]
+
+    rows, trades = [], {}
+    for name, signal, p in runs:
+        sim = df.assign(signal=signal)
+        t   = simulate_trades(sim, tp_pct=p["tp_pct"], sl_pct=p["sl_pct"], max_candles=p["max_candles"],
+                              intrabar=intrabar, sub_bars=sub)
+        row, trades[name] = _metrics(name, size_trades(t, sizing, sim), eval_params, sim)
+        rows.append(row | {"signals": int(np.count_nonzero(signal))})
+    t3 = time.perf_counter()
+
+    out = pd.DataFrame(rows)
+    tbl = Table(box=box.SIMPLE_HEAD, header_style="bold cyan")
+    for c in out.columns:
+        tbl.add_column(c, justify="left" if c == "signal" else "right")
+    for _, r in out.iterrows():
+        style = ("bold " if r["signal"].startswith("ensemble:") else "") + ("green" if r["sharpe"] > 0 else "red")
+        tbl.add_row(*[str(r[c]) for c in out.columns], style=style)
+    _console.print(tbl)
+    shared = (after["hits"] - before["hits"], after["misses"] - before["misses"])
+    _console.print(f"[dim]load {t1 - t0:.2f}s · indicators+signals {t2 - t1:.2f}s ({shared[0]} graph nodes reused, {shared[1]} computed) "
+                   f"· {len(runs)} simulations {t3 - t2:.2f}s[/dim]")
+    return out, trades
@@ -1,13 +1,99 @@
+import io
+import os
+
 import pandas as pd
 
+# --- candle schema as stored under data/org/<asset_type>/<ticker>/<interval>.csv ---
+KLINE_COLUMNS = [
+    "open_time", "open_price", "high_price", "low_price", "close_price", "volume",
+    "close_time", "quote_asset_volume", "number_of_trades",
+    "taker_buy_base_asset_volume", "taker_buy_quote_asset_volume",
+]
+
+INTERVAL_MS = {
+    "1m": 60_000, "3m": 180_000, "5m": 300_000, "15m": 900_000, "30m": 1_800_000,
+    "1h": 3_600_000, "2h": 7_200_000, "4h": 14_400_000, "6h": 21_600_000,
+    "8h": 28_800_000, "12h": 43_200_000, "1d": 86_400_000,
+}
+
+
+# --- request weight of one GET /api/v3/klines call (Binance spot) ---
+def klines_weight(limit: int) -> int:
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    return 5 if limit <= 1000 else 10
+
+
+# --- epoch milliseconds <-> timestamps (numeric columns are treated as ms) ---
+def to_datetime(s: pd.Series) -> pd.Series:
+    if pd.api.types.is_numeric_dtype(s):
+        return pd.to_datetime(s, unit="ms")
+    return pd.to_datetime(s)
+
+
+def to_ms(s: pd.Series) -> pd.Series:
+    return (to_datetime(s) - pd.Timestamp(0)) // pd.Timedelta(milliseconds=1)
+
+
 def load_df(
         ticker: str,
         timeframe: str,
         asset_type: str,
+        derive: bool = False,   # build the interval from the stored 1m candles instead of its own CSV
+        data_root: str = "data/org",
     ) -> pd.DataFrame:
 
-    fpath = f"data/org/{asset_type}/{ticker}/{timeframe}.csv"
-    df = pd.read_csv(fpath, index_col=0)
-
-    df["close_time"] = pd.to_datetime(df["close_time"])
+    fpath = f"{data_root}/{asset_type}/{ticker}/{timeframe}.csv"
+    if timeframe != "1m" and (derive or not os.path.isfile(fpath)):
+        df = _load_derived(ticker, timeframe, asset_type, data_root)
+    else:
+        df = pd.read_csv(fpath, index_col=0)
+        df["open_time"]  = to_datetime(df["open_time"])   # datetime64 either way, as the derived frames have them
+        df["close_time"] = to_datetime(df["close_time"])
+    # where the candles came from; survives slicing/copies and reaches columns (see shared.mtf)
+    df.attrs.update(symbol=ticker, interval=timeframe, asset_type=asset_type)
     return df
+
+
+# --- derived intervals are cached per 1m file and interval. The dataloader only ever appends to the
+# 1m CSV, so when the file has grown past the bytes already read (and those bytes are unchanged),
+# only the new rows are parsed and the buckets they close are appended with update_resampled; the
+# 1m rows after the last closed bucket are kept for that. Any other change rebuilds from scratch. ---
+_derived_cache = {}   # (1m path, interval) -> {"size", "mtime", "mark", "header", "derived", "pending"}
+_MARK_BYTES    = 256
+
+def _load_derived(ticker: str, timeframe: str, asset_type: str, data_root: str = "data/org") -> pd.DataFrame:
+    from backtesting.shared.resample import resample_klines, update_resampled
+
+    path1m = f"{data_root}/{asset_type}/{ticker}/1m.csv"
+    key    = (os.path.abspath(path1m), timeframe)
+    entry  = _derived_cache.get(key)
+    with open(path1m, "rb") as f:   # one file version throughout (appends land via an atomic replace)
+        st   = os.fstat(f.fileno())
+        size = st.st_size
+        if entry and (size, st.st_mtime_ns) == (entry["size"], entry["mtime"]):
+            return entry["derived"].copy()
+        if entry and size > entry["size"] and _mark(f, entry["size"]) == entry["mark"]:
+            f.seek(entry["size"])
+            df1m    = pd.concat([entry["pending"], pd.read_csv(io.BytesIO(entry["header"] + f.read()), index_col=0)])
+            derived = update_resampled(entry["derived"], df1m, timeframe)
+        else:
+            f.seek(0)
+            df1m    = pd.read_csv(io.BytesIO(f.read()), index_col=0)
+            derived = resample_klines(df1m, timeframe)
+        f.seek(0)
+        header = f.readline()
+        mark   = _mark(f, size)
+
+    pending = df1m
+    if not derived.empty:
+        pending = df1m[to_ms(df1m["open_time"]) > to_ms(derived["close_time"]).iloc[-1]]
+    _derived_cache[key] = {"size": size, "mtime": st.st_mtime_ns, "mark": mark, "header": header, "derived": derived, "pending": pending}
+    return derived.copy()
+
+
+def _mark(f, end: int) -> bytes:
+    f.seek(max(0, end - _MARK_BYTES))
+    return f.read(end - max(0, end - _MARK_BYTES))
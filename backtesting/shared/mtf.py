@@ -0,0 +1,101 @@
+import math
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from backtesting.shared.load import INTERVAL_MS, to_ms
+
+# --- higher-timeframe features on a base series without merge_asof ---
+# Each base bar maps to the last higher-timeframe (HTF) bar whose close_time is at or before the
+# base bar's close_time: searchsorted(htf_close, base_close, "right") - 1. An HTF bar is only
+# visible once it has closed, so an HTF feature can never leak its still-forming bar into the
+# base series. The index is built once per (symbol, base interval, HTF interval, data version);
+# HTF indicators are computed once on the HTF series and broadcast by an integer gather.
+#
+# Base frames carry symbol / interval / asset_type in df.attrs (set by load_df), and so do their
+# columns, so strategy nodes that only receive close_time can still find their HTF data.
+
+_MAX_ENTRIES = 16
+_index   = OrderedDict()   # key -> int64 base row -> HTF row (-1: no closed HTF bar yet)
+_feature = OrderedDict()   # key -> np.ndarray over the HTF series
+
+
+def enabled(interval) -> bool:
+    if interval is None or (isinstance(interval, float) and math.isnan(interval)):
+        return False
+    return str(interval).strip().lower() not in ("", "nan", "none")
+
+
+# --- base row -> last closed HTF row ---
+def asof_index(base_close_time, htf_close_time) -> np.ndarray:
+    base = to_ms(pd.Series(base_close_time)).to_numpy(np.int64)
+    htf  = to_ms(pd.Series(htf_close_time)).to_numpy(np.int64)
+    return np.searchsorted(htf, base, side="right") - 1
+
+
+# --- values[idx] with NaN where no HTF bar has closed yet ---
+def gather(values, idx: np.ndarray) -> np.ndarray:
+    values = np.asarray(values, dtype=np.float64)
+    out    = values[np.maximum(idx, 0)] if len(values) else np.full(len(idx), np.nan)
+    out[idx < 0] = np.nan
+    return out
+
+
+def _source(close_time: pd.Series, symbol=None, asset_type=None, base_interval=None):
+    attrs = getattr(close_time, "attrs", {}) or {}
+    symbol, asset_type = symbol or attrs.get("symbol"), asset_type or attrs.get("asset_type")
+    if not symbol or not asset_type:
+        raise ValueError("higher-timeframe features need the frame's symbol and asset_type "
+                         "(df.attrs, set by load_df) or explicit symbol= / asset_type=")
+    return symbol, asset_type, base_interval or attrs.get("interval")
+
+
+def _lru_put(cache: OrderedDict, key, value):
+    cache[key] = value
+    if len(cache) > _MAX_ENTRIES:
+        cache.popitem(last=False)
+    return value
+
+
+# --- fn(*htf columns, **kw) on the HTF candles of the base frame's symbol, aligned to the base bars ---
+# fn must be a module-level function (it is part of the cache key) returning one value per HTF bar.
+def htf_feature(close_time: pd.Series, interval: str, fn, cols=("close_price",), symbol=None, asset_type=None,
+                base_interval=None, **kw) -> np.ndarray:
+    from backtesting.shared.cache import raw_frame
+
+    if interval not in INTERVAL_MS:
+        raise ValueError(f"unknown higher timeframe {interval!r}; known: {', '.join(INTERVAL_MS)}")
+    symbol, asset_type, base_interval = _source(close_time, symbol, asset_type, base_interval)
+    if base_interval in INTERVAL_MS and INTERVAL_MS[interval] <= INTERVAL_MS[base_interval]:
+        raise ValueError(f"higher timeframe {interval} must be longer than the base interval {base_interval}")
+
+    htf, _, dkey = raw_frame(symbol, interval, asset_type)
+    base = pd.Series(close_time)
+    ikey = (dkey, base_interval, len(base), str(base.iloc[0]) if len(base) else None, str(base.iloc[-1]) if len(base) else None)
+    if ikey in _index:
+        _index.move_to_end(ikey)
+        idx = _index[ikey]
+    else:
+        idx = _lru_put(_index, ikey, asof_index(base, htf["close_time"]))
+
+    fkey = (dkey, fn.__module__, fn.__qualname__, tuple(cols), tuple(sorted(kw.items())))
+    if fkey in _feature:
+        _feature.move_to_end(fkey)
+        values = _feature[fkey]
+    else:
+        values = _lru_put(_feature, fkey, np.asarray(fn(*(htf[c] for c in cols), **kw), dtype=np.float64))
+    return gather(values, idx)
+
+
+def clear() -> None:
+    _index.clear()
+    _feature.clear()
+
+
+# --- HTF ops ---
+
+# +1 / -1 / 0: HTF close above / below its MA(window); NaN until the MA exists
+def trend_bias(close: pd.Series, window: int = 50) -> np.ndarray:
+    ma = close.rolling(window).mean()
+    return np.sign(close - ma).to_numpy(np.float64)
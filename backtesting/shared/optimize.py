@@ -8,12 +8,48 @@ from rich.progress import BarColumn, MofNCompleteColumn, Progress, SpinnerColumn
 from rich.table import Table
 from rich import box
 
-from backtesting.shared.load import load_df
+from backtesting.shared import report, robust, stats, tracking
+from backtesting.shared.cache import METRIC_COLS, build_cached, raw_frame
+from backtesting.shared.prune import Pruned, make_pruner, trials as prune_trials
+from backtesting.shared.sizing import SizingError, describe, size_bars, size_trades
+from backtesting.shared.store import grid_records, record_results
 from backtesting.shared.trade import simulate_trades, evaluate_trades
 
 _console = Console()
 
 
+# --- one combo on the train window -> ("ok", result row, trades) | ("pruned", pruned row, None) | (None, None, None) ---
+# The unit of work of the local loop and of shared.distributed workers alike.
+def run_combo(build_df, rawdf, sub, dkey, p, start, end, eval_params, intrabar=False, sizing=None, pruner=None):
+    df = None
+    try:
+        df     = build_cached(build_df, rawdf, p, dkey)   # combos differing only in tp/sl/max_candles share one build
+        df     = size_bars(df[(df["close_time"] > start) & (df["close_time"] <= end)], sizing)
+        trades = simulate_trades(df, tp_pct=p["tp_pct"], sl_pct=p["sl_pct"], max_candles=p["max_candles"],
+                                 intrabar=intrabar, sub_bars=sub, prune=pruner)
+        trades = size_trades(trades, sizing, df)
+        if trades.empty:
+            return None, None, None
+        ev = evaluate_trades(trades, **eval_params, bars=df)
+        return "ok", {
+            **p,
+            "trades":       len(ev),
+            "win_rate":     round(len(ev[ev["pnl"] > 0]) / len(ev) * 100, 1),
+            "total_pnl":    round(ev["pnl"].sum(), 2),
+            "final_portf":  ev.attrs.get("final_portfolio", 0),
+            "sharpe":       ev.attrs.get("sharpe", 0),
+            "max_drawdown": ev.attrs.get("max_drawdown", 0),
+            "avg_candles":  round(ev["candles"].mean(), 1),
+        }, ev
+    except Pruned as e:
+        return "pruned", {**p, "reason": e.reason, "trades": e.trades, "max_trades": e.max_trades, "drawdown": e.drawdown,
+                          "at": str(df["close_time"].iloc[e.bar]) if df is not None and len(df) else None}, None
+    except SizingError:
+        raise
+    except Exception:
+        return None, None, None
+
+
 def run_grid_search(
     strategy_name: str,
     runs_base: str,
@@ -28,6 +64,10 @@ def run_grid_search(
     is_valid,           # (params) -> bool
     readme_cols: list,
     format_combo=None,  # (params) -> str  — key params for the per-combo progress line
+    intrabar: bool = False,  # tp/sl against high/low, ties resolved on 1m candles
+    sizing: dict = None,     # shared.sizing config; None → fixed trade_size_pct
+    prune: dict = None,      # shared.prune config ({} → run_validation's criteria); None → simulate every combo in full
+    workers: dict = None,    # shared.distributed config ({"address": "host:port", "local": n, ...}); None → this process
 ) -> str:
     START = pd.to_datetime(train_start)
     END   = pd.to_datetime(train_end)
@@ -38,8 +78,12 @@ def run_grid_search(
 
     _console.print(f"[bold]Grid Search[/bold]  ·  {strategy_name}  ·  {symbol} {interval}  [{train_start} → {train_end}  |  {len(combos)} combos]")
 
-    rawdf   = load_df(ticker=symbol, timeframe=interval, asset_type=asset_type)
+    rawdf, sub, dkey = raw_frame(symbol, interval, asset_type, intrabar)
+    pruner  = make_pruner(prune, eval_params, sizing)
+    pruned  = []     # combos abandoned early, with why (pruned.csv)
     results = []
+    evs     = []     # per-result trades, for returns.npz
+    best_ev = None   # trades of the best-Sharpe combo, for the report's equity curve
 
     progress = Progress(
         SpinnerColumn(),
@@ -52,35 +96,43 @@ def run_grid_search(
         transient=False,
     )
 
+    dist     = None
+    outcomes = None
     with progress:
         task = progress.add_task("Running combos", total=len(combos), status="")
+        if workers is not None:
+            # the same outcomes, computed by shared.distributed workers and returned in combo order
+            from backtesting.shared import distributed
+
+            progress.update(task, description=f"distributed · {len(combos)} combos")
+            outcomes, dist = distributed.run_combos(
+                workers, build_df, combos, (symbol, interval, asset_type, intrabar), (rawdf, sub, dkey),
+                dict(start=train_start, end=train_end, eval_params=eval_params, intrabar=intrabar, sizing=sizing, prune=prune),
+                on_done=lambda n, status: progress.update(task, advance=n, status=status))
+        best = None
         for i, p in enumerate(combos):
-            desc = format_combo(p) if format_combo else f"combo {i+1}"
-            progress.update(task, description=desc)
-            try:
-                df     = build_df(rawdf.copy(), p)
-                df     = df[(df["close_time"] > START) & (df["close_time"] <= END)]
-                trades = simulate_trades(df, tp_pct=p["tp_pct"], sl_pct=p["sl_pct"], max_candles=p["max_candles"])
-                if trades.empty:
-                    progress.advance(task)
-                    continue
-                ev = evaluate_trades(trades, **eval_params)
-                results.append({
-                    **p,
-                    "trades":       len(ev),
-                    "win_rate":     round(len(ev[ev["pnl"] > 0]) / len(ev) * 100, 1),
-                    "total_pnl":    round(ev["pnl"].sum(), 2),
-                    "final_portf":  ev.attrs.get("final_portfolio", 0),
-                    "sharpe":       ev.attrs.get("sharpe", 0),
-                    "max_drawdown": ev.attrs.get("max_drawdown", 0),
-                    "avg_candles":  round(ev["candles"].mean(), 1),
-                })
-                r = results[-1]
-                sharpe_style = "green" if r["sharpe"] > 0 else "red"
-                progress.update(task, status=f"[{sharpe_style}]sharpe={r['sharpe']:+.2f}[/{sharpe_style}]  wr={r['win_rate']}%  n={r['trades']}")
-            except Exception:
-                pass
-            progress.advance(task)
+            if outcomes is None:
+                progress.update(task, description=format_combo(p) if format_combo else f"combo {i+1}")
+                kind, row, ev = run_combo(build_df, rawdf, sub, dkey, p, START, END, eval_params, intrabar, sizing, pruner)
+            else:
+                kind, row, ev = outcomes[i]
+            if kind == "ok":
+                results.append(row)
+                evs.append(ev[["entry_time", "exit_time", "pnl"]])
+                if best is None or row["sharpe"] > best["sharpe"]:
+                    best, best_i, best_ev = row, i, ev
+                sharpe_style = "green" if row["sharpe"] > 0 else "red"
+                status = f"[{sharpe_style}]sharpe={row['sharpe']:+.2f}[/{sharpe_style}]  wr={row['win_rate']}%  n={row['trades']}"
+            elif kind == "pruned":
+                pruned.append(row)
+                status = f"[dim]pruned: {row['reason']}[/dim]"
+            if outcomes is None:
+                if kind is not None:
+                    progress.update(task, status=status)
+                progress.advance(task)
+    if outcomes is not None and best is not None:
+        # workers send back trade returns only; the best combo's full trade list is replayed here
+        best_ev = run_combo(build_df, rawdf, sub, dkey, combos[best_i], START, END, eval_params, intrabar, sizing, pruner)[2]
 
     os.makedirs(runs_base, exist_ok=True)
     prefix   = f"{datetime.now().strftime('%Y%m%d')}_{symbol}_{interval}_"
@@ -88,21 +140,38 @@ def run_grid_search(
     run_dir  = f"{runs_base}/{prefix}{len(existing) + 1:02d}"
     os.makedirs(run_dir)
 
-    df_results = pd.DataFrame(results).sort_values("sharpe", ascending=False)
+    # no rows (every combo pruned or never traded) still gets a header, so validation can read it
+    df_results = pd.DataFrame(results) if results else pd.DataFrame(columns=keys + list(METRIC_COLS))
+    df_results = df_results.sort_values("sharpe", ascending=False) if len(df_results) else df_results
+    summary    = None
+    if not df_results.empty:
+        # trade returns of every combo tried → PSR / DSR against the whole grid's selection bias;
+        # pruned combos count as trials without returns (see shared.prune)
+        stats.save_returns(run_dir, [evs[i] for i in df_results.index], eval_params.get("init_portfolio", 1_000),
+                           train_start, train_end)
+        per_combo, summary = stats.deflate(stats.load_returns(run_dir), pruned_trials=prune_trials(pruned))
+        df_results = df_results.reset_index(drop=True)
+        df_results[["psr", "dsr"]] = per_combo[["psr", "dsr"]]
     df_results.to_csv(f"{run_dir}/grid_search.csv", index=False)
-
-    top10 = df_results.head(10)
-    valid_cols = [c for c in readme_cols if c in df_results.columns]
-    md = (
-        f"# Grid Search — {strategy_name}\n\n"
-        f"**Symbol:** {symbol} / {interval} | **Train:** {train_start} → {train_end}\n\n"
-        f"| Param | Values |\n|---|---|\n"
-        + "\n".join(f"| {k} | {v} |" for k, v in grid.items())
-        + f"\n\n**Combos:** {len(combos)} | **Results:** {len(df_results)}\n\n"
-        f"## Top 10 by Sharpe\n\n{top10[valid_cols].to_markdown(index=False)}\n"
-    )
-    with open(f"{run_dir}/README.md", "w") as f:
-        f.write(md)
+    if pruned:
+        pd.DataFrame(pruned).to_csv(f"{run_dir}/pruned.csv", index=False)
+    if best_ev is not None:
+        best_ev.to_csv(f"{run_dir}/best_trades.csv", index=False)
+    record_results(run_dir, "grid", grid_records(df_results, symbol, train_start, train_end),
+                   strategy_name=strategy_name, train_start=train_start, train_end=train_end)
+    meta = {
+        "strategy_name": strategy_name, "symbol": symbol, "interval": interval, "asset_type": asset_type,
+        "train_start": train_start, "train_end": train_end, "grid": grid, "combos": len(combos),
+        "readme_cols": readme_cols, "eval_params": eval_params, "intrabar": intrabar, "sizing": describe(sizing),
+        "prune": None if pruner is None else {"max_dd": pruner.max_dd, "min_trades": pruner.min_trades, "chunk": pruner.chunk},
+        "pruned": len(pruned), "distributed": dist,
+    }
+    report.write_meta(run_dir, "grid", meta)
+    if summary is not None:
+        report.write_meta(run_dir, "stats", summary)
+        robust.analyze(run_dir)   # robust.csv: neighbourhood scores over the parameter lattice
+    tracking.log_grid(run_dir, df_results, meta, summary)   # MLflow, on a background thread
+    report.submit(run_dir)   # README.md / report.html / plots, off the compute path
 
     # ── top results table ─────────────────────────────────────────────────────
     top = df_results.head(10)
@@ -115,5 +184,11 @@ def run_grid_search(
         style = "green" if sharpe_val > 0 else "red"
         tbl.add_row(*[f"{row[c]}" for c in display_cols], style=style)
     _console.print(tbl)
+    if summary is not None:
+        _console.print(f"[dim]Selection bias: {stats.describe(summary)}[/dim]")
+    if dist is not None:
+        _console.print(f"[dim]Distributed: {distributed.describe(dist)}[/dim]")
+    if pruner is not None:
+        _console.print(f"[dim]Pruned early: {len(pruned)}/{len(combos)} combos" + (" → pruned.csv" if pruned else "") + "[/dim]")
     _console.print(f"[dim]Grid search: {len(df_results)} results → {run_dir}[/dim]")
     return run_dir
@@ -0,0 +1,233 @@
+import heapq
+
+import numpy as np
+import pandas as pd
+from rich import box
+from rich.console import Console
+from rich.table import Table
+
+from backtesting.shared.load import load_df
+from backtesting.shared.sizing import size_bars
+from backtesting.shared.trade import _find_exit
+
+_console = Console()
+
+
+# --- align per-symbol frames on open_time: (times, {col: T×S matrix}, {symbol: row -> time index}) ---
+# The event loop walks each symbol's own arrays through `rows`; only the mark-to-market equity
+# curve needs a matrix (close_price).
+def align_symbols(frames: dict, cols=("close_price",)):
+    symbols = list(frames)
+    times   = pd.Index(sorted(set().union(*(set(pd.to_datetime(f["open_time"])) for f in frames.values()))))
+    rows    = {s: times.get_indexer(pd.to_datetime(frames[s]["open_time"])) for s in symbols}
+    mats    = {}
+    for c in cols:
+        m = np.full((len(times), len(symbols)), np.nan)
+        for k, s in enumerate(symbols):
+            m[rows[s], k] = frames[s][c].to_numpy(np.float64)
+        mats[c] = m
+    return times, mats, rows
+
+
+# --- shared-capital simulation over all symbols ---
+# Exits follow simulate_trades exactly (they do not depend on capital), so each accepted entry is
+# resolved with one per-trade scan of its symbol's column and the engine only walks an event heap
+# of entries/exits in time order — cost grows with the number of trades, not bars × symbols.
+# An entry is taken only if its margin fits in free cash, total open notional stays within
+# max_exposure × balance and fewer than max_positions are open; otherwise the symbol waits for
+# its next signal. At equal times exits are settled before entries.
+# Frames with a `size` column (shared.sizing) size each entry at size × balance instead of
+# trade_size_pct × leverage × balance.
+# With a cost_model (shared.costs) each exit is charged that trade's fees, spread, slippage and
+# funding (itemised in cost_* columns, spread / slippage from its symbol's frame) instead of the
+# flat fee_pct per side; the amount depends on the trade's notional, so it is priced as it settles.
+def simulate_portfolio(
+    frames: dict,               # {symbol: df with open_time, close_price, signal} (already windowed)
+    tp_pct: float = None,
+    sl_pct: float = None,
+    max_candles: int = None,
+    init_portfolio=1_000,
+    trade_size_pct=0.1,
+    fee_pct=0.0005,
+    leverage=10,
+    max_exposure: float = 3.0,  # cap on open notional as a multiple of balance
+    max_positions: int = None,
+    compound: bool = False,     # size from current balance instead of init_portfolio
+    cost_model: dict = None,    # shared.costs model; None → notional × fee_pct per side
+):
+    symbols = list(frames)
+    times, mats, rows = align_symbols(frames)
+    sig   = {s: frames[s]["signal"].to_numpy() for s in symbols}
+    close = {s: frames[s]["close_price"].to_numpy(np.float64) for s in symbols}
+    nz    = {s: np.flatnonzero(sig[s] != 0) for s in symbols}
+    size  = {s: frames[s]["size"].to_numpy(np.float64) for s in symbols if "size" in frames[s].columns}
+
+    cash, open_notional, n_open = float(init_portfolio), 0.0, 0
+    positions, trades, rejected, max_open = {}, [], 0, 0
+    events = []   # (time index, 0=exit / 1=entry, symbol index, local bar)
+
+    def push_next_entry(k, after):
+        s = symbols[k]
+        nxt = np.searchsorted(nz[s], after, side="right")
+        if nxt < len(nz[s]):
+            i = nz[s][nxt]
+            heapq.heappush(events, (rows[s][i], 1, k, i))
+
+    for k in range(len(symbols)):
+        push_next_entry(k, -1)
+
+    while events:
+        t, kind, k, i = heapq.heappop(events)
+        s = symbols[k]
+        if kind == 1:
+            position = sig[s][i]
+            balance  = cash + sum(p["margin"] for p in positions.values())
+            exposure = size[s][i] if s in size and not np.isnan(size[s][i]) else trade_size_pct * leverage
+            notional = (balance if compound else init_portfolio) * exposure
+            margin   = notional / leverage
+            if margin > cash or open_notional + notional > max_exposure * balance \
+                    or (max_positions is not None and n_open >= max_positions):
+                rejected += 1
+                push_next_entry(k, i)
+                continue
+            cash -= margin
+            open_notional += notional
+            n_open += 1
+            max_open = max(max_open, n_open)
+            j, reason, price = _find_exit(i, position, close[s][i], sig[s], close[s], tp_pct, sl_pct, max_candles, None)
+            if j is None:
+                j, reason, price = len(close[s]) - 1, "end", close[s][-1]
+            positions[s] = {"entry": i, "signal": position, "entry_price": close[s][i], "notional": notional,
+                            "margin": margin, "exit": j, "exit_price": price, "reason": reason}
+            heapq.heappush(events, (rows[s][j], 0, k, j))
+        else:
+            p = positions.pop(s)
+            ret = p["signal"] * (p["exit_price"] - p["entry_price"]) / p["entry_price"]
+            if cost_model is None:
+                costs = {}
+                pnl   = ret * p["notional"] - p["notional"] * fee_pct * 2
+            else:
+                costs = _costs(p, frames[s], times[rows[s][p["entry"]]], times[t], cost_model, fee_pct, leverage)
+                pnl   = ret * p["notional"] - sum(costs.values())
+            cash += p["margin"] + pnl
+            open_notional -= p["notional"]
+            n_open -= 1
+            trades.append({
+                "symbol":      s,
+                "entry_time":  times[rows[s][p["entry"]]],
+                "exit_time":   times[t],
+                "entry_price": p["entry_price"],
+                "exit_price":  p["exit_price"],
+                "signal":      p["signal"],
+                "candles":     p["exit"] - p["entry"],
+                "exit_reason": p["reason"],
+                "notional":    p["notional"],
+                "margin":      p["margin"],
+                "return":      ret,
+                "pnl":         pnl,
+                **{f"cost_{c}": v for c, v in costs.items()},
+                "_entry_t":    rows[s][p["entry"]],
+                "_exit_t":     t,
+            })
+            if p["reason"] == "signal":
+                heapq.heappush(events, (t, 1, k, i))
+            else:
+                push_next_entry(k, i)
+
+    t = pd.DataFrame(trades)
+    equity = _equity_curve(t, times, mats["close_price"], symbols, init_portfolio)
+    if t.empty:
+        return t, equity
+
+    t = t.sort_values(["exit_time", "symbol"]).reset_index(drop=True)
+    t["portfolio"] = init_portfolio + t["pnl"].cumsum()
+    if t["pnl"].std() > 0:
+        t.attrs["sharpe"] = round(t["pnl"].mean() / t["pnl"].std() * np.sqrt(len(t)), 2)
+    else:
+        t.attrs["sharpe"] = 0.0
+    running_max = equity["equity"].cummax()
+    t.attrs["max_drawdown"]    = round(((equity["equity"] - running_max) / running_max).min() * 100, 2)
+    t.attrs["final_portfolio"] = round(t["portfolio"].iloc[-1], 2)
+    t.attrs["max_positions"]   = max_open
+    t.attrs["rejected"]        = rejected
+    return t.drop(columns=["_entry_t", "_exit_t"]), equity
+
+
+# --- one settled position's shared.costs items in currency: {fee, spread, slippage, funding} ---
+def _costs(p: dict, bars: pd.DataFrame, entry_time, exit_time, cost_model: dict, fee_pct: float, leverage) -> dict:
+    from backtesting.shared.costs import trade_costs
+
+    trade = pd.DataFrame({"entry_time": [entry_time], "exit_time": [exit_time], "exit_reason": [p["reason"]],
+                          "signal": [p["signal"]]})
+    return {k: float(v[0]) for k, v in trade_costs(trade, p["notional"], cost_model, bars, fee_pct=fee_pct,
+                                                      leverage=leverage).items()}
+
+
+# --- mark-to-market equity, open positions and locked margin on the aligned time axis ---
+def _equity_curve(trades: pd.DataFrame, times, close, symbols, init_portfolio) -> pd.DataFrame:
+    close    = pd.DataFrame(close).ffill().to_numpy()
+    realised = np.zeros(len(times))
+    unreal   = np.zeros(len(times))
+    opened   = np.zeros(len(times) + 1)
+    margin   = np.zeros(len(times) + 1)
+    if not trades.empty:
+        np.add.at(opened, trades["_entry_t"].to_numpy(), 1)
+        np.add.at(opened, trades["_exit_t"].to_numpy(), -1)
+        np.add.at(margin, trades["_entry_t"].to_numpy(), trades["margin"].to_numpy())
+        np.add.at(margin, trades["_exit_t"].to_numpy(), -trades["margin"].to_numpy())
+        col = {s: k for k, s in enumerate(symbols)}
+        for s, a, b, side, entry, notional, pnl in zip(trades["symbol"], trades["_entry_t"], trades["_exit_t"],
+                                                        trades["signal"], trades["entry_price"], trades["notional"], trades["pnl"]):
+            unreal[a:b] += side * (close[a:b, col[s]] - entry) / entry * notional
+            realised[b] += pnl
+    return pd.DataFrame({
+        "open_time":      times,
+        "equity":         init_portfolio + np.cumsum(realised) + unreal,
+        "open_positions": np.cumsum(opened)[:-1].astype(int),
+        "margin":         np.cumsum(margin)[:-1],
+    })
+
+
+def run_portfolio(
+    strategy_name: str,
+    symbols: dict,              # {asset_type: [symbol, ...]} as in run_dataloader.SYMBOLS
+    interval: str,
+    start: str,
+    end: str,
+    params: dict,               # strategy params + tp_pct / sl_pct / max_candles
+    eval_params: dict,
+    build_df,                   # (rawdf_copy, params) -> df with indicators + signals
+    max_exposure: float = 3.0,
+    max_positions: int = None,
+    sizing: dict = None,        # shared.sizing bar-level method ("kelly" / "vol"); None → fixed size
+):
+    START = pd.to_datetime(start)
+    END   = pd.to_datetime(end)
+    flat  = [(a, s) for a, syms in symbols.items() for s in syms]
+    _console.print(f"[bold]Portfolio[/bold]  ·  {strategy_name}  ·  {len(flat)} symbols {interval}  [{start} → {end}]")
+
+    frames = {}
+    for asset_type, symbol in flat:
+        df = build_df(load_df(ticker=symbol, timeframe=interval, asset_type=asset_type), params)
+        frames[symbol] = size_bars(df[(df["close_time"] > START) & (df["close_time"] <= END)], sizing)
+
+    trades, equity = simulate_portfolio(
+        frames, tp_pct=params.get("tp_pct"), sl_pct=params.get("sl_pct"),
+        max_candles=int(params["max_candles"]) if params.get("max_candles") is not None else None,
+        max_exposure=max_exposure, max_positions=max_positions, **eval_params,
+    )
+    if trades.empty:
+        _console.print("[dim]No trades fired.[/dim]")
+        return trades, equity
+
+    tbl = Table(title="Per symbol", box=box.SIMPLE_HEAD, header_style="bold cyan")
+    for c in ["symbol", "trades", "win_rate", "total_pnl"]:
+        tbl.add_column(c, justify="right")
+    for s, g in trades.groupby("symbol"):
+        style = "green" if g["pnl"].sum() > 0 else "red"
+        tbl.add_row(s, str(len(g)), f"{(g['pnl'] > 0).mean() * 100:.1f}", f"{g['pnl'].sum():+.2f}", style=style)
+    _console.print(tbl)
+    _console.print(f"sharpe={trades.attrs['sharpe']}  max_dd={trades.attrs['max_drawdown']}%  "
+                   f"final=${trades.attrs['final_portfolio']}  max_open={trades.attrs['max_positions']}  "
+                   f"rejected={trades.attrs['rejected']}")
+    return trades, equity
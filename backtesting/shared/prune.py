@@ -0,0 +1,88 @@
+import numpy as np
+
+# --- early abort of grid combos that cannot pass run_validation's bar ---
+# Both rules are exact bounds, so a pruned combo would have failed anyway and every combo that
+# survives gets the same trades and metrics as in an unpruned run:
+#
+#   min_trades  every trade opens on its own signal bar, so trades so far + signal bars still ahead
+#               caps the final count. Checked from the signal array before simulating, then again
+#               at every check point.
+#   max_dd      evaluate_trades' max drawdown is a running minimum over the trade sequence; once the
+#               partial equity curve (same notional / fee arithmetic, same rounding) is at or past
+#               max_dd %, the full one is too. Off when sizing is applied after simulation
+#               (trade-level methods) or a cost model prices the trades (shared.costs), since the
+#               flat-fee curve no longer bounds the real one.
+#
+# simulate_trades calls check() every `chunk` trades. Nothing depends on timing, so the same grid
+# always prunes the same combos at the same trade.
+#
+# What is exact is each survivor's own row. The grid-level statistics built over all rows cannot
+# see the pruned combos' returns: stats.deflate counts them as trials (pruned_trials) and
+# robust.score places the max_dd ones on the lattice as known-bad points (pruned.csv), so DSR and
+# robust ranks approximate, rather than equal, those of an unpruned run.
+
+DEFAULTS = {"max_dd": 20.0, "min_trades": 5, "chunk": 16}   # run_validation: |dd| < 20%, ≥ 5 trades
+
+
+class Pruned(Exception):
+    def __init__(self, reason: str, bar: int, trades: int, max_trades: int = None, drawdown: float = None):
+        super().__init__(reason)
+        self.reason, self.bar, self.trades = reason, bar, trades
+        self.max_trades = max_trades   # min_trades: the bound on the final count
+        self.drawdown   = drawdown     # max_dd: drawdown % so far (the full run's is at or below it)
+
+
+class Pruner:
+    def __init__(self, eval_params: dict, max_dd: float = 20.0, min_trades: int = 5, chunk: int = 16,
+                 sized_later: bool = False):
+        self.init     = eval_params.get("init_portfolio", 1_000)
+        self.fixed    = eval_params.get("trade_size_pct", 0.1) * eval_params.get("leverage", 10)
+        self.fee      = eval_params.get("fee_pct", 0.0005)
+        self.max_dd   = None if sized_later or not max_dd or eval_params.get("cost_model") is not None else float(max_dd)
+        self.min_trades = int(min_trades or 0)
+        self.chunk    = max(int(chunk), 1)
+
+    # --- before simulating: reset, and prune if the signal bars cannot reach min_trades ---
+    def start(self, entries: np.ndarray) -> None:
+        self.entries = entries
+        self.done, self.cum, self.peak, self.worst = 0, 0.0, -np.inf, 0.0
+        if len(entries) < self.min_trades:
+            raise Pruned(f"min_trades: at most {len(entries)} possible", 0, 0, max_trades=len(entries))
+
+    # --- after the trade exiting at bar j: running drawdown and the trade-count bound ---
+    def check(self, trades: list, j: int) -> None:
+        if self.max_dd is not None:
+            new = trades[self.done:]
+            self.done = len(trades)
+            sig   = np.array([t["signal"] for t in new], dtype=np.float64)
+            entry = np.array([t["entry_price"] for t in new], dtype=np.float64)
+            exit_ = np.array([t["exit_price"] for t in new], dtype=np.float64)
+            size  = np.array([t.get("size", np.nan) for t in new], dtype=np.float64)
+            notional = self.init * np.where(np.isnan(size), self.fixed, size) if "size" in new[0] else self.init * self.fixed
+            pnl   = sig * (exit_ - entry) / entry * notional - notional * self.fee * 2
+            cum   = np.cumsum(np.concatenate([[self.cum], pnl]))[1:]   # sequential, as pandas cumsum
+            port  = self.init + cum
+            peak  = np.maximum.accumulate(np.maximum(port, self.peak))
+            self.cum, self.peak = cum[-1], peak[-1]
+            self.worst = min(self.worst, float(((port - peak) / peak).min()))
+            if round(self.worst * 100, 2) <= -self.max_dd:
+                dd = round(self.worst * 100, 2)
+                raise Pruned(f"max_dd: {dd}% after {len(trades)} trades", j, len(trades), drawdown=dd)
+        ahead = len(self.entries) - int(np.searchsorted(self.entries, j))   # signal bars ≥ j can still open a trade
+        if len(trades) + ahead < self.min_trades:
+            raise Pruned(f"min_trades: at most {len(trades) + ahead} possible", j, len(trades), max_trades=len(trades) + ahead)
+
+
+# --- pruned.csv rows that would have been DSR trials (≥ min_trades trades in the full run, or unknown) ---
+def trials(pruned: list, min_trades: int = 5) -> int:
+    return sum(1 for r in pruned if r.get("max_trades") is None or r["max_trades"] >= min_trades)
+
+
+# --- --prune / run_grid_search(prune=...) config -> Pruner, or None when pruning is off ---
+def make_pruner(prune, eval_params: dict, sizing: dict = None):
+    if prune is None or prune is False:
+        return None
+    from backtesting.shared.sizing import TRADE_METHODS
+
+    cfg = DEFAULTS | (prune if isinstance(prune, dict) else {})
+    return Pruner(eval_params, sized_later=(sizing or {}).get("method") in TRADE_METHODS, **cfg)
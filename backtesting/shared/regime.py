@@ -0,0 +1,195 @@
+import math
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# --- market regimes from a Gaussian HMM: fitted offline, filtered forward bar by bar ---
+# Features per bar, from the last `window` log returns (no look-ahead):
+#   trend  mean / std · √window — a drift t-stat: large |trend| trending, near 0 ranging
+#   vol    log of the return std
+# fit() runs Baum–Welch (EM) for a K-state HMM with diagonal-covariance Gaussian emissions on the
+# first `fit_bars` complete rows; states are then ordered by volatility, state 0 the calmest.
+# Probabilities are the forward filter P(state_t | x_1..x_t): one O(K²) step per bar, so bar t
+# never sees later bars. Over a whole backtest the emission densities are computed as one T × K
+# array and only the K × K recursion loops; RegimeFilter runs the same step on live candles.
+#
+# fit_bars counts from the start of the series the node receives — the full data file (cache.
+# raw_frame), i.e. mostly history before the backtest windows. Bars inside the fit span are
+# filtered with parameters fitted on that span; start backtests after it for a strictly
+# out-of-sample regime column. Fits and filtered probabilities are cached per close series.
+
+_MAX_ENTRIES = 8
+_fits = OrderedDict()   # (close fingerprint, states, window, fit_bars) -> (model, T × K probabilities)
+
+_VAR_FLOOR = 1e-4       # relative to each feature's overall variance
+
+
+# --- T × 2 [trend, vol] per bar; NaN until `window` returns exist ---
+def features(close, window: int = 20) -> np.ndarray:
+    r = np.log(pd.Series(np.asarray(close, dtype=np.float64))).diff()
+    m = r.rolling(window).mean()
+    s = r.rolling(window).std()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        trend = (m / s * math.sqrt(window)).to_numpy()
+        vol   = np.log(s).to_numpy()
+    bad = ~np.isfinite(trend) | ~np.isfinite(vol)
+    x = np.column_stack([trend, vol])
+    x[bad] = np.nan
+    return x
+
+
+# --- T × K log N(x_t | mu_k, diag var_k) ---
+def _loglik(x: np.ndarray, model: dict) -> np.ndarray:
+    d = x[:, None, :] - model["mu"][None]
+    return -0.5 * (np.log(2 * math.pi * model["var"])[None] + d * d / model["var"][None]).sum(axis=2)
+
+
+# --- scaled forward pass; rows of b are emission likelihoods up to a per-row factor ---
+def _forward(b: np.ndarray, pi: np.ndarray, a: np.ndarray) -> tuple:
+    alpha, c = np.empty_like(b), np.empty(len(b))
+    p = pi * b[0]
+    c[0] = p.sum()
+    alpha[0] = p / c[0]
+    for t in range(1, len(b)):
+        p = (alpha[t - 1] @ a) * b[t]
+        c[t] = p.sum()
+        alpha[t] = p / c[t]
+    return alpha, c
+
+
+def _backward(b: np.ndarray, c: np.ndarray, a: np.ndarray) -> np.ndarray:
+    beta = np.ones_like(b)
+    for t in range(len(b) - 2, -1, -1):
+        beta[t] = a @ (b[t + 1] * beta[t + 1]) / c[t + 1]
+    return beta
+
+
+def _init(x: np.ndarray, k: int) -> dict:
+    order  = np.argsort(x[:, 1], kind="stable")   # k volatility quantile groups
+    groups = np.array_split(order, k)
+    mu     = np.array([x[g].mean(axis=0) for g in groups])
+    var    = np.array([x[g].var(axis=0) for g in groups]) + _VAR_FLOOR * x.var(axis=0)
+    a      = np.full((k, k), 0.1 / (k - 1)) if k > 1 else np.ones((1, 1))
+    np.fill_diagonal(a, 0.9 if k > 1 else 1.0)
+    return {"pi": np.full(k, 1.0 / k), "a": a, "mu": mu, "var": var}
+
+
+# --- states sorted by mean vol feature: state 0 calmest ---
+def _ordered(model: dict) -> dict:
+    o = np.argsort(model["mu"][:, 1], kind="stable")
+    return dict(model, pi=model["pi"][o], a=model["a"][np.ix_(o, o)], mu=model["mu"][o], var=model["var"][o])
+
+
+# --- Baum–Welch on the complete rows of x -> {pi, a, mu, var, loglik, iters} ---
+def fit(x: np.ndarray, states: int = 3, n_iter: int = 50, tol: float = 1e-4) -> dict:
+    x = x[~np.isnan(x).any(axis=1)]
+    if len(x) < 10 * states:
+        raise ValueError(f"regime fit: {len(x)} complete bars is too few for {states} states")
+    model = _init(x, states)
+    floor = _VAR_FLOOR * x.var(axis=0)
+    prev  = -np.inf
+    for it in range(1, n_iter + 1):
+        ll  = _loglik(x, model)
+        top = ll.max(axis=1, keepdims=True)
+        b   = np.exp(ll - top)
+        alpha, c = _forward(b, model["pi"], model["a"])
+        beta     = _backward(b, c, model["a"])
+        loglik   = float(np.log(c).sum() + top.sum())
+
+        gamma = alpha * beta
+        gamma /= gamma.sum(axis=1, keepdims=True)
+        xi    = model["a"] * (alpha[:-1].T @ (b[1:] * beta[1:] / c[1:, None]))
+        w     = gamma.sum(axis=0)
+        mu    = gamma.T @ x / w[:, None]
+        model = {
+            "pi":  gamma[0],
+            "a":   xi / xi.sum(axis=1, keepdims=True),
+            "mu":  mu,
+            "var": np.maximum(gamma.T @ (x * x) / w[:, None] - mu * mu, 0.0) + floor,
+        }
+        if loglik - prev < tol * abs(loglik):
+            break
+        prev = loglik
+    return _ordered(model) | {"loglik": loglik, "iters": it}
+
+
+# --- T × K filtered P(state_t | x_1..x_t) from the first complete row on; NaN rows get NaN and only
+# advance the chain (no observation) ---
+def filter_probs(x: np.ndarray, model: dict) -> np.ndarray:
+    ok  = ~np.isnan(x).any(axis=1)
+    out = np.full((len(x), len(model["pi"])), np.nan)
+    if not ok.any():
+        return out
+    f   = int(np.argmax(ok))
+    ll  = _loglik(np.where(ok[f:, None], x[f:], 0.0), model)
+    b   = np.where(ok[f:, None], np.exp(ll - ll.max(axis=1, keepdims=True)), 1.0)
+    out[f:], _ = _forward(b, model["pi"], model["a"])
+    out[~ok] = np.nan
+    return out
+
+
+def _fingerprint(close: pd.Series) -> tuple:
+    v = close.to_numpy(np.float64)
+    return (len(v), close.index[0], close.index[-1], float(v[0]), float(v[-1]), float(np.nansum(v))) if len(v) else (0,)
+
+
+# --- (model, T × K probabilities) of a close series; fit on its first fit_bars complete rows ---
+def regimes(close: pd.Series, states: int = 3, window: int = 20, fit_bars: int = 2000) -> tuple:
+    key = (_fingerprint(close), int(states), int(window), int(fit_bars))
+    if key in _fits:
+        _fits.move_to_end(key)
+        return _fits[key]
+    x     = features(close, window)
+    model = fit(x[:int(window) + int(fit_bars)], states)
+    out   = _fits[key] = (model | {"window": int(window)}, filter_probs(x, model))
+    if len(_fits) > _MAX_ENTRIES:
+        _fits.popitem(last=False)
+    return out
+
+
+# --- graph op: P(regime `state`) per bar; all ones (no constraint) when states is 0 ---
+def regime_prob(close: pd.Series, states: int = 0, state: int = 0, window: int = 20, fit_bars: int = 2000) -> np.ndarray:
+    if not states:
+        return np.ones(len(close))
+    _, probs = regimes(close, states, window, fit_bars)
+    return probs[:, min(max(int(state), 0), int(states) - 1)]
+
+
+# --- the same forward step on live candles: update(close) -> K probabilities (None while warming up) ---
+class RegimeFilter:
+    def __init__(self, model: dict, window: int = None):
+        self.model  = model
+        self.window = int(window or model["window"])
+        self._ret   = np.zeros(self.window)
+        self._n     = 0
+        self._last  = None
+        self.probs  = None
+
+    def update(self, close: float):
+        if self._last is not None:
+            self._ret[self._n % self.window] = math.log(close / self._last)
+            self._n += 1
+        self._last = close
+        if self._n < self.window:
+            return None
+        r = self._ret
+        s = r.std(ddof=1)
+        if not s > 0 and self.probs is None:   # filter_probs starts at the first complete row too
+            return None
+        b = 1.0   # flat window: no observation, the chain only advances (as filter_probs' NaN rows)
+        if s > 0:
+            ll = _loglik(np.array([[r.mean() / s * math.sqrt(self.window), math.log(s)]]), self.model)[0]
+            b  = np.exp(ll - ll.max())
+        p = (self.model["pi"] if self.probs is None else self.probs @ self.model["a"]) * b
+        self.probs = p / p.sum()
+        return self.probs if s > 0 else None
+
+
+def describe(model: dict) -> str:
+    return " · ".join(f"s{k}: trend {m[0]:+.2f}, vol {math.exp(m[1]):.4f}, stay {model['a'][k, k]:.2f}"
+                      for k, m in enumerate(model["mu"]))
+
+
+def clear() -> None:
+    _fits.clear()
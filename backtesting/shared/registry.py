@@ -0,0 +1,155 @@
+import importlib
+
+# --- every strategy package under backtesting/, by CLI name ---
+# params:   param schema, name -> type (grid values and CLI strings are cast with it)
+# defaults: the single-run config (single_run.py constants)
+# grid:     the default grid (tune.py GRID)
+# forecast: per-bar return forecast columns (mean, std) the strategy produces, for kelly sizing
+# Modules are imported only when a strategy is actually used, so listing them costs nothing.
+STRATEGIES = {
+    "macrossover": {
+        "title": "MA Crossover",
+        "params": {"short_window": int, "long_window": int, "trend_window": int, "cross_persist": int,
+                   "rsi_buy": float, "rsi_sell": float, "use_vol_filter": bool,
+                   "htf_interval": str, "htf_trend_window": int,
+                   "regime_states": int, "regime_state": int, "regime_min_p": float,
+                   "tp_pct": float, "sl_pct": float, "max_candles": int},
+        "defaults": dict(short_window=10, long_window=50, trend_window=200, cross_persist=2, rsi_buy=55, rsi_sell=45,
+                         use_vol_filter=False, htf_interval=None, htf_trend_window=50, regime_states=0, regime_state=0, regime_min_p=0.5,
+                         tp_pct=0.05, sl_pct=0.07, max_candles=None),
+        "grid": {
+            "short_window":   [10, 20, 50],
+            "long_window":    [50, 100, 200],
+            "trend_window":   [100, 200],
+            "rsi_buy":        [55],
+            "rsi_sell":       [45],
+            "cross_persist":  [2],
+            "tp_pct":         [0.03, 0.05, 0.08],
+            "sl_pct":         [0.01, 0.02, 0.03],
+            "use_vol_filter": [False],
+            "max_candles":    [96, 192, 384],
+        },
+    },
+    "momentum": {
+        "title": "Momentum (Price ROC)",
+        "params": {"roc_window": int, "smooth_window": int, "trend_window": int, "roc_buy": float, "roc_sell": float,
+                   "regime_states": int, "regime_state": int, "regime_min_p": float,
+                   "tp_pct": float, "sl_pct": float, "max_candles": int},
+        "defaults": dict(roc_window=10, smooth_window=3, trend_window=200, roc_buy=2.0, roc_sell=-2.0,
+                         regime_states=0, regime_state=0, regime_min_p=0.5, tp_pct=0.03, sl_pct=0.03, max_candles=192),
+        "grid": {
+            "roc_window":    [5, 10, 20],
+            "smooth_window": [3],
+            "trend_window":  [200],
+            "roc_buy":       [2.0, 3.0],
+            "roc_sell":      [-2.0, -3.0],
+            "tp_pct":        [0.03, 0.05, 0.08],
+            "sl_pct":        [0.02, 0.03],
+            "max_candles":   [96, 192, 384],
+        },
+    },
+    "linreg": {
+        "title": "Linear Regression Slope",
+        "params": {"lr_window": int, "trend_window": int, "slope_buy": float, "slope_sell": float, "use_trend_filter": bool,
+                   "tp_pct": float, "sl_pct": float, "max_candles": int},
+        "defaults": dict(lr_window=30, trend_window=200, slope_buy=0.001, slope_sell=-0.001, use_trend_filter=True,
+                         tp_pct=0.05, sl_pct=0.03, max_candles=192),
+        "grid": {
+            "lr_window":        [20, 30, 50],
+            "trend_window":     [200],
+            "slope_buy":        [0.0005, 0.001, 0.002],
+            "slope_sell":       [-0.0005, -0.001, -0.002],
+            "use_trend_filter": [True, False],
+            "tp_pct":           [0.03, 0.05, 0.08],
+            "sl_pct":           [0.02, 0.03],
+            "max_candles":      [96, 192, 384],
+        },
+    },
+    "mllinreg": {
+        "title": "ML Linear Regression",
+        "params": {"train_size": int, "retrain_every": int, "signal_threshold": float, "use_trend_filter": bool,
+                   "tp_pct": float, "sl_pct": float, "max_candles": int},
+        "defaults": dict(train_size=500, retrain_every=100, signal_threshold=0.001, use_trend_filter=True,
+                         tp_pct=0.05, sl_pct=0.03, max_candles=192),
+        "grid": {
+            "train_size":       [300, 500],
+            "retrain_every":    [50, 100],
+            "signal_threshold": [0.0, 0.0005, 0.001],
+            "use_trend_filter": [True, False],
+            "tp_pct":           [0.03, 0.05, 0.08],
+            "sl_pct":           [0.02, 0.03],
+            "max_candles":      [96, 192, 384],
+        },
+    },
+    "bayeslinreg": {
+        "title": "Bayesian Online Linear Regression",
+        "forecast": ("_pred_mean", "_pred_std"),
+        "params": {"forgetting": float, "prob_buy": float, "prob_sell": float, "use_trend_filter": bool,
+                   "tp_pct": float, "sl_pct": float, "max_candles": int},
+        "defaults": dict(forgetting=0.995, prob_buy=0.6, prob_sell=0.4, use_trend_filter=True,
+                         tp_pct=0.05, sl_pct=0.03, max_candles=192),
+        "grid": {
+            "forgetting":       [0.99, 0.995, 0.999],
+            "prob_buy":         [0.55, 0.6, 0.65],
+            "prob_sell":        [0.45, 0.4, 0.35],
+            "use_trend_filter": [True, False],
+            "tp_pct":           [0.03, 0.05, 0.08],
+            "sl_pct":           [0.02, 0.03],
+            "max_candles":      [96, 192, 384],
+        },
+    },
+}
+
+
+def get(name: str) -> dict:
+    if name not in STRATEGIES:
+        raise KeyError(f"Unknown strategy {name!r}; known: {', '.join(STRATEGIES)}")
+    return STRATEGIES[name]
+
+
+# --- backtesting.<name>.src.<part>, imported on first use (ta / optimize / validate / diagnose) ---
+def module(name: str, part: str):
+    get(name)
+    return importlib.import_module(f"backtesting.{name}.src.{part}")
+
+
+def add_indicators(name: str):
+    return module(name, "ta").add_indicators
+
+
+def add_signals(name: str):
+    return module(name, "ta").add_signals
+
+
+def build_df(name: str):
+    return module(name, "optimize")._build_df
+
+
+def plot_kwargs(name: str, p) -> dict:
+    return module(name, "diagnose")._make_plot_kwargs(p)
+
+
+def runs_base(name: str) -> str:
+    return f"results/{name}"
+
+
+# --- "1,2,3" / "true" -> typed values per the strategy's param schema ---
+def parse_value(name: str, key: str, raw: str):
+    typ = get(name)["params"].get(key)
+    if raw.lower() in ("none", "null", ""):
+        return None
+    if typ is bool:
+        if raw.lower() not in ("true", "false", "1", "0", "yes", "no"):
+            raise ValueError(f"{key}: expected a boolean, got {raw!r}")
+        return raw.lower() in ("true", "1", "yes")
+    if typ is None:
+        raise KeyError(f"{name} has no param {key!r}; known: {', '.join(get(name)['params'])}")
+    return typ(float(raw)) if typ is int else typ(raw)
+
+
+def parse_grid(name: str, items: list, base: dict = None) -> dict:
+    grid = dict(base if base is not None else get(name)["grid"])
+    for item in items or []:
+        key, _, values = item.partition("=")
+        grid[key.strip()] = [parse_value(name, key.strip(), v.strip()) for v in values.split(",")]
+    return grid
@@ -0,0 +1,358 @@
+import base64
+import hashlib
+import json
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from backtesting.shared.load import INTERVAL_MS, KLINE_COLUMNS, klines_weight, load_df, to_ms
+
+# Local stand-in for the Binance spot REST/websocket kline feed, replaying data/org/... candles.
+#   GET /api/v3/klines?symbol=&interval=&startTime=&endTime=&limit=   (same shape as api.binance.com)
+#   GET /api/v3/time, /api/v3/ping
+#   ws  /ws/<symbol>@kline_<interval>   or   /stream?streams=<s1>/<s2>/...
+#
+# speed=None replays at max throughput (every candle is available immediately);
+# speed=1.0 is real time, speed=60 plays one market minute per wall-clock second.
+# Only candles whose close_time has passed on the replay clock are served.
+
+_WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+_MAX_LIMIT = 1000
+
+
+# --- replay clock: maps wall-clock time onto market time ---
+class ReplayClock:
+    def __init__(self, start_ms: int = None, speed: float = None):
+        if speed and start_ms is None:
+            raise ValueError("a paced replay (speed set) needs a start time")
+        self.start_ms = start_ms
+        self.speed = speed
+        self._t0 = time.monotonic()
+
+    def now_ms(self):
+        if not self.speed:
+            return None   # max throughput — everything is already closed
+        return self.start_ms + int((time.monotonic() - self._t0) * 1000 * self.speed)
+
+
+# --- one (symbol, interval) candle series held as arrays ---
+class _Series:
+    def __init__(self, symbol: str, interval: str, df: pd.DataFrame):
+        self.symbol = symbol
+        self.interval = interval
+        self.open_ms = to_ms(df["open_time"]).to_numpy(np.int64)
+        self.close_ms = to_ms(df["close_time"]).to_numpy(np.int64)
+        self.cols = {
+            c: (df[c].to_numpy(np.float64) if c in df.columns else np.zeros(len(df)))
+            for c in KLINE_COLUMNS if c not in ("open_time", "close_time")
+        }
+
+    def __len__(self):
+        return len(self.open_ms)
+
+    def available(self, now_ms) -> int:
+        return len(self) if now_ms is None else int(np.searchsorted(self.close_ms, now_ms, side="right"))
+
+    def rest_rows(self, lo: int, hi: int) -> list:
+        c = self.cols
+        return [
+            [int(self.open_ms[i]), str(c["open_price"][i]), str(c["high_price"][i]), str(c["low_price"][i]),
+             str(c["close_price"][i]), str(c["volume"][i]), int(self.close_ms[i]),
+             str(c["quote_asset_volume"][i]), int(c["number_of_trades"][i]),
+             str(c["taker_buy_base_asset_volume"][i]), str(c["taker_buy_quote_asset_volume"][i]), "0"]
+            for i in range(lo, hi)
+        ]
+
+    def ws_event(self, i: int, event_ms: int) -> dict:
+        c = self.cols
+        return {
+            "e": "kline", "E": event_ms, "s": self.symbol,
+            "k": {
+                "t": int(self.open_ms[i]), "T": int(self.close_ms[i]), "s": self.symbol, "i": self.interval,
+                "o": str(c["open_price"][i]), "c": str(c["close_price"][i]),
+                "h": str(c["high_price"][i]), "l": str(c["low_price"][i]),
+                "v": str(c["volume"][i]), "n": int(c["number_of_trades"][i]), "x": True,
+                "q": str(c["quote_asset_volume"][i]),
+                "V": str(c["taker_buy_base_asset_volume"][i]), "Q": str(c["taker_buy_quote_asset_volume"][i]),
+            },
+        }
+
+
+# --- per-minute request-weight accounting (mirrors X-MBX-USED-WEIGHT-1M) ---
+class _WeightMeter:
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._minute = None
+        self._used = 0
+        self._lock = threading.Lock()
+
+    def spend(self, weight: int):
+        with self._lock:
+            minute = int(time.time() // 60)
+            if minute != self._minute:
+                self._minute, self._used = minute, 0
+            self._used += weight
+            return self._used, self._used <= self.limit
+
+
+# --- candle source shared by all handler threads ---
+class ReplayFeed:
+    def __init__(self, symbols: dict, clock: ReplayClock, data_root: str = "data/org", weight_limit: int = 6000,
+                 derive: bool = False):
+        self.asset_types = {s: a for a, syms in symbols.items() for s in syms}
+        self.clock = clock
+        self.data_root = data_root
+        self.derive = derive
+        self.weights = _WeightMeter(weight_limit)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    # symbol and interval come from the request: check both before they reach a file path.
+    # Candles load as the backtests load them (load_df): intervals without a CSV are built from 1m.
+    def series(self, symbol: str, interval: str) -> _Series:
+        if symbol not in self.asset_types:
+            raise ValueError(f"unknown symbol {symbol!r}")
+        if interval not in INTERVAL_MS:
+            raise ValueError(f"unknown interval {interval!r}")
+        key = (symbol, interval)
+        with self._lock:
+            if key not in self._series:
+                asset_type = self.asset_types[symbol]
+                df = load_df(symbol, interval, asset_type, derive=self.derive, data_root=self.data_root)
+                self._series[key] = _Series(symbol, interval, df)
+            return self._series[key]
+
+    def klines(self, symbol: str, interval: str, start_ms=None, end_ms=None, limit: int = 500) -> list:
+        s = self.series(symbol, interval)
+        hi = s.available(self.clock.now_ms())
+        if end_ms is not None:
+            hi = min(hi, int(np.searchsorted(s.open_ms, end_ms, side="right")))
+        if start_ms is None:
+            lo = max(0, hi - limit)
+        else:
+            lo = int(np.searchsorted(s.open_ms, start_ms, side="left"))
+            hi = min(hi, lo + limit)
+        return s.rest_rows(lo, hi) if hi > lo else []
+
+
+# --- a query parameter the handler cannot use; answered with a Binance-style 400 ---
+class _BadParam(Exception):
+    def __init__(self, code: int, msg: str):
+        super().__init__(msg)
+        self.code = code
+
+
+def _int_param(q: dict, name: str, default=None, minimum: int = None):
+    if name not in q:
+        return default
+    try:
+        v = int(q[name])
+    except ValueError:
+        raise _BadParam(-1100, f"Illegal characters found in parameter '{name}'; legal range is '^[0-9]{{1,20}}$'.")
+    if minimum is not None and v < minimum:
+        raise _BadParam(-1130, f"Data sent for parameter '{name}' is not valid.")
+    return v
+
+
+def _ws_frame(payload: bytes, opcode: int = 0x1) -> bytes:
+    n = len(payload)
+    if n < 126:
+        header = struct.pack("!BB", 0x80 | opcode, n)
+    elif n < 65536:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, n)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, n)
+    return header + payload
+
+
+# --- one client frame -> (opcode, unmasked payload); (None, b"") at EOF ---
+def _ws_read(rfile) -> tuple:
+    head = rfile.read(2)
+    if len(head) < 2:
+        return None, b""
+    opcode, n = head[0] & 0x0F, head[1] & 0x7F
+    if n == 126:
+        n = struct.unpack("!H", rfile.read(2))[0]
+    elif n == 127:
+        n = struct.unpack("!Q", rfile.read(8))[0]
+    mask = rfile.read(4) if head[1] & 0x80 else b"\0\0\0\0"
+    data = rfile.read(n)
+    return opcode, bytes(b ^ mask[i % 4] for i, b in enumerate(data))
+
+
+def _ws_close(code: int, reason: str = "") -> bytes:
+    return _ws_frame(struct.pack("!H", code) + reason.encode()[:120], opcode=0x8)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _json(self, status: int, body, headers: dict = None):
+        data = json.dumps(body, separators=(",", ":")).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, str(v))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        feed = self.server.feed
+        url = urlparse(self.path)
+        q = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+        if url.path == "/api/v3/ping":
+            return self._json(200, {})
+        if url.path == "/api/v3/time":
+            now = feed.clock.now_ms()
+            return self._json(200, {"serverTime": now if now is not None else int(time.time() * 1000)})
+        if url.path == "/api/v3/klines":
+            return self._klines(feed, q)
+        if url.path.startswith("/ws/") or url.path == "/stream":
+            streams = url.path[len("/ws/"):] if url.path.startswith("/ws/") else q.get("streams", "")
+            return self._websocket(feed, [s for s in streams.split("/") if s], q, combined=url.path == "/stream")
+        return self._json(404, {"code": -1, "msg": f"Unknown path {url.path}"})
+
+    def _klines(self, feed: ReplayFeed, q: dict):
+        try:
+            limit    = min(_int_param(q, "limit", 500, minimum=1), _MAX_LIMIT)
+            start_ms = _int_param(q, "startTime")
+            end_ms   = _int_param(q, "endTime")
+        except _BadParam as e:
+            return self._json(400, {"code": e.code, "msg": str(e)})
+        used, ok = feed.weights.spend(klines_weight(limit))
+        headers = {"X-MBX-USED-WEIGHT-1M": used}
+        if not ok:
+            return self._json(429, {"code": -1003, "msg": "Too much request weight used."}, {**headers, "Retry-After": 60 - int(time.time()) % 60})
+        symbol, interval = q.get("symbol"), q.get("interval")
+        if symbol not in feed.asset_types:
+            return self._json(400, {"code": -1121, "msg": "Invalid symbol."}, headers)
+        try:
+            rows = feed.klines(symbol, interval, start_ms=start_ms, end_ms=end_ms, limit=limit)
+        except (ValueError, FileNotFoundError):
+            return self._json(400, {"code": -1120, "msg": "Invalid interval."}, headers)
+        return self._json(200, rows, headers)
+
+    def _websocket(self, feed: ReplayFeed, streams: list, q: dict, combined: bool):
+        key = self.headers.get("Sec-WebSocket-Key")
+        if not key or not streams:
+            return self._json(400, {"code": -1, "msg": "Expected a websocket upgrade with at least one stream"})
+        # stream names are checked as the REST path checks its params; a bad one gets an error
+        # frame and a close after the upgrade, so websocket clients see why
+        subs, error = [], None
+        try:
+            start_ms = _int_param(q, "startTime")
+        except _BadParam as e:
+            error = {"code": e.code, "msg": str(e)}
+        for name in streams if error is None else ():
+            symbol, _, interval = name.partition("@kline_")
+            if symbol.upper() not in feed.asset_types:
+                error = {"code": -1121, "msg": f"Invalid symbol in stream {name!r}."}
+                break
+            try:
+                subs.append((name, feed.series(symbol.upper(), interval)))
+            except (ValueError, FileNotFoundError):
+                error = {"code": -1120, "msg": f"Invalid interval in stream {name!r}."}
+                break
+
+        accept = base64.b64encode(hashlib.sha1((key + _WS_GUID).encode()).digest()).decode()
+        self.send_response(101, "Switching Protocols")
+        self.send_header("Upgrade", "websocket")
+        self.send_header("Connection", "Upgrade")
+        self.send_header("Sec-WebSocket-Accept", accept)
+        self.end_headers()
+        self.wfile.flush()
+        self.close_connection = True
+        if error is not None:
+            self.wfile.write(_ws_frame(json.dumps({"error": error}, separators=(",", ":")).encode())
+                             + _ws_close(1008, error["msg"]))
+            self.wfile.flush()
+            return
+
+        # client frames: answer pings, stop on close; writes from both threads go through one lock
+        lock, closed = threading.Lock(), threading.Event()
+
+        def send(data: bytes):
+            with lock:
+                self.wfile.write(data)
+                self.wfile.flush()
+
+        def read_client():
+            try:
+                while not closed.is_set():
+                    opcode, payload = _ws_read(self.rfile)
+                    if opcode is None or opcode == 0x8:
+                        break
+                    if opcode == 0x9:
+                        send(_ws_frame(payload, opcode=0xA))
+            except (OSError, ValueError, struct.error):
+                pass
+            closed.set()
+
+        threading.Thread(target=read_client, daemon=True).start()
+
+        # start from startTime if given, otherwise from the next candle to close on the replay clock
+        now = feed.clock.now_ms()
+        if start_ms is not None:
+            pos = [int(np.searchsorted(s.open_ms, start_ms, side="left")) for _, s in subs]
+        else:
+            pos = [s.available(now) if now is not None else 0 for _, s in subs]
+
+        try:
+            while not closed.is_set():
+                now = feed.clock.now_ms()
+                due = []
+                for k, (name, s) in enumerate(subs):
+                    end = s.available(now)
+                    due.extend((int(s.close_ms[i]), k, i) for i in range(pos[k], end))
+                    pos[k] = max(pos[k], end)
+                if due:
+                    due.sort()
+                    frames = []
+                    for close_ms, k, i in due:
+                        event = subs[k][1].ws_event(i, close_ms if now is None else now)
+                        msg = {"stream": subs[k][0], "data": event} if combined else event
+                        frames.append(_ws_frame(json.dumps(msg, separators=(",", ":")).encode()))
+                    send(b"".join(frames))
+                if all(pos[k] >= len(s) for k, (_, s) in enumerate(subs)):
+                    break
+                closed.wait(0.01 if now is None else 0.05)
+            send(_ws_close(1000))   # our close, or the reply to the client's
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        closed.set()
+
+
+def make_server(
+    symbols: dict,                # {asset_type: [symbol, ...]} as in run_dataloader.SYMBOLS
+    data_root: str = "data/org",
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    start: str = None,            # market time the replay clock starts at (required when speed is set)
+    speed: float = None,          # None → max throughput, 1.0 → real time, N → N× real time
+    weight_limit: int = 6000,     # request weight per minute before answering 429
+    derive: bool = False,         # serve every interval resampled from 1m, not from its own CSV
+) -> ThreadingHTTPServer:
+    start_ms = int(pd.Timestamp(start).value // 1_000_000) if start is not None else None
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.feed = ReplayFeed(symbols, ReplayClock(start_ms, speed), data_root=data_root, weight_limit=weight_limit,
+                             derive=derive)
+    return server
+
+
+# --- run the server on a daemon thread; returns (server, base_url) ---
+def serve_in_thread(symbols: dict, **kwargs):
+    server = make_server(symbols, **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}"
@@ -0,0 +1,289 @@
+import atexit
+import html
+import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from backtesting.shared.store import _plain
+
+# --- reports rendered from what a run persisted, off the compute path ---
+# run_grid_search / run_validation only write data: grid_search.csv, best_trades.csv,
+# validate.csv and run.json (the bits of context the reports need). Rendering README.md,
+# validate.md, report.html, the equity curve and the parameter heatmaps happens here —
+# in a background process after each run, or for many stored runs at once with render_runs().
+#
+# MODE: "async" → one background worker per process, drained at exit
+#       "sync"  → render inline
+#       "defer" → do nothing; the caller batches render_runs() (sweep workers)
+MODE = "async"
+
+_pool    = None
+_pending = []
+_lock    = threading.Lock()
+
+
+# --- run.json: one section per stage, merged and replaced atomically ---
+def write_meta(run_dir: str, section: str, meta: dict) -> None:
+    data = read_meta(run_dir)
+    data[section] = json.loads(json.dumps(meta, default=_jsonable))
+    tmp = f"{run_dir}/run.json.tmp.{os.getpid()}"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, f"{run_dir}/run.json")
+
+
+def read_meta(run_dir: str) -> dict:
+    path = f"{run_dir}/run.json"
+    if not os.path.isfile(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _jsonable(v):
+    v = _plain(v)
+    return v if not isinstance(v, (np.ndarray, pd.Series)) else v.tolist()
+
+
+def _write(path: str, text: str) -> str:
+    tmp = f"{path}.tmp.{os.getpid()}"
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, path)
+    return path
+
+
+def _costs(meta: dict) -> str:
+    from backtesting.shared.costs import describe
+
+    return describe((meta.get("eval_params") or {}).get("cost_model"))
+
+
+# --- README.md of a grid search ---
+def render_grid(run_dir: str) -> list:
+    meta = read_meta(run_dir).get("grid")
+    if meta is None or not os.path.isfile(f"{run_dir}/grid_search.csv"):
+        return []
+    df    = pd.read_csv(f"{run_dir}/grid_search.csv")
+    cols  = [c for c in meta["readme_cols"] if c in df.columns] + [c for c in ("psr", "dsr") if c in df.columns]
+    top10 = df.head(10)
+    md = (
+        f"# Grid Search — {meta['strategy_name']}\n\n"
+        f"**Symbol:** {meta['symbol']} / {meta['interval']} | **Train:** {meta['train_start']} → {meta['train_end']}"
+        f" | **Sizing:** {meta.get('sizing', 'fixed')} | **Costs:** {_costs(meta)}\n\n"
+        f"| Param | Values |\n|---|---|\n"
+        + "\n".join(f"| {k} | {v} |" for k, v in meta["grid"].items())
+        + f"\n\n**Combos:** {meta['combos']} | **Results:** {len(df)}"
+        + (f" | **Pruned early:** {meta['pruned']} (pruned.csv)" if meta.get("pruned") else "") + "\n\n"
+        + _stats_line(run_dir)
+        + f"## Top 10 by Sharpe\n\n{top10[cols].to_markdown(index=False)}\n"
+    )
+    if os.path.isfile(f"{run_dir}/robust.csv"):
+        rb    = pd.read_csv(f"{run_dir}/robust.csv").head(10)
+        rcols = cols + [c for c in ("robust", "sharpe_nbr_mean", "sharpe_nbr_std", "sharpe_nbr_min", "dd_nbr_min", "nbr_n") if c in rb.columns]
+        md += (f"\n## Top 10 by robustness\n\n"
+               f"Neighbourhood mean − std of Sharpe over adjacent parameter values (see robust.csv).\n\n"
+               f"{rb[rcols].to_markdown(index=False)}\n")
+    return [_write(f"{run_dir}/README.md", md)]
+
+
+# --- selection-bias summary (shared.stats) written by the grid search ---
+def _stats_line(run_dir: str) -> str:
+    from backtesting.shared.stats import describe
+
+    summary = read_meta(run_dir).get("stats")
+    return f"**Selection bias:** {describe(summary)}. `dsr` = P(true Sharpe > SR*).\n\n" if summary else ""
+
+
+# --- validate.md ---
+def render_validate(run_dir: str) -> list:
+    meta = read_meta(run_dir).get("validate")
+    if meta is None or not os.path.isfile(f"{run_dir}/validate.csv"):
+        return []
+    df_out  = pd.read_csv(f"{run_dir}/validate.csv")
+    passing = df_out[df_out["pass"] == "YES"]
+    best_block = ""
+    if not passing.empty and meta.get("best_text"):
+        best = passing.sort_values("test_sharpe", ascending=False).iloc[0]
+        best_block = (f"\n## Best config\n\n```\n{meta['best_text']}\n```\n\n"
+                      f"Sharpe={best['test_sharpe']}, win_rate={best['test_wr%']}%, drawdown={best['test_dd%']}%\n")
+    rank_corr = meta.get("rank_corr") or {}
+    corr_line = ("**Train/test rank correlation (Spearman):** "
+                 + ", ".join(f"{k}: {v:+.2f}" for k, v in rank_corr.items()) + "\n\n") if rank_corr else ""
+    md = (
+        f"# Validation — {meta['strategy_name']}\n\n"
+        f"**Test window:** {', '.join(f'{a} → {b}' for a, b in meta['windows'])} | **Passing:** {len(passing)}/{len(df_out)}\n\n"
+        f"Candidates: {'all' if meta.get('top_n') is None else 'top ' + str(meta['top_n'])} by {meta.get('rank_by', 'sharpe')}.\n\n"
+        f"Pass criteria: Sharpe > 0, win rate > 50%, drawdown < 20%, trades ≥ 5.\n\n"
+        f"{corr_line}"
+        f"{_stats_line(run_dir)}"
+        f"## Results\n\n{df_out.to_markdown(index=False)}\n"
+        + best_block
+    )
+    return [_write(f"{run_dir}/validate.md", md)]
+
+
+def _figure(w=10, h=4):
+    from matplotlib.figure import Figure   # no pyplot: figures stay per-thread/process, no display
+    return Figure(figsize=(w, h))
+
+
+# --- equity curve of the top grid config (best_trades.csv) ---
+def render_equity(run_dir: str) -> list:
+    path = f"{run_dir}/best_trades.csv"
+    if not os.path.isfile(path):
+        return []
+    t = pd.read_csv(path).sort_values("exit_time")
+    if t.empty:
+        return []
+    fig = _figure()
+    ax  = fig.add_subplot()
+    x   = pd.to_datetime(t["exit_time"])
+    init = t["portfolio"].iloc[0] - t["pnl"].iloc[0]
+    ax.plot(x, t["portfolio"], color="steelblue", linewidth=1.2)
+    ax.axhline(init, linestyle="--", color="grey", alpha=0.5)
+    ax.fill_between(x, init, t["portfolio"], alpha=0.15, color="steelblue")
+    ax.set_title("Top config — portfolio (train window)")
+    ax.grid(True, alpha=0.3)
+    fig.autofmt_xdate()
+    fig.tight_layout()
+    fig.savefig(f"{run_dir}/equity.png", dpi=100)
+    return [f"{run_dir}/equity.png"]
+
+
+# --- best Sharpe over every pair of grid params with ≥ 2 values (other params maximised out) ---
+def render_heatmaps(run_dir: str, metric: str = "sharpe", max_pairs: int = 6) -> list:
+    meta = read_meta(run_dir).get("grid")
+    if meta is None or not os.path.isfile(f"{run_dir}/grid_search.csv"):
+        return []
+    df     = pd.read_csv(f"{run_dir}/grid_search.csv")
+    axes   = [k for k, v in meta["grid"].items() if len(v) > 1 and k in df.columns]
+    pairs  = [(a, b) for i, a in enumerate(axes) for b in axes[i + 1:]][:max_pairs]
+    if not pairs or metric not in df.columns or df.empty:
+        return []
+    ncols = min(3, len(pairs))
+    nrows = -(-len(pairs) // ncols)
+    fig   = _figure(5 * ncols, 4 * nrows)
+    for k, (a, b) in enumerate(pairs):
+        ax  = fig.add_subplot(nrows, ncols, k + 1)
+        piv = df.pivot_table(index=a, columns=b, values=metric, aggfunc="max")
+        im  = ax.imshow(piv.to_numpy(), cmap="RdYlGn", aspect="auto", origin="lower")
+        ax.set_xticks(range(len(piv.columns)), [str(c) for c in piv.columns], fontsize=8)
+        ax.set_yticks(range(len(piv.index)), [str(i) for i in piv.index], fontsize=8)
+        ax.set_xlabel(b)
+        ax.set_ylabel(a)
+        for (i, j), v in np.ndenumerate(piv.to_numpy()):
+            if not np.isnan(v):
+                ax.text(j, i, f"{v:.2f}", ha="center", va="center", fontsize=7)
+        fig.colorbar(im, ax=ax)
+    fig.suptitle(f"best {metric} per parameter pair")
+    fig.tight_layout()
+    fig.savefig(f"{run_dir}/heatmap_{metric}.png", dpi=100)
+    return [f"{run_dir}/heatmap_{metric}.png"]
+
+
+# --- report.html: both tables plus the images, relative to the run dir ---
+def render_html(run_dir: str) -> list:
+    meta  = read_meta(run_dir)
+    parts = [f"<h1>{html.escape(os.path.basename(run_dir.rstrip('/')))}</h1>"]
+    if "grid" in meta and os.path.isfile(f"{run_dir}/grid_search.csv"):
+        g = meta["grid"]
+        parts.append(f"<h2>Grid search — {html.escape(g['strategy_name'])}</h2>"
+                     f"<p>{g['symbol']} / {g['interval']} · train {g['train_start']} → {g['train_end']} · {g['combos']} combos</p>")
+        parts.append(pd.read_csv(f"{run_dir}/grid_search.csv").head(20).to_html(index=False, border=0))
+    for img in ("equity.png", "heatmap_sharpe.png"):
+        if os.path.isfile(f"{run_dir}/{img}"):
+            parts.append(f'<p><img src="{img}" style="max-width:100%"></p>')
+    if "validate" in meta and os.path.isfile(f"{run_dir}/validate.csv"):
+        v = meta["validate"]
+        parts.append(f"<h2>Validation</h2><p>{', '.join(f'{a} → {b}' for a, b in v['windows'])}</p>")
+        parts.append(pd.read_csv(f"{run_dir}/validate.csv").to_html(index=False, border=0))
+    if len(parts) == 1:
+        return []
+    css = "body{font-family:sans-serif;margin:2em}table{border-collapse:collapse;font-size:12px}td,th{padding:2px 8px;text-align:right}"
+    return [_write(f"{run_dir}/report.html", f"<!doctype html><html><head><meta charset='utf-8'><style>{css}</style></head>"
+                                           f"<body>{''.join(parts)}</body></html>")]
+
+
+# --- everything a run has data for ---
+def render_run(run_dir: str) -> list:
+    out = render_grid(run_dir) + render_validate(run_dir)
+    try:
+        out += render_equity(run_dir) + render_heatmaps(run_dir)
+    except ImportError:   # no matplotlib: text reports only
+        pass
+    return out + render_html(run_dir)
+
+
+def _atexit_wait() -> None:
+    wait()
+    if _pool is not None:
+        _pool.shutdown(wait=True)
+
+
+# --- hand a run to the renderer according to MODE ---
+def submit(run_dir: str):
+    global _pool
+    if MODE == "defer":
+        return None
+    if MODE == "sync":
+        return render_run(run_dir)
+    with _lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=1)
+            atexit.register(_atexit_wait)
+        fut = _pool.submit(render_run, run_dir)
+        _pending.append(fut)
+    return fut
+
+
+# --- block until every submitted render has finished; [paths or error] per run ---
+def wait() -> list:
+    with _lock:
+        pending = list(_pending)
+        _pending.clear()
+    out = []
+    for f in pending:
+        try:
+            out.append(f.result())
+        except Exception as e:
+            out.append(f"{type(e).__name__}: {e}")
+    return out
+
+
+# --- re-render many stored runs concurrently ---
+def render_runs(run_dirs: list, n_jobs: int = os.cpu_count()) -> dict:
+    run_dirs = list(run_dirs)
+    if n_jobs <= 1 or len(run_dirs) <= 1:
+        return {d: _render_or_error(d) for d in run_dirs}
+    out = {}
+    with ProcessPoolExecutor(max_workers=min(n_jobs, len(run_dirs))) as pool:
+        futures = {pool.submit(_render_or_error, d): d for d in run_dirs}
+        for f in as_completed(futures):
+            try:
+                out[futures[f]] = f.result()
+            except Exception as e:   # the pool itself broke (worker killed)
+                out[futures[f]] = f"{type(e).__name__}: {e}"
+    return out
+
+
+# --- render_run, with a failure as "Type: message" (what cmd_report prints) instead of raising ---
+def _render_or_error(run_dir: str):
+    try:
+        return render_run(run_dir)
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+
+
+# --- run dirs under results/<strategy>/ (or any base) that have stored data ---
+def find_runs(base: str = "results") -> list:
+    runs = []
+    for root, dirs, files in os.walk(base):
+        if "grid_search.csv" in files or "validate.csv" in files:
+            runs.append(root)
+            dirs[:] = []
+    return sorted(runs)
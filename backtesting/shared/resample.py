@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+
+from backtesting.shared.load import INTERVAL_MS, KLINE_COLUMNS, to_ms
+
+_SUM_COLS = ["volume", "quote_asset_volume", "number_of_trades",
+             "taker_buy_base_asset_volume", "taker_buy_quote_asset_volume"]
+
+
+# --- aggregate 1m candles into a higher timeframe in one vectorized pass ---
+# Buckets are aligned to the epoch (UTC), like Binance. A trailing bucket whose 1m candles
+# do not yet reach its close_time is dropped unless drop_partial=False.
+def resample_klines(df1m: pd.DataFrame, interval: str, drop_partial: bool = True) -> pd.DataFrame:
+    ims = INTERVAL_MS[interval]
+    open_ms  = to_ms(df1m["open_time"]).to_numpy(np.int64)
+    close_ms = to_ms(df1m["close_time"]).to_numpy(np.int64)
+    if len(open_ms) == 0:
+        return pd.DataFrame(columns=[c for c in KLINE_COLUMNS if c in df1m.columns])
+
+    bucket = open_ms - open_ms % ims
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends   = np.r_[starts[1:], len(bucket)] - 1
+
+    out = {
+        "open_time":   pd.to_datetime(bucket[starts], unit="ms"),
+        "open_price":  df1m["open_price"].to_numpy()[starts],
+        "high_price":  np.maximum.reduceat(df1m["high_price"].to_numpy(np.float64), starts),
+        "low_price":   np.minimum.reduceat(df1m["low_price"].to_numpy(np.float64), starts),
+        "close_price": df1m["close_price"].to_numpy()[ends],
+        "close_time":  pd.to_datetime(bucket[starts] + ims - 1, unit="ms"),
+    }
+    sum_cols = [c for c in _SUM_COLS if c in df1m.columns]
+    if sum_cols:
+        sums = np.add.reduceat(df1m[sum_cols].to_numpy(np.float64), starts, axis=0)
+        for k, c in enumerate(sum_cols):
+            out[c] = sums[:, k].astype(np.int64) if c == "number_of_trades" else sums[:, k]
+
+    res = pd.DataFrame(out)[[c for c in KLINE_COLUMNS if c in out]]
+    if drop_partial and close_ms[-1] < bucket[-1] + ims - 1:
+        res = res.iloc[:-1]
+    return res
+
+
+# --- append the buckets that closed since `derived` was last built ---
+# df1m must cover at least every 1m candle after derived's last close_time.
+def update_resampled(derived: pd.DataFrame, df1m: pd.DataFrame, interval: str) -> pd.DataFrame:
+    if derived is None or derived.empty:
+        return resample_klines(df1m, interval)
+    last_close = to_ms(derived["close_time"]).iloc[-1]
+    new = resample_klines(df1m[to_ms(df1m["open_time"]) > last_close], interval)
+    if new.empty:
+        return derived
+    new.index = range(derived.index[-1] + 1, derived.index[-1] + 1 + len(new))
+    return pd.concat([derived, new])
+
+
+# --- rebuild/extend data/org/<asset>/<symbol>/<interval>.csv from the stored 1m candles ---
+def write_derived(asset_type: str, symbol: str, intervals: list, data_root: str = "data/org") -> dict:
+    from backtesting.shared.dataloader import append_atomic, last_close_time
+
+    df1m  = pd.read_csv(f"{data_root}/{asset_type}/{symbol}/1m.csv", index_col=0)
+    ms1m  = to_ms(df1m["open_time"])
+    added = {}
+    for interval in intervals:
+        if interval == "1m":
+            continue
+        path = f"{data_root}/{asset_type}/{symbol}/{interval}.csv"
+        last = last_close_time(path)
+        new  = resample_klines(df1m[ms1m > last[0]] if last else df1m, interval)
+        if not new.empty:
+            append_atomic(path, new, next_index=last[1] + 1 if last else 0)
+        added[interval] = len(new)
+    return added
+
+
+
+# --- child candles (normally 1m) as arrays for the intrabar exit mode in trade.simulate_trades ---
+def sub_bars(df_child: pd.DataFrame) -> dict:
+    return {
+        "open_ms": to_ms(df_child["open_time"]).to_numpy(np.int64),
+        "high":    df_child["high_price"].to_numpy(np.float64),
+        "low":     df_child["low_price"].to_numpy(np.float64),
+    }
+
+
+# --- parent bar -> [start, end) row range of its child candles ---
+def child_index(df: pd.DataFrame, sub: dict):
+    start = np.searchsorted(sub["open_ms"], to_ms(df["open_time"]).to_numpy(np.int64), side="left")
+    end   = np.searchsorted(sub["open_ms"], to_ms(df["close_time"]).to_numpy(np.int64), side="right")
+    return start, end
+
+
+# --- precompute the parent->child index once on the raw frame; it survives build_df and slicing ---
+def attach_child_index(df: pd.DataFrame, sub: dict) -> pd.DataFrame:
+    df["_child_start"], df["_child_end"] = child_index(df, sub)
+    return df
+
+
+# --- load the 1m candles behind rawdf and index them, for simulate_trades(intrabar=True) ---
+def prepare_intrabar(rawdf: pd.DataFrame, symbol: str, interval: str, asset_type: str):
+    if interval == "1m":
+        return rawdf, None
+    from backtesting.shared.load import load_df
+    sub = sub_bars(load_df(ticker=symbol, timeframe="1m", asset_type=asset_type))
+    return attach_child_index(rawdf, sub), sub
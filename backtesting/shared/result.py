@@ -1,5 +1,6 @@
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
+import os
+
+import numpy as np
 import pandas as pd
 
 from rich import box
@@ -12,48 +13,96 @@ from rich.text import Text
 _console = Console()
 
 
+# --- Largest-Triangle-Three-Buckets: indices of n points that keep the series' visual shape ---
+# First and last points are kept; each bucket in between contributes the point forming the largest
+# triangle with the previous pick and the next bucket's mean. NaNs are skipped.
+def lttb(x, y, n: int) -> np.ndarray:
+    x = np.asarray(x)
+    x = (x.astype(np.int64) if x.dtype.kind == "M" else x).astype(np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    ok = np.flatnonzero(~np.isnan(y))
+    if n is None or len(ok) <= max(n, 3):
+        return ok
+    xs, ys = x[ok], y[ok]
+    edges  = np.linspace(1, len(ok) - 1, n - 1).astype(np.int64)   # n - 2 inner buckets
+    picks  = np.empty(n, dtype=np.int64)
+    picks[0], picks[-1] = 0, len(ok) - 1
+    a = 0
+    for b in range(n - 2):
+        lo, hi = edges[b], edges[b + 1]
+        nlo, nhi = hi, (edges[b + 2] if b + 2 < len(edges) else len(ok))
+        cx, cy = xs[nlo:nhi].mean(), ys[nlo:nhi].mean()
+        area = np.abs((xs[a] - cx) * (ys[lo:hi] - ys[a]) - (xs[a] - xs[lo:hi]) * (cy - ys[a]))
+        a = lo + int(np.argmax(area))
+        picks[b + 1] = a
+    return ok[picks]
+
+
+def _line(ax, x, y, n, **kw):
+    idx = lttb(x, y, n)
+    ax.plot(np.asarray(x)[idx], np.asarray(y, dtype=np.float64)[idx], **kw)
+
+
 # --- generic strategy plot ---
 # price_overlays: list of (col_name, label, color) to plot on the price panel
 # indicator_panel: optional dict {"col": str, "label": str, "buy": float, "sell": float}
 #                  adds a middle panel with the indicator + threshold lines
+# max_points:      lines are LTTB-downsampled to this many points (None → every candle)
+# save_path:       write the figure there (png/svg/pdf); show=False renders off-screen on a bare
+#                  Figure, leaving pyplot and its backend alone
 def plot(
     df: pd.DataFrame,
     trades: pd.DataFrame = None,
     price_overlays: list = None,
     indicator_panel: dict = None,
+    max_points: int = 4000,
+    save_path: str = None,
+    show: bool = True,
 ) -> None:
+    import matplotlib.dates as mdates   # lazy: headless runs never load matplotlib
+    from matplotlib.lines import Line2D
+
     n_rows = 3 if indicator_panel else 2
     height_ratios = [3, 1.5, 1.5] if indicator_panel else [3, 1.5]
-    fig, axes = plt.subplots(nrows=n_rows, ncols=1, figsize=(14, 4 * n_rows + 2),
-                             sharex=True, gridspec_kw={"height_ratios": height_ratios})
+    if show:
+        import matplotlib.pyplot as plt
+        fig = plt.figure(figsize=(14, 4 * n_rows + 2))
+    else:
+        from matplotlib.figure import Figure   # no pyplot: nothing global changes, no window
+        fig = Figure(figsize=(14, 4 * n_rows + 2))
+    axes = fig.subplots(nrows=n_rows, ncols=1, sharex=True, gridspec_kw={"height_ratios": height_ratios})
     ax1 = axes[0]
     ax_ind = axes[1] if indicator_panel else None
     ax_port = axes[-1]
+    t = pd.to_datetime(df["open_time"]).to_numpy()
 
     # --- price ---
-    ax1.plot(df["open_time"], df["close_price"], color="black", linewidth=0.8, label="Price")
+    _line(ax1, t, df["close_price"], max_points, color="black", linewidth=0.8, label="Price")
     for col, label, color in (price_overlays or []):
         kw = {"alpha": 0.6, "linewidth": 0.8, "label": label}
         if color:
             kw["color"] = color
-        ax1.plot(df["open_time"], df[col], **kw)
+        _line(ax1, t, df[col], max_points, **kw)
 
     EXIT_MARKERS = {"tp": ("*", 12), "sl": ("x", 8), "timeout": ("s", 6), "signal": ("o", 6), "end": ("D", 6)}
     EXIT_COLORS  = {"tp": "lime",    "sl": "red",    "timeout": "orange",  "signal": "grey",   "end": "purple"}
 
     if trades is not None and not trades.empty:
-        for _, tr in trades.iterrows():
-            side_color = "green" if tr["signal"] == 1 else "red"
-            marker = "^" if tr["signal"] == 1 else "v"
-            ax1.scatter(tr["entry_time"], tr["entry_price"], marker=marker, color=side_color, s=70, zorder=5)
-            m, ms = EXIT_MARKERS.get(tr["exit_reason"], ("x", 8))
-            ec = EXIT_COLORS.get(tr["exit_reason"], "grey")
-            ax1.scatter(tr["exit_time"], tr["exit_price"], marker=m, color=ec, s=ms**2, zorder=5, linewidths=1.2)
-
-        entry_long  = plt.Line2D([0], [0], marker="^", color="w", markerfacecolor="green", markersize=9, label="Entry long")
-        entry_short = plt.Line2D([0], [0], marker="v", color="w", markerfacecolor="red",   markersize=9, label="Entry short")
+        # one scatter per marker type, not one per trade
+        side = trades["signal"].to_numpy()
+        for s_, marker, color in ((1, "^", "green"), (-1, "v", "red")):
+            m = side == s_
+            if m.any():
+                ax1.scatter(pd.to_datetime(trades["entry_time"][m]), trades["entry_price"][m], marker=marker, color=color, s=70, zorder=5)
+        for reason, g in trades.groupby("exit_reason"):
+            mk, ms = EXIT_MARKERS.get(reason, ("x", 8))
+            ax1.scatter(pd.to_datetime(g["exit_time"]), g["exit_price"], marker=mk, color=EXIT_COLORS.get(reason, "grey"),
+                        s=ms**2, zorder=5, linewidths=1.2)
+
+        entry_long  = Line2D([0], [0], marker="^", color="w", markerfacecolor="green", markersize=9, label="Entry long")
+        entry_short = Line2D([0], [0], marker="v", color="w", markerfacecolor="red",   markersize=9, label="Entry short")
         exit_handles = [
-            plt.Line2D([0], [0], marker=m, color="w", markerfacecolor=EXIT_COLORS[r],
+            Line2D([0], [0], marker=m, color="w", markerfacecolor=EXIT_COLORS[r],
                        markeredgecolor=EXIT_COLORS[r], markersize=8, label=f"Exit: {r}")
             for r, (m, _) in EXIT_MARKERS.items()
         ]
@@ -71,14 +120,16 @@ def plot(
         buy   = indicator_panel.get("buy")
         sell  = indicator_panel.get("sell")
 
-        ax_ind.plot(df["open_time"], df[col], color="steelblue", linewidth=0.9, label=label)
+        idx = lttb(t, df[col], max_points)
+        ti, yi = t[idx], df[col].to_numpy(np.float64)[idx]
+        ax_ind.plot(ti, yi, color="steelblue", linewidth=0.9, label=label)
         ax_ind.axhline(0, color="grey", linewidth=0.6, linestyle="--")
         if buy is not None:
             ax_ind.axhline(buy,  color="green", linewidth=0.8, linestyle="--", label=f"Buy ({buy})")
         if sell is not None:
             ax_ind.axhline(sell, color="red",   linewidth=0.8, linestyle="--", label=f"Sell ({sell})")
-        ax_ind.fill_between(df["open_time"], df[col], 0, where=(df[col] > 0), alpha=0.15, color="green")
-        ax_ind.fill_between(df["open_time"], df[col], 0, where=(df[col] < 0), alpha=0.15, color="red")
+        ax_ind.fill_between(ti, yi, 0, where=(yi > 0), alpha=0.15, color="green")
+        ax_ind.fill_between(ti, yi, 0, where=(yi < 0), alpha=0.15, color="red")
         ax_ind.set_title(label)
         ax_ind.legend(fontsize=9)
         ax_ind.grid(True, alpha=0.3)
@@ -87,9 +138,12 @@ def plot(
     if trades is not None and not trades.empty:
         t_sorted = trades.sort_values("exit_time")
         init = t_sorted["portfolio"].iloc[0] - t_sorted["pnl"].iloc[0]
-        ax_port.plot(t_sorted["exit_time"], t_sorted["portfolio"], color="steelblue", linewidth=1.2, label="Portfolio")
+        te   = pd.to_datetime(t_sorted["exit_time"]).to_numpy()
+        idx  = lttb(te, t_sorted["portfolio"], max_points)
+        te, pv = te[idx], t_sorted["portfolio"].to_numpy(np.float64)[idx]
+        ax_port.plot(te, pv, color="steelblue", linewidth=1.2, label="Portfolio")
         ax_port.axhline(init, linestyle="--", color="grey", alpha=0.5, label="Initial")
-        ax_port.fill_between(t_sorted["exit_time"], init, t_sorted["portfolio"], alpha=0.15, color="steelblue")
+        ax_port.fill_between(te, init, pv, alpha=0.15, color="steelblue")
         ax_port.set_title("Portfolio Value Over Time")
         ax_port.legend(fontsize=9)
         ax_port.grid(True, alpha=0.3)
@@ -100,8 +154,13 @@ def plot(
     ax1.xaxis.set_major_locator(mdates.WeekdayLocator(interval=96))
     ax1.xaxis.set_major_formatter(date_fmt)
 
-    plt.tight_layout()
-    plt.show()
+    fig.tight_layout()
+    if save_path:
+        os.makedirs(os.path.dirname(save_path) or ".", exist_ok=True)
+        fig.savefig(save_path, dpi=110)
+    if show:
+        plt.show()
+        plt.close(fig)
 
 
 # --- print backtest summary ---
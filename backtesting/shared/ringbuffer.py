@@ -0,0 +1,176 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from backtesting.shared.load import KLINE_COLUMNS, to_ms
+
+# --- fixed-capacity candle buffers for live ingestion ---
+# Each column is one preallocated array of 2 × capacity. Row k is written at k % capacity and at
+# k % capacity + capacity, so the newest `n ≤ capacity` rows are always one contiguous slice
+# [start, start + n) — windows are zero-copy views, appends are O(1), nothing is ever reallocated.
+#
+# One writer per ring, any number of readers, no locks, seqlock-style: the writer first raises
+# `writing` to the row count it is about to reach, fills both mirror slots, and only then bumps
+# `written`, so a reader that reads `written` once sees complete rows. Writing row k overwrites
+# row k - capacity, so a view stays valid until the writer laps it; readers that hold a window
+# across appends (or copy one) check `intact(window_end, n)` after reading. frame() and save()
+# copy and re-check until the copy is clean.
+
+_TIME_COLS = ("open_time", "close_time")
+
+
+class CandleRing:
+    def __init__(self, capacity: int = 1024, columns=KLINE_COLUMNS, symbol=None, interval=None, asset_type=None):
+        self.capacity = int(capacity)
+        self.columns  = tuple(columns)
+        self.meta     = {"symbol": symbol, "interval": interval, "asset_type": asset_type}
+        self._data    = {c: np.zeros(2 * self.capacity, np.int64 if c in _TIME_COLS else np.float64) for c in self.columns}
+        self.written  = 0   # rows ever appended; published last
+        self.writing  = 0   # rows appended once the write in progress is done; raised first
+
+    def __len__(self) -> int:
+        return min(self.written, self.capacity)
+
+    @property
+    def last_open_ms(self):
+        return int(self._data["open_time"][(self.written - 1) % self.capacity]) if self.written else None
+
+    # --- one closed candle (dict of column -> value, times in epoch ms); older/duplicate candles are ignored ---
+    def append(self, row: dict) -> bool:
+        t = int(row["open_time"])
+        if self.written and t <= self.last_open_ms:
+            return False
+        k = self.written % self.capacity
+        self.writing = self.written + 1
+        for c, a in self._data.items():
+            a[k] = a[k + self.capacity] = row.get(c, 0)
+        self.written += 1   # publish
+        return True
+
+    # --- many candles at once (load_df-style frame); only rows newer than the last one are taken ---
+    def extend(self, df: pd.DataFrame) -> int:
+        if df.empty:
+            return 0
+        open_ms = to_ms(df["open_time"]).to_numpy(np.int64)
+        keep    = open_ms > self.last_open_ms if self.written else np.ones(len(df), bool)
+        cols    = {c: (to_ms(df[c]).to_numpy(np.int64) if c in _TIME_COLS else df[c].to_numpy(np.float64))[keep]
+                   if c in df.columns else np.zeros(int(keep.sum())) for c in self.columns}
+        n = int(keep.sum())
+        if n == 0:
+            return 0
+        take  = min(n, self.capacity)
+        first = self.written + n - take   # row number of the first row that survives
+        slots = (first + np.arange(take)) % self.capacity
+        self.writing = self.written + n
+        for c, a in self._data.items():
+            v = cols[c][n - take:]
+            a[slots] = v
+            a[slots + self.capacity] = v
+        self.written += n   # publish
+        return n
+
+    # --- newest n rows as zero-copy views: ({column: array}, end) with end = rows written at read time ---
+    def window(self, n: int = None):
+        end = self.written
+        n   = min(len(self) if n is None else n, end, self.capacity)
+        s   = (end - n) % self.capacity
+        return {c: a[s:s + n] for c, a in self._data.items()}, end
+
+    # --- a window read at `end` with n rows is unchanged as long as no row written (or being written)
+    # since has reached its oldest slot: row `writing - 1` overwrites row `writing - 1 - capacity` ---
+    def intact(self, end: int, n: int) -> bool:
+        return self.writing - end <= self.capacity - n
+
+    # --- newest n rows copied out, re-read until no write overlapped the copy: ({column: array}, end) ---
+    def _copy(self, n: int = None):
+        while True:
+            cols, end = self.window(n)
+            out = {c: v.copy() for c, v in cols.items()}
+            if self.intact(end, len(next(iter(out.values()), ()))):
+                return out, end
+
+    # --- newest n rows as a load_df-style DataFrame (a copy, safe to keep) ---
+    def frame(self, n: int = None) -> pd.DataFrame:
+        cols, _ = self._copy(n)
+        df = pd.DataFrame({c: pd.to_datetime(v, unit="ms") if c in _TIME_COLS else v for c, v in cols.items()})
+        df.attrs.update({k: v for k, v in self.meta.items() if v is not None})
+        return df
+
+    # --- npz of the live rows, written to a temp file and renamed so a crash never leaves half a snapshot ---
+    def save(self, path: str) -> None:
+        cols, end = self._copy()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp.{os.getpid()}.{threading.get_ident()}.npz"
+        np.savez(tmp, _capacity=self.capacity, _written=end, _meta=np.array([str(self.meta.get(k) or "") for k in self.meta]),
+                 **{f"col_{c}": v for c, v in cols.items()})
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "CandleRing":
+        with np.load(path) as z:
+            meta = dict(zip(("symbol", "interval", "asset_type"), (m or None for m in z["_meta"].tolist())))
+            cols = [k[4:] for k in z.files if k.startswith("col_")]
+            ring = cls(int(z["_capacity"]), columns=cols, **meta)
+            n    = len(z[f"col_{cols[0]}"]) if cols else 0
+            k0   = int(z["_written"]) - n
+            slots = (k0 + np.arange(n)) % ring.capacity
+            for c in cols:
+                ring._data[c][slots] = z[f"col_{c}"]
+                ring._data[c][slots + ring.capacity] = z[f"col_{c}"]
+            ring.written = ring.writing = int(z["_written"])
+        return ring
+
+
+# --- one ring per (symbol, interval) ---
+class RingStore:
+    def __init__(self, capacity: int = 1024):
+        self.capacity = capacity   # ≥ the longest lookback a live strategy reads (ma_trend 200, mllinreg train_size 500)
+        self.rings    = {}
+        self._lock    = threading.Lock()   # guards ring creation only; appends stay lock-free
+
+    def get(self, symbol: str, interval: str, asset_type: str = "crypto") -> CandleRing:
+        key = (symbol, interval)
+        ring = self.rings.get(key)
+        if ring is None:
+            with self._lock:
+                ring = self.rings.setdefault(key, CandleRing(self.capacity, symbol=symbol, interval=interval, asset_type=asset_type))
+        return ring
+
+    # --- seed from the tail of data/org/... so strategies have their lookback before the first live candle ---
+    def warm(self, symbol: str, interval: str, asset_type: str = "crypto") -> CandleRing:
+        from backtesting.shared.load import load_df
+
+        ring = self.get(symbol, interval, asset_type)
+        ring.extend(load_df(ticker=symbol, timeframe=interval, asset_type=asset_type).tail(self.capacity))
+        return ring
+
+    # --- Binance kline websocket event (as served by shared.replay); only closed candles are stored ---
+    def on_kline(self, event: dict) -> bool:
+        k = event.get("k", event)
+        if not k.get("x", True):
+            return False
+        return self.get(k["s"], k["i"]).append({
+            "open_time": k["t"], "close_time": k["T"],
+            "open_price": float(k["o"]), "high_price": float(k["h"]), "low_price": float(k["l"]), "close_price": float(k["c"]),
+            "volume": float(k["v"]), "quote_asset_volume": float(k["q"]), "number_of_trades": int(k["n"]),
+            "taker_buy_base_asset_volume": float(k["V"]), "taker_buy_quote_asset_volume": float(k["Q"]),
+        })
+
+    def snapshot(self, directory: str) -> list:
+        paths = []
+        for (symbol, interval), ring in list(self.rings.items()):
+            paths.append(f"{directory}/{symbol}_{interval}.npz")
+            ring.save(paths[-1])
+        return paths
+
+    @classmethod
+    def restore(cls, directory: str, capacity: int = 1024) -> "RingStore":
+        store = cls(capacity)
+        if os.path.isdir(directory):
+            for name in sorted(os.listdir(directory)):
+                if name.endswith(".npz") and ".tmp." not in name:
+                    ring = CandleRing.load(f"{directory}/{name}")
+                    store.rings[(ring.meta["symbol"], ring.meta["interval"])] = ring
+        return store
@@ -0,0 +1,174 @@
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+from backtesting.shared.cache import METRIC_COLS, ROBUST_COLS
+
+# --- parameter-robustness surface over a grid search ---
+# The grid is an N-D lattice with one axis per parameter that takes ≥ 2 values. Each metric is
+# scattered into a cube of that shape (NaN where a combo was invalid or never traded) and every
+# combo is scored on its neighbourhood: the box of lattice points within `radius` steps along each
+# numeric axis, itself included. Box sums, counts and minima are separable, so each statistic is
+# one pass of 2·radius + 1 shifted slices per axis over the padded cube — no loop over combos.
+# Categorical axes (strings, bools, None) are never smoothed across (radius 0).
+#
+# robust = neighbourhood mean − penalty · neighbourhood std of Sharpe. A narrow peak among poor
+# neighbours scores below a plateau; combos with fewer than `min_points` observed neighbourhood
+# points (itself included) get NaN and rank last.
+#
+# Combos shared.prune abandoned on max_dd (pruned.csv rows with a drawdown) are known to fail
+# validation but have no metrics. They go on the lattice as known-bad points: Sharpe at min(worst
+# surviving Sharpe, 0), drawdown at the one they had reached when pruned (the full run's is at or
+# below it), so a survivor among pruned neighbours scores as one among poor neighbours would.
+# Combos pruned on min_trades stay unobserved: the full run has them at a few trades' noisy
+# Sharpe, and flooring them moved the top ranks further from the full run than leaving them out.
+
+
+def _numeric(values) -> bool:
+    return all(isinstance(v, (int, float, np.integer, np.floating)) and not isinstance(v, (bool, np.bool_))
+               and not (isinstance(v, float) and math.isnan(v)) for v in values)
+
+
+def _cat(v) -> str:
+    return "" if v is None or (isinstance(v, float) and math.isnan(v)) else str(v)
+
+
+# --- {param: lattice values in order} for every param with ≥ 2 values; grid from run.json, else the CSV ---
+def axes(df: pd.DataFrame, grid: dict = None) -> dict:
+    if grid is None:
+        grid = {c: df[c].drop_duplicates().tolist() for c in df.columns if c not in METRIC_COLS and c not in ROBUST_COLS}
+    out = {}
+    for k, values in grid.items():
+        if k not in df.columns:
+            continue
+        if _numeric(values):
+            values = sorted({float(v) for v in values})
+        else:
+            values = list(dict.fromkeys(_cat(v) for v in values))
+        if len(values) > 1:
+            out[k] = values
+    return out
+
+
+# --- lattice coordinates of each row; rows whose value is off the lattice get -1 ---
+def coords(df: pd.DataFrame, ax: dict) -> np.ndarray:
+    out = np.empty((len(df), len(ax)), dtype=np.int64)
+    for j, (k, values) in enumerate(ax.items()):
+        if isinstance(values[0], float):
+            v   = pd.to_numeric(df[k], errors="coerce").to_numpy(np.float64)
+            lat = np.asarray(values)
+            i   = np.clip(np.searchsorted(lat, v), 0, len(lat) - 1)
+            out[:, j] = np.where(np.isclose(lat[i], v), i, -1)
+        else:
+            pos = {c: i for i, c in enumerate(values)}
+            out[:, j] = [pos.get(_cat(v), -1) for v in df[k]]
+    return out
+
+
+# --- metric values scattered into the lattice; NaN where no row landed ---
+def cube(values, idx: np.ndarray, shape: tuple) -> np.ndarray:
+    c = np.full(shape, np.nan)
+    c[tuple(idx.T)] = values
+    return c
+
+
+# --- separable box reduction: `op` over ±radii[axis] along every axis, `fill` beyond the edges ---
+def _box(a: np.ndarray, radii, op, fill) -> np.ndarray:
+    for axis, r in enumerate(radii):
+        if r == 0:
+            continue
+        pad = [(0, 0)] * a.ndim
+        pad[axis] = (r, r)
+        p   = np.pad(a, pad, constant_values=fill)
+        n   = a.shape[axis]
+        sl  = [slice(None)] * a.ndim
+        sl[axis] = slice(0, n)
+        out = p[tuple(sl)].copy()
+        for s in range(1, 2 * r + 1):
+            sl[axis] = slice(s, s + n)
+            op(out, p[tuple(sl)], out=out)
+        a = out
+    return a
+
+
+# --- NaN-aware neighbourhood count / mean / std / min of a metric cube ---
+def neighbourhood(c: np.ndarray, radii) -> dict:
+    ok = ~np.isnan(c)
+    x  = np.where(ok, c, 0.0)
+    n  = _box(ok.astype(np.float64), radii, np.add, 0.0)
+    s1 = _box(x, radii, np.add, 0.0)
+    s2 = _box(x * x, radii, np.add, 0.0)
+    mn = _box(np.where(ok, c, np.inf), radii, np.minimum, np.inf)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = s1 / n
+        std  = np.sqrt(np.maximum(s2 / n - mean * mean, 0.0))
+    mn[n == 0] = np.nan
+    return {"n": n, "mean": mean, "std": std, "min": mn}
+
+
+# --- grid_search.csv rows + ROBUST_COLS, same order ---
+def score(df: pd.DataFrame, grid: dict = None, metric: str = "sharpe", radius: int = 1, penalty: float = 1.0,
+          min_points: int = 2, pruned: pd.DataFrame = None) -> pd.DataFrame:
+    df = df.reset_index(drop=True).copy()
+    ax = axes(df, grid)
+    if df.empty or not ax:
+        return df.assign(nbr_n=1, sharpe_nbr_min=df.get(metric), sharpe_nbr_mean=df.get(metric), sharpe_nbr_std=0.0,
+                         dd_nbr_min=df.get("max_drawdown"), robust=df.get(metric))
+
+    idx   = coords(df, ax)
+    on    = (idx >= 0).all(axis=1)
+    shape = tuple(len(v) for v in ax.values())
+    radii = [radius if isinstance(v[0], float) else 0 for v in ax.values()]
+    at    = tuple(idx[on].T)
+
+    # several rows on one lattice point (params off the grid axes, e.g. a fixed column that varied) keep the best
+    keep  = np.flatnonzero(on)[np.argsort(-df.loc[on, metric].to_numpy(np.float64), kind="stable")]
+    keep  = keep[~pd.DataFrame(idx[keep]).duplicated().to_numpy()]
+
+    sc = cube(df.loc[keep, metric].to_numpy(np.float64), idx[keep], shape)
+    dc = cube(df.loc[keep, "max_drawdown"].to_numpy(np.float64), idx[keep], shape) if "max_drawdown" in df.columns else None
+    if pruned is not None and "drawdown" in pruned.columns:
+        pruned = pruned[pd.to_numeric(pruned["drawdown"], errors="coerce").notna()]
+    if pruned is not None and len(pruned):
+        bad  = coords(pruned, ax)
+        bon  = (bad >= 0).all(axis=1)
+        free = np.isnan(sc[tuple(bad[bon].T)])   # a surviving row on the same point wins
+        at_b = tuple(bad[bon][free].T)
+        sc[at_b] = min(float(np.nanmin(sc)), 0.0) if (~np.isnan(sc)).any() else 0.0
+        if dc is not None:
+            dc[at_b] = pd.to_numeric(pruned["drawdown"], errors="coerce").to_numpy(np.float64)[bon][free]
+
+    s  = neighbourhood(sc, radii)
+    dd = neighbourhood(dc, radii) if dc is not None else None
+
+    def col(a):
+        out = np.full(len(df), np.nan)
+        out[on] = a[at]
+        return out
+
+    df["nbr_n"]           = col(s["n"])
+    df["sharpe_nbr_min"]  = col(s["min"]).round(2)
+    df["sharpe_nbr_mean"] = col(s["mean"]).round(2)
+    df["sharpe_nbr_std"]  = col(s["std"]).round(2)
+    df["dd_nbr_min"]      = col(dd["min"]).round(2) if dd is not None else np.nan
+    robust = col(s["mean"] - penalty * s["std"])
+    robust[~(df["nbr_n"].to_numpy() >= min_points)] = np.nan
+    df["robust"] = robust.round(3)
+    return df
+
+
+# --- score a run's grid_search.csv, write robust.csv ranked by robustness (ties: train Sharpe) ---
+def analyze(run_dir: str, metric: str = "sharpe", radius: int = 1, penalty: float = 1.0, min_points: int = 2) -> pd.DataFrame:
+    from backtesting.shared.report import read_meta
+
+    df     = pd.read_csv(f"{run_dir}/grid_search.csv")
+    grid   = read_meta(run_dir).get("grid", {}).get("grid")
+    pruned = pd.read_csv(f"{run_dir}/pruned.csv") if os.path.isfile(f"{run_dir}/pruned.csv") else None
+    out    = score(df, grid, metric=metric, radius=radius, penalty=penalty, min_points=min_points, pruned=pruned)
+    out    = out.sort_values(["robust", metric], ascending=False, na_position="last", kind="stable").reset_index(drop=True)
+    tmp    = f"{run_dir}/robust.csv.tmp.{os.getpid()}"
+    out.to_csv(tmp, index=False)
+    os.replace(tmp, f"{run_dir}/robust.csv")
+    return out
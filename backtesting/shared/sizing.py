@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+
+# --- position sizing between signal generation and simulation ---
+# A size is the trade's notional as a fraction of the portfolio (exposure): 0.5 = half the
+# portfolio, 2.0 = 2× levered. Without a size, evaluate_trades falls back to
+# trade_size_pct × leverage, so unsized runs are unchanged.
+#
+# sizing dicts, as passed to run_grid_search / run_validation / run_diagnose:
+#   {"method": "kelly", "fraction": 0.5, "mean_col": "_pred_mean", "std_col": "_pred_std"}
+#   {"method": "vol", "target_vol": 0.5, "window": 96}
+#   {"method": "hit_rate", "fraction": 0.5, "window": 50, "min_trades": 20}
+# plus optional "max_size" (cap, default 1.0) and, for kelly/hit_rate, "target_vol" to also cap
+# each size at the volatility-target size.
+
+BAR_METHODS   = ("kelly", "vol")
+TRADE_METHODS = ("hit_rate",)
+
+
+# --- a config that cannot apply to the strategy's frame (grid / validation loops re-raise it) ---
+class SizingError(ValueError):
+    pass
+
+
+# --- kelly sizes from a per-bar forecast; strategies list the columns they produce under "forecast"
+# in shared.registry. columns: the frame's columns, or that list for a check before loading data ---
+def check_columns(sizing: dict, columns, strategy: str = None) -> None:
+    if not sizing or sizing.get("method") != "kelly":
+        return
+    need = [sizing.get("mean_col", "_pred_mean"), sizing.get("std_col", "_pred_std")]
+    if all(c in columns for c in need):
+        return
+    from backtesting.shared import registry
+
+    makers = [n for n, e in registry.STRATEGIES.items() if set(need) <= set(e.get("forecast", ()))]
+    raise SizingError(f"sizing method=kelly needs forecast columns {', '.join(need)}, which "
+                      f"{strategy or 'this strategy'} does not produce; strategies that do: {', '.join(makers) or 'none'} "
+                      f"(or set mean_col / std_col)")
+
+
+# --- continuous (Gaussian) Kelly from per-bar forecasts: f* = μ / σ², scaled by `fraction` ---
+# Sized in the direction of the bar's signal; a forecast pointing the other way sizes 0.
+def kelly_size(mean, std, direction=None, fraction=0.5) -> np.ndarray:
+    mean = np.asarray(mean, dtype=np.float64)
+    var  = np.asarray(std, dtype=np.float64) ** 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        f = np.where(var > 0, mean / var, 0.0)
+    if direction is not None:
+        d = np.sign(np.asarray(direction, dtype=np.float64))
+        f = np.where(d != 0, f * d, np.abs(f))
+    return np.nan_to_num(np.clip(f * fraction, 0.0, None))
+
+
+# --- volatility targeting: exposure that gives `target_vol` annualised volatility ---
+def vol_target_size(close, target_vol=0.5, window=96, bars_per_year=None, open_time=None) -> np.ndarray:
+    close = pd.Series(np.asarray(close, dtype=np.float64))
+    if bars_per_year is None:
+        bars_per_year = _bars_per_year(open_time) if open_time is not None else 365 * 24 * 4
+    vol = close.pct_change().ewm(span=window, min_periods=max(window // 4, 2)).std().to_numpy() * np.sqrt(bars_per_year)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.nan_to_num(np.where(vol > 0, target_vol / vol, 0.0))
+
+
+def _bars_per_year(open_time) -> float:
+    t = pd.to_datetime(pd.Series(open_time)).to_numpy()
+    step = np.median(np.diff(t).astype("timedelta64[ms]").astype(np.int64)) if len(t) > 1 else 0
+    return 365 * 24 * 3_600_000 / step if step > 0 else 365 * 24 * 4
+
+
+# --- binary Kelly per trade from the hit rate and win/loss ratio of earlier closed trades ---
+# For each trade only trades that exited at or before its entry count (last `window` of them);
+# with fewer than `min_trades` the size is NaN → evaluate_trades' fixed size.
+def hit_rate_size(trades: pd.DataFrame, fraction=0.5, window=50, min_trades=20) -> np.ndarray:
+    n = len(trades)
+    if n == 0:
+        return np.zeros(0)
+    ret   = (trades["signal"] * (trades["exit_price"] - trades["entry_price"]) / trades["entry_price"]).to_numpy(np.float64)
+    order = np.argsort(trades["exit_time"].to_numpy(), kind="stable")
+    exits = trades["exit_time"].to_numpy()[order]
+    r     = ret[order]
+    wins  = np.r_[0, np.cumsum(r > 0)]
+    gain  = np.r_[0.0, np.cumsum(np.where(r > 0, r, 0.0))]
+    loss  = np.r_[0.0, np.cumsum(np.where(r <= 0, -r, 0.0))]
+
+    hi = np.searchsorted(exits, trades["entry_time"].to_numpy(), side="right")
+    lo = np.maximum(hi - window, 0) if window else np.zeros_like(hi)
+    k  = hi - lo
+    w  = wins[hi] - wins[lo]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = w / k
+        b = ((gain[hi] - gain[lo]) / w) / ((loss[hi] - loss[lo]) / (k - w))   # avg win / avg loss
+        f = np.where(b > 0, p - (1 - p) / b, np.where(w == k, 1.0, 0.0))
+    size = np.clip(np.nan_to_num(f) * fraction, 0.0, None)
+    return np.where(k >= min_trades, size, np.nan)
+
+
+# --- bar-level stage: df (windowed, shared) -> copy with a `size` column; no-op for trade-level methods ---
+def size_bars(df: pd.DataFrame, sizing: dict = None) -> pd.DataFrame:
+    check_columns(sizing, df.columns)
+    if not sizing or sizing.get("method") not in BAR_METHODS or df.empty:
+        return df
+    s = dict(sizing)
+    method, max_size = s.pop("method"), s.pop("max_size", 1.0)
+    if method == "kelly":
+        size = kelly_size(df[s.get("mean_col", "_pred_mean")], df[s.get("std_col", "_pred_std")],
+                          direction=df["signal"], fraction=s.get("fraction", 0.5))
+        if "target_vol" in s:
+            size = np.minimum(size, _vol(df, s))
+    else:
+        size = _vol(df, s)
+    return df.assign(size=np.clip(size, 0.0, max_size))
+
+
+def _vol(df: pd.DataFrame, s: dict) -> np.ndarray:
+    return vol_target_size(df["close_price"], target_vol=s.get("target_vol", 0.5), window=s.get("window", 96),
+                           bars_per_year=s.get("bars_per_year"), open_time=df["open_time"])
+
+
+# --- trade-level stage: trades -> trades with `size`; no-op for bar-level methods ---
+# target_vol caps come from the bars, so they need the (windowed) df the trades were simulated on.
+def size_trades(trades: pd.DataFrame, sizing: dict = None, df: pd.DataFrame = None) -> pd.DataFrame:
+    if not sizing or sizing.get("method") not in TRADE_METHODS or trades.empty:
+        return trades
+    s = dict(sizing)
+    size = hit_rate_size(trades, fraction=s.get("fraction", 0.5), window=s.get("window", 50),
+                         min_trades=s.get("min_trades", 20))
+    if "target_vol" in s and df is not None:
+        cap  = pd.Series(_vol(df, s), index=df["open_time"].to_numpy())
+        size = np.fmin(size, cap.reindex(trades["entry_time"].to_numpy()).to_numpy())
+    return trades.assign(size=np.clip(size, 0.0, s.get("max_size", 1.0)))
+
+
+def describe(sizing: dict = None) -> str:
+    if not sizing:
+        return "fixed"
+    return ", ".join(f"{k}={v}" for k, v in sizing.items())
@@ -0,0 +1,255 @@
+import json
+import math
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+# --- incremental strategy state that restarts from a snapshot instead of a full replay ---
+# Every component updates in O(1) (O(d²) for regressions) per closed candle and exposes its whole
+# state as a flat dict of arrays/scalars. An Engine runs named components over candles and saves
+# them all into one npz (temp file + rename, so a crash never leaves a torn snapshot); restoring
+# is one np.load. check() rebuilds the same engine from the full history and compares state.
+# Recent candles are snapshotted alongside with shared.ringbuffer (RingStore.snapshot).
+
+
+class RollingMean:
+    def __init__(self, window: int, col: str = "close_price"):
+        self.window, self.col = int(window), col
+        self.buf   = np.zeros(self.window)
+        self.n     = 0       # values seen
+        self.total = 0.0
+
+    def update(self, row) -> float:
+        x = float(row[self.col])
+        k = self.n % self.window
+        self.total += x - (self.buf[k] if self.n >= self.window else 0.0)
+        self.buf[k] = x
+        self.n += 1
+        return self.total / self.window if self.n >= self.window else math.nan
+
+    def params(self) -> dict:
+        return {"window": self.window, "col": self.col}
+
+    def state(self) -> dict:
+        return {"buf": self.buf, "n": self.n, "total": self.total}
+
+
+# --- pandas ewm(com=..., adjust=True, min_periods=...).mean(), one value at a time ---
+class EWMMean:
+    def __init__(self, com: float, min_periods: int = 0, col: str = None):
+        self.com, self.min_periods, self.col = float(com), int(min_periods), col
+        self.num = self.den = 0.0
+        self.nobs = 0
+
+    def update(self, row) -> float:
+        x = float(row[self.col]) if self.col else float(row)
+        decay = self.com / (1.0 + self.com)
+        self.num *= decay
+        self.den *= decay
+        if not math.isnan(x):
+            self.num += x
+            self.den += 1.0
+            self.nobs += 1
+        return self.num / self.den if self.nobs >= max(self.min_periods, 1) else math.nan
+
+    def params(self) -> dict:
+        return {"com": self.com, "min_periods": self.min_periods, "col": self.col}
+
+    def state(self) -> dict:
+        return {"num": self.num, "den": self.den, "nobs": self.nobs}
+
+
+# --- RSI on EWM(com=window-1) gain/loss averages, as macrossover's _ewm_rsi ---
+class EWMRSI:
+    def __init__(self, window: int = 14, col: str = "close_price"):
+        self.window, self.col = int(window), col
+        self.gain = EWMMean(self.window - 1, self.window)
+        self.loss = EWMMean(self.window - 1, self.window)
+        self.prev = math.nan
+
+    def update(self, row) -> float:
+        x = float(row[self.col])
+        d = x - self.prev
+        self.prev = x
+        g, l = self.gain.update(max(d, 0.0) if not math.isnan(d) else math.nan), self.loss.update(max(-d, 0.0) if not math.isnan(d) else math.nan)
+        return 100 - 100 / (1 + g / l) if l else (100.0 if g else math.nan)
+
+    def params(self) -> dict:
+        return {"window": self.window, "col": self.col}
+
+    def state(self) -> dict:
+        return {"prev": self.prev, **{f"gain_{k}": v for k, v in self.gain.state().items()},
+                **{f"loss_{k}": v for k, v in self.loss.state().items()}}
+
+    def restore(self, state: dict) -> None:
+        self.prev = float(state["prev"])
+        _restore(self.gain, {k[5:]: v for k, v in state.items() if k.startswith("gain_")})
+        _restore(self.loss, {k[5:]: v for k, v in state.items() if k.startswith("loss_")})
+
+
+# --- least squares over the last `window` (x, y) rows from XᵀX / Xᵀy kept up to date ---
+# Adding the newest row and removing the one that leaves is O(d²); solve() is the walk-forward
+# refit without touching the history. Rows are fed by the caller: update(x, y).
+class RollingRegression:
+    def __init__(self, d: int, window: int):
+        self.d, self.window = int(d), int(window)
+        self.X   = np.zeros((self.window, self.d))
+        self.y   = np.zeros(self.window)
+        self.XtX = np.zeros((self.d, self.d))
+        self.Xty = np.zeros(self.d)
+        self.n   = 0
+
+    def update(self, x, y) -> None:
+        x = np.asarray(x, dtype=np.float64)
+        k = self.n % self.window
+        if self.n >= self.window:
+            self.XtX -= np.outer(self.X[k], self.X[k])
+            self.Xty -= self.X[k] * self.y[k]
+        self.XtX += np.outer(x, x)
+        self.Xty += x * y
+        self.X[k], self.y[k] = x, y
+        self.n += 1
+
+    def solve(self) -> np.ndarray:
+        return np.linalg.lstsq(self.XtX, self.Xty, rcond=None)[0]
+
+    def params(self) -> dict:
+        return {"d": self.d, "window": self.window}
+
+    def state(self) -> dict:
+        return {"X": self.X, "y": self.y, "XtX": self.XtX, "Xty": self.Xty, "n": self.n}
+
+
+# --- one position, stepped bar by bar with simulate_trades' close-based exit rules ---
+# Exits in priority tp, sl, timeout, opposite signal; an opposite signal reopens on the same bar,
+# any other exit waits for the next signal bar. Closed trades are returned by update().
+class PositionState:
+    def __init__(self, tp_pct: float = None, sl_pct: float = None, max_candles: int = None):
+        self.tp_pct, self.sl_pct = tp_pct, sl_pct
+        self.max_candles = int(max_candles) if max_candles is not None else None
+        self.side, self.entry_price, self.entry_time, self.held = 0, math.nan, 0, 0
+
+    def update(self, row):
+        close, sig, t = float(row["close_price"]), int(row["signal"]), int(row["open_time"])
+        closed = None
+        if self.side != 0:
+            self.held += 1
+            ret = self.side * (close - self.entry_price) / self.entry_price
+            reason = ("tp" if self.tp_pct is not None and ret >= self.tp_pct else
+                      "sl" if self.sl_pct is not None and ret <= -self.sl_pct else
+                      "timeout" if self.max_candles is not None and self.held >= self.max_candles else
+                      "signal" if sig == -self.side else None)
+            if reason is None:
+                return None
+            closed = {"entry_time": self.entry_time, "exit_time": t, "entry_price": self.entry_price, "exit_price": close,
+                      "signal": self.side, "candles": self.held, "exit_reason": reason}
+            self.side = 0
+            if reason != "signal":
+                return closed
+        if sig != 0:
+            self.side, self.entry_price, self.entry_time, self.held = sig, close, t, 0
+        return closed
+
+    def params(self) -> dict:
+        return {"tp_pct": self.tp_pct, "sl_pct": self.sl_pct, "max_candles": self.max_candles}
+
+    def state(self) -> dict:
+        return {"side": self.side, "entry_price": self.entry_price, "entry_time": self.entry_time, "held": self.held}
+
+
+COMPONENTS = {c.__name__: c for c in (RollingMean, EWMMean, EWMRSI, RollingRegression, PositionState)}
+
+
+def _restore(component, state: dict) -> None:
+    if hasattr(component, "restore"):
+        component.restore(state)
+        return
+    for k, v in state.items():
+        cur = getattr(component, k)
+        setattr(component, k, np.array(v, dtype=cur.dtype) if isinstance(cur, np.ndarray) else type(cur)(v))
+
+
+# --- named components stepped together over closed candles ---
+class Engine:
+    def __init__(self, components: dict):
+        self.components = dict(components)
+        self.bars       = 0          # candles processed
+        self.last_time  = None       # open_time (ms) of the last candle
+
+    # --- one candle (dict / Series with load_df columns, open_time in ms) -> {name: output} ---
+    def update(self, row) -> dict:
+        out = {name: c.update(row) for name, c in self.components.items()}
+        self.bars += 1
+        self.last_time = int(row["open_time"])
+        return out
+
+    # --- feed a frame; every output per candle as a DataFrame ---
+    def replay(self, df: pd.DataFrame) -> pd.DataFrame:
+        rows = _rows(df)
+        return pd.DataFrame([self.update(r) for r in rows], index=df.index[:len(rows)])
+
+    def save(self, path: str, extra: dict = None) -> None:
+        arrays = {"_meta": np.array(json.dumps({
+            "bars": self.bars, "last_time": self.last_time, "saved_at": time.time(),
+            "components": {n: [type(c).__name__, c.params()] for n, c in self.components.items()},
+        }))}
+        for name, c in self.components.items():
+            arrays |= {f"{name}.{k}": np.asarray(v if v is not None else math.nan) for k, v in c.state().items()}
+        for k, v in (extra or {}).items():
+            arrays[f"_extra.{k}"] = np.asarray(v)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp.{os.getpid()}.{threading.get_ident()}.npz"
+        np.savez(tmp, **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "Engine":
+        with np.load(path) as z:
+            meta = json.loads(str(z["_meta"]))
+            eng  = cls({n: COMPONENTS[kind](**params) for n, (kind, params) in meta["components"].items()})
+            for name, c in eng.components.items():
+                _restore(c, {k.split(".", 1)[1]: z[k] for k in z.files if k.startswith(f"{name}.")})
+            eng.extra = {k[7:]: z[k] for k in z.files if k.startswith("_extra.")}
+        eng.bars, eng.last_time = meta["bars"], meta["last_time"]
+        return eng
+
+
+def _rows(df: pd.DataFrame) -> list:
+    from backtesting.shared.load import to_ms
+
+    d = df.copy()
+    for c in ("open_time", "close_time"):
+        if c in d.columns:
+            d[c] = to_ms(d[c])
+    return d.to_dict("records")
+
+
+# --- save every `every_bars` candles or `every_s` seconds, whichever comes first ---
+class SnapshotWriter:
+    def __init__(self, path: str, every_bars: int = 100, every_s: float = 60.0):
+        self.path, self.every_bars, self.every_s = path, every_bars, every_s
+        self._bars, self._t = None, time.monotonic()
+
+    def maybe_save(self, engine: Engine, extra: dict = None) -> bool:
+        if self._bars is not None and engine.bars - self._bars < self.every_bars and time.monotonic() - self._t < self.every_s:
+            return False
+        engine.save(self.path, extra)
+        self._bars, self._t = engine.bars, time.monotonic()
+        return True
+
+
+# --- restored engine vs a fresh one replayed over the whole history: {component: max abs diff} ---
+# `history` is every candle the restored engine has seen plus any fed after the restore.
+def check(engine: Engine, history: pd.DataFrame, make_engine, rtol: float = 1e-9) -> dict:
+    fresh = make_engine()
+    fresh.replay(history.iloc[:engine.bars])
+    bad = {}
+    for name, c in engine.components.items():
+        for k, v in c.state().items():
+            a, b = np.asarray(v, dtype=np.float64), np.asarray(fresh.components[name].state()[k], dtype=np.float64)
+            if a.shape != b.shape or not np.allclose(a, b, rtol=rtol, atol=1e-12, equal_nan=True):
+                bad[f"{name}.{k}"] = float(np.nanmax(np.abs(a - b))) if a.shape == b.shape else math.inf
+    return bad
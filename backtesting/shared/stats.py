@@ -0,0 +1,214 @@
+import math
+import os
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from backtesting.shared.load import to_ms
+
+# --- selection-bias statistics over every combo a grid search (or a whole sweep) tried ---
+# run_grid_search stores each combo's trade returns (pnl / init_portfolio) in returns.npz as one
+# CSR-style column set — ret / entry_ms / exit_ms concatenated over combos plus indptr, row i ↔
+# row i of grid_search.csv. Everything below works on those flat arrays with bincount / matrix ops:
+#
+#   psr              probabilistic Sharpe ratio — P(true per-trade SR > sr_star) given n, skew, kurtosis
+#   effective_trials participation ratio N² / ‖C‖²_F of the combos' bucketed return correlations,
+#                    with the sampling-noise part of ‖C‖²_F removed — correlated combos count once
+#   deflate          DSR = PSR against the expected maximum SR of N_eff independent unskilled trials
+#   cpcv_splits/pbo  combinatorially purged CV over time buckets and the probability that the
+#                    in-sample winner ends up below the out-of-sample median
+#
+# Sharpe here is per trade (mean / std of trade returns), i.e. grid_search.csv's sharpe / √trades.
+
+_EULER_GAMMA = 0.5772156649015329
+
+
+# --- returns.npz: one row per grid_search.csv row, in the same order ---
+def save_returns(run_dir: str, trades: list, init_portfolio: float, start: str, end: str) -> str:
+    n      = np.array([len(t) for t in trades], dtype=np.int64)
+    indptr = np.concatenate([[0], np.cumsum(n)])
+    cat    = lambda f: np.concatenate([f(t) for t in trades]) if len(trades) else np.empty(0)
+    arrays = {
+        "indptr":   indptr,
+        "ret":      cat(lambda t: (t["pnl"] / init_portfolio).to_numpy(np.float32)).astype(np.float32),
+        "entry_ms": cat(lambda t: to_ms(t["entry_time"]).to_numpy(np.int64)).astype(np.int64),
+        "exit_ms":  cat(lambda t: to_ms(t["exit_time"]).to_numpy(np.int64)).astype(np.int64),
+        "start_ms": np.int64(to_ms(pd.Series([start])).iloc[0]),
+        "end_ms":   np.int64(to_ms(pd.Series([end])).iloc[0]),
+    }
+    path = f"{run_dir}/returns.npz"
+    tmp  = f"{path}.tmp.{os.getpid()}.npz"
+    np.savez_compressed(tmp, **arrays)
+    os.replace(tmp, path)
+    return path
+
+
+def load_returns(run_dir: str) -> dict:
+    with np.load(f"{run_dir}/returns.npz") as z:
+        return {k: z[k] for k in z.files}
+
+
+# --- several runs' returns as one CSR set (combos of run k follow those of run k-1) ---
+def concat_returns(parts: list) -> dict:
+    out = {k: np.concatenate([p[k] for p in parts]) for k in ("ret", "entry_ms", "exit_ms")}
+    ends = np.cumsum([p["indptr"][-1] for p in parts])
+    out["indptr"]   = np.concatenate([[0]] + [p["indptr"][1:] + off for p, off in zip(parts, np.r_[0, ends[:-1]])])
+    out["start_ms"] = min(int(p["start_ms"]) for p in parts)
+    out["end_ms"]   = max(int(p["end_ms"]) for p in parts)
+    return out
+
+
+def _rows(indptr: np.ndarray) -> np.ndarray:
+    return np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+
+
+# --- per-combo n, mean, std (ddof=1), skew, kurtosis (non-excess) of the trade returns ---
+def moments(ret: np.ndarray, indptr: np.ndarray) -> dict:
+    k   = len(indptr) - 1
+    row = _rows(indptr)
+    x   = ret.astype(np.float64)
+    n   = np.diff(indptr).astype(np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.bincount(row, x, k) / n
+        d    = x - mean[row]
+        m2   = np.bincount(row, d * d, k) / n
+        m3   = np.bincount(row, d ** 3, k) / n
+        m4   = np.bincount(row, d ** 4, k) / n
+        std  = np.sqrt(m2 * n / (n - 1))
+        skew = np.where(m2 > 0, m3 / m2 ** 1.5, 0.0)
+        kurt = np.where(m2 > 0, m4 / (m2 * m2), 3.0)
+    return {"n": n, "mean": mean, "std": std, "skew": skew, "kurt": kurt}
+
+
+def sharpe(m: dict) -> np.ndarray:
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(m["std"] > 0, m["mean"] / m["std"], 0.0)
+
+
+# --- P(SR > sr_star) for an observed per-trade SR over n trades (Bailey & López de Prado) ---
+def psr(sr, n, skew, kurt, sr_star=0.0) -> np.ndarray:
+    from scipy.special import ndtr   # lazy, like stdtr in bayeslinreg
+
+    sr, n = np.asarray(sr, np.float64), np.asarray(n, np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        den = np.sqrt(np.maximum(1 - skew * sr + (kurt - 1) / 4 * sr * sr, 1e-12))
+        out = ndtr((sr - sr_star) * np.sqrt(n - 1) / den)
+    return np.where(n > 1, out, np.nan)
+
+
+# --- E[max SR] of n_trials independent zero-skill trials whose SRs vary with variance sr_var ---
+def expected_max_sr(sr_var: float, n_trials: float) -> float:
+    from scipy.special import ndtri
+
+    if n_trials <= 1 or not sr_var > 0:
+        return 0.0
+    return math.sqrt(sr_var) * ((1 - _EULER_GAMMA) * ndtri(1 - 1 / n_trials) + _EULER_GAMMA * ndtri(1 - 1 / (n_trials * math.e)))
+
+
+# --- combos × time buckets of summed trade returns, bucketed by exit time ---
+def bucket_matrix(r: dict, n_buckets: int = 256) -> np.ndarray:
+    k     = len(r["indptr"]) - 1
+    span  = max(int(r["end_ms"]) - int(r["start_ms"]), 1)
+    b     = np.clip((r["exit_ms"] - int(r["start_ms"])) * n_buckets // span, 0, n_buckets - 1)
+    flat  = np.bincount(_rows(r["indptr"]) * n_buckets + b, r["ret"].astype(np.float64), k * n_buckets)
+    return flat.reshape(k, n_buckets)
+
+
+# --- N² / ‖C‖²_F over combos with any variance; E‖C‖²_F of independent series (N + N(N-1)/(B-1)) is discounted ---
+def effective_trials(m: np.ndarray) -> float:
+    m  = m[m.std(axis=1) > 0]
+    n, b = m.shape
+    if n <= 1 or b <= 2:
+        return float(n)
+    z  = (m - m.mean(axis=1, keepdims=True)) / m.std(axis=1, keepdims=True)
+    g  = (z @ z.T) if n <= b else (z.T @ z)   # same Frobenius norm: ‖ZZᵀ‖ = ‖ZᵀZ‖
+    fro = float((g * g).sum()) / (b * b)
+    noise = n * (n - 1) / (b - 1)
+    return float(min(n, n * n / max(fro - noise, n)))
+
+
+# --- every combination of n_test of n_groups contiguous bucket groups as the test set ---
+# Train buckets within `purge` buckets of a test group (trades spanning the boundary) and the
+# `embargo` buckets after it are dropped.
+def cpcv_splits(n_obs: int, n_groups: int = 6, n_test: int = 2, purge: int = 0, embargo: int = 0) -> list:
+    bounds = np.linspace(0, n_obs, n_groups + 1).astype(int)
+    splits = []
+    for test in combinations(range(n_groups), n_test):
+        is_test = np.zeros(n_obs, bool)
+        drop    = np.zeros(n_obs, bool)
+        for g in test:
+            a, b = bounds[g], bounds[g + 1]
+            is_test[a:b] = True
+            drop[max(a - purge, 0):a] = True
+            drop[b:min(b + purge + embargo, n_obs)] = True
+        splits.append((np.flatnonzero(~is_test & ~drop), np.flatnonzero(is_test)))
+    return splits
+
+
+# --- probability of backtest overfitting: in-sample best combo's OOS rank ≤ median, over the splits ---
+def pbo(m: np.ndarray, splits: list) -> dict:
+    logits, oos = [], []
+    n = len(m)
+    if n < 2:
+        return {"pbo": math.nan, "logits": np.array([]), "oos_sr": np.array([])}
+    for train, test in splits:
+        if len(train) < 2 or len(test) < 2:   # purge swallowed the train side
+            continue
+        with np.errstate(invalid="ignore", divide="ignore"):
+            is_sr  = np.nan_to_num(m[:, train].mean(axis=1) / m[:, train].std(axis=1))
+            oos_sr = np.nan_to_num(m[:, test].mean(axis=1) / m[:, test].std(axis=1))
+        best = int(np.argmax(is_sr))
+        w    = (np.sum(oos_sr < oos_sr[best]) + 0.5 * np.sum(oos_sr == oos_sr[best]) + 0.5) / (n + 1)
+        logits.append(math.log(w / (1 - w)))
+        oos.append(oos_sr[best])
+    logits = np.array(logits)
+    return {"pbo": float((logits <= 0).mean()) if len(logits) else math.nan, "logits": logits, "oos_sr": np.array(oos)}
+
+
+# --- PSR / DSR per combo plus the trial summary, for one run's or many runs' returns ---
+# Combos with fewer than min_trades trades are not trials (their SRs are mostly noise) and get NaN.
+# pruned_trials: combos shared.prune abandoned that would have been trials. Their returns are
+# unknown, so they raise N and N_eff at the observed trials' redundancy (N_eff / N); sr_var and
+# PBO stay those of the observed trials.
+def deflate(r: dict, n_buckets: int = 256, n_groups: int = 6, n_test: int = 2, embargo_pct: float = 0.01,
+            min_trades: int = 5, pruned_trials: int = 0) -> tuple:
+    m   = moments(r["ret"], r["indptr"])
+    sr  = sharpe(m)
+    ok  = m["n"] >= max(min_trades, 2)
+    mat = bucket_matrix(r, n_buckets)
+
+    n_seen   = int(ok.sum())
+    n_trials = n_seen + int(pruned_trials)
+    n_eff    = effective_trials(mat[ok]) * n_trials / n_seen if n_seen else float(n_trials)
+    sr_var   = float(np.var(sr[ok], ddof=1)) if n_seen > 1 else 0.0
+    sr_star  = expected_max_sr(sr_var, n_eff)
+
+    width   = max(int(r["end_ms"]) - int(r["start_ms"]), 1) / n_buckets
+    hold    = (r["exit_ms"] - r["entry_ms"]).max() if len(r["ret"]) else 0
+    splits  = cpcv_splits(n_buckets, n_groups, n_test, purge=int(math.ceil(hold / width)),
+                          embargo=int(math.ceil(embargo_pct * n_buckets)))
+    cv      = pbo(mat[ok], splits)
+
+    per_combo = pd.DataFrame({
+        "sr_trade": sr.round(4),
+        "psr": np.where(ok, psr(sr, m["n"], m["skew"], m["kurt"]), np.nan).round(3),
+        "dsr": np.where(ok, psr(sr, m["n"], m["skew"], m["kurt"], sr_star), np.nan).round(3),
+    })
+    summary = {
+        "n_trials": n_trials, "n_eff": round(n_eff, 1), "sr_var": sr_var, "sr_star": round(sr_star, 4),
+        "pruned_trials": int(pruned_trials),
+        "best_dsr": float(per_combo["dsr"].max()) if n_seen else None,
+        "pbo": None if math.isnan(cv["pbo"]) else round(cv["pbo"], 3),
+        "cpcv_splits": len(splits), "cpcv_oos_sr": round(float(np.median(cv["oos_sr"])), 4) if len(cv["oos_sr"]) else None,
+    }
+    return per_combo, summary
+
+
+def describe(summary: dict) -> str:
+    if not summary or summary.get("best_dsr") is None:
+        return "no combo traded often enough to count as a trial"
+    pbo_txt = "–" if summary["pbo"] is None else f"{summary['pbo']:.2f}"
+    pruned = f", {summary['pruned_trials']} pruned" if summary.get("pruned_trials") else ""
+    return (f"{summary['n_trials']} trials (≈{summary['n_eff']:g} effective{pruned}) · SR* {summary['sr_star']:.3f}/trade · "
+            f"best DSR {summary['best_dsr']:.2f} · PBO {pbo_txt} ({summary['cpcv_splits']} CPCV splits)")
@@ -0,0 +1,244 @@
+import hashlib
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from rich.console import Console
+
+from backtesting.shared.cache import METRIC_COLS
+
+_console = Console()
+
+# One SQLite file indexing every grid search / validation / diagnose result under results/.
+# The per-run CSV/Markdown artifacts are still written next to it; this is the queryable copy.
+DB_PATH = "results/results.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id        INTEGER PRIMARY KEY,
+    run_dir       TEXT UNIQUE NOT NULL,
+    strategy      TEXT NOT NULL,      -- results/<strategy>/...
+    strategy_name TEXT,
+    symbol        TEXT NOT NULL,
+    interval      TEXT NOT NULL,
+    run_date      TEXT NOT NULL,      -- YYYYMMDD from the run directory name
+    train_start   TEXT,
+    train_end     TEXT,
+    created_at    TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_lookup ON runs (strategy, symbol, interval, run_date);
+
+CREATE TABLE IF NOT EXISTS results (
+    id            INTEGER PRIMARY KEY,
+    run_id        INTEGER NOT NULL REFERENCES runs (run_id),
+    kind          TEXT NOT NULL,      -- grid | validate | diagnose
+    symbol        TEXT NOT NULL,
+    window_start  TEXT,
+    window_end    TEXT,
+    params        TEXT NOT NULL,      -- JSON, sorted keys
+    params_hash   TEXT NOT NULL,
+    trades        INTEGER,
+    win_rate      REAL,
+    total_pnl     REAL,
+    sharpe        REAL,
+    max_drawdown  REAL,
+    final_portf   REAL,
+    avg_candles   REAL,
+    passed        INTEGER
+);
+CREATE INDEX IF NOT EXISTS results_run    ON results (run_id, kind);
+CREATE INDEX IF NOT EXISTS results_sharpe ON results (kind, sharpe);
+CREATE INDEX IF NOT EXISTS results_params ON results (params_hash);
+"""
+
+# validate.csv column -> results column
+_VALIDATE_METRICS = {"test_n": "trades", "test_wr%": "win_rate", "test_pnl": "total_pnl",
+                     "test_sharpe": "sharpe", "test_dd%": "max_drawdown"}
+_METRIC_FIELDS = ["trades", "win_rate", "total_pnl", "sharpe", "max_drawdown", "final_portf", "avg_candles"]
+
+
+# --- `with connect() as conn:` commits on success, rolls back on error, and always closes ---
+@contextmanager
+def connect(db_path: str = DB_PATH):
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def _plain(v):
+    if isinstance(v, (np.bool_, bool)):
+        return bool(v)
+    if isinstance(v, np.integer):
+        return int(v)
+    if isinstance(v, np.floating):
+        return None if np.isnan(v) else float(v)
+    return v
+
+
+def _params_json(params: dict) -> str:
+    return json.dumps({k: _plain(v) for k, v in params.items()}, sort_keys=True)
+
+
+# --- <YYYYMMDD>_<SYMBOL>_<interval>_<NN> -> (date, symbol, interval), or None for any other name ---
+def parse_run_dir(run_dir: str):
+    parts = os.path.basename(run_dir.rstrip("/")).split("_", 3)
+    if len(parts) != 4 or not (len(parts[0]) == 8 and parts[0].isdigit()):
+        return None
+    return tuple(parts[:3])
+
+
+# --- results/<strategy>/<YYYYMMDD>_<SYMBOL>_<interval>_<NN> -> run row (created on first sight) ---
+def register_run(conn, run_dir: str, strategy_name: str = None, train_start: str = None, train_end: str = None) -> int:
+    run_dir = run_dir.rstrip("/")
+    parsed  = parse_run_dir(run_dir)
+    if parsed is None:
+        raise ValueError(f"run directory {run_dir!r} is not named <YYYYMMDD>_<SYMBOL>_<interval>_<NN>")
+    date, symbol, interval = parsed
+    conn.execute(
+        "INSERT OR IGNORE INTO runs (run_dir, strategy, strategy_name, symbol, interval, run_date, train_start, train_end, created_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (run_dir, os.path.basename(os.path.dirname(run_dir)), strategy_name, symbol, interval, date,
+         train_start, train_end, datetime.now().isoformat(timespec="seconds")),
+    )
+    if train_start is not None:
+        conn.execute("UPDATE runs SET train_start = ?, train_end = ?, strategy_name = COALESCE(?, strategy_name) WHERE run_dir = ?",
+                     (train_start, train_end, strategy_name, run_dir))
+    return conn.execute("SELECT run_id FROM runs WHERE run_dir = ?", (run_dir,)).fetchone()[0]
+
+
+# --- replace the `kind` results of a run with `records` (dicts: params, symbol, window_*, metric fields) ---
+def record_results(run_dir: str, kind: str, records: list, strategy_name: str = None,
+                   train_start: str = None, train_end: str = None, db_path: str = DB_PATH) -> None:
+    with connect(db_path) as conn:
+        run_id = register_run(conn, run_dir, strategy_name, train_start, train_end)
+        conn.execute("DELETE FROM results WHERE run_id = ? AND kind = ?", (run_id, kind))
+        rows = []
+        for r in records:
+            pj = _params_json(r["params"])
+            rows.append((run_id, kind, r["symbol"], r.get("window_start"), r.get("window_end"), pj,
+                         hashlib.sha1(pj.encode()).hexdigest()[:16],
+                         *[_plain(r.get(f)) for f in _METRIC_FIELDS],
+                         None if r.get("passed") is None else int(r["passed"])))
+        conn.executemany(
+            f"INSERT INTO results (run_id, kind, symbol, window_start, window_end, params, params_hash, "
+            f"{', '.join(_METRIC_FIELDS)}, passed) VALUES ({', '.join('?' * (8 + len(_METRIC_FIELDS)))})",
+            rows,
+        )
+
+
+def grid_records(df_results: pd.DataFrame, symbol: str, train_start: str, train_end: str) -> list:
+    param_cols = [c for c in df_results.columns if c not in METRIC_COLS]
+    return [
+        {"params": {c: row[c] for c in param_cols}, "symbol": symbol,
+         "window_start": train_start, "window_end": train_end,
+         **{c: row[c] for c in METRIC_COLS if c in row}}
+        for _, row in df_results.iterrows()
+    ]
+
+
+# params: full grid params per row (validate.csv only carries make_param_row's short names)
+def validate_records(df_out: pd.DataFrame, symbol: str, window: tuple = None, params: list = None) -> list:
+    skip = set(_VALIDATE_METRICS) | {"pass", "train_sharpe", "train_robust", "train_dsr", "symbol", "window"}
+    out = []
+    for i, (_, row) in enumerate(df_out.iterrows()):
+        if str(row.get("pass", "")).startswith("ERROR"):
+            continue
+        start, end = str(row["window"]).split(" → ") if "window" in row else (window or (None, None))
+        out.append({
+            "params": params[i] if params else {c: row[c] for c in df_out.columns if c not in skip},
+            "symbol": row.get("symbol", symbol), "window_start": start, "window_end": end,
+            **{dst: row[src] for src, dst in _VALIDATE_METRICS.items() if src in row},
+            "passed": row.get("pass") == "YES",
+        })
+    return out
+
+
+# --- newest run directory of a strategy that has a grid_search.csv, or None if there is none ---
+# Indexed runs and the directories under runs_base are both candidates, so a run the store never
+# registered (an interrupted write, a copied-in directory) still wins when it is newer. Run names
+# start with YYYYMMDD, so the newest is the largest name — the same order as the store's query.
+def latest_run(runs_base: str, db_path: str = DB_PATH):
+    runs_base = runs_base.rstrip("/")
+    found = []
+    if os.path.isfile(db_path):
+        with connect(db_path) as conn:
+            found = [r for (r,) in conn.execute("SELECT run_dir FROM runs WHERE strategy = ?",
+                                                (os.path.basename(runs_base),))]
+    if os.path.isdir(runs_base):
+        found += [f"{runs_base}/{d}" for d in os.listdir(runs_base)]
+    found = [r for r in found if os.path.isfile(f"{r}/grid_search.csv")]
+    return max(found, key=lambda r: (os.path.basename(r), r)) if found else None
+
+
+def query(sql: str, params: tuple = (), db_path: str = DB_PATH) -> pd.DataFrame:
+    with connect(db_path) as conn:
+        return pd.read_sql_query(sql, conn, params=params)
+
+
+# columns best_by may group / filter on: runs (u) and results (x); symbol is the result's
+_RUN_COLS    = ("strategy", "strategy_name", "interval", "run_date", "run_dir", "train_start", "train_end")
+_RESULT_COLS = ("kind", "symbol", "window_start", "window_end", "params_hash", "passed", *_METRIC_FIELDS)
+
+
+def _column(name: str) -> str:
+    if name in _RUN_COLS:
+        return f"u.{name}"
+    if name in _RESULT_COLS:
+        return f"x.{name}"
+    raise ValueError(f"unknown column {name!r}; known: {', '.join(_RUN_COLS + _RESULT_COLS)}")
+
+
+# --- best row per group across all runs, e.g. best test Sharpe per strategy per interval ---
+# where: {column: value} (a list / tuple → any of the values), bound as query parameters
+def best_by(kind: str = "validate", metric: str = "sharpe", group_by=("strategy", "interval"),
+            where: dict = None, db_path: str = DB_PATH) -> pd.DataFrame:
+    if metric not in _METRIC_FIELDS:
+        raise ValueError(f"unknown metric {metric!r}; known: {', '.join(_METRIC_FIELDS)}")
+    groups = ", ".join(_column(g) for g in group_by)
+    conds, args = ["x.kind = ?"], [kind]
+    for col, value in (where or {}).items():
+        values = list(value) if isinstance(value, (list, tuple)) else [value]
+        conds.append(f"{_column(col)} IN ({', '.join('?' * len(values))})")
+        args  += [_plain(v) for v in values]
+    sql = f"""
+        SELECT * FROM (
+            SELECT u.strategy, u.interval, u.run_dir, u.run_date, x.symbol, x.window_start, x.window_end,
+                   x.params, x.trades, x.win_rate, x.total_pnl, x.sharpe, x.max_drawdown, x.passed,
+                   x.{metric} AS _metric,
+                   ROW_NUMBER() OVER (PARTITION BY {groups} ORDER BY x.{metric} DESC) AS rn
+            FROM results x JOIN runs u USING (run_id)
+            WHERE {' AND '.join(conds)}
+        ) WHERE rn = 1 ORDER BY _metric DESC
+    """
+    return query(sql, tuple(args), db_path=db_path).drop(columns=["rn", "_metric"])
+
+
+# --- backfill the store from existing results/<strategy>/<run>/ directories ---
+def import_results_dir(results_root: str = "results", db_path: str = DB_PATH) -> int:
+    n = 0
+    for strategy in sorted(os.listdir(results_root)):
+        base = f"{results_root}/{strategy}"
+        if not os.path.isdir(base):
+            continue
+        for d in sorted(os.listdir(base)):
+            run_dir = f"{base}/{d}"
+            if os.path.isfile(f"{run_dir}/grid_search.csv"):
+                if parse_run_dir(run_dir) is None:
+                    _console.print(f"[yellow]skipped {run_dir}: not a <YYYYMMDD>_<SYMBOL>_<interval>_<NN> run directory[/yellow]")
+                    continue
+                symbol = parse_run_dir(run_dir)[1]
+                record_results(run_dir, "grid", grid_records(pd.read_csv(f"{run_dir}/grid_search.csv"), symbol, None, None), db_path=db_path)
+                n += 1
+                if os.path.isfile(f"{run_dir}/validate.csv"):
+                    record_results(run_dir, "validate", validate_records(pd.read_csv(f"{run_dir}/validate.csv"), symbol), db_path=db_path)
+    return n
@@ -0,0 +1,192 @@
+import importlib
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import pandas as pd
+from rich import box
+from rich.console import Console
+from rich.progress import BarColumn, MofNCompleteColumn, Progress, SpinnerColumn, TextColumn, TimeElapsedColumn
+from rich.table import Table
+
+from backtesting.shared import report, stats, tracking
+from backtesting.shared.cache import data_path, raw_frame
+
+_console = Console()
+
+
+# --- quiet the per-run consoles inside pool workers; the parent shows one progress bar ---
+# Reports are deferred in workers and rendered for all runs in one batch at the end.
+def _quiet_worker() -> None:
+    from backtesting.shared import optimize, report, validate
+    optimize._console.quiet = True
+    validate._console.quiet = True
+    report.MODE = "defer"
+
+
+# --- one work unit: every strategy on one (symbol, interval) dataset, loaded once in this worker ---
+def _sweep_unit(asset_type, symbol, interval, strategies, grids, train, test, eval_params, top_n, intrabar, n_jobs, prune=None):
+    raw_frame(symbol, interval, asset_type, intrabar)   # warm the per-process cache for grid search + validation
+    out = []
+    for name in strategies:
+        row = {"strategy": name, "asset_type": asset_type, "symbol": symbol, "interval": interval}
+        try:
+            opt = importlib.import_module(f"backtesting.{name}.src.optimize")
+            val = importlib.import_module(f"backtesting.{name}.src.validate")
+            run_dir = opt.run_grid_search(symbol, interval, train[0], train[1], grids[name], eval_params, asset_type,
+                                          intrabar=intrabar, prune=prune)
+            grid = pd.read_csv(f"{run_dir}/grid_search.csv")
+            res  = val.run_validation(symbol, interval, test[0], test[1], eval_params, asset_type,
+                                      run_dir=run_dir, top_n=top_n, intrabar=intrabar, n_jobs=n_jobs)
+            ok   = res[~res["pass"].astype(str).str.startswith("ERROR")]
+            row |= {
+                "run_dir":      run_dir,
+                "combos":       len(grid),
+                "train_sharpe": grid["sharpe"].max() if len(grid) else None,
+                "test_sharpe":  ok["test_sharpe"].max() if len(ok) else None,
+                "passing":      int((res["pass"] == "YES").sum()),
+            }
+        except Exception as e:
+            row["error"] = f"{type(e).__name__}: {e}"
+        out.append(row)
+    tracking.flush()   # pool workers exit without running atexit
+    return out
+
+
+def run_sweep(
+    strategies: list,          # strategy packages under backtesting/, e.g. ["macrossover", "momentum"]
+    symbols: dict,             # {asset_type: [symbol, ...]} as in run_dataloader.SYMBOLS
+    intervals: list,
+    grids: dict,               # {strategy: grid}
+    train: tuple,              # (train_start, train_end)
+    test: tuple,               # (test_start, test_end)
+    eval_params: dict,
+    top_n: int = 10,
+    intrabar: bool = False,
+    n_jobs: int = 1,           # worker processes; each takes whole (symbol, interval) units
+    out_base: str = "results/sweeps",
+    prune: dict = None,        # shared.prune config for every grid search
+) -> pd.DataFrame:
+    # largest CSVs first, so the long units start early and the tail of the pool stays busy
+    units = []
+    for asset_type, syms in symbols.items():
+        for symbol in syms:
+            for interval in intervals:
+                path = data_path(symbol, interval, asset_type)
+                if not os.path.isfile(path):
+                    _console.print(f"[yellow]skip {symbol} {interval}: no {path}[/yellow]")
+                    continue
+                units.append((os.path.getsize(path) * len(strategies), asset_type, symbol, interval))
+    units.sort(reverse=True)
+
+    _console.print(f"[bold]Sweep[/bold]  ·  {len(strategies)} strategies × {len(units)} datasets  "
+                   f"[train: {train[0]} → {train[1]}  |  test: {test[0]} → {test[1]}]")
+
+    args = [(a, s, i, strategies, grids, train, test, eval_params, top_n, intrabar, 1 if n_jobs > 1 else n_jobs, prune)
+            for _, a, s, i in units]
+    rows = []
+    progress = Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        MofNCompleteColumn(),
+        TimeElapsedColumn(),
+        console=_console,
+    )
+    mode, report.MODE = report.MODE, "defer"
+    try:
+        with progress:
+            task = progress.add_task("Running datasets", total=len(args))
+            if n_jobs > 1 and len(args) > 1:
+                with ProcessPoolExecutor(max_workers=n_jobs, initializer=_quiet_worker) as pool:
+                    futures = {pool.submit(_sweep_unit, *a): a for a in args}
+                    for f in as_completed(futures):
+                        a = futures[f]
+                        try:
+                            rows += f.result()
+                        except Exception as e:
+                            rows += [{"strategy": n, "asset_type": a[0], "symbol": a[1], "interval": a[2],
+                                      "error": f"{type(e).__name__}: {e}"} for n in strategies]
+                        progress.update(task, description=f"{a[1]} {a[2]}")
+                        progress.advance(task)
+            else:
+                for a in args:
+                    progress.update(task, description=f"{a[1]} {a[2]}")
+                    rows += _sweep_unit(*a)
+                    progress.advance(task)
+    finally:
+        report.MODE = mode
+
+    df = pd.DataFrame(rows)
+    df, summary = _deflate(df)
+    _write_summary(df, strategies, intervals, train, test, out_base, summary)
+    if "run_dir" in df.columns:
+        runs = df["run_dir"].dropna().tolist()
+        _console.print(f"[dim]Rendering {len(runs)} run reports…[/dim]")
+        report.render_runs(runs, n_jobs=n_jobs)
+    return df
+
+
+# --- DSR of each run's best train combo against every combo the sweep tried ---
+def _deflate(df: pd.DataFrame):
+    if "run_dir" not in df.columns:
+        return df, None
+    runs  = [d for d in df["run_dir"].dropna() if os.path.isfile(f"{d}/returns.npz")]
+    if not runs:
+        return df, None
+    parts = [stats.load_returns(d) for d in runs]
+    per_combo, summary = stats.deflate(stats.concat_returns(parts))
+    first = dict(zip(runs, [0] + list(pd.Series([len(p["indptr"]) - 1 for p in parts]).cumsum()[:-1])))
+    df = df.copy()
+    df["sweep_dsr"] = [per_combo["dsr"].iloc[first[d]] if d in first else None for d in df["run_dir"]]
+    return df, summary
+
+
+# --- (strategy, symbol) × interval matrix of the best test Sharpe ---
+def summary_matrix(df: pd.DataFrame, intervals: list, value: str = "test_sharpe") -> pd.DataFrame:
+    if value not in df.columns:
+        return pd.DataFrame()
+    m = df.pivot_table(index=["strategy", "symbol"], columns="interval", values=value, aggfunc="max")
+    return m[[i for i in intervals if i in m.columns]]
+
+
+def _write_summary(df, strategies, intervals, train, test, out_base, summary=None):
+    os.makedirs(out_base, exist_ok=True)
+    out_dir = f"{out_base}/{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    os.makedirs(out_dir)
+    df.to_csv(f"{out_dir}/sweep.csv", index=False)
+
+    sharpe  = summary_matrix(df, intervals, "test_sharpe")
+    passing = summary_matrix(df, intervals, "passing")
+    sharpe.to_csv(f"{out_dir}/summary_test_sharpe.csv")
+    errors  = df[df["error"].notna()] if "error" in df.columns else df.iloc[:0]
+    md = (
+        f"# Sweep\n\n"
+        f"**Strategies:** {', '.join(strategies)} | **Intervals:** {', '.join(intervals)}\n\n"
+        f"**Train:** {train[0]} → {train[1]} | **Test:** {test[0]} → {test[1]}\n\n"
+        f"## Best test Sharpe\n\n{sharpe.round(2).to_markdown()}\n\n"
+        f"## Passing configs\n\n{passing.to_markdown()}\n"
+        + (f"\n## Selection bias\n\n{stats.describe(summary)} — `sweep_dsr` deflates each run's best train config "
+           f"by every combo of the sweep.\n\n{summary_matrix(df, intervals, 'sweep_dsr').round(2).to_markdown()}\n" if summary else "")
+        + (f"\n## Errors\n\n{errors[['strategy', 'symbol', 'interval', 'error']].to_markdown(index=False)}\n" if len(errors) else "")
+    )
+    with open(f"{out_dir}/README.md", "w") as f:
+        f.write(md)
+
+    tbl = Table(title="Best test Sharpe", box=box.SIMPLE_HEAD, header_style="bold cyan")
+    tbl.add_column("strategy")
+    tbl.add_column("symbol")
+    for c in sharpe.columns:
+        tbl.add_column(c, justify="right")
+    for (strategy, symbol), row in sharpe.iterrows():
+        cells = []
+        for c in sharpe.columns:
+            v = row[c]
+            cells.append("–" if pd.isna(v) else f"[{'green' if v > 0 else 'red'}]{v:+.2f}[/]")
+        tbl.add_row(strategy, symbol, *cells)
+    _console.print(tbl)
+    if len(errors):
+        _console.print(f"[red]{len(errors)} failed runs — see {out_dir}/README.md[/red]")
+    if summary:
+        _console.print(f"[dim]Selection bias across the sweep: {stats.describe(summary)}[/dim]")
+    _console.print(f"[dim]Sweep summary → {out_dir}[/dim]")
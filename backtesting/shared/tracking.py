@@ -0,0 +1,309 @@
+import atexit
+import importlib.util
+import math
+import os
+import queue
+import re
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+from rich.console import Console
+
+from backtesting.shared.cache import METRIC_COLS, ROBUST_COLS
+
+_console = Console()
+
+# --- grid search / validation / diagnose runs in an MLflow tracking store, off the compute path ---
+# The compute path only puts small dicts on a queue. One background thread per process turns them
+# into MLflow calls: consecutive params / metrics / tags of a run are merged and sent as log_batch
+# calls of up to MLflow's limits (1000 entities, 100 params, 100 tags), many queue items per call.
+# flush() blocks until the queue is empty; it runs at exit, and sweep pool workers (which skip
+# atexit) call it after each unit, so every queued record reaches the store. A forked child starts
+# with a fresh queue and thread of its own.
+#
+# Layout: one experiment per strategy ("backtesting/<strategy>"); per run directory a parent run
+# for each stage (grid, validate, diagnose) with the run-level params, summary metrics and the
+# stage's files as artifacts. Every combo's metrics (and numeric params) go into the grid / validate
+# parent as "combo.<col>" with step = combo index, ~1000 values per log_batch; only the top
+# TOP_CHILDREN combos also get a child run of their own.
+#
+# mlflow is optional: without it (or with ENABLED = False) every call is a no-op. The store is
+# $MLFLOW_TRACKING_URI when set, else the local file store mlruns/ under the repo root.
+
+ENABLED      = True
+TRACKING_DIR = "mlruns"
+TOP_CHILDREN = 10       # child runs per grid / validate parent
+
+_MAX_METRICS = 1000
+_MAX_PARAMS  = 100
+_MAX_TAGS    = 100
+_MAX_VALUE   = 6000     # param / tag value length
+
+_queue  = None
+_thread = None
+_lock   = threading.Lock()
+_mlflow = None          # None: not checked yet
+
+
+def enabled() -> bool:
+    global _mlflow
+    if _mlflow is None:
+        _mlflow = importlib.util.find_spec("mlflow") is not None
+    return ENABLED and _mlflow
+
+
+def _key(k) -> str:
+    return re.sub(r"[^\w\-. /]", "_", str(k).replace("%", "_pct"))
+
+
+def _value(v) -> str:
+    return str(v)[:_MAX_VALUE]
+
+
+def _metric(v):
+    if isinstance(v, (bool, np.bool_)):
+        return float(v)
+    if isinstance(v, (int, float, np.integer, np.floating)):
+        return float(v)
+    return None
+
+
+def _put(item: tuple) -> None:
+    global _queue, _thread
+    with _lock:
+        if _thread is None or not _thread.is_alive():
+            _queue  = queue.Queue()
+            _thread = threading.Thread(target=_drain, daemon=True, name="mlflow-tracking")
+            _thread.start()
+            atexit.register(flush)
+    _queue.put(item)
+
+
+# --- a forked child inherits the parent's queue but not its thread: start over on first use ---
+def _reset_after_fork() -> None:
+    global _queue, _thread, _lock
+    _queue, _thread, _lock = None, None, threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+# --- queue API: runs are named by any hashable key; the thread maps keys to MLflow run ids ---
+def start_run(key, experiment: str, name: str, parent=None, tags: dict = None):
+    _put(("start", key, experiment, name, parent, dict(tags or {})))
+    return key
+
+
+def log(key, params: dict = None, metrics: dict = None, tags: dict = None, step: int = 0) -> None:
+    ts = int(time.time() * 1000)
+    _put(("log", key, dict(params or {}), {(k, step): (v, ts) for k, v in (metrics or {}).items()}, dict(tags or {})))
+
+
+# --- one metric dict per step (row i -> step i), as a single queue item ---
+def log_steps(key, rows: list, prefix: str = "") -> None:
+    ts = int(time.time() * 1000)
+    _put(("log", key, {}, {(f"{prefix}{k}", i): (v, ts) for i, r in enumerate(rows) for k, v in r.items()}, {}))
+
+
+def log_artifacts(key, paths) -> None:
+    for p in paths:
+        if os.path.isfile(p):
+            _put(("artifact", key, os.path.abspath(p)))
+
+
+def end_run(key, status: str = "FINISHED") -> None:
+    _put(("end", key, status))
+
+
+# --- block until everything queued so far is in the store ---
+def flush() -> None:
+    if _queue is not None:
+        _queue.join()
+
+
+# --- background thread ---
+
+def _client():
+    from mlflow.tracking import MlflowClient
+
+    uri = os.environ.get("MLFLOW_TRACKING_URI")
+    if not uri:
+        uri = f"file:{os.path.abspath(TRACKING_DIR)}"
+        os.environ.setdefault("MLFLOW_ALLOW_FILE_STORE", "true")   # newer mlflow refuses file stores otherwise
+    return MlflowClient(tracking_uri=uri)
+
+
+def _send(client, run_id: str, buf: dict) -> None:
+    from mlflow.entities import Metric, Param, RunTag
+
+    params  = [Param(_key(k), _value(v)) for k, v in buf["params"].items()]
+    tags    = [RunTag(_key(k), _value(v)) for k, v in buf["tags"].items()]
+    metrics = [Metric(_key(k), m, ts, step) for (k, step), (v, ts) in buf["metrics"].items()
+               if (m := _metric(v)) is not None]
+    while params or tags or metrics:
+        p, params = params[:_MAX_PARAMS], params[_MAX_PARAMS:]
+        t, tags   = tags[:_MAX_TAGS], tags[_MAX_TAGS:]
+        n         = _MAX_METRICS - len(p) - len(t)
+        m, metrics = metrics[:n], metrics[n:]
+        client.log_batch(run_id, metrics=m, params=p, tags=t)
+
+
+def _apply(client, state: dict, items: list) -> None:
+    runs, experiments = state["runs"], state["experiments"]
+    bufs = {}
+
+    def flush_buf(key):
+        buf = bufs.pop(key, None)
+        if buf and key in runs:
+            _send(client, runs[key], buf)
+
+    for item in items:
+        op, key = item[0], item[1]
+        if op == "start":
+            _, _, experiment, name, parent, tags = item
+            if experiment not in experiments:
+                exp = client.get_experiment_by_name(experiment)
+                experiments[experiment] = exp.experiment_id if exp else client.create_experiment(experiment)
+            if parent is not None and parent in runs:
+                tags["mlflow.parentRunId"] = runs[parent]
+            runs[key] = client.create_run(experiments[experiment], tags={_key(k): _value(v) for k, v in tags.items()},
+                                          run_name=name).info.run_id
+        elif op == "log":
+            buf = bufs.setdefault(key, {"params": {}, "metrics": {}, "tags": {}})
+            buf["params"] |= item[2]
+            buf["metrics"] |= item[3]
+            buf["tags"] |= item[4]
+        elif op == "artifact":
+            flush_buf(key)
+            if key in runs:
+                client.log_artifact(runs[key], item[2])
+        elif op == "end":
+            flush_buf(key)
+            if key in runs:
+                client.set_terminated(runs.pop(key), status=item[2])
+    for key in list(bufs):
+        flush_buf(key)
+
+
+def _drain() -> None:
+    state, client, warned = {"runs": {}, "experiments": {}}, None, False
+    while True:
+        items = [_queue.get()]
+        while len(items) < 4 * _MAX_METRICS:
+            try:
+                items.append(_queue.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            client = client or _client()
+            _apply(client, state, items)
+        except Exception as e:
+            if not warned:
+                _console.print(f"[yellow]mlflow tracking: {type(e).__name__}: {e}[/yellow]")
+                warned = True
+        finally:
+            for _ in items:
+                _queue.task_done()
+
+
+# --- stage loggers ---
+
+def _experiment(run_dir: str) -> str:
+    return f"backtesting/{os.path.basename(os.path.dirname(run_dir.rstrip('/')))}"
+
+
+def _flat(d: dict, prefix: str = "") -> dict:
+    out = {}
+    for k, v in (d or {}).items():
+        if isinstance(v, dict):
+            out |= _flat(v, f"{prefix}{k}.")
+        else:
+            out[f"{prefix}{k}"] = v
+    return out
+
+
+def _clean(v):
+    return None if isinstance(v, float) and math.isnan(v) else v
+
+
+# rows: (params, metrics, tags) per combo, in combo-index order; order: indices of the best first
+def _combos(parent, run_dir: str, kind: str, rows: list, order) -> None:
+    log_steps(parent, [{k: v for k, v in (params | metrics).items() if _metric(v) is not None}
+                       for params, metrics, _ in rows], prefix="combo.")
+    exp = _experiment(run_dir)
+    for i in list(order)[:TOP_CHILDREN]:
+        params, metrics, tags = rows[i]
+        key = start_run((run_dir, kind, i), exp, " ".join(f"{k}={v}" for k, v in params.items())[:250], parent=parent,
+                        tags={"kind": f"{kind}_combo", "run_dir": run_dir, "combo": i} | tags)
+        log(key, params=params, metrics=metrics)
+        end_run(key)
+
+
+# --- positional row indices, best `col` first (NaN last); row order when `col` is missing ---
+def _best(df: pd.DataFrame, col: str) -> np.ndarray:
+    if col not in df.columns:
+        return np.arange(len(df))
+    return np.argsort(-pd.to_numeric(df[col], errors="coerce").fillna(-np.inf).to_numpy(), kind="stable")
+
+
+def log_grid(run_dir: str, df_results: pd.DataFrame, meta: dict, summary: dict = None) -> None:
+    if not enabled():
+        return
+    name   = os.path.basename(run_dir.rstrip("/"))
+    parent = start_run((run_dir, "grid"), _experiment(run_dir), f"{name} grid",
+                       tags={"kind": "grid", "run_dir": run_dir, "strategy_name": meta.get("strategy_name")})
+    log(parent,
+        params=_flat({k: v for k, v in meta.items() if k not in ("readme_cols", "grid", "strategy_name", "distributed")})
+               | {f"grid.{k}": v for k, v in (meta.get("grid") or {}).items()},
+        metrics={"results": len(df_results), "best_sharpe": df_results["sharpe"].max() if len(df_results) else None}
+                | {f"stats.{k}": v for k, v in (summary or {}).items()})
+    metric_cols = [c for c in df_results.columns if c in METRIC_COLS or c in ROBUST_COLS]
+    param_cols  = [c for c in df_results.columns if c not in metric_cols]
+    _combos(parent, run_dir, "grid", [({c: _clean(r[c]) for c in param_cols}, {c: r[c] for c in metric_cols}, {})
+                                      for r in df_results.to_dict("records")], _best(df_results, "sharpe"))
+    log_artifacts(parent, [f"{run_dir}/{f}" for f in ("grid_search.csv", "robust.csv", "pruned.csv", "best_trades.csv", "run.json")])
+    end_run(parent)
+
+
+# params: full grid params per validate.csv row (as for store.validate_records)
+def log_validate(run_dir: str, df_out: pd.DataFrame, meta: dict, params: list = None) -> None:
+    if not enabled():
+        return
+    name   = os.path.basename(run_dir.rstrip("/"))
+    parent = start_run((run_dir, "validate"), _experiment(run_dir), f"{name} validate",
+                       tags={"kind": "validate", "run_dir": run_dir, "strategy_name": meta.get("strategy_name")})
+    passed = int((df_out["pass"] == "YES").sum()) if "pass" in df_out.columns else 0
+    log(parent,
+        params=_flat({k: v for k, v in meta.items() if k not in ("stats", "rank_corr", "best_text", "strategy_name")}),
+        metrics={"candidates": len(df_out), "passed": passed,
+                 "best_test_sharpe": df_out["test_sharpe"].max() if "test_sharpe" in df_out.columns else None}
+                | {f"rank_corr.{k}": v for k, v in (meta.get("rank_corr") or {}).items()})
+    # ERROR rows (a config that failed to build) carry no metrics and no params (_params is None)
+    ok = ~df_out["pass"].astype(str).str.startswith("ERROR") if "pass" in df_out.columns else pd.Series(True, df_out.index)
+    params = [p for p, keep in zip(params, ok) if keep] if params else None
+    df_out = df_out[ok.to_numpy()]
+    metric_cols = [c for c in df_out.columns if c.startswith(("train_", "test_"))]
+    rows = []
+    for i, r in enumerate(df_out.to_dict("records")):
+        p = params[i] if params else {c: r[c] for c in df_out.columns if c not in metric_cols and c != "pass"}
+        extra = {c: r[c] for c in ("symbol", "window") if c in r}
+        rows.append(({k: _clean(v) for k, v in p.items() if k not in METRIC_COLS} | extra,
+                     {c: r[c] for c in metric_cols}, {"pass": r.get("pass")}))
+    _combos(parent, run_dir, "validate", rows, _best(df_out, "test_sharpe"))
+    log_artifacts(parent, [f"{run_dir}/validate.csv", f"{run_dir}/run.json"])
+    end_run(parent)
+
+
+def log_diagnose(run_dir: str, params: dict, metrics: dict, window: tuple, artifacts=()) -> None:
+    if not enabled():
+        return
+    name = os.path.basename(run_dir.rstrip("/"))
+    key  = start_run((run_dir, "diagnose", window), _experiment(run_dir), f"{name} diagnose",
+                     tags={"kind": "diagnose", "run_dir": run_dir})
+    log(key, params={k: _clean(v) for k, v in params.items()} | {"window_start": window[0], "window_end": window[1]},
+        metrics=metrics)
+    log_artifacts(key, artifacts)
+    end_run(key)
@@ -2,89 +2,209 @@ import pandas as pd
 import numpy as np
 
 # --- replay signals and collect raw trade records ---
+# One position at a time; exits are checked in priority order tp, sl, timeout, opposite signal
+# (which closes and flips). The scan runs per trade over numpy slices, not per bar.
+#
+# intrabar=True checks tp/sl against each bar's high/low instead of its close and books the exit
+# at the level (or at the open if the bar gapped through it). When both levels fall inside one
+# bar, the child candles in sub_bars (see resample.sub_bars / attach_child_index) decide which
+# was hit first; without them, or if both hit in the same child, the stop is assumed first.
+#
+# A `size` column (shared.sizing.size_bars) is carried into each trade from its entry bar.
+#
+# prune (shared.prune.Pruner) is consulted before the scan and every prune.chunk trades; it raises
+# Pruned to abandon a combo that can no longer pass.
 def simulate_trades(
     df: pd.DataFrame,
     tp_pct: float = None,       # take-profit threshold (e.g. 0.03 = 3%)
     sl_pct: float = None,       # stop-loss threshold  (e.g. 0.01 = 1%)
     max_candles: int = None,    # max holding period in candles
+    intrabar: bool = False,     # check tp/sl against high/low rather than close
+    sub_bars: dict = None,      # 1m candles from resample.sub_bars, to order tp vs sl inside a bar
+    prune=None,                 # shared.prune.Pruner, or None to always run to the end
 ) -> pd.DataFrame:
+    n = len(df)
+    if n == 0:
+        return pd.DataFrame()
+
+    sig       = df["signal"].to_numpy()
+    close     = df["close_price"].to_numpy(np.float64)
+    open_time = df["open_time"].to_numpy()
+    size      = df["size"].to_numpy(np.float64) if "size" in df.columns else None
+    entries   = np.flatnonzero(sig != 0)
+    bars      = _IntrabarView(df, sub_bars) if intrabar else None
+    if prune is not None:
+        prune.start(entries)
+
     trades = []
-    position = 0
-    entry_idx = None
-    entry_price = None
-    candles_held = 0
-
-    for idx in df.index:
-        row = df.loc[idx]
-        sig = row["signal"]
-
-        if position == 0:
-            if sig != 0:
-                position = sig
-                entry_idx = idx
-                entry_price = row["close_price"]
-                candles_held = 0
-            continue
+    if len(entries) == 0:
+        return pd.DataFrame(trades)
+    i = entries[0]
+    position, entry_price = sig[i], close[i]
 
-        price = row["close_price"]
-        ret = position * (price - entry_price) / entry_price
-        candles_held += 1
-
-        exit_reason = None
-        if tp_pct is not None and ret >= tp_pct:
-            exit_reason = "tp"
-        elif sl_pct is not None and ret <= -sl_pct:
-            exit_reason = "sl"
-        elif max_candles is not None and candles_held >= max_candles:
-            exit_reason = "timeout"
-        elif sig == -position:
-            exit_reason = "signal"
-
-        if exit_reason:
-            entry_row = df.loc[entry_idx]
-            trades.append({
-                "entry_time":  entry_row["open_time"],
-                "exit_time":   row["open_time"],
-                "entry_price": entry_price,
-                "exit_price":  price,
-                "signal":      position,
-                "candles":     candles_held,
-                "exit_reason": exit_reason,
-            })
-            position = 0
-            entry_idx = None
-            entry_price = None
-            candles_held = 0
-            # if exit was triggered by an opposite signal, open the new position immediately
-            if exit_reason == "signal":
-                position = sig
-                entry_idx = idx
-                entry_price = price
-                candles_held = 0
-
-    # force-exit any open position at end of data
-    if position != 0:
-        entry_row = df.loc[entry_idx]
-        exit_row = df.iloc[-1]
-        trades.append({
-            "entry_time":  entry_row["open_time"],
-            "exit_time":   exit_row["open_time"],
-            "entry_price": entry_price,
-            "exit_price":  exit_row["close_price"],
-            "signal":      position,
-            "candles":     candles_held,
-            "exit_reason": "end",
-        })
+    while True:
+        j, reason, price = _find_exit(i, position, entry_price, sig, close, tp_pct, sl_pct, max_candles, bars)
+        if j is None:
+            # force-exit any open position at end of data
+            trades.append(_record(open_time, i, n - 1, entry_price, close[-1], position, "end", size))
+            break
+        trades.append(_record(open_time, i, j, entry_price, price, position, reason, size))
+        if prune is not None and len(trades) % prune.chunk == 0:
+            prune.check(trades, j)
+        if reason == "signal":
+            # exit triggered by an opposite signal opens the new position immediately
+            i, position, entry_price = j, sig[j], close[j]
+            continue
+        k = np.searchsorted(entries, j, side="right")
+        if k >= len(entries):
+            break
+        i = entries[k]
+        position, entry_price = sig[i], close[i]
 
     return pd.DataFrame(trades)
 
 
+def _record(open_time, i, j, entry_price, exit_price, position, reason, size=None) -> dict:
+    rec = {
+        "entry_time":  open_time[i],
+        "exit_time":   open_time[j],
+        "entry_price": entry_price,
+        "exit_price":  exit_price,
+        "signal":      position,
+        "candles":     j - i,
+        "exit_reason": reason,
+    }
+    if size is not None:
+        rec["size"] = size[i]
+    return rec
+
+
+# --- first bar after entry i that closes the position: (bar, reason, exit price) or (None, ...) ---
+def _find_exit(i, position, entry_price, sig, close, tp_pct, sl_pct, max_candles, bars):
+    n = len(close)
+    lo = i + 1
+    # with max_candles the first window always contains the exit; otherwise widen until found
+    step = max(int(max_candles), 1) if max_candles is not None else 256
+    while lo < n:
+        hi = min(n, lo + step)
+        ret = position * (close[lo:hi] - entry_price) / entry_price
+        held = np.arange(lo - i, hi - i)
+
+        if bars is None:
+            tp_hit = ret >= tp_pct if tp_pct is not None else np.zeros(hi - lo, bool)
+            sl_hit = ret <= -sl_pct if sl_pct is not None else np.zeros(hi - lo, bool)
+        else:
+            tp_hit, sl_hit = bars.hits(lo, hi, position, entry_price, tp_pct, sl_pct)
+        timeout = held >= max_candles if max_candles is not None else np.zeros(hi - lo, bool)
+        flip = sig[lo:hi] == -position
+
+        any_exit = tp_hit | sl_hit | timeout | flip
+        if any_exit.any():
+            off = int(np.argmax(any_exit))
+            j = lo + off
+            if bars is not None and (tp_hit[off] or sl_hit[off]):
+                reason = bars.first_hit(j, position, entry_price, tp_pct, sl_pct, tp_hit[off], sl_hit[off])
+                return j, reason, bars.fill_price(j, position, entry_price, tp_pct, sl_pct, reason)
+            if tp_hit[off]:
+                return j, "tp", close[j]
+            if sl_hit[off]:
+                return j, "sl", close[j]
+            if timeout[off]:
+                return j, "timeout", close[j]
+            return j, "signal", close[j]
+        lo = hi
+        step *= 2
+    return None, None, None
+
+
+# --- high/low (and optional child-candle) view used by the intrabar exit mode ---
+class _IntrabarView:
+    def __init__(self, df: pd.DataFrame, sub_bars: dict = None):
+        self.open = df["open_price"].to_numpy(np.float64) if "open_price" in df.columns else None
+        self.high = df["high_price"].to_numpy(np.float64)
+        self.low  = df["low_price"].to_numpy(np.float64)
+        self.sub  = sub_bars
+        self.child_start = self.child_end = None
+        if sub_bars is not None:
+            if "_child_start" in df.columns:
+                self.child_start = df["_child_start"].to_numpy()
+                self.child_end   = df["_child_end"].to_numpy()
+            else:
+                from backtesting.shared.resample import child_index
+                self.child_start, self.child_end = child_index(df, sub_bars)
+
+    @staticmethod
+    def levels(position, entry_price, tp_pct, sl_pct):
+        tp = entry_price * (1 + position * tp_pct) if tp_pct is not None else None
+        sl = entry_price * (1 - position * sl_pct) if sl_pct is not None else None
+        return tp, sl
+
+    @staticmethod
+    def _hits(high, low, position, tp, sl):
+        m = len(high)
+        if position == 1:
+            tp_hit = high >= tp if tp is not None else np.zeros(m, bool)
+            sl_hit = low <= sl if sl is not None else np.zeros(m, bool)
+        else:
+            tp_hit = low <= tp if tp is not None else np.zeros(m, bool)
+            sl_hit = high >= sl if sl is not None else np.zeros(m, bool)
+        return tp_hit, sl_hit
+
+    def hits(self, lo, hi, position, entry_price, tp_pct, sl_pct):
+        tp, sl = self.levels(position, entry_price, tp_pct, sl_pct)
+        return self._hits(self.high[lo:hi], self.low[lo:hi], position, tp, sl)
+
+    def first_hit(self, j, position, entry_price, tp_pct, sl_pct, tp_hit, sl_hit) -> str:
+        if not (tp_hit and sl_hit):
+            return "tp" if tp_hit else "sl"
+        tp, sl = self.levels(position, entry_price, tp_pct, sl_pct)
+        if self.open is not None:
+            o_tp, o_sl = self._hits(self.open[j:j + 1], self.open[j:j + 1], position, tp, sl)
+            if o_sl[0] or o_tp[0]:
+                return "sl" if o_sl[0] else "tp"
+        if self.sub is None:
+            return "sl"
+        cs, ce = self.child_start[j], self.child_end[j]
+        c_tp, c_sl = self._hits(self.sub["high"][cs:ce], self.sub["low"][cs:ce], position, tp, sl)
+        either = c_tp | c_sl
+        if not either.any():
+            return "sl"
+        first = int(np.argmax(either))
+        return "tp" if c_tp[first] and not c_sl[first] else "sl"
+
+    def fill_price(self, j, position, entry_price, tp_pct, sl_pct, reason) -> float:
+        tp, sl = self.levels(position, entry_price, tp_pct, sl_pct)
+        level = tp if reason == "tp" else sl
+        if self.open is None:
+            return level
+        o = self.open[j]
+        # a bar that opens beyond the level fills at the open
+        if reason == "sl":
+            return min(o, level) if position == 1 else max(o, level)
+        return max(o, level) if position == 1 else min(o, level)
+
+
 # --- compute returns, pnl, and portfolio curve ---
-def evaluate_trades(trades: pd.DataFrame, init_portfolio=1_000, trade_size_pct=0.1, fee_pct=0.0005, leverage=10) -> pd.DataFrame:
+# Notional per trade is init_portfolio × trade_size_pct × leverage, or init_portfolio × size for
+# trades with a `size` (exposure fraction, see shared.sizing); NaN sizes fall back to the fixed one.
+# Costs are notional × fee_pct per side, or with a cost_model (shared.costs) fees, spread, slippage
+# and funding per trade, itemised in cost_* columns; spread and slippage read `bars`, the simulated frame.
+def evaluate_trades(trades: pd.DataFrame, init_portfolio=1_000, trade_size_pct=0.1, fee_pct=0.0005, leverage=10,
+                    cost_model: dict = None, bars: pd.DataFrame = None) -> pd.DataFrame:
     notional = init_portfolio * trade_size_pct * leverage
     t = trades.copy()
+    if "size" in t.columns:
+        notional = init_portfolio * t["size"].fillna(trade_size_pct * leverage).to_numpy(np.float64)
     t["return"] = t["signal"] * (t["exit_price"] - t["entry_price"]) / t["entry_price"]
-    t["pnl"] = (t["return"] * notional) - notional * fee_pct * 2
+    if cost_model is None:
+        t["pnl"] = (t["return"] * notional) - notional * fee_pct * 2
+    else:
+        from backtesting.shared.costs import trade_costs
+
+        costs = trade_costs(t, notional, cost_model, bars, fee_pct=fee_pct, leverage=leverage)
+        for k, v in costs.items():
+            t[f"cost_{k}"] = v
+        t["pnl"] = (t["return"] * notional) - sum(costs.values())
     t = t.sort_values("exit_time").reset_index(drop=True)
     t["portfolio"] = init_portfolio + t["pnl"].cumsum()
 
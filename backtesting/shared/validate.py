@@ -1,4 +1,4 @@
-import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
 import pandas as pd
@@ -8,20 +8,73 @@ from rich.panel import Panel
 from rich.table import Table
 from rich.text import Text
 
-from backtesting.shared.load import load_df
+from backtesting.shared import report, robust, stats, tracking
+from backtesting.shared.cache import METRIC_COLS, ROBUST_COLS, build_cached, raw_frame, signal_key
+from backtesting.shared.sizing import SizingError, size_bars, size_trades
+from backtesting.shared.store import latest_run, record_results, validate_records
 from backtesting.shared.trade import simulate_trades, evaluate_trades
 
 _console = Console()
 
+_MAX_DISPLAY = 30   # rows shown in the console table; the CSV/MD keep all
+
 
 def latest_run_dir(runs_base: str) -> str:
-    dirs = sorted(
-        [d for d in os.listdir(runs_base) if os.path.isfile(f"{runs_base}/{d}/grid_search.csv")],
-        reverse=True,
-    )
-    if not dirs:
+    run_dir = latest_run(runs_base)
+    if run_dir is None:
         raise FileNotFoundError(f"No grid_search.csv found under {runs_base}/. Run grid_search.py first.")
-    return f"{runs_base}/{dirs[0]}"
+    return run_dir
+
+
+# --- one work unit: configs sharing signal params × one symbol, built once, run over every window ---
+def _validate_group(configs, asset_type, symbol, interval, windows, eval_params, build_df, make_param_row, intrabar, tag, sizing=None):
+    rawdf, sub, dkey = raw_frame(symbol, interval, asset_type, intrabar)   # per process, so pool workers load each symbol once
+    out = []
+    for order, p in configs:
+        try:
+            built = build_cached(build_df, rawdf, p, dkey)
+        except Exception as e:
+            out.append(((order, symbol, 0), {"pass": f"ERROR: {e}", "_params": None}))
+            continue
+        for w, (test_start, test_end) in enumerate(windows):
+            try:
+                df     = built[(built["close_time"] > pd.to_datetime(test_start)) & (built["close_time"] <= pd.to_datetime(test_end))]
+                df     = size_bars(df, sizing)
+                trades = simulate_trades(df, tp_pct=p["tp_pct"], sl_pct=p["sl_pct"], max_candles=int(p["max_candles"]),
+                                         intrabar=intrabar, sub_bars=sub)
+                trades = size_trades(trades, sizing, df)
+
+                if trades.empty:
+                    test_sharpe, test_win_rate, test_pnl, test_dd, test_n = 0, 0, 0, 0, 0
+                else:
+                    ev            = evaluate_trades(trades, **eval_params, bars=df)
+                    test_n        = len(ev)
+                    test_win_rate = round(len(ev[ev["pnl"] > 0]) / len(ev) * 100, 1)
+                    test_pnl      = round(ev["pnl"].sum(), 2)
+                    test_sharpe   = ev.attrs.get("sharpe", 0)
+                    test_dd       = ev.attrs.get("max_drawdown", 0)
+
+                passed = test_sharpe > 0 and test_win_rate > 50 and abs(test_dd) < 20 and test_n >= 5
+                where  = ({"symbol": symbol} if tag["symbols"] else {}) | ({"window": f"{test_start} → {test_end}"} if tag["windows"] else {})
+                out.append(((order, symbol, w), {
+                    **where,
+                    **make_param_row(p),
+                    "train_sharpe": round(p["sharpe"], 2),
+                    **({"train_robust": p["robust"]} if "robust" in p else {}),
+                    **({"train_dsr": p["dsr"]} if "dsr" in p else {}),
+                    "test_sharpe":  test_sharpe,
+                    "test_wr%":     test_win_rate,
+                    "test_pnl":     test_pnl,
+                    "test_dd%":     test_dd,
+                    "test_n":       test_n,
+                    "pass":         "YES" if passed else "no",
+                    "_params":      {k: v for k, v in p.items() if k not in METRIC_COLS + ROBUST_COLS},
+                }))
+            except SizingError:
+                raise
+            except Exception as e:
+                out.append(((order, symbol, w), {"pass": f"ERROR: {e}", "_params": None}))
+    return out
 
 
 def run_validation(
@@ -37,50 +90,58 @@ def run_validation(
     make_param_row,    # (params) -> dict of strategy-specific columns for the output row
     format_best,       # (best_row) -> str describing the best config (for MD)
     run_dir: str = None,
-    top_n: int = 10,
+    top_n: int = 10,   # None → every row of grid_search.csv
+    intrabar: bool = False,
+    test_windows: list = None,   # [(start, end), ...]; defaults to [(test_start, test_end)]
+    symbols: list = None,        # [symbol, ...] or {asset_type: [symbol, ...]}; defaults to [symbol]
+    n_jobs: int = 1,             # worker processes; configs are split by shared signal params
+    sizing: dict = None,         # shared.sizing config; None → fixed trade_size_pct
+    rank_by: str = "robust",     # "robust" → neighbourhood score (shared.robust); "sharpe" → train Sharpe
 ) -> pd.DataFrame:
     if run_dir is None:
         run_dir = latest_run_dir(runs_base)
 
-    _console.print(f"[bold]Validation[/bold]  ·  {strategy_name}  ·  {symbol} {interval}  [test: {test_start} → {test_end}]")
-
-    TEST_START = pd.to_datetime(test_start)
-    TEST_END   = pd.to_datetime(test_end)
-
-    top_configs = pd.read_csv(f"{run_dir}/grid_search.csv").head(top_n)
-    rawdf       = load_df(ticker=symbol, timeframe=interval, asset_type=asset_type)
-    rows        = []
-
-    for _, p in top_configs.iterrows():
-        try:
-            df     = build_df(rawdf.copy(), p)
-            df     = df[(df["close_time"] > TEST_START) & (df["close_time"] <= TEST_END)]
-            trades = simulate_trades(df, tp_pct=p["tp_pct"], sl_pct=p["sl_pct"], max_candles=int(p["max_candles"]))
-
-            if trades.empty:
-                test_sharpe, test_win_rate, test_pnl, test_dd, test_n = 0, 0, 0, 0, 0
-            else:
-                ev            = evaluate_trades(trades, **eval_params)
-                test_n        = len(ev)
-                test_win_rate = round(len(ev[ev["pnl"] > 0]) / len(ev) * 100, 1)
-                test_pnl      = round(ev["pnl"].sum(), 2)
-                test_sharpe   = ev.attrs.get("sharpe", 0)
-                test_dd       = ev.attrs.get("max_drawdown", 0)
-
-            passed = test_sharpe > 0 and test_win_rate > 50 and abs(test_dd) < 20 and test_n >= 5
-            rows.append({
-                **make_param_row(p),
-                "train_sharpe": round(p["sharpe"], 2),
-                "test_sharpe":  test_sharpe,
-                "test_wr%":     test_win_rate,
-                "test_pnl":     test_pnl,
-                "test_dd%":     test_dd,
-                "test_n":       test_n,
-                "pass":         "YES" if passed else "no",
-            })
-        except Exception as e:
-            rows.append({"pass": f"ERROR: {e}"})
-
+    windows = [tuple(w) for w in test_windows] if test_windows else [(test_start, test_end)]
+    if symbols is None:
+        targets = [(asset_type, symbol)]
+    elif isinstance(symbols, dict):
+        targets = [(a, s) for a, syms in symbols.items() for s in syms]
+    else:
+        targets = [(asset_type, s) for s in symbols]
+    tag = {"symbols": len(targets) > 1, "windows": len(windows) > 1}
+
+    span = f"{windows[0][0]} → {windows[0][1]}" if len(windows) == 1 else f"{len(windows)} test windows"
+    who  = targets[0][1] if len(targets) == 1 else f"{len(targets)} symbols"
+    _console.print(f"[bold]Validation[/bold]  ·  {strategy_name}  ·  {who} {interval}  [test: {span}]")
+
+    if rank_by == "robust":
+        grid = robust.analyze(run_dir)   # robust.csv, best plateau first
+        _console.print("[dim]Candidates ranked by robustness: neighbourhood mean − std of train Sharpe[/dim]")
+    else:
+        grid = pd.read_csv(f"{run_dir}/grid_search.csv")
+    configs = grid if top_n is None else grid.head(top_n)
+    if configs.empty:
+        _console.print(f"[yellow]No candidates: no grid combo in {run_dir} traded (or every one was pruned); nothing to validate.[/yellow]")
+        return pd.DataFrame(columns=["train_sharpe", "test_sharpe", "test_wr%", "test_pnl", "test_dd%", "test_n", "pass"])
+    groups  = {}
+    for order, (_, p) in enumerate(configs.iterrows()):
+        groups.setdefault(signal_key(p), []).append((order, p.to_dict()))
+
+    summary = report.read_meta(run_dir).get("stats")
+    if summary:
+        _console.print(f"[dim]Selection bias over the grid: {stats.describe(summary)}[/dim]")
+
+    jobs = [(g, a, s, interval, windows, eval_params, build_df, make_param_row, intrabar, tag, sizing)
+            for g in groups.values() for a, s in targets]
+    if n_jobs > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            parts = list(pool.map(_validate_group, *zip(*jobs)))
+    else:
+        parts = [_validate_group(*j) for j in jobs]
+    sym_order = {s: k for k, (_, s) in enumerate(targets)}
+    rows = [r for _, r in sorted((r for part in parts for r in part), key=lambda x: (x[0][0], sym_order[x[0][1]], x[0][2]))]
+
+    params  = [r.pop("_params") for r in rows]
     df_out  = pd.DataFrame(rows)
     passing = df_out[df_out["pass"] == "YES"]
 
@@ -90,7 +151,7 @@ def run_validation(
     for c in display_cols:
         tbl.add_column(c, justify="right")
     tbl.add_column("pass", justify="center")
-    for _, row in df_out.iterrows():
+    for _, row in df_out.head(_MAX_DISPLAY).iterrows():
         passed = row.get("pass") == "YES"
         row_style = "green" if passed else ""
         tbl.add_row(
@@ -101,27 +162,44 @@ def run_validation(
     pass_style = "green" if len(passing) > 0 else "red"
     _console.print(Panel(
         tbl,
-        title=f"[bold]Validation Results[/bold]  [{test_start} → {test_end}]",
+        title=f"[bold]Validation Results[/bold]  [{span}]",
         subtitle=Text(f"{len(passing)}/{len(df_out)} passed", style=f"bold {pass_style}"),
         border_style="bright_blue",
         padding=(0, 1),
     ))
 
-    best_block = ""
+    # train-vs-test rank agreement, per symbol / window
+    rank_corr = _rank_correlation(df_out, [c for c in ("symbol", "window") if c in df_out.columns])
+    if rank_corr:
+        _console.print("[dim]Spearman(train_sharpe, test_sharpe): " + "  ".join(f"{k}={v:+.2f}" for k, v in rank_corr.items()) + "[/dim]")
+
+    best_text = None
     if not passing.empty:
-        best       = passing.sort_values("test_sharpe", ascending=False).iloc[0]
-        best_block = f"\n## Best config\n\n```\n{format_best(best)}\n```\n\nSharpe={best['test_sharpe']}, win_rate={best['test_wr%']}%, drawdown={best['test_dd%']}%\n"
+        best_text = format_best(passing.sort_values("test_sharpe", ascending=False).iloc[0])
 
     _console.print(f"[dim]Saved → {run_dir}/validate.csv[/dim]")
     df_out.to_csv(f"{run_dir}/validate.csv", index=False)
-    md = (
-        f"# Validation — {strategy_name}\n\n"
-        f"**Test window:** {test_start} → {test_end} | **Passing:** {len(passing)}/{len(df_out)}\n\n"
-        f"Pass criteria: Sharpe > 0, win rate > 50%, drawdown < 20%, trades ≥ 5.\n\n"
-        f"## Results\n\n{df_out.to_markdown(index=False)}\n"
-        + best_block
-    )
-    with open(f"{run_dir}/validate.md", "w") as f:
-        f.write(md)
+    meta = {
+        "strategy_name": strategy_name, "interval": interval, "windows": windows, "symbols": [s for _, s in targets],
+        "top_n": top_n, "rank_by": rank_by, "stats": summary, "rank_corr": rank_corr, "best_text": best_text, "sizing": sizing,
+    }
+    report.write_meta(run_dir, "validate", meta)
+    report.submit(run_dir)   # validate.md / report.html, off the compute path
+    record_results(run_dir, "validate",
+                   validate_records(df_out, targets[0][1], windows[0] if len(windows) == 1 else None, params),
+                   strategy_name=strategy_name)
+    tracking.log_validate(run_dir, df_out, meta, params)
 
     return df_out
+
+
+def _rank_correlation(df_out: pd.DataFrame, by: list) -> dict:
+    if "test_sharpe" not in df_out.columns:
+        return {}
+    ok = df_out.dropna(subset=["train_sharpe", "test_sharpe"])
+    groups = ok.groupby(by) if by else [("all", ok)]
+    out = {}
+    for k, g in groups:
+        if len(g) >= 3 and g["train_sharpe"].nunique() > 1 and g["test_sharpe"].nunique() > 1:
+            out[" / ".join(map(str, k)) if isinstance(k, tuple) else str(k)] = g["train_sharpe"].corr(g["test_sharpe"], method="spearman")
+    return out
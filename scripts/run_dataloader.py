@@ -1,31 +1,38 @@
 import os, sys
-root = "/home/mykyta/Code/personal/stochastic-risk-assessment"
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 os.chdir(root)
 sys.path.insert(0, root)
 
-from binance_testnet import get_klines, get_klines_df
 import pandas as pd
 
-BASE_URL = "https://api.binance.com"
+BASE_URL = "https://api.binance.com"   # or http://127.0.0.1:8765 for scripts/run_replay_server.py
+
+MAX_WORKERS       = 8
+WEIGHT_PER_MINUTE = 6000   # Binance spot REQUEST_WEIGHT limit; the loader keeps ~80% of it
 
 SYMBOLS = {
     "crypto":      ["BTCUSDT", "ETHUSDT", "SOLUSDT", "XRPUSDT"],
     "commodities": ["XAUUSDT", "XAGUSDT"],
 }
 INTERVALS = ["1m", "15m", "30m", "1h", "4h"]
+DERIVE_FROM_1M = True   # fetch 1m only and build the higher intervals locally (backtesting.shared.resample)
+
+if __name__ == "__main__":
+    from backtesting.shared.dataloader import sync_klines
+    from backtesting.shared.resample import write_derived
+
+    end_date   = pd.Timestamp.today().normalize()
+    start_date = end_date - pd.DateOffset(years=1)
+
+    # pairs fetch concurrently and page through the 1000-candle limit in parallel;
+    # existing CSVs only get candles newer than their last close_time
+    fetch = ["1m"] if DERIVE_FROM_1M else INTERVALS
+    added = sync_klines(BASE_URL, SYMBOLS, fetch, start=start_date, end=end_date,
+                        max_workers=MAX_WORKERS, weight_per_minute=WEIGHT_PER_MINUTE)
+    print(f"saved {sum(added.values())} new rows across {len(added)} symbol/interval pairs")
 
-end_date   = pd.Timestamp.today().normalize()
-start_date = end_date - pd.DateOffset(years=1)
-
-for asset_type, symbols in SYMBOLS.items():
-    for symbol in symbols:
-        for interval in INTERVALS:
-            path = f"data/org/{asset_type}/{symbol}/{interval}.csv"
-            os.makedirs(f"data/org/{asset_type}/{symbol}", exist_ok=True)
-            print(f"Fetching {symbol} {interval} ...")
-            start_int = int(start_date.value / 1e6)
-            end_int   = int(end_date.value / 1e6)
-            obj   = get_klines(BASE_URL, symbol=symbol, interval=interval, startTime=start_int, endTime=end_int)
-            resdf = get_klines_df(obj)
-            resdf.to_csv(path)
-            print(f"  saved {len(resdf)} rows")
\ No newline at end of file
+    if DERIVE_FROM_1M:
+        for asset_type, symbols in SYMBOLS.items():
+            for symbol in symbols:
+                derived = write_derived(asset_type, symbol, INTERVALS)
+                print(f"  {symbol} derived: " + ", ".join(f"{i} +{n}" for i, n in derived.items()))
@@ -0,0 +1,25 @@
+import os, sys
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(root); sys.path.insert(0, root)
+
+from backtesting.shared.portfolio import run_portfolio
+from backtesting.macrossover.src.optimize import _build_df
+from scripts.run_dataloader import SYMBOLS
+
+INTERVAL  = "15m"
+RUN_START = "2025-09-21"
+RUN_END   = "2026-03-21"
+
+PARAMS = dict(short_window=10, long_window=50, trend_window=200, cross_persist=2, rsi_buy=55, rsi_sell=45,
+              use_vol_filter=False, tp_pct=0.05, sl_pct=0.03, max_candles=192)
+EVAL   = dict(init_portfolio=1000, trade_size_pct=0.1, fee_pct=0.001, leverage=1)
+
+# shared capital across all symbols: open notional ≤ MAX_EXPOSURE × balance, ≤ MAX_POSITIONS at once
+MAX_EXPOSURE  = 0.5
+MAX_POSITIONS = 4
+
+run_portfolio(
+    strategy_name="MA Crossover", symbols=SYMBOLS, interval=INTERVAL,
+    start=RUN_START, end=RUN_END, params=PARAMS, eval_params=EVAL, build_df=_build_df,
+    max_exposure=MAX_EXPOSURE, max_positions=MAX_POSITIONS,
+)
@@ -0,0 +1,29 @@
+import os, sys
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(root); sys.path.insert(0, root)
+
+from rich.console import Console
+
+from backtesting.shared.replay import make_server
+from scripts.run_dataloader import SYMBOLS, INTERVALS
+
+# Serves data/org/... candles on the Binance kline endpoints so run_dataloader / live loops
+# can be pointed at http://HOST:PORT instead of api.binance.com.
+HOST  = "127.0.0.1"
+PORT  = 8765
+START = "2025-09-21"   # market time the replay clock starts at
+SPEED = 60.0           # None → max throughput, 1.0 → real time, 60.0 → 1 market minute per second
+
+WEIGHT_LIMIT = 6000    # request weight per minute before the server answers 429
+
+console = Console()
+server  = make_server(SYMBOLS, host=HOST, port=PORT, start=START, speed=SPEED, weight_limit=WEIGHT_LIMIT)
+
+pace = "max throughput" if not SPEED else f"{SPEED:g}× real time from {START}"
+console.print(f"[bold]Replay server[/bold]  ·  http://{HOST}:{PORT}  [{pace}]")
+console.print("[dim]REST  /api/v3/klines?symbol=BTCUSDT&interval=15m&limit=1000[/dim]")
+console.print(f"[dim]WS    ws://{HOST}:{PORT}/stream?streams=" + "/".join(f"{s.lower()}@kline_{i}" for s in SYMBOLS["crypto"][:2] for i in INTERVALS[:2]) + "[/dim]")
+try:
+    server.serve_forever()
+except KeyboardInterrupt:
+    server.shutdown()
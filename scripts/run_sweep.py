@@ -0,0 +1,29 @@
+import os, sys
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(root); sys.path.insert(0, root)
+
+from backtesting.shared import registry
+from backtesting.shared.sweep import run_sweep
+from scripts.run_dataloader import SYMBOLS, INTERVALS
+
+STRATEGIES  = ["macrossover", "momentum", "linreg", "mllinreg", "bayeslinreg"]
+SWEEP_INTERVALS = [i for i in INTERVALS if i != "1m"]
+
+TRAIN_START = "2024-03-21"
+TRAIN_END   = "2025-09-21"
+TEST_START  = "2025-09-21"
+TEST_END    = "2026-03-21"
+
+EVAL_PARAMS = dict(init_portfolio=1000, trade_size_pct=0.1, fee_pct=0.001, leverage=1)
+TOP_N  = 10
+N_JOBS = 8   # each worker takes whole (symbol, interval) datasets, largest first
+
+# the registry's default grids; max_candles is in bars of whatever interval is being run
+GRIDS = {n: registry.get(n)["grid"] for n in STRATEGIES}
+
+if __name__ == "__main__":
+    run_sweep(
+        strategies=STRATEGIES, symbols=SYMBOLS, intervals=SWEEP_INTERVALS, grids=GRIDS,
+        train=(TRAIN_START, TRAIN_END), test=(TEST_START, TEST_END),
+        eval_params=EVAL_PARAMS, top_n=TOP_N, n_jobs=N_JOBS,
+    )
@@ -0,0 +1,42 @@
+import os, sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtesting.shared.resample import resample_klines
+
+SYMBOL, ASSET_TYPE = "BTCUSDT", "crypto"
+START = pd.Timestamp("2025-08-01")
+
+
+# --- a random-walk 1m series with the stored kline columns ---
+def make_1m(n: int, start=START, seed: int = 0) -> pd.DataFrame:
+    rng   = np.random.default_rng(seed)
+    ot    = start + pd.to_timedelta(np.arange(n), unit="min")
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+    openp = np.r_[close[0], close[:-1]]
+    vol   = rng.uniform(1, 10, n)
+    return pd.DataFrame({
+        "open_time": ot, "open_price": openp,
+        "high_price": np.maximum(openp, close) * (1 + np.abs(rng.normal(0, 0.0005, n))),
+        "low_price": np.minimum(openp, close) * (1 - np.abs(rng.normal(0, 0.0005, n))),
+        "close_price": close, "volume": vol,
+        "close_time": ot + pd.Timedelta(minutes=1) - pd.Timedelta(milliseconds=1),
+        "quote_asset_volume": vol * close, "number_of_trades": rng.integers(10, 100, n),
+        "taker_buy_base_asset_volume": vol / 2, "taker_buy_quote_asset_volume": vol * close / 2,
+    })
+
+
+# --- tmp repo root with data/org/crypto/BTCUSDT/{1m,15m,1h}.csv (6 days); the cwd during the test ---
+@pytest.fixture
+def market(tmp_path, monkeypatch):
+    df1m = make_1m(6 * 24 * 60)
+    d = tmp_path / "data" / "org" / ASSET_TYPE / SYMBOL
+    d.mkdir(parents=True)
+    df1m.to_csv(d / "1m.csv")
+    for iv in ("15m", "1h"):
+        resample_klines(df1m, iv).to_csv(d / f"{iv}.csv")
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
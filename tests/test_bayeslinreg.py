@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+from scipy.special import stdtr
+
+from backtesting.bayeslinreg.src.ta import BayesLinReg, _design, posterior_predictive
+from backtesting.mllinreg.src.ta import _FEATURES
+
+
+# --- conjugate normal-inverse-gamma posterior from all n pairs at once ---
+def _batch(X, y, prior_var, noise_var):
+    P0_inv = np.eye(X.shape[1]) / prior_var
+    P      = np.linalg.inv(P0_inv + X.T @ X)
+    m      = P @ X.T @ y
+    alpha  = 1.0 + len(y) / 2
+    beta   = noise_var + 0.5 * (y @ y - m @ np.linalg.solve(P, m))
+    return m, P, alpha, beta
+
+
+def test_sequential_update_matches_the_batch_posterior():
+    rng = np.random.default_rng(0)
+    X   = np.c_[np.ones(300), rng.normal(size=(300, 3))]
+    y   = X @ np.array([0.1, -0.5, 0.2, 0.0]) + rng.normal(0, 0.3, 300)
+    model = BayesLinReg(4, forgetting=1.0, prior_var=2.0, noise_var=0.05)
+    for n, (x, t) in enumerate(zip(X, y), 1):
+        model.update(x, t)
+        if n in (1, 10, 300):
+            m, P, alpha, beta = _batch(X[:n], y[:n], 2.0, 0.05)
+            np.testing.assert_allclose(model.m, m, rtol=1e-8, atol=1e-12)
+            np.testing.assert_allclose(model.P, P, rtol=1e-8, atol=1e-12)
+            assert (model.alpha, model.beta) == (pytest.approx(alpha), pytest.approx(beta, rel=1e-8))
+
+
+def test_posterior_predictive_mean_and_variance():
+    rng   = np.random.default_rng(1)
+    n     = 400
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    feats = [rng.normal(50, 10, n) if f == "rsi" else rng.normal(0, 0.01, n) for f in _FEATURES]
+    mean, std, prob = posterior_predictive(close, *feats, forgetting=1.0, prior_var=1.0, warmup=50)
+
+    X   = _design(dict(zip(_FEATURES, feats)))
+    ret = np.r_[np.nan, close[1:] / close[:-1] - 1]
+    noise_var = float(np.nanvar(ret[1:51]))
+    for t in (50, 123, n - 1):
+        # at bar t the model has seen (x[s-1], ret[s]) for s = 1..t, and predicts from x[t]
+        m, P, alpha, beta = _batch(X[:t], ret[1:t + 1], 1.0, noise_var)
+        scale, dof = beta / alpha * (1 + X[t] @ P @ X[t]), 2 * alpha
+        assert mean[t] == pytest.approx(X[t] @ m, rel=1e-8, abs=1e-14)
+        assert std[t] ** 2 == pytest.approx(scale * dof / (dof - 2), rel=1e-8)
+        assert prob[t] == pytest.approx(stdtr(dof, X[t] @ m / np.sqrt(scale)), rel=1e-8)
+    assert (mean[:50] == 0).all() and (prob[:50] == 0.5).all()   # warmup bars are neutral
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtesting.shared.costs import corwin_schultz, trade_costs
+
+NOTIONAL = 1_000.0
+FLAT     = {"spread": None, "impact": 0}   # fees and funding only; no bars needed
+
+
+def _trades(rows) -> pd.DataFrame:
+    return pd.DataFrame(rows, columns=["entry_time", "exit_time", "exit_reason", "signal"]).assign(
+        entry_time=lambda d: pd.to_datetime(d["entry_time"]), exit_time=lambda d: pd.to_datetime(d["exit_time"]))
+
+
+def test_corwin_schultz_on_a_known_bar_pair():
+    # beta = ln(101/99)² + ln(100.5/99.5)², gamma = ln(101/99)², alpha = (√(2β) − √β)/(3 − 2√2) − √(γ/(3 − 2√2))
+    s = corwin_schultz([101.0, 100.5], [99.0, 99.5])
+    assert np.isnan(s[0]) and s[1] == pytest.approx(0.0056990897531961696, rel=1e-12)
+    assert corwin_schultz([101.0, 102.0], [99.0, 100.0])[1] == 0.0   # a negative estimate is clipped
+
+
+@pytest.mark.parametrize("entry, exit, periods", [
+    ("2025-08-01 07:59", "2025-08-01 08:00", 1),
+    ("2025-08-01 07:00", "2025-08-01 15:59", 1),
+    ("2025-08-01 07:00", "2025-08-01 16:00", 2),
+    ("2025-08-01 08:00", "2025-08-01 08:30", 0),     # funding at the entry instant is not paid
+    ("2025-08-01 23:00", "2025-08-02 00:00", 1),
+    ("2025-08-01 01:00", "2025-08-02 01:00", 3),
+])
+def test_funding_counts_periods_at_00_08_16_utc(entry, exit, periods):
+    t = _trades([(entry, exit, "timeout", 1), (entry, exit, "timeout", -1)])
+    c = trade_costs(t, NOTIONAL, FLAT | {"funding_rate": 0.001}, leverage=10)
+    np.testing.assert_allclose(c["funding"], [NOTIONAL * 0.001 * periods, -NOTIONAL * 0.001 * periods])   # shorts receive
+    assert not trade_costs(t, NOTIONAL, FLAT | {"funding_rate": 0.001}, leverage=1)["funding"].any()    # spot
+
+
+def test_maker_fee_on_tp_exits_only():
+    t  = _trades([("2025-08-01 00:00", "2025-08-01 01:00", r, 1) for r in ("tp", "sl", "timeout", "signal", "end")])
+    cm = FLAT | {"taker_fee": 0.0005, "maker_fee": 0.0002}
+    np.testing.assert_allclose(trade_costs(t, NOTIONAL, cm)["fee"], NOTIONAL * np.array([0.0007] + [0.001] * 4))
+    np.testing.assert_allclose(trade_costs(t, NOTIONAL, cm | {"tp_maker": False})["fee"], NOTIONAL * 0.001)
+    np.testing.assert_allclose(trade_costs(t, NOTIONAL, FLAT, fee_pct=0.0004)["fee"], NOTIONAL * 0.0008)   # taker = fee_pct
+
+
+def test_spread_and_slippage_need_bars():
+    t = _trades([("2025-08-01 00:00", "2025-08-01 01:00", "tp", 1)])
+    with pytest.raises(ValueError, match="bars"):
+        trade_costs(t, NOTIONAL, {})
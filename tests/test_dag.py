@@ -0,0 +1,84 @@
+import importlib
+import inspect
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtesting.shared import dag
+from backtesting.shared.load import load_df
+from backtesting.shared.registry import get
+from conftest import ASSET_TYPE, SYMBOL
+
+# strategy -> module with its add_indicators (bayeslinreg reuses mllinreg's features)
+_INDICATORS = {"momentum": "momentum", "linreg": "linreg", "macrossover": "macrossover", "mllinreg": "mllinreg",
+               "bayeslinreg": "mllinreg"}
+
+
+def _kwargs(fn, p: dict, types: dict) -> dict:
+    return {k: types[k](p[k]) if k in types else p[k] for k in inspect.signature(fn).parameters if k in p}
+
+
+# --- the add_indicators -> dropna -> add_signals chain the graphs replaced ---
+def _chain(name: str, rawdf: pd.DataFrame, p: dict) -> pd.DataFrame:
+    ind, sig = (importlib.import_module(f"backtesting.{m}.src.ta") for m in (_INDICATORS[name], name))
+    types = get(name)["params"]
+    df = ind.add_indicators(rawdf.copy(), **_kwargs(ind.add_indicators, p, types)).dropna()
+    return sig.add_signals(df, **_kwargs(sig.add_signals, p, types))
+
+
+def _param_sets(name: str, n: int, seed: int = 0) -> list:
+    spec, rng = get(name), np.random.default_rng(seed)
+    return [spec["defaults"] | {k: v[rng.integers(len(v))] for k, v in spec["grid"].items()} for _ in range(n)]
+
+
+@pytest.fixture
+def rawdf(market):
+    dag.clear()
+    return load_df(SYMBOL, "5m", ASSET_TYPE)
+
+
+@pytest.mark.parametrize("name", list(_INDICATORS))
+def test_graph_matches_the_indicator_signal_chain(rawdf, name):
+    graph = importlib.import_module(f"backtesting.{name}.src.ta").GRAPH
+    fired = 0
+    for p in _param_sets(name, 5):
+        got, want = graph(rawdf, p), _chain(name, rawdf, p)
+        assert got.index.equals(want.index) and len(got) > 0, p
+        fired += int(got["signal"].abs().sum())
+        for c in got.columns.intersection(want.columns):
+            pd.testing.assert_series_equal(got[c], want[c], check_dtype=False, rtol=1e-12, obj=f"{c} {p}")
+    assert fired > 0
+
+
+def test_nodes_are_reused_and_only_downstream_recomputed(rawdf):
+    graph = importlib.import_module("backtesting.momentum.src.ta").GRAPH
+    p     = get("momentum")["defaults"]
+    first = graph(rawdf, p)
+    built = dag.stats()["misses"]
+    pd.testing.assert_frame_equal(graph(rawdf, p), first)
+    assert dag.stats()["misses"] == built
+
+    graph(rawdf, p | {"roc_buy": 3.0})               # a signal param: only buy_mask and signal rerun
+    assert dag.stats()["misses"] == built + 2
+    assert set(graph.downstream("roc_buy")) == {"buy_mask", "signal"}
+
+    graph(rawdf, p | {"tp_pct": 0.08})               # not a graph param: everything is a hit
+    assert dag.stats()["misses"] == built + 2
+
+
+def test_cache_is_bounded_by_bytes(rawdf, monkeypatch):
+    graph = importlib.import_module("backtesting.momentum.src.ta").GRAPH
+    one   = rawdf["close_price"].to_numpy().nbytes
+    monkeypatch.setattr(dag, "_MAX_BYTES", 20 * one)
+    p = get("momentum")["defaults"]
+    for w in range(5, 30):
+        graph(rawdf, p | {"roc_window": w})
+        assert dag._bytes <= dag._MAX_BYTES
+        assert dag._bytes == sum(v.to_numpy().nbytes for v in dag._cache.values())
+
+    misses = dag.stats()["misses"]
+    graph(rawdf, p | {"roc_window": 29})                # the newest combo is still cached
+    assert dag.stats()["misses"] == misses
+    graph(rawdf, p | {"roc_window": 5})                 # the first one was evicted
+    assert dag.stats()["misses"] > misses
@@ -0,0 +1,45 @@
+import pandas as pd
+import pytest
+
+from backtesting.shared.dataloader import last_close_time, sync_klines
+from backtesting.shared.load import klines_weight
+from backtesting.shared.replay import serve_in_thread
+from conftest import ASSET_TYPE, SYMBOL
+
+
+@pytest.fixture
+def replay(market):
+    srv, url = serve_in_thread({ASSET_TYPE: [SYMBOL]}, port=0)
+    yield url
+    srv.shutdown()
+    srv.server_close()
+
+
+def _read(path) -> pd.DataFrame:
+    df = pd.read_csv(path, index_col=0)
+    for c in ("open_time", "close_time"):
+        df[c] = pd.to_datetime(df[c])
+    return df
+
+
+def test_sync_then_incremental_append_matches_source(replay):
+    mirror = "mirror/org"
+    kw = dict(symbols={ASSET_TYPE: [SYMBOL]}, intervals=["1m", "15m", "1h"], start="2025-08-01",
+              data_root=mirror, max_workers=4, log=lambda *_: None)
+
+    added = sync_klines(replay, end="2025-08-03 12:00", **kw)
+    assert added[(SYMBOL, "1h")] == 2 * 24 + 12
+    assert added[(SYMBOL, "1m")] == (2 * 24 + 12) * 60   # several 1000-candle pages
+
+    added = sync_klines(replay, end="2025-08-10", **kw)     # only what closed since
+    assert added[(SYMBOL, "1h")] == 6 * 24 - (2 * 24 + 12)
+    assert sync_klines(replay, end="2025-08-10", **kw) == {(SYMBOL, iv): 0 for iv in kw["intervals"]}
+
+    for iv in kw["intervals"]:
+        got, src = _read(f"{mirror}/{ASSET_TYPE}/{SYMBOL}/{iv}.csv"), _read(f"data/org/{ASSET_TYPE}/{SYMBOL}/{iv}.csv")
+        pd.testing.assert_frame_equal(got, src, check_dtype=False)
+    assert last_close_time(f"{mirror}/{ASSET_TYPE}/{SYMBOL}/1h.csv")[1] == 6 * 24 - 1
+
+
+def test_klines_weight_tiers():
+    assert [klines_weight(n) for n in (1, 99, 100, 499, 500, 1000, 1500)] == [1, 1, 2, 2, 5, 5, 10]
@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+
+from conftest import ASSET_TYPE, SYMBOL
+from backtesting.shared import distributed, stats
+from backtesting.shared.report import read_meta
+from backtesting.momentum.src import optimize
+
+EVAL = dict(init_portfolio=1000, trade_size_pct=0.5, fee_pct=0.0005, leverage=10)
+GRID = {"roc_window": [5, 10, 20], "smooth_window": [3], "trend_window": [20, 50], "roc_buy": [0.1, 0.2],
+        "roc_sell": [-0.1, -0.2], "tp_pct": [0.005, 0.01], "sl_pct": [0.005], "max_candles": [24, 96]}
+
+
+def _run(**kw) -> str:
+    return optimize.run_grid_search(SYMBOL, "15m", "2025-08-01", "2025-08-05", GRID, EVAL, ASSET_TYPE, prune={}, **kw)
+
+
+# --- a coordinator with two local workers writes what a local run_grid_search writes ---
+def test_local_workers_match_local_run(market):
+    local = _run()
+    try:
+        dist = _run(workers={"address": "127.0.0.1:0", "local": 2, "unit_size": 8, "heartbeat": 0.5, "lease": 5.0})
+    finally:
+        distributed.shutdown()
+
+    for name in ("grid_search.csv", "pruned.csv"):
+        pd.testing.assert_frame_equal(pd.read_csv(f"{dist}/{name}"), pd.read_csv(f"{local}/{name}"))
+    a, b = stats.load_returns(dist), stats.load_returns(local)
+    assert a.keys() == b.keys() and all(np.array_equal(a[k], b[k]) for k in a)
+    assert len(pd.read_csv(f"{local}/grid_search.csv")) > 0 and len(pd.read_csv(f"{local}/pruned.csv")) > 0
+    assert read_meta(dist)["grid"]["distributed"]["workers"] == 2
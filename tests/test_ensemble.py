@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from backtesting.shared.ensemble import combine, default_window, hold
+
+
+# --- T × M signals from {(bar, member): ±1} ---
+def _signals(n: int, fires: dict) -> np.ndarray:
+    s = np.zeros((n, 1 + max(m for _, m in fires)), dtype=np.int64)
+    for (t, m), v in fires.items():
+        s[t, m] = v
+    return s
+
+
+def test_hold_keeps_a_signal_for_window_bars():
+    s = np.array([[1], [0], [0], [-1], [0], [0], [0]])
+    assert hold(s, 1)[:, 0].tolist() == [1, 0, 0, -1, 0, 0, 0]
+    assert hold(s, 2)[:, 0].tolist() == [1, 1, 0, -1, -1, 0, 0]
+    assert hold(s, 5)[:, 0].tolist() == [1, 1, 1, -1, -1, -1, -1]   # a new signal replaces the held one
+    assert hold(np.zeros((3, 2), dtype=int), 4).tolist() == [[0, 0]] * 3
+
+
+def test_vote_needs_the_quorum_of_held_votes():
+    s = _signals(10, {(1, 0): 1, (3, 1): 1, (4, 2): -1})
+    assert not combine(s, "vote", window=1).any()                    # crosses on different bars never line up
+    assert combine(s, "vote", window=3).tolist() == [0, 0, 0, 1, 0, 0, 0, 0, 0, 0]   # 2 of 3 long at bar 3
+    assert not combine(s, "vote", window=3, quorum=3).any()         # net votes: at most 2
+    assert combine(s, "vote", window=3, quorum=1).tolist() == [0, 1, 0, 0, 0, 0, -1, 0, 0, 0]   # net turns short at 6
+    short = _signals(10, {(6, 0): -1, (7, 1): -1})
+    assert combine(short, "vote", window=2, quorum=2).tolist() == [0, 0, 0, 0, 0, 0, 0, -1, 0, 0]
+
+
+def test_weighted_compares_to_a_share_of_the_total_weight():
+    s = _signals(6, {(2, 0): 1, (2, 1): -1, (2, 2): -1})
+    assert combine(s, "weighted", weights=[3, 1, 1], threshold=0.2).tolist() == [0, 0, 1, 0, 0, 0]   # 1 ≥ 0.2·5
+    assert not combine(s, "weighted", weights=[3, 1, 1], threshold=0.3).any()                        # 1 < 0.3·5
+    assert combine(s, "weighted", threshold=0.3).tolist() == [0, 0, -1, 0, 0, 0]                      # |−1| ≥ 0.3·3
+
+
+def test_agree_keeps_lead_signals_no_other_member_votes_against():
+    s = _signals(8, {(1, 1): 1, (2, 0): 1, (4, 2): -1, (5, 0): 1, (6, 0): -1})
+    got = combine(s, "agree", window=2)
+    assert got.tolist() == [0, 0, 1, 0, 0, 0, 0, 0]    # bar 5 vetoed by member 2's held short; bar 6 has no support
+    assert combine(s, "agree", window=3, quorum=0).tolist() == [0, 0, 1, 0, 0, 0, -1, 0]
+    assert combine(s, "agree", window=1).tolist() == [0] * 8   # member 1 fired a bar early
+
+
+def test_unknown_rule_and_default_window():
+    with pytest.raises(ValueError, match="unknown ensemble rule"):
+        combine(np.zeros((2, 2)), "median")
+    assert default_window({"macrossover": {"max_candles": None}, "momentum": {"max_candles": 96},
+                           "linreg": {"max_candles": 192}}, 384) == 96
+    assert default_window({"macrossover": {"max_candles": None}}, 192) == 192
@@ -0,0 +1,43 @@
+import pandas as pd
+
+from backtesting.shared import resample
+from backtesting.shared.dataloader import append_atomic
+from backtesting.shared.load import load_df
+from conftest import ASSET_TYPE, SYMBOL, make_1m
+
+PATH_1M = f"data/org/{ASSET_TYPE}/{SYMBOL}/1m.csv"
+_resample_klines = resample.resample_klines
+
+
+def _expected(interval: str) -> pd.DataFrame:
+    return _resample_klines(pd.read_csv(PATH_1M, index_col=0), interval)
+
+
+def test_derived_frame_extends_incrementally_on_append(market, monkeypatch):
+    full = make_1m(6 * 24 * 60)
+    full.iloc[:3000].to_csv(PATH_1M)            # ends mid-bucket
+    pd.testing.assert_frame_equal(load_df(SYMBOL, "4h", ASSET_TYPE, derive=True), _expected("4h"), check_dtype=False)
+
+    rows = []
+    monkeypatch.setattr(resample, "resample_klines", lambda df, *a, **k: rows.append(len(df)) or _resample_klines(df, *a, **k))
+    for lo, hi in [(3000, 3007), (3007, 5000), (5000, len(full))]:
+        append_atomic(PATH_1M, full.iloc[lo:hi], next_index=lo)
+        got = load_df(SYMBOL, "4h", ASSET_TYPE, derive=True)
+        assert rows[-1] < hi - lo + 240         # the new rows plus at most one pending 4h bucket
+        pd.testing.assert_frame_equal(got, _expected("4h"), check_dtype=False)
+    assert len(got) == 6 * 6
+
+
+def test_derived_frame_rebuilds_when_rewritten(market):
+    load_df(SYMBOL, "1h", ASSET_TYPE, derive=True)
+    make_1m(2 * 24 * 60, seed=1).to_csv(PATH_1M)
+    pd.testing.assert_frame_equal(load_df(SYMBOL, "1h", ASSET_TYPE, derive=True), _expected("1h"), check_dtype=False)
+
+
+def test_derived_frame_matches_stored_csv(market):
+    stored, derived = load_df(SYMBOL, "15m", ASSET_TYPE), load_df(SYMBOL, "15m", ASSET_TYPE, derive=True)
+    assert list(derived.columns) == list(stored.columns)
+    for c in stored.columns:
+        assert derived[c].dtype == stored[c].dtype, c
+        pd.testing.assert_series_equal(derived[c], stored[c], check_index=False, rtol=1e-12)
+    assert pd.api.types.is_datetime64_any_dtype(stored["open_time"])
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtesting.shared import mtf
+from backtesting.shared.load import load_df, to_ms
+from conftest import ASSET_TYPE, SYMBOL
+
+
+def _close(close: pd.Series) -> np.ndarray:
+    return close.to_numpy(np.float64)
+
+
+def test_asof_index_never_sees_an_unclosed_bar(market):
+    base, htf = load_df(SYMBOL, "15m", ASSET_TYPE), load_df(SYMBOL, "1h", ASSET_TYPE)
+    b, h = to_ms(base["close_time"]).to_numpy(), to_ms(htf["close_time"]).to_numpy()
+    idx  = mtf.asof_index(base["close_time"], htf["close_time"])
+    seen = idx >= 0
+    assert (h[idx[seen]] <= b[seen]).all()                              # the mapped HTF bar has closed
+    nxt  = np.minimum(idx + 1, len(h) - 1)
+    assert ((h[nxt] > b) | (idx == len(h) - 1)).all()                   # and it is the newest one that has
+    assert (idx[:3] == -1).all() and idx[3] == 0                        # 00:45 closes with the 00:00 hour bar
+    coincide = np.isin(b, h)
+    assert coincide.sum() == len(h) and (h[idx[coincide]] == b[coincide]).all()
+
+
+def test_htf_feature_is_the_last_closed_htf_value(market):
+    mtf.clear()
+    base, htf = load_df(SYMBOL, "15m", ASSET_TYPE), load_df(SYMBOL, "1h", ASSET_TYPE)
+    got = mtf.htf_feature(base["close_time"], "1h", _close)
+    assert np.isnan(got[:3]).all()
+    want = [htf.loc[htf["close_time"] <= t, "close_price"].iloc[-1] for t in base["close_time"].iloc[3:]]
+    np.testing.assert_array_equal(got[3:], want)
+
+    # rewriting HTF bars that close after a base bar cannot change that base bar's value
+    cut = base["close_time"].iloc[100]
+    htf.loc[htf["close_time"] > cut, "close_price"] *= 2
+    idx = mtf.asof_index(base["close_time"], htf["close_time"])
+    np.testing.assert_array_equal(mtf.gather(_close(htf["close_price"]), idx)[:101], got[:101])
+
+
+@pytest.mark.parametrize("interval", ["7m", "1H", None])
+def test_unknown_interval_is_a_value_error(market, interval):
+    base = load_df(SYMBOL, "15m", ASSET_TYPE)
+    with pytest.raises(ValueError, match="unknown higher timeframe"):
+        mtf.htf_feature(base["close_time"], interval, _close)
+    with pytest.raises(ValueError, match="longer than"):
+        mtf.htf_feature(base["close_time"], "15m", _close)
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtesting.shared.load import load_df
+from backtesting.shared.portfolio import simulate_portfolio
+from backtesting.shared.trade import evaluate_trades, simulate_trades
+from conftest import ASSET_TYPE, SYMBOL
+
+EVAL = {"init_portfolio": 1_000, "trade_size_pct": 0.1, "fee_pct": 0.0005, "leverage": 10}
+EXIT = {"tp_pct": 0.004, "sl_pct": 0.003, "max_candles": 12}
+
+
+def _frame(seed: int = 0, p: float = 0.05) -> pd.DataFrame:
+    df  = load_df(SYMBOL, "15m", ASSET_TYPE)
+    rng = np.random.default_rng(seed)
+    return df.assign(signal=rng.choice([-1, 0, 1], len(df), p=[p, 1 - 2 * p, p]))
+
+
+def _single(df: pd.DataFrame, **eval_params) -> pd.DataFrame:
+    return evaluate_trades(simulate_trades(df, **EXIT), **(EVAL | eval_params), bars=df)
+
+
+def _same_trades(got: pd.DataFrame, want: pd.DataFrame, cols) -> None:
+    got  = got.sort_values("entry_time").reset_index(drop=True)
+    want = want.sort_values("entry_time").reset_index(drop=True)
+    assert len(got) == len(want) > 0
+    for c in cols:
+        np.testing.assert_allclose(got[c].to_numpy(np.float64), want[c].to_numpy(np.float64), rtol=1e-9, err_msg=c)
+
+
+@pytest.mark.parametrize("cost_model", [{}, {"spread": 0.0004, "impact": 0.5, "funding_rate": 0.0002}])
+def test_cost_model_charges_match_evaluate_trades(market, cost_model):
+    df = _frame()
+    got, _ = simulate_portfolio({SYMBOL: df}, **EXIT, **EVAL, max_exposure=1e9, cost_model=cost_model)
+    want   = _single(df, cost_model=cost_model)
+    _same_trades(got, want, ["entry_price", "exit_price", "signal", "pnl", "cost_fee", "cost_spread",
+                             "cost_slippage", "cost_funding"])
+
+
+def test_single_symbol_without_caps_matches_evaluate_trades(market):
+    df = _frame()
+    got, equity = simulate_portfolio({SYMBOL: df}, **EXIT, **EVAL, max_exposure=1e9)
+    want = _single(df)
+    _same_trades(got, want, ["entry_price", "exit_price", "signal", "return", "pnl", "portfolio"])
+    assert got["exit_reason"].tolist() == want.sort_values("entry_time")["exit_reason"].tolist()
+    assert got.attrs["final_portfolio"] == want.attrs["final_portfolio"]
+    assert got.attrs["rejected"] == 0 and got.attrs["max_positions"] == 1
+    assert equity["equity"].iloc[-1] == pytest.approx(want.attrs["final_portfolio"], abs=0.005)
+
+
+# --- most positions open at once, from the trades' [entry, exit) intervals ---
+def _most_open(t: pd.DataFrame) -> int:
+    edges = pd.concat([pd.Series(1, index=t["entry_time"]), pd.Series(-1, index=t["exit_time"])]).sort_index()
+    return int(edges.groupby(level=0).sum().cumsum().max())
+
+
+@pytest.mark.parametrize("caps", [{"max_exposure": 1.0}, {"max_exposure": 1e9, "max_positions": 1}])
+def test_entries_over_a_cap_are_skipped(market, caps):
+    frames = {SYMBOL: _frame(0, 0.1), "ETHUSDT": _frame(1, 0.1)}   # one position uses exposure 1.0
+    free, _   = simulate_portfolio(frames, **EXIT, **EVAL, max_exposure=1e9)
+    capped, _ = simulate_portfolio(frames, **EXIT, **EVAL, **caps)
+    assert free.attrs["max_positions"] == 2 and free.attrs["rejected"] == 0
+    assert capped.attrs["max_positions"] == _most_open(capped) == 1
+    assert capped.attrs["rejected"] > 0 and len(capped) < len(free)
+    assert (capped["notional"] == EVAL["init_portfolio"] * EVAL["trade_size_pct"] * EVAL["leverage"]).all()
+
+
+def test_compound_sizes_from_the_current_balance(market):
+    df = _frame()
+    got, _ = simulate_portfolio({SYMBOL: df}, **EXIT, **EVAL, max_exposure=1e9, compound=True)
+    balance = EVAL["init_portfolio"] + np.r_[0.0, got["pnl"].cumsum().to_numpy()[:-1]]   # one position at a time
+    np.testing.assert_allclose(got["notional"], balance * EVAL["trade_size_pct"] * EVAL["leverage"], rtol=1e-12)
+    assert got["notional"].nunique() > 1
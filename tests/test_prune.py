@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+from conftest import ASSET_TYPE, SYMBOL
+from backtesting.shared import robust
+from backtesting.shared.cache import METRIC_COLS
+from backtesting.momentum.src import optimize, validate
+
+EVAL = dict(init_portfolio=1000, trade_size_pct=0.1, fee_pct=0.0005, leverage=10)
+GRID = {"roc_window": [5, 10], "smooth_window": [3], "trend_window": [20], "roc_buy": [0.1, 0.2],
+        "roc_sell": [-0.1, -0.2], "tp_pct": [0.01], "sl_pct": [0.01], "max_candles": [24]}
+
+
+# --- every combo pruned: grid_search.csv keeps its header and validation finds no candidates ---
+def test_all_pruned_run_validates_to_nothing(market):
+    run_dir = optimize.run_grid_search(SYMBOL, "15m", "2025-08-01", "2025-08-04", GRID, EVAL, ASSET_TYPE,
+                                       prune={"min_trades": 10 ** 6})
+    df = pd.read_csv(f"{run_dir}/grid_search.csv")
+    assert df.empty and {"roc_window", "sharpe", "trades"} <= set(df.columns)
+    assert len(pd.read_csv(f"{run_dir}/pruned.csv")) == 8
+
+    for rank_by in ("robust", "sharpe"):
+        out = validate.run_validation(SYMBOL, "15m", "2025-08-04", "2025-08-07", EVAL, ASSET_TYPE,
+                                      run_dir=run_dir, rank_by=rank_by)
+        assert out.empty and "pass" in out.columns
+
+
+# --- some combos pruned, some kept: the survivors' rows are those of the full run, and the pruned ones fail the bar ---
+def test_survivors_match_the_unpruned_run(market):
+    grid  = GRID | {"roc_window": [5, 10, 20], "trend_window": [20, 50], "tp_pct": [0.005, 0.01], "sl_pct": [0.005]}
+    evals = EVAL | {"trade_size_pct": 0.5}
+    prune = {"max_dd": 5, "min_trades": 10, "chunk": 4}
+
+    def run(p):
+        return optimize.run_grid_search(SYMBOL, "15m", "2025-08-01", "2025-08-05", grid, evals, ASSET_TYPE, prune=p)
+
+    full, a, b = run(None), run(prune), run(prune)
+
+    full = pd.read_csv(f"{full}/grid_search.csv")
+    kept = pd.read_csv(f"{a}/grid_search.csv")
+    cut  = pd.read_csv(f"{a}/pruned.csv")
+    pd.testing.assert_frame_equal(pd.read_csv(f"{b}/grid_search.csv"), kept)          # deterministic
+    pd.testing.assert_frame_equal(pd.read_csv(f"{b}/pruned.csv"), cut)
+    assert 0 < len(kept) < len(full) and len(kept) + len(cut) == len(full)
+    assert {r.split(":")[0] for r in cut["reason"]} == {"max_dd", "min_trades"}
+
+    keys = list(grid)
+    both = kept.merge(full, on=keys, suffixes=("", "_full"), validate="one_to_one")
+    assert len(both) == len(kept)
+    for c in [c for c in kept.columns if c in METRIC_COLS and c != "dsr"]:   # dsr deflates by the grid's trials
+        np.testing.assert_array_equal(both[c].to_numpy(), both[f"{c}_full"].to_numpy(), err_msg=c)
+
+    gone = full.merge(cut[keys], on=keys)
+    assert len(gone) == len(cut)
+    assert ((gone["max_drawdown"] <= -prune["max_dd"]) | (gone["trades"] < prune["min_trades"])).all()
+
+
+# --- max_dd-pruned combos pull their neighbours' robustness down; min_trades-pruned ones are left out ---
+def test_robust_score_known_bad_points():
+    grid = {"a": [1, 2, 3]}
+    df   = pd.DataFrame({"a": [1, 2], "sharpe": [1.0, 1.2], "max_drawdown": [-5.0, -6.0]})
+    base = robust.score(df, grid)
+
+    few  = pd.DataFrame({"a": [3], "reason": ["min_trades: at most 2 possible"], "max_trades": [2], "drawdown": [np.nan]})
+    pd.testing.assert_frame_equal(robust.score(df, grid, pruned=few), base)
+
+    dd   = pd.DataFrame({"a": [3], "reason": ["max_dd: -25.0% after 9 trades"], "max_trades": [np.nan], "drawdown": [-25.0]})
+    out  = robust.score(df, grid, pruned=dd)
+    assert out.loc[1, "robust"] < base.loc[1, "robust"]
+    assert out.loc[1, "dd_nbr_min"] == -25.0 and out.loc[1, "nbr_n"] == 3
+    assert out.loc[0, "robust"] == base.loc[0, "robust"]
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+from backtesting.shared import regime
+
+WINDOW = 20
+
+
+# --- a random walk switching between a calm and a volatile regime every 300 bars ---
+def _close(n: int = 2400, seed: int = 0) -> pd.Series:
+    rng = np.random.default_rng(seed)
+    vol = np.where((np.arange(n) // 300) % 2, 0.004, 0.001)
+    return pd.Series(100 * np.exp(np.cumsum(rng.normal(0, vol))))
+
+
+def _model(close: pd.Series) -> dict:
+    return regime.fit(regime.features(close, WINDOW), states=2)
+
+
+def test_filter_rows_are_distributions():
+    close = _close()
+    probs = regime.filter_probs(regime.features(close, WINDOW), _model(close))
+    assert np.isnan(probs[:WINDOW]).all()
+    np.testing.assert_allclose(probs[WINDOW:].sum(axis=1), 1.0, rtol=1e-12)
+    calm = (np.arange(len(close)) // 300) % 2 == 0
+    assert probs[WINDOW:][calm[WINDOW:], 0].mean() > 0.8        # state 0 is the calm one
+
+
+def test_row_t_ignores_later_bars():
+    close, t = _close(), 1000
+    model = _model(close)
+    probs = regime.filter_probs(regime.features(close, WINDOW), model)
+    later = close.copy()
+    later.iloc[t + 1:] *= np.exp(np.random.default_rng(1).normal(0, 0.05, len(close) - t - 1))
+    moved = regime.filter_probs(regime.features(later, WINDOW), model)
+    np.testing.assert_array_equal(moved[:t + 1], probs[:t + 1])
+    assert not np.allclose(moved[t + 1:], probs[t + 1:])
+
+
+def test_live_filter_reproduces_filter_probs():
+    close = _close(1200)
+    model = _model(close) | {"window": WINDOW}
+    probs = regime.filter_probs(regime.features(close, WINDOW), model)
+    live  = regime.RegimeFilter(model)
+    for t, c in enumerate(close):
+        p = live.update(c)
+        if t < WINDOW:
+            assert p is None
+        else:
+            np.testing.assert_allclose(p, probs[t], rtol=1e-6, atol=1e-12, err_msg=str(t))
+
+
+def test_zero_states_is_no_constraint():
+    close = _close(500)
+    np.testing.assert_array_equal(regime.regime_prob(close, states=0), np.ones(len(close)))
@@ -0,0 +1,126 @@
+import base64
+import json
+import os
+import socket
+import struct
+import urllib.error
+import urllib.request
+
+import pytest
+
+from backtesting.shared.load import load_df, to_ms
+from backtesting.shared.replay import serve_in_thread
+from conftest import ASSET_TYPE, SYMBOL
+
+
+@pytest.fixture
+def server(market):
+    srv, url = serve_in_thread({ASSET_TYPE: [SYMBOL]}, port=0)
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+# --- minimal websocket client: handshake, masked frames out, frames in ---
+def _connect(srv, path: str) -> socket.socket:
+    sock = socket.create_connection(srv.server_address[:2], timeout=5)
+    key  = base64.b64encode(os.urandom(16)).decode()
+    sock.sendall((f"GET {path} HTTP/1.1\r\nHost: x\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                  f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n").encode())
+    head = b""
+    while b"\r\n\r\n" not in head:
+        head += sock.recv(1)
+    assert head.startswith(b"HTTP/1.1 101")
+    return sock
+
+
+def _recv_exact(sock, n: int) -> bytes:
+    buf = b""
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        assert chunk, "connection closed mid-frame"
+        buf += chunk
+    return buf
+
+
+def _recv(sock) -> tuple:
+    b0, b1 = _recv_exact(sock, 2)
+    n = b1 & 0x7F
+    if n == 126:
+        n = struct.unpack("!H", _recv_exact(sock, 2))[0]
+    elif n == 127:
+        n = struct.unpack("!Q", _recv_exact(sock, 8))[0]
+    return b0 & 0x0F, _recv_exact(sock, n)
+
+
+def _send(sock, payload: bytes, opcode: int) -> None:
+    mask = os.urandom(4)
+    sock.sendall(bytes([0x80 | opcode, 0x80 | len(payload)]) + mask + bytes(b ^ mask[i % 4] for i, b in enumerate(payload)))
+
+
+def _get(srv, path: str) -> tuple:
+    host, port = srv.server_address[:2]
+    try:
+        with urllib.request.urlopen(f"http://{host}:{port}{path}", timeout=5) as r:
+            return r.status, json.loads(r.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+@pytest.mark.parametrize("query, code", [
+    ("limit=abc", -1100), ("limit=0", -1130), ("limit=-5", -1130), ("startTime=x", -1100), ("endTime=1.5", -1100),
+    ("interval=../../x", -1120), ("interval=7m", -1120), ("symbol=ETHUSDT", -1121),
+])
+def test_bad_kline_params_get_400(server, query, code):
+    params = {"symbol": SYMBOL, "interval": "1h"} | dict([query.split("=", 1)])
+    status, body = _get(server, "/api/v3/klines?" + "&".join(f"{k}={v}" for k, v in params.items()))
+    assert status == 400 and body["code"] == code
+    status, body = _get(server, f"/api/v3/klines?symbol={SYMBOL}&interval=1h&limit=3")
+    assert status == 200 and len(body) == 3
+
+
+# --- intervals without their own CSV are served as load_df derives them from 1m ---
+@pytest.mark.parametrize("interval", ["5m", "4h", "15m"])
+def test_klines_serve_the_backtest_intervals(server, interval):
+    status, body = _get(server, f"/api/v3/klines?symbol={SYMBOL}&interval={interval}&limit=1000")
+    want = load_df(SYMBOL, interval, ASSET_TYPE).tail(1000)
+    assert status == 200 and len(body) == len(want) > 0
+    assert [r[0] for r in body] == to_ms(want["open_time"]).tolist()
+    assert [float(r[4]) for r in body] == want["close_price"].tolist()
+
+
+def test_stream_replays_closed_candles(server):
+    sock = _connect(server, f"/ws/{SYMBOL.lower()}@kline_1h")
+    events = []
+    while True:
+        op, data = _recv(sock)
+        if op == 0x8:
+            break
+        events.append(json.loads(data))
+    assert len(events) == 6 * 24
+    assert all(e["s"] == SYMBOL and e["k"]["i"] == "1h" and e["k"]["x"] for e in events)
+    assert [e["k"]["t"] for e in events] == sorted(e["k"]["t"] for e in events)
+
+
+@pytest.mark.parametrize("stream, code", [("ethusdt@kline_1h", -1121), (f"{SYMBOL.lower()}@kline_7m", -1120),
+                                          (f"{SYMBOL.lower()}@kline_1h&startTime=x", -1100)])
+def test_invalid_stream_gets_error_and_close(server, stream, code):
+    sock = _connect(server, f"/stream?streams={SYMBOL.lower()}@kline_15m/{stream}")
+    op, data = _recv(sock)
+    assert op == 0x1 and json.loads(data)["error"]["code"] == code
+    op, data = _recv(sock)
+    assert op == 0x8 and struct.unpack("!H", data[:2])[0] == 1008
+
+
+def test_ping_and_client_close(market):
+    srv, _ = serve_in_thread({ASSET_TYPE: [SYMBOL]}, port=0, start="2025-08-01 01:00", speed=1.0)
+    try:
+        sock = _connect(srv, f"/ws/{SYMBOL.lower()}@kline_1h")
+        _send(sock, b"hi", 0x9)
+        assert _recv(sock) == (0xA, b"hi")
+        _send(sock, struct.pack("!H", 1000), 0x8)
+        op, data = _recv(sock)
+        assert op == 0x8 and struct.unpack("!H", data[:2])[0] == 1000
+    finally:
+        srv.shutdown()
+        srv.server_close()
@@ -0,0 +1,37 @@
+import os
+
+import pandas as pd
+
+from backtesting.momentum.src import optimize, validate
+from backtesting.shared import report
+from conftest import ASSET_TYPE, SYMBOL
+
+EVAL = dict(init_portfolio=1000, trade_size_pct=0.1, fee_pct=0.0005, leverage=10)
+GRID = {"roc_window": [5, 10], "smooth_window": [3], "trend_window": [20], "roc_buy": [0.1, 0.2],
+        "roc_sell": [-0.1, -0.2], "tp_pct": [0.01], "sl_pct": [0.01], "max_candles": [24]}
+
+
+# --- a stored grid + validate run renders README.md, validate.md and report.html from its data alone ---
+def test_render_run_writes_the_reports(market, monkeypatch):
+    monkeypatch.setattr(report, "MODE", "defer")
+    run_dir = optimize.run_grid_search(SYMBOL, "15m", "2025-08-01", "2025-08-04", GRID, EVAL, ASSET_TYPE)
+    validate.run_validation(SYMBOL, "15m", "2025-08-04", "2025-08-07", EVAL, ASSET_TYPE, run_dir=run_dir)
+    assert not any(os.path.exists(f"{run_dir}/{f}") for f in ("README.md", "validate.md", "report.html"))
+
+    out = report.render_run(run_dir)
+    for name in ("README.md", "validate.md", "report.html"):
+        assert f"{run_dir}/{name}" in out and os.path.getsize(f"{run_dir}/{name}") > 0
+    assert "Grid Search" in open(f"{run_dir}/README.md").read()
+    assert len(pd.read_csv(f"{run_dir}/validate.csv")) > 0
+
+
+# --- a run that fails to render is reported as "Type: message" on the serial path as on the pool path ---
+def test_render_runs_reports_failures(tmp_path):
+    bad = tmp_path / "bad"
+    bad.mkdir()
+    pd.DataFrame({"sharpe": [1.0]}).to_csv(bad / "grid_search.csv", index=False)
+    report.write_meta(str(bad), "grid", {"strategy_name": "x"})   # no readme_cols
+    for n_jobs in (1, 2):
+        done = report.render_runs([str(bad)], n_jobs=n_jobs)
+        assert done == {str(bad): "KeyError: 'readme_cols'"}
+    assert report.render_runs([str(bad), str(bad)], n_jobs=2)[str(bad)].startswith("KeyError")
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtesting.shared.result import lttb, plot
+from conftest import make_1m
+
+
+def test_lttb_keeps_endpoints_and_skips_nans():
+    rng = np.random.default_rng(0)
+    x   = np.arange(1000)
+    y   = np.cumsum(rng.normal(size=1000))
+    y[[0, 17, 500, 501, 999]] = np.nan
+    for n in (3, 10, 100, 500):
+        idx = lttb(x, y, n)
+        assert len(idx) == n and idx[0] == 1 and idx[-1] == 998   # first / last non-NaN points
+        assert (np.diff(idx) > 0).all() and not np.isnan(y[idx]).any()
+
+    spike = np.zeros(1000)
+    spike[321] = 50.0
+    assert 321 in lttb(x, spike, 20)                               # the shape's extreme survives
+
+
+def test_lttb_returns_every_point_when_n_covers_them():
+    t = pd.date_range("2025-08-01", periods=50, freq="min").to_numpy()
+    y = np.linspace(0, 1, 50)
+    y[10] = np.nan
+    want = np.delete(np.arange(50), 10)
+    for n in (49, 50, 1000, None):
+        np.testing.assert_array_equal(lttb(t, y, n), want)
+
+
+def test_plot_off_screen_leaves_the_backend_alone(tmp_path, monkeypatch):
+    matplotlib = pytest.importorskip("matplotlib")
+
+    def no_switch(*a, **kw):
+        raise AssertionError("plot(show=False) must not switch the global backend")
+
+    monkeypatch.setattr(matplotlib, "use", no_switch)
+    before = matplotlib.rcParams["backend"]
+    df = make_1m(3000).assign(ma=lambda d: d["close_price"].rolling(20).mean())
+    plot(df, price_overlays=[("ma", "MA 20", None)], save_path=str(tmp_path / "plot.png"), show=False, max_points=500)
+    assert (tmp_path / "plot.png").stat().st_size > 0
+    assert matplotlib.rcParams["backend"] == before
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+from backtesting.shared.load import to_ms
+from backtesting.shared.ringbuffer import CandleRing, RingStore
+from conftest import SYMBOL, make_1m
+
+
+def _rows(df: pd.DataFrame) -> list:
+    out = df.assign(open_time=to_ms(df["open_time"]), close_time=to_ms(df["close_time"]))
+    return out.to_dict("records")
+
+
+def test_window_stays_contiguous_across_wraparound():
+    df, ring = make_1m(21), CandleRing(8)
+    for r in _rows(df):
+        ring.append(r)
+        for n in {1, min(5, len(ring)), len(ring)}:
+            cols, end = ring.window(n)
+            assert end == ring.written and cols["close_price"].base is ring._data["close_price"]
+            np.testing.assert_array_equal(cols["close_price"], df["close_price"].iloc[end - n:end])
+    assert not ring.append(_rows(df)[-3])    # older candle: ignored
+
+
+def test_extend_matches_append():
+    df = make_1m(50)
+    by_row, by_frame = CandleRing(16), CandleRing(16)
+    for r in _rows(df):
+        by_row.append(r)
+    for lo, hi in [(0, 5), (3, 9), (9, 40), (38, 50)]:  # overlapping chunks and one longer than the ring
+        by_frame.extend(df.iloc[lo:hi])
+    assert by_frame.written == by_row.written == by_frame.writing == 50
+    for c in by_row.columns:
+        np.testing.assert_array_equal(by_frame._data[c], by_row._data[c])
+    pd.testing.assert_frame_equal(by_frame.frame(), df.tail(16).reset_index(drop=True)[list(by_frame.columns)],
+                                  check_dtype=False)
+
+
+def test_intact_sees_the_lap_and_the_write_in_progress():
+    ring = CandleRing(8)
+    ring.extend(make_1m(8))
+    _, end = ring.window(8)
+    assert ring.intact(end, 8)
+    ring.writing = ring.written + 1             # the writer is filling row 8, which reuses row 0's slot
+    assert not ring.intact(end, 8) and ring.intact(end, 7)
+    ring.append(_rows(make_1m(9))[-1])
+    assert not ring.intact(end, 8) and ring.intact(end, 7) and not ring.intact(end - 1, 7)
+
+
+def test_on_kline_stores_closed_candles_only():
+    store = RingStore(4)
+    k = {"t": 0, "T": 59_999, "s": SYMBOL, "i": "1m", "o": "1", "h": "2", "l": "0.5", "c": "1.5", "v": "3",
+         "q": "4.5", "n": 7, "V": "1", "Q": "1.5", "x": False}
+    assert not store.on_kline({"e": "kline", "k": k})
+    assert store.on_kline({"e": "kline", "k": k | {"x": True}})
+    assert not store.on_kline({"e": "kline", "k": k | {"x": True}})   # duplicate
+    ring = store.get(SYMBOL, "1m")
+    assert ring.written == 1 and ring.frame()["close_price"].tolist() == [1.5]
+
+
+def test_snapshot_round_trip(tmp_path):
+    store = RingStore(16)
+    store.get(SYMBOL, "1m").extend(make_1m(40))
+    store.get(SYMBOL, "15m").extend(make_1m(5, seed=1))
+    store.snapshot(str(tmp_path))
+    restored = RingStore.restore(str(tmp_path), 16)
+    assert set(restored.rings) == set(store.rings)
+    for key, ring in store.rings.items():
+        back = restored.rings[key]
+        assert (back.written, back.writing, back.meta) == (ring.written, ring.written, ring.meta)
+        pd.testing.assert_frame_equal(back.frame(), ring.frame())
+    back = restored.rings[(SYMBOL, "1m")]
+    back.extend(make_1m(41))
+    assert back.written == 41 and back.last_open_ms == int(to_ms(make_1m(41)["open_time"]).iloc[-1])
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtesting.shared.sizing import (SizingError, check_columns, hit_rate_size, kelly_size, size_bars, size_trades,
+                                       vol_target_size)
+from conftest import make_1m
+
+T0 = pd.Timestamp("2025-08-01")
+
+
+def test_kelly_sizes_in_the_signal_direction():
+    mean = [0.01, 0.01, -0.01, -0.01, 0.01, -0.01]
+    size = kelly_size(mean, [0.1] * 6, direction=[1, -1, -1, 1, 0, 0], fraction=0.5)   # mu / sigma^2 = ±1
+    np.testing.assert_allclose(size, [0.5, 0.0, 0.5, 0.0, 0.5, 0.5])
+    np.testing.assert_allclose(kelly_size(mean, [0.1] * 6, fraction=0.5), [0.5, 0.5, 0.0, 0.0, 0.5, 0.0])
+    np.testing.assert_allclose(kelly_size([0.01, np.nan], [0.0, 0.1]), [0.0, 0.0])
+
+
+def _trades(n: int, seed: int = 0) -> pd.DataFrame:
+    rng   = np.random.default_rng(seed)
+    entry = T0 + pd.to_timedelta(np.sort(rng.integers(0, 50 * n, n)), unit="min")
+    exit_ = entry + pd.to_timedelta(rng.integers(1, 200, n), unit="min")
+    price = 100 * (1 + rng.normal(0.001, 0.01, n))
+    return pd.DataFrame({"entry_time": entry, "exit_time": exit_, "entry_price": 100.0, "exit_price": price,
+                         "signal": rng.choice([-1, 1], n)})
+
+
+# --- hit_rate_size for one trade, from the trades that closed by its entry ---
+def _by_hand(t: pd.DataFrame, i: int, fraction, window, min_trades) -> float:
+    done = t[t["exit_time"] <= t["entry_time"].iloc[i]].sort_values("exit_time", kind="stable").tail(window)
+    r    = (done["signal"] * (done["exit_price"] - done["entry_price"]) / done["entry_price"]).to_numpy()
+    if len(r) < min_trades:
+        return np.nan
+    win, loss = r[r > 0], -r[r <= 0]
+    if len(loss) == 0 or len(win) == 0:
+        return fraction * (len(loss) == 0)
+    p = len(win) / len(r)
+    return max(0.0, (p - (1 - p) / (win.mean() / loss.mean())) * fraction)
+
+
+def test_hit_rate_uses_only_trades_closed_before_entry():
+    t    = _trades(200)
+    size = hit_rate_size(t, fraction=0.5, window=30, min_trades=10)
+    want = [_by_hand(t, i, 0.5, 30, 10) for i in range(len(t))]
+    np.testing.assert_allclose(size, want, rtol=1e-12)
+    assert np.isnan(size[:10]).all() and np.isfinite(size[-50:]).all()
+
+    # rewriting the outcome of trades still open at entry i cannot change size i
+    i     = 120
+    later = t["exit_time"] > t["entry_time"].iloc[i]
+    flip  = t.assign(exit_price=np.where(later, 200 - t["exit_price"], t["exit_price"]))
+    assert hit_rate_size(flip, 0.5, 30, 10)[i] == size[i]
+
+
+def test_size_trades_caps_at_the_vol_target():
+    df = make_1m(6000).assign(signal=0)
+    t  = _trades(100).assign(entry_time=lambda d: d["entry_time"].dt.floor("min"))
+    sizing = {"method": "hit_rate", "fraction": 5.0, "window": 30, "min_trades": 5, "target_vol": 0.05, "max_size": 10.0}
+    got  = size_trades(t, sizing, df)["size"].to_numpy()
+    cap  = pd.Series(vol_target_size(df["close_price"], 0.05, 30, open_time=df["open_time"]), index=df["open_time"])   # "window" serves both
+    want = np.clip(np.fmin(hit_rate_size(t, 5.0, 30, 5), cap.reindex(t["entry_time"]).to_numpy()), 0, 10.0)
+    np.testing.assert_allclose(got, want)
+    assert (got[np.isfinite(got)] <= cap.max() + 1e-12).all() and (got < hit_rate_size(t, 5.0, 30, 5)).any()
+    assert "size" not in size_trades(t, {"method": "vol"}, df)   # bar-level methods size the bars instead
+
+
+def test_check_columns_raises_sizing_error():
+    kelly = {"method": "kelly"}
+    with pytest.raises(SizingError, match="bayeslinreg"):
+        check_columns(kelly, ["close_price", "signal"], "momentum")
+    with pytest.raises(SizingError):
+        size_bars(make_1m(10).assign(signal=0), kelly)
+    check_columns(kelly, ["_pred_mean", "_pred_std"])
+    check_columns({"method": "vol"}, ["close_price"])
+    check_columns(None, [])
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+
+from backtesting.shared import snapshot as S
+from backtesting.shared.load import load_df
+from conftest import ASSET_TYPE, SYMBOL
+
+
+def _engine() -> S.Engine:
+    return S.Engine({"ma": S.RollingMean(50), "ew": S.EWMMean(9, 10, "close_price"), "rsi": S.EWMRSI(14),
+                     "pos": S.PositionState(0.02, 0.01, 20)})
+
+
+def _candles() -> pd.DataFrame:
+    df  = load_df(SYMBOL, "15m", ASSET_TYPE)
+    rng = np.random.default_rng(0)
+    return df.assign(signal=rng.choice([-1, 0, 0, 0, 1], len(df)))
+
+
+def test_restored_engine_matches_full_replay(market, tmp_path):
+    df, cut = _candles(), 400
+    whole = _engine().replay(df)
+
+    eng = _engine()
+    eng.replay(df.iloc[:cut])
+    eng.save(str(tmp_path / "snap" / "engine.npz"), extra={"note": "x"})
+    restored = S.Engine.load(str(tmp_path / "snap" / "engine.npz"))
+    assert restored.bars == cut and restored.last_time == eng.last_time and str(restored.extra["note"]) == "x"
+    assert S.check(restored, df, _engine) == {}
+
+    tail = restored.replay(df.iloc[cut:])
+    assert S.check(restored, df, _engine) == {}
+    pd.testing.assert_frame_equal(tail[["ma", "ew", "rsi"]], whole.iloc[cut:][["ma", "ew", "rsi"]])
+    assert tail["pos"].tolist() == whole["pos"].iloc[cut:].tolist()
+
+
+def test_check_reports_diverged_state(market):
+    df  = _candles()
+    eng = _engine()
+    eng.replay(df.iloc[:300])
+    eng.components["ma"].total += 1.0
+    assert set(S.check(eng, df, _engine)) == {"ma.total"}
+
+
+def test_components_match_pandas(market):
+    df  = _candles()
+    out = _engine().replay(df)
+    c   = df["close_price"]
+    np.testing.assert_allclose(out["ma"], c.rolling(50).mean(), rtol=1e-9)
+    np.testing.assert_allclose(out["ew"], c.ewm(com=9, min_periods=10).mean(), rtol=1e-12)
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from backtesting.shared import stats
+
+
+def test_psr_and_dsr_against_hand_computed_values():
+    # PSR = Φ((SR − SR*) √(n − 1) / √(1 − skew·SR + (kurt − 1)/4 · SR²))
+    assert stats.psr(0.1, 101, 0.0, 3.0) == pytest.approx(0.8407413278013518, rel=1e-12)     # Φ(1 / √1.005)
+    assert stats.psr(0.1, 101, -0.5, 5.0) == pytest.approx(0.8342970265275427, rel=1e-12)    # Φ(1 / √1.06)
+    assert np.isnan(stats.psr(0.1, 1, 0.0, 3.0))
+
+    # E[max SR] = σ_SR ((1 − γ) Φ⁻¹(1 − 1/N) + γ Φ⁻¹(1 − 1/(N e)))
+    sr_star = stats.expected_max_sr(0.01, 100)
+    assert sr_star == pytest.approx(0.2530602893201685, rel=1e-12)
+    assert stats.psr(0.3, 101, 0.0, 3.0, sr_star) == pytest.approx(0.6769472783229421, rel=1e-12)   # DSR
+    assert stats.expected_max_sr(0.01, 1) == 0.0 and stats.expected_max_sr(0.0, 100) == 0.0
+
+
+def test_effective_trials_counts_correlated_combos_once():
+    rng = np.random.default_rng(0)
+    base = rng.normal(size=256)
+    assert stats.effective_trials(base + rng.normal(0, 0.01, (40, 256))) < 1.5
+    assert stats.effective_trials(rng.normal(size=(40, 256))) > 30
+    blocks = np.repeat(rng.normal(size=(4, 256)), 10, axis=0) + rng.normal(0, 0.01, (40, 256))
+    assert 3 < stats.effective_trials(blocks) < 5
+
+
+@pytest.mark.parametrize("purge, embargo", [(0, 0), (2, 3)])
+def test_cpcv_splits_purge_and_embargo(purge, embargo):
+    n_obs, groups = 60, 6
+    splits = stats.cpcv_splits(n_obs, groups, 2, purge=purge, embargo=embargo)
+    assert len(splits) == 15
+    for train, test in splits:
+        assert not set(train) & set(test) and len(test) == 20
+        dropped = np.zeros(n_obs, bool)
+        for a in range(0, n_obs, 10):
+            if a in test:                     # a test group [a, a + 10)
+                dropped[max(a - purge, 0):a] = True
+                dropped[a + 10:a + 10 + purge + embargo] = True
+        is_test = np.isin(np.arange(n_obs), test)
+        assert train.tolist() == np.flatnonzero(~is_test & ~dropped).tolist()
+
+
+def test_pbo_is_about_half_on_noise_and_low_with_skill():
+    splits = stats.cpcv_splits(256, 6, 2)
+    noise  = [stats.pbo(np.random.default_rng(s).normal(size=(50, 256)), splits)["pbo"] for s in range(20)]
+    assert 0.35 < np.mean(noise) < 0.65
+
+    skilled = np.random.default_rng(0).normal(size=(50, 256))
+    skilled[7] += 0.5
+    assert stats.pbo(skilled, splits)["pbo"] == 0.0
@@ -0,0 +1,80 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from backtesting.shared import store
+
+GRID = pd.DataFrame({"tp_pct": [0.01, 0.02], "sharpe": [1.0, 0.5], "trades": [10, 12]})
+
+
+def _run(root, name: str) -> str:
+    d = root / "results" / "momentum" / name
+    d.mkdir(parents=True)
+    GRID.to_csv(d / "grid_search.csv", index=False)
+    return str(d)
+
+
+def test_connect_commits_and_closes(tmp_path):
+    db = str(tmp_path / "r.db")
+    with store.connect(db) as conn:
+        store.register_run(conn, _run(tmp_path, "20250801_BTCUSDT_15m_01"))
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
+    assert len(store.query("SELECT * FROM runs", db_path=db)) == 1
+
+
+def test_latest_run_prefers_a_newer_unregistered_dir(tmp_path):
+    db   = str(tmp_path / "r.db")
+    base = str(tmp_path / "results" / "momentum")
+    old  = _run(tmp_path, "20250801_BTCUSDT_15m_01")
+    store.record_results(old, "grid", store.grid_records(GRID, "BTCUSDT", None, None), db_path=db)
+    assert store.latest_run(base, db_path=db) == old
+    new = _run(tmp_path, "20250802_BTCUSDT_15m_01")   # written, never indexed
+    assert store.latest_run(base, db_path=db) == new
+    assert store.latest_run(str(tmp_path / "results" / "none"), db_path=db) is None
+
+
+def test_import_skips_dirs_that_are_not_runs(tmp_path):
+    db = str(tmp_path / "r.db")
+    _run(tmp_path, "20250801_BTCUSDT_15m_01")
+    _run(tmp_path, "20250801_BTCUSDT_15m_02_rerun")   # extra suffix: still a run, kept by split("_", 3)
+    _run(tmp_path, "scratch")
+    _run(tmp_path, "old_BTCUSDT")
+    assert store.import_results_dir(str(tmp_path / "results"), db_path=db) == 2
+    assert sorted(store.query("SELECT symbol, interval FROM runs", db_path=db).itertuples(index=False)) == \
+        [("BTCUSDT", "15m")] * 2
+    with store.connect(db) as conn, pytest.raises(ValueError, match="scratch"):
+        store.register_run(conn, str(tmp_path / "results" / "momentum" / "scratch"))
+
+
+# --- "best test Sharpe per strategy per interval" over validate results of several runs ---
+def test_best_by_picks_the_top_row_per_group(tmp_path):
+    db   = str(tmp_path / "r.db")
+    best = {}
+    for k, (strategy, name) in enumerate([("momentum", "20250801_BTCUSDT_15m_01"), ("momentum", "20250802_BTCUSDT_15m_01"),
+                                          ("momentum", "20250801_BTCUSDT_1h_01"), ("linreg", "20250801_ETHUSDT_15m_01")]):
+        d = tmp_path / "results" / strategy / name
+        d.mkdir(parents=True)
+        sharpes = [0.1 * k, 1.0 + k, -0.5]
+        store.record_results(str(d), "validate", [
+            {"params": {"tp_pct": 0.01 * i}, "symbol": name.split("_")[1], "sharpe": s, "trades": 10 + i, "passed": s > 0}
+            for i, s in enumerate(sharpes)], db_path=db)
+        key = (strategy, name.split("_")[2])
+        best[key] = max(best.get(key, -1e9), max(sharpes))
+
+    out = store.best_by(db_path=db)
+    assert {(r.strategy, r.interval): r.sharpe for r in out.itertuples()} == best
+    assert out["sharpe"].is_monotonic_decreasing
+    assert out.loc[(out["strategy"] == "momentum") & (out["interval"] == "15m"), "run_dir"].item().endswith("20250802_BTCUSDT_15m_01")
+
+    eth = store.best_by(group_by=("symbol",), where={"symbol": "ETHUSDT", "passed": 1}, db_path=db)
+    assert eth[["strategy", "symbol", "sharpe"]].values.tolist() == [["linreg", "ETHUSDT", 4.0]]
+    assert store.best_by(metric="trades", where={"interval": ["1h", "4h"]}, db_path=db)["trades"].tolist() == [12]
+
+
+@pytest.mark.parametrize("kw", [{"metric": "sharpe; DROP TABLE runs"}, {"group_by": ("strategy", "1) --")},
+                                {"where": {"1 = 1 OR symbol": "x"}}])
+def test_best_by_rejects_unknown_columns(tmp_path, kw):
+    with pytest.raises(ValueError, match="unknown"):
+        store.best_by(db_path=str(tmp_path / "r.db"), **kw)
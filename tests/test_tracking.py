@@ -0,0 +1,158 @@
+import multiprocessing as mp
+import threading
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from backtesting.momentum.src import optimize, validate
+from backtesting.shared import tracking
+from conftest import ASSET_TYPE, SYMBOL
+
+
+class FakeClient:
+    def __init__(self, hold: threading.Event = None):
+        self.calls, self.hold, self.started = [], hold, threading.Event()
+
+    def get_experiment_by_name(self, name):
+        return None
+
+    def create_experiment(self, name):
+        return "1"
+
+    def create_run(self, experiment_id, tags=None, run_name=None):
+        self.calls.append(("create_run", run_name))
+        self.started.set()
+        if self.hold is not None:
+            self.hold.wait(5)
+        return SimpleNamespace(info=SimpleNamespace(run_id=f"r{len(self.calls)}"))
+
+    def log_batch(self, run_id, metrics=(), params=(), tags=()):
+        self.calls.append(("log_batch", run_id, list(metrics), list(params), list(tags)))
+
+    def log_artifact(self, run_id, path):
+        self.calls.append(("log_artifact", run_id, path))
+
+    def set_terminated(self, run_id, status=None):
+        self.calls.append(("set_terminated", run_id, status))
+
+    def batches(self):
+        return [c for c in self.calls if c[0] == "log_batch"]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    pytest.importorskip("mlflow")
+    fake = FakeClient(threading.Event())
+    monkeypatch.setattr(tracking, "_mlflow", True)
+    monkeypatch.setattr(tracking, "_queue", None)
+    monkeypatch.setattr(tracking, "_thread", None)
+    monkeypatch.setattr(tracking, "_client", lambda: fake)
+    return fake
+
+
+def test_consecutive_logs_merge_into_one_batch(client):
+    key = tracking.start_run("k", "exp", "run")
+    assert client.started.wait(5)            # the thread is inside create_run; queue the rest meanwhile
+    for i in range(5):
+        tracking.log(key, params={f"p{i}": i}, metrics={"m": i, f"m{i}": i}, tags={"t": i})
+    tracking.end_run(key)
+    client.hold.set()
+    tracking.flush()
+
+    (batch,) = client.batches()
+    _, run_id, metrics, params, tags = batch
+    assert {p.key: p.value for p in params} == {f"p{i}": str(i) for i in range(5)}
+    assert {m.key: m.value for m in metrics} == {"m": 4.0} | {f"m{i}": float(i) for i in range(5)}
+    assert [(t.key, t.value) for t in tags] == [("t", "4")]
+    assert client.calls[-1] == ("set_terminated", run_id, "FINISHED")
+
+
+def test_batches_respect_mlflow_limits():
+    pytest.importorskip("mlflow")
+    client = FakeClient()
+    buf = {"params": {f"p{i}": i for i in range(250)}, "tags": {f"t{i}": i for i in range(150)},
+           "metrics": {(f"m{i % 7}", i): (i, 0) for i in range(2500)} | {("bad", 0): ("x", 0)}}
+    tracking._send(client, "r", buf)
+
+    batches = client.batches()
+    assert all(len(m) + len(p) + len(t) <= 1000 and len(p) <= 100 and len(t) <= 100 for _, _, m, p, t in batches)
+    assert sum(len(p) for _, _, _, p, _ in batches) == 250
+    assert sum(len(t) for _, _, _, _, t in batches) == 150
+    assert sorted(m.step for _, _, ms, _, _ in batches for m in ms) == list(range(2500))   # "bad" is not a number
+
+
+def test_grid_combos_batch_into_the_parent(client, tmp_path):
+    client.hold.set()
+    n   = 2500
+    df  = pd.DataFrame({"tp": [0.01 * (i % 5) for i in range(n)], "sharpe": [float(i) for i in range(n)],
+                        "trades": range(n)})
+    tracking.log_grid(str(tmp_path / "strat" / "run"), df, {"strategy_name": "strat"})
+    tracking.flush()
+
+    runs = [c for c in client.calls if c[0] == "create_run"]
+    assert len(runs) == 1 + tracking.TOP_CHILDREN
+    assert runs[1][1].startswith("tp=") and "combo" not in runs[1][1]
+    steps = [m.step for _, _, ms, _, _ in client.batches() for m in ms if m.key == "combo.sharpe"]
+    assert sorted(steps) == list(range(n))
+    assert len(client.batches()) < 20
+
+
+def test_flush_returns_once_drained(client):
+    client.hold.set()
+    for i in range(200):
+        key = tracking.start_run(i, "exp", f"run{i}")
+        tracking.log(key, metrics={"m": i})
+        tracking.end_run(key)
+    tracking.flush()
+    assert tracking._queue.unfinished_tasks == 0
+    assert sum(c[0] == "set_terminated" for c in client.calls) == 200
+
+
+def test_validation_with_an_erroring_config_still_logs(client, market, monkeypatch):
+    client.hold.set()
+    grid    = {"roc_window": [5, 10], "smooth_window": [3], "trend_window": [20], "roc_buy": [0.1], "roc_sell": [-0.1],
+               "tp_pct": [0.01], "sl_pct": [0.01], "max_candles": [24]}
+    evals   = dict(init_portfolio=1000, trade_size_pct=0.1, fee_pct=0.0005, leverage=10)
+    run_dir = optimize.run_grid_search(SYMBOL, "15m", "2025-08-01", "2025-08-04", grid, evals, ASSET_TYPE)
+    build   = validate._build_df
+
+    def failing(rawdf, p):
+        if int(p["roc_window"]) == 5:
+            raise ValueError("no candles")
+        return build(rawdf, p)
+
+    monkeypatch.setattr(validate, "_build_df", failing)
+    out = validate.run_validation(SYMBOL, "15m", "2025-08-04", "2025-08-07", evals, ASSET_TYPE, run_dir=run_dir,
+                                  rank_by="sharpe")
+    tracking.flush()
+    assert out["pass"].str.startswith("ERROR").sum() == 1 and len(out) == 2
+    runs = [c[1] for c in client.calls if c[0] == "create_run"]
+    assert runs[-2].endswith(" validate") and runs[-1].startswith("roc_window=10")   # one child: the config that built
+
+
+def _child_logs() -> None:
+    tracking.log(tracking.start_run("c", "exp", "child"), metrics={"m": 1})
+    tracking.flush()
+
+
+def test_forked_child_gets_its_own_thread(client):
+    client.hold.set()
+    tracking.log(tracking.start_run("p", "exp", "parent"), metrics={"m": 1})
+    tracking.flush()
+    proc = mp.get_context("fork").Process(target=_child_logs)
+    proc.start()
+    proc.join(10)
+    assert proc.exitcode == 0
+
+
+def test_without_mlflow_every_call_is_a_no_op(monkeypatch, tmp_path):
+    monkeypatch.setattr(tracking, "_mlflow", False)
+    monkeypatch.setattr(tracking, "_queue", None)
+    monkeypatch.setattr(tracking, "_thread", None)
+    run_dir = str(tmp_path / "strat" / "run")
+    tracking.log_grid(run_dir, pd.DataFrame({"tp": [0.01], "sharpe": [1.0]}), {"strategy_name": "strat"})
+    tracking.log_validate(run_dir, pd.DataFrame({"tp": [0.01], "test_sharpe": [1.0]}), {"strategy_name": "strat"})
+    tracking.log_diagnose(run_dir, {"tp": 0.01}, {"sharpe": 1.0}, ("a", "b"))
+    tracking.flush()
+    assert tracking._queue is None and tracking._thread is None
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtesting.shared.load import load_df
+from backtesting.shared.resample import attach_child_index, child_index, sub_bars
+from backtesting.shared.trade import simulate_trades
+from conftest import ASSET_TYPE, SYMBOL
+
+T0 = pd.Timestamp("2025-08-01")
+
+
+# --- 15m bars: a long entry at 100 on bar 0, then bar 1 reaching both tp (101) and sl (99) ---
+def _bars() -> pd.DataFrame:
+    ot = T0 + pd.to_timedelta([0, 15, 30], unit="min")
+    return pd.DataFrame({
+        "open_time": ot, "close_time": ot + pd.Timedelta(minutes=15) - pd.Timedelta(milliseconds=1),
+        "open_price": [100.0, 100.0, 100.2], "high_price": [100.1, 102.0, 100.5],
+        "low_price": [99.9, 98.0, 100.0], "close_price": [100.0, 100.2, 100.3], "signal": [1, 0, 0],
+    })
+
+
+# --- 1m children of bar 1 with one excursion to `first` and later one to `second` ---
+def _children(first: tuple, second: tuple) -> pd.DataFrame:
+    ot   = T0 + pd.to_timedelta(np.arange(15, 30), unit="min")
+    high = np.full(15, 100.3)
+    low  = np.full(15, 99.7)
+    for k, (h, l) in ((3, first), (9, second)):
+        high[k], low[k] = h, l
+    return pd.DataFrame({"open_time": ot, "high_price": high, "low_price": low})
+
+
+@pytest.mark.parametrize("first, second, reason, price", [
+    ((101.5, 99.8), (100.1, 98.5), "tp", 101.0),    # tp touched in minute 3, sl only in minute 9
+    ((100.1, 98.5), (101.5, 99.8), "sl", 99.0),
+    ((101.5, 98.5), (100.1, 99.8), "sl", 99.0),     # both in the same minute: the stop is assumed first
+])
+def test_child_candles_decide_tp_vs_sl(first, second, reason, price):
+    df  = _bars()
+    sub = sub_bars(_children(first, second))
+    for frame in (df, attach_child_index(df.copy(), sub)):
+        t = simulate_trades(frame, tp_pct=0.01, sl_pct=0.01, intrabar=True, sub_bars=sub)
+        assert (t["exit_reason"].iloc[0], t["exit_price"].iloc[0], t["candles"].iloc[0]) == (reason, price, 1)
+
+
+def test_without_children_the_stop_is_assumed_first():
+    df = _bars()
+    t  = simulate_trades(df, tp_pct=0.01, sl_pct=0.01, intrabar=True)
+    assert (t["exit_reason"].iloc[0], t["exit_price"].iloc[0]) == ("sl", 99.0)
+
+    sub = sub_bars(_children((101.5, 99.8), (100.1, 98.5)).iloc[:0])   # a bar whose 1m rows are missing
+    start, end = child_index(df, sub)
+    assert (start == end).all()
+    t = simulate_trades(df, tp_pct=0.01, sl_pct=0.01, intrabar=True, sub_bars=sub)
+    assert t["exit_reason"].iloc[0] == "sl"
+
+
+def test_gap_through_the_level_fills_at_the_open():
+    df = _bars().assign(open_price=[100.0, 97.0, 100.2])   # bar 1 opens below the stop
+    t  = simulate_trades(df, tp_pct=0.01, sl_pct=0.01, intrabar=True)
+    assert (t["exit_reason"].iloc[0], t["exit_price"].iloc[0]) == ("sl", 97.0)
+
+
+# --- the close-only loop simulate_trades replaced, kept as the reference for intrabar=False ---
+def _close_only(df, tp_pct, sl_pct, max_candles) -> pd.DataFrame:
+    trades, position = [], 0
+    sig, close, ot = df["signal"].to_numpy(), df["close_price"].to_numpy(), df["open_time"].to_numpy()
+    for i in range(len(df)):
+        if position == 0:
+            if sig[i] != 0:
+                position, entry, entry_price, held = sig[i], i, close[i], 0
+            continue
+        ret, held = position * (close[i] - entry_price) / entry_price, held + 1
+        reason = ("tp" if tp_pct is not None and ret >= tp_pct else "sl" if sl_pct is not None and ret <= -sl_pct
+                  else "timeout" if max_candles is not None and held >= max_candles
+                  else "signal" if sig[i] == -position else None)
+        if reason:
+            trades.append((ot[entry], ot[i], entry_price, close[i], position, held, reason))
+            position = 0
+            if reason == "signal":
+                position, entry, entry_price, held = sig[i], i, close[i], 0
+    if position != 0:
+        trades.append((ot[entry], ot[-1], entry_price, close[-1], position, held, "end"))
+    return pd.DataFrame(trades, columns=["entry_time", "exit_time", "entry_price", "exit_price", "signal", "candles",
+                                         "exit_reason"])
+
+
+@pytest.mark.parametrize("tp_pct, sl_pct, max_candles", [(0.004, 0.003, 12), (0.05, 0.05, 6), (0.01, None, None), (None, 0.002, 40)])
+def test_close_only_mode_matches_the_reference_loop(market, tp_pct, sl_pct, max_candles):
+    df  = load_df(SYMBOL, "15m", ASSET_TYPE)
+    df  = df.assign(signal=np.random.default_rng(1).choice([-1, 0, 0, 0, 0, 0, 1], len(df)))
+    got = simulate_trades(df, tp_pct=tp_pct, sl_pct=sl_pct, max_candles=max_candles)
+    pd.testing.assert_frame_equal(got, _close_only(df, tp_pct, sl_pct, max_candles), check_dtype=False)